@@ -0,0 +1,138 @@
+"""
+Implements the CompileCache class, an on-disk cache of the compiled forms of scripts.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import sys
+import tempfile
+
+# The version of the cached forms, which is part of every key. It must be bumped whenever a cached form changes
+# (e.g. a field is added to an AST node class), so that entries written by an older interpreter are not used.
+CACHE_VERSION = 2
+
+# Once the entries of a cache directory take up more than this many bytes, the least recently used are evicted
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def default_directory() -> str:
+    """
+    Return the default cache directory: `$BARNACLE_CACHE_DIR` if it is set, otherwise `barnacle` within the
+    user's cache directory (`$XDG_CACHE_HOME`, or `~/.cache`).
+    """
+
+    if directory := os.environ.get("BARNACLE_CACHE_DIR"):
+        return directory
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(cache_home, "barnacle")
+
+
+class CompileCache:
+    """
+    A directory of the compiled forms of scripts (e.g. their AST), like Python's `__pycache__`, so that a script
+    which has not changed does not have to be tokenized and parsed again every time it is run.
+
+    The forms are stored as the bytes they are serialized into (e.g. by `binary.dumps`), and it is up to the caller
+    to check them when they are deserialized (`binary.loads` raises a ValueError for a damaged entry).
+
+    Each entry is a file named by a hash of the script's source, the interpreter's version (`CACHE_VERSION` and the
+    Python version) and the name of the form, so a changed script or a different interpreter simply misses.
+    Entries are written to a temporary file and renamed into place, so a reader never sees a partly written entry.
+    Once the entries take up more than `max_bytes`, the least recently used are evicted.
+
+    The cache is only an optimization: an entry which cannot be read or written is logged and skipped.
+    """
+
+    def __init__(self, directory: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory if directory is not None else default_directory()
+        self.max_bytes = max_bytes
+
+    def key(self, source: str | bytes | mmap.mmap, form: str) -> str:
+        """Return the key of the compiled form of the source, which is also the name of its entry file."""
+
+        digest = hashlib.sha256(f"barnacle {CACHE_VERSION} {sys.implementation.cache_tag} {form}\n".encode("utf-8"))
+        digest.update(source.encode("utf-8") if isinstance(source, str) else source)
+
+        return f"{digest.hexdigest()}.{form}"
+
+    def load(self, source: str | bytes | mmap.mmap, form: str) -> bytes | None:
+        """Return the bytes of the cached compiled form of the source, or None if it is not in the cache."""
+
+        path = os.path.join(self.directory, self.key(source, form))
+
+        try:
+            with open(path, "rb") as entry_file:
+                data = entry_file.read()
+        except FileNotFoundError:
+            logging.debug("Compile cache miss for '%s'", path)
+            return None
+        except OSError as error:
+            logging.warning("Ignoring unreadable compile cache entry '%s': %s", path, error)
+            return None
+
+        # An entry's modification time is when it was last used, for evicting the least recently used entries
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        logging.debug("Compile cache hit for '%s'", path)
+
+        return data
+
+    def store(self, source: str | bytes | mmap.mmap, form: str, data: bytes):
+        """Store the bytes of the compiled form of the source, then evict entries if the cache is over its size cap."""
+
+        path = os.path.join(self.directory, self.key(source, form))
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            # The entry only appears under its name once it has been written in full
+            handle, temporary_path = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+
+            try:
+                with os.fdopen(handle, "wb") as entry_file:
+                    entry_file.write(data)
+
+                os.replace(temporary_path, path)
+            except BaseException:
+                os.unlink(temporary_path)
+                raise
+
+            self.evict()
+        except OSError as error:
+            logging.warning("Could not write compile cache entry '%s': %s", path, error)
+            return
+
+        logging.debug("Stored compile cache entry '%s' (%d bytes)", path, len(data))
+
+    def evict(self):
+        """Remove the least recently used entries until the entries take up no more than `max_bytes`."""
+
+        entries = []
+
+        with os.scandir(self.directory) as directory_entries:
+            for entry in directory_entries:
+                # Temporary files of writes which are still in progress are skipped
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            logging.debug("Evicted compile cache entry '%s'", path)
+            total_bytes -= size
@@ -0,0 +1,180 @@
+"""
+Implements the bytecode which the Compiler lowers the AST into, and its disassembler.
+"""
+
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Iterator
+
+from bcl_parser import nodes
+from bcl_tokenizer.positions import LineIndex
+
+
+class Opcode(IntEnum):
+    """
+    The opcode of a bytecode instruction.
+
+    The binary operators come first, so that the virtual machine can tell them apart from the rest with a single
+    comparison against `BINARY_OPERATION`.
+    """
+
+    # ==================== Binary operators (pop the right operand, then replace the left one) ====================
+    BINARY_ADD = 0
+    BINARY_SUBTRACT = 1
+    BINARY_MULTIPLY = 2
+    BINARY_DIVIDE = 3
+    COMPARE_LESS = 4
+    COMPARE_LESS_EQUAL = 5
+    COMPARE_MORE = 6
+    COMPARE_MORE_EQUAL = 7
+    COMPARE_EQUAL = 8
+    COMPARE_NOT_EQUAL = 9
+    BINARY_OPERATION = 10  # Any other operator, named by the argument
+    # ==================== Values ====================
+    LOAD_CONST = 11  # Push a constant
+    LOAD_LOCAL = 12  # Push the value of the named variable, from the innermost scope which declares it
+    STORE_LOCAL = 13  # Pop a value into the named variable, in the innermost scope which declares it
+    DECLARE_LOCAL = 14  # Pop a value into a new variable in the current scope
+    POP_TOP = 15  # Discard the value on top of the stack
+    PRINT = 16  # Pop a value and print it
+    # ==================== Control flow ====================
+    JUMP = 17  # Continue from the instruction at the argument
+    JUMP_IF_FALSE = 18  # Pop a value, and jump if it is falsy
+    JUMP_IF_TRUE = 19  # Pop a value, and jump if it is truthy
+    PUSH_SCOPE = 20  # Enter a new scope for a code block
+    POP_SCOPE = 21  # Leave the given number of scopes
+    # ==================== Functions ====================
+    DECLARE_FUNCTION = 22  # Declare the function constant in the current scope
+    LOAD_FUNCTION = 23  # Push the named function and the scope which declares it
+    CHECK_ARITY = 24  # Raise an error if the function just loaded does not take the given number of arguments
+    CALL = 25  # Call the function below the given number of arguments, and push its result (None if it returned none)
+    CHECK_RESULT = 26  # Raise an error if the named function's result, on top of the stack, is None
+    RETURN = 27  # Pop a value, and return it from the current code object
+
+
+# The operator of each binary opcode, as used by `calculate_binary_operation`
+BINARY_OPERATORS = {
+    "+": Opcode.BINARY_ADD,
+    "-": Opcode.BINARY_SUBTRACT,
+    "*": Opcode.BINARY_MULTIPLY,
+    "/": Opcode.BINARY_DIVIDE,
+    "<": Opcode.COMPARE_LESS,
+    "<=": Opcode.COMPARE_LESS_EQUAL,
+    ">": Opcode.COMPARE_MORE,
+    ">=": Opcode.COMPARE_MORE_EQUAL,
+    "==": Opcode.COMPARE_EQUAL,
+    "!=": Opcode.COMPARE_NOT_EQUAL,
+}
+
+OPERATOR_NAMES = {opcode: name for name, opcode in BINARY_OPERATORS.items()}
+
+# The opcodes whose argument is an index into the constants of the code object, into its names, or a jump target
+CONSTANT_OPCODES = frozenset({Opcode.LOAD_CONST, Opcode.DECLARE_FUNCTION})
+NAME_OPCODES = frozenset(
+    {
+        Opcode.BINARY_OPERATION,
+        Opcode.LOAD_LOCAL,
+        Opcode.STORE_LOCAL,
+        Opcode.DECLARE_LOCAL,
+        Opcode.LOAD_FUNCTION,
+        Opcode.CHECK_RESULT,
+    }
+)
+JUMP_OPCODES = frozenset({Opcode.JUMP, Opcode.JUMP_IF_FALSE, Opcode.JUMP_IF_TRUE})
+
+
+@dataclass(slots=True, eq=False)
+class CodeObject:
+    """
+    The bytecode of a function, or of a program.
+
+    The instructions are a flat list of opcode and argument pairs: the opcode of the instruction at `pc` is
+    `instructions[pc]` and its argument (0 if it takes none) is `instructions[pc + 1]`, so every jump target is even.
+    The source offset of the innermost statement an instruction belongs to (or None) is `positions[pc // 2]`.
+    """
+
+    name: str
+    parameters: list[str] = field(default_factory=list)
+    instructions: list[int] = field(default_factory=list)
+    constants: list[Any] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+    positions: list[int | None] = field(default_factory=list)
+
+
+@dataclass(slots=True, eq=False)
+class Function:
+    """
+    A function, as a constant declared by `DECLARE_FUNCTION`.
+
+    Its code object is compiled along with the code object which declares it, unless its code block has not been
+    parsed yet (when function bodies are parsed lazily), in which case it is compiled when the function is first
+    called.
+    """
+
+    name: str
+    parameters: list[str]
+    code_block: nodes.CodeBlock | nodes.UnparsedCodeBlock
+    code: CodeObject | None = None
+
+    # Declaring the parameters fails on the first one which has the same name as an earlier one
+    duplicate_parameter: str | None = None
+
+
+def disassemble(code: CodeObject, line_index: LineIndex | None = None) -> Iterator[str]:
+    """
+    Yield the lines of a human-readable listing of the code object, followed by those of the functions it declares.
+    If a line index of the source is given, each instruction which starts a new source line is labelled with it.
+    """
+
+    pending = [code]
+
+    while pending:
+        code = pending.pop(0)
+        parameters = ", ".join(code.parameters)
+
+        yield f"Disassembly of {code.name}({parameters}):"
+
+        previous_line = None
+
+        for pc in range(0, len(code.instructions), 2):
+            opcode = Opcode(code.instructions[pc])
+            argument = code.instructions[pc + 1]
+            offset = code.positions[pc // 2]
+            line = line_index.position(offset)[0] if line_index is not None and offset is not None else None
+
+            line_label = str(line) if line is not None and line != previous_line else ""
+            previous_line = line if line is not None else previous_line
+
+            text = f"{line_label:>6} {pc:>6} {opcode.name:<20}"
+
+            if opcode in CONSTANT_OPCODES:
+                constant = code.constants[argument]
+                text += f"{argument:>4} ({__describe_constant(constant)})"
+
+                if isinstance(constant, Function) and constant.code is not None:
+                    pending.append(constant.code)
+            elif opcode in NAME_OPCODES:
+                text += f"{argument:>4} ({code.names[argument]})"
+            elif opcode in JUMP_OPCODES:
+                text += f"{argument:>4} (to {argument})"
+            elif opcode in (Opcode.CHECK_ARITY, Opcode.CALL, Opcode.POP_SCOPE):
+                text += f"{argument:>4}"
+
+            yield text.rstrip()
+
+        yield ""
+
+
+def __describe_constant(constant: Any) -> str:
+    """Return a description of a constant, as it would be written in Barnacle."""
+
+    if isinstance(constant, Function):
+        return f"function {constant.name}" + ("" if constant.code is not None else ", compiled when first called")
+
+    if isinstance(constant, bool):
+        return "true" if constant else "false"
+
+    if isinstance(constant, str):
+        return f'"{constant}"'
+
+    return repr(constant)
@@ -0,0 +1,348 @@
+"""
+Implements the Compiler class, which lowers the AST of a Barnacle program into bytecode for the virtual machine.
+"""
+
+import logging
+from typing import Any, Callable
+
+from bcl_parser import nodes
+from bcl_parser.nodes import NodeKind
+
+from .bytecode import BINARY_OPERATORS, CodeObject, Function, Opcode
+
+# A position in the instructions which is not known yet when a jump to it is emitted
+Label = list[int]
+
+
+def compile_program(ast: nodes.Program) -> CodeObject:
+    """Compile a whole program, and the functions it declares whose code blocks have been parsed."""
+
+    return Compiler("<program>", top_level=True).compile_all(ast.body)
+
+
+def compile_statement(ast: nodes.Node) -> CodeObject:
+    """Compile a single top-level statement (e.g. of a streamed source), and the functions it declares."""
+
+    return Compiler("<statement>", top_level=True).compile_all([ast])
+
+
+def compile_function(function: Function, code_block: nodes.CodeBlock) -> CodeObject:
+    """Compile the code block of a function, and the functions it declares, and set it as the function's code."""
+
+    return Compiler(function.name, function.parameters, function=function).compile_all(code_block.body)
+
+
+class Compiler:
+    """
+    Compiles a list of statements into a code object.
+
+    The AST is walked without recursion: a stack holds the pending steps of the walk (visiting a node, emitting an
+    instruction, marking a label...), and visiting a node pushes the steps which compile it, so expressions and
+    blocks of any depth can be compiled. A jump to a label which has not been marked yet is fixed up at the end.
+
+    The bytecode keeps the semantics of the Interpreter:
+
+    - Each code block (including the body of a loop, on each iteration) runs in a new scope
+    - A top-level `return`, or a call statement whose function returns a truthy value, ends the top-level statement
+      it is in, and the program goes on with the next one
+    - A call statement whose function returns a truthy value within a function returns from that function, with no
+      value
+    """
+
+    def __init__(
+        self,
+        name: str,
+        parameters: list[str] | None = None,
+        top_level: bool = False,
+        function: Function | None = None,
+    ):
+        self.code = CodeObject(name, list(parameters or []))
+        self.top_level = top_level
+        self.function = function
+
+        # Functions declared in the code object, whose code objects are compiled after it
+        self.functions: list[Function] = []
+
+        self.__pending: list[tuple[Callable[[Any], None], Any]] = []
+        self.__fixups: list[tuple[int, Label]] = []
+        self.__constants: dict[tuple[type, Any], int] = {}
+        self.__names: dict[str, int] = {}
+
+        # The source offset of the statement being compiled, and the number of scopes entered since the start of the
+        # current top-level statement (which must be left to jump to its end)
+        self.__offset: int | None = None
+        self.__depth = 0
+        self.__statement_end: Label | None = None
+
+    def compile_all(self, statements: list[nodes.Node]) -> CodeObject:
+        """
+        Compile the statements, then the functions declared in them and in those functions, one after another rather
+        than recursively. Return the code object of the statements.
+        """
+
+        code = self.compile(statements)
+        functions = list(self.functions)
+
+        while functions:
+            function = functions.pop()
+
+            if function.code is None and function.code_block.kind == NodeKind.CODE_BLOCK:
+                nested = Compiler(function.name, function.parameters, function=function)
+                nested.compile(function.code_block.body)
+                functions.extend(nested.functions)
+
+        return code
+
+    def compile(self, statements: list[nodes.Node]) -> CodeObject:
+        """Compile the statements into the code object, and return it."""
+
+        visit = self.__top_level_statement if self.top_level else self.__statement
+        self.__then(*[(visit, statement) for statement in statements])
+
+        while self.__pending:
+            step, argument = self.__pending.pop()
+            step(argument)
+
+        self.__emit((Opcode.LOAD_CONST, self.__constant(None)))
+        self.__emit((Opcode.RETURN, 0))
+
+        for pc, label in self.__fixups:
+            self.code.instructions[pc + 1] = label[0]
+
+        if self.function is not None:
+            self.function.code = self.code
+
+        logging.debug("Compiled code object '%s' (%d instructions)", self.code.name, len(self.code.positions))
+
+        return self.code
+
+    # ==================================================================================================================
+    # Steps of the walk
+    # ==================================================================================================================
+
+    def __then(self, *steps: tuple[Callable[[Any], None], Any]):
+        """Push steps to run next, in order."""
+
+        self.__pending.extend(reversed(steps))
+
+    def __emit(self, instruction: tuple[Opcode, int]):
+        opcode, argument = instruction
+
+        self.code.instructions.append(int(opcode))
+        self.code.instructions.append(argument)
+        self.code.positions.append(self.__offset)
+
+    def __emit_jump(self, jump: tuple[Opcode, Label]):
+        opcode, label = jump
+
+        self.__fixups.append((len(self.code.instructions), label))
+        self.__emit((opcode, -1))
+
+    def __mark(self, label: Label):
+        label[0] = len(self.code.instructions)
+
+    def __set_offset(self, offset: int | None):
+        self.__offset = offset
+
+    def __enter_scope(self, _: None):
+        self.__depth += 1
+        self.__emit((Opcode.PUSH_SCOPE, 0))
+
+    def __leave_scope(self, _: None):
+        self.__depth -= 1
+        self.__emit((Opcode.POP_SCOPE, 1))
+
+    def __leave_statement(self, _: None):
+        """
+        Emit the instructions which end the current statement early: returning from the function with no value, or
+        leaving every scope entered by the current top-level statement and jumping to its end.
+        """
+
+        if not self.top_level:
+            self.__emit((Opcode.LOAD_CONST, self.__constant(None)))
+            self.__emit((Opcode.RETURN, 0))
+            return
+
+        if self.__depth:
+            self.__emit((Opcode.POP_SCOPE, self.__depth))
+
+        self.__emit_jump((Opcode.JUMP, self.__statement_end))
+
+    def __start_top_level_statement(self, label: Label):
+        self.__depth = 0
+        self.__statement_end = label
+
+    # ==================================================================================================================
+    # Statements and expressions
+    # ==================================================================================================================
+
+    def __top_level_statement(self, ast: nodes.Node):
+        end = [-1]
+
+        self.__then(
+            (self.__start_top_level_statement, end),
+            (self.__statement, ast),
+            (self.__mark, end),
+        )
+
+    def __statement(self, ast: nodes.Node):
+        # A statement without an offset (e.g. parsed without positions) reports that of the statement it is in
+        offset = ast.offset if ast.offset is not None else self.__offset
+        steps = [(self.__set_offset, offset)]
+
+        match ast.kind:
+            case NodeKind.PRINT:
+                steps += [(self.__expression, ast.body), (self.__emit, (Opcode.PRINT, 0))]
+            case NodeKind.VAR_DECLARATION:
+                name = self.__name(ast.identifier.name)
+                steps += [(self.__expression, ast.value), (self.__emit, (Opcode.DECLARE_LOCAL, name))]
+            case NodeKind.VAR_ASSIGNMENT:
+                name = self.__name(ast.identifier.name)
+                steps += [(self.__expression, ast.value), (self.__emit, (Opcode.STORE_LOCAL, name))]
+            case NodeKind.CODE_BLOCK:
+                steps += self.__code_block(ast)
+            case NodeKind.CONDITIONAL:
+                steps += self.__conditional(ast)
+            case NodeKind.WHILE:
+                start, end = [-1], [-1]
+                steps += [
+                    (self.__mark, start),
+                    (self.__expression, ast.expression),
+                    (self.__emit_jump, (Opcode.JUMP_IF_FALSE, end)),
+                    *self.__code_block(ast.body),
+                    (self.__emit_jump, (Opcode.JUMP, start)),
+                    (self.__mark, end),
+                ]
+            case NodeKind.DO_WHILE:
+                start = [-1]
+                steps += [
+                    (self.__mark, start),
+                    *self.__code_block(ast.body),
+                    (self.__expression, ast.expression),
+                    (self.__emit_jump, (Opcode.JUMP_IF_TRUE, start)),
+                ]
+            case NodeKind.FUNC_DECLARATION:
+                steps.append((self.__emit, (Opcode.DECLARE_FUNCTION, self.__function(ast))))
+            case NodeKind.FUNC_CALL:
+                skip = [-1]
+                steps += [
+                    *self.__call(ast),
+                    (self.__emit_jump, (Opcode.JUMP_IF_FALSE, skip)),
+                    (self.__leave_statement, None),
+                    (self.__mark, skip),
+                ]
+            case NodeKind.RETURN:
+                steps.append((self.__expression, ast.body))
+
+                if self.top_level:
+                    steps += [(self.__emit, (Opcode.POP_TOP, 0)), (self.__leave_statement, None)]
+                else:
+                    steps.append((self.__emit, (Opcode.RETURN, 0)))
+
+        steps.append((self.__set_offset, self.__offset))
+        self.__then(*steps)
+
+    def __code_block(self, ast: nodes.CodeBlock) -> list[tuple[Callable[[Any], None], Any]]:
+        return [
+            (self.__enter_scope, None),
+            *[(self.__statement, statement) for statement in ast.body],
+            (self.__leave_scope, None),
+        ]
+
+    def __conditional(self, ast: nodes.Conditional) -> list[tuple[Callable[[Any], None], Any]]:
+        end = [-1]
+        steps = []
+
+        while ast is not None and ast.kind == NodeKind.CONDITIONAL:
+            next_branch = [-1]
+            steps += [
+                (self.__expression, ast.expression),
+                (self.__emit_jump, (Opcode.JUMP_IF_FALSE, next_branch)),
+                *self.__code_block(ast.on_true),
+                (self.__emit_jump, (Opcode.JUMP, end)),
+                (self.__mark, next_branch),
+            ]
+            ast = ast.on_false
+
+        if ast is not None:
+            steps += self.__code_block(ast)
+
+        steps.append((self.__mark, end))
+
+        return steps
+
+    def __call(self, ast: nodes.FuncCall) -> list[tuple[Callable[[Any], None], Any]]:
+        return [
+            (self.__emit, (Opcode.LOAD_FUNCTION, self.__name(ast.identifier.name))),
+            (self.__emit, (Opcode.CHECK_ARITY, len(ast.parameters))),
+            *[(self.__expression, parameter) for parameter in ast.parameters],
+            (self.__emit, (Opcode.CALL, len(ast.parameters))),
+        ]
+
+    def __expression(self, ast: nodes.Node):
+        match ast.kind:
+            case NodeKind.STRING_LITERAL | NodeKind.NUMERIC_LITERAL | NodeKind.BOOLEAN_LITERAL:
+                self.__emit((Opcode.LOAD_CONST, self.__constant(ast.value)))
+            case NodeKind.IDENTIFIER:
+                self.__emit((Opcode.LOAD_LOCAL, self.__name(ast.name)))
+            case NodeKind.BINARY_EXPRESSION:
+                self.__then(
+                    (self.__expression, ast.left),
+                    (self.__expression, ast.right),
+                    (self.__emit, self.__operator(ast.operator)),
+                )
+            case NodeKind.NARY_EXPRESSION:
+                operator = self.__operator(ast.operator)
+                steps = [(self.__expression, ast.operands[0])]
+
+                for operand in ast.operands[1:]:
+                    steps += [(self.__expression, operand), (self.__emit, operator)]
+
+                self.__then(*steps)
+            case NodeKind.FUNC_CALL:
+                name = self.__name(ast.identifier.name)
+                self.__then(*self.__call(ast), (self.__emit, (Opcode.CHECK_RESULT, name)))
+
+    # ==================================================================================================================
+    # Constants and names
+    # ==================================================================================================================
+
+    def __operator(self, operator: str) -> tuple[Opcode, int]:
+        opcode = BINARY_OPERATORS.get(operator)
+
+        if opcode is None:
+            return Opcode.BINARY_OPERATION, self.__name(operator)
+
+        return opcode, 0
+
+    def __constant(self, value: Any) -> int:
+        # Keyed by type as well, so that e.g. 1, 1.0 and true are separate constants
+        key = (type(value), value)
+        index = self.__constants.get(key)
+
+        if index is None:
+            index = self.__constants[key] = len(self.code.constants)
+            self.code.constants.append(value)
+
+        return index
+
+    def __name(self, name: str) -> int:
+        index = self.__names.get(name)
+
+        if index is None:
+            index = self.__names[name] = len(self.code.names)
+            self.code.names.append(name)
+
+        return index
+
+    def __function(self, ast: nodes.FuncDeclaration) -> int:
+        parameters = [parameter.name for parameter in ast.parameters]
+        duplicates = [name for i, name in enumerate(parameters) if name in parameters[:i]]
+
+        function = Function(ast.identifier.name, parameters, ast.body, duplicate_parameter=next(iter(duplicates), None))
+        self.functions.append(function)
+
+        # Every declaration is its own constant, even if another one is identical
+        self.code.constants.append(function)
+
+        return len(self.code.constants) - 1
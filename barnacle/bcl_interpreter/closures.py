@@ -0,0 +1,399 @@
+"""
+Implements the ClosureInterpreter class.
+"""
+
+import logging
+from typing import Any, Callable, Iterator
+
+from bcl_parser import nodes
+from bcl_parser.nodes import NodeKind
+
+from .engine import Engine
+from .operations import compile_binary_operation
+from .scope import Scope
+
+
+class CompiledFunction:
+    """
+    A function declaration, whose code block is compiled the first time the function is called.
+
+    A declaration which is run again (e.g. within a loop) declares the same CompiledFunction, so its code block is
+    only ever compiled once.
+    """
+
+    __slots__ = ("name", "parameters", "code_block", "body", "duplicate_parameter")
+
+    def __init__(self, name: str, parameters: list[str], code_block: nodes.CodeBlock | nodes.UnparsedCodeBlock):
+        self.name = name
+        self.parameters = parameters
+        self.code_block = code_block
+        self.body: Callable[[Scope], Any] | None = None
+
+        # Declaring the parameters fails on the first one which has the same name as an earlier one
+        self.duplicate_parameter = next(
+            (name for index, name in enumerate(parameters) if name in parameters[:index]),
+            None,
+        )
+
+
+class Return:
+    """The result of a `return` statement, which ends every code block up to the function's."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+class ClosureInterpreter(Engine):
+    """
+    The Barnacle Interpreter, as a closure-compiling engine (selected with `--engine closure`).
+
+    Rather than walking the AST each time it is run, the AST is compiled once into a tree of nested Python closures,
+    each specialized for one node (e.g. a binary expression with a `+` operator). Running the program is then just
+    calling the closures: nothing is dispatched on the kind of a node, validated or logged at run time.
+
+    It takes the arguments described in `Engine`, and behaves as the `Interpreter` class, including its errors and
+    their positions.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__program: list[Callable[[Scope], Any]] | None = None
+
+        # The compiled code blocks of lazily parsed functions, keyed by the index of their first token
+        self.__compiled_code_blocks: dict[int, Callable[[Scope], Any]] = {}
+
+        # The closures which compile each kind of node
+        self.__statement_compilers = {
+            NodeKind.PRINT: self.__compile_print,
+            NodeKind.CONDITIONAL: self.__compile_conditional,
+            NodeKind.VAR_DECLARATION: self.__compile_var_declaration,
+            NodeKind.VAR_ASSIGNMENT: self.__compile_var_assignment,
+            NodeKind.CODE_BLOCK: self.__compile_code_block,
+            NodeKind.WHILE: self.__compile_while_loop,
+            NodeKind.DO_WHILE: self.__compile_do_while_loop,
+            NodeKind.FUNC_DECLARATION: self.__compile_func_declaration,
+            NodeKind.FUNC_CALL: self.__compile_func_call,
+            NodeKind.RETURN: self.__compile_return,
+        }
+
+        self.__expression_compilers = {
+            NodeKind.STRING_LITERAL: self.__compile_literal,
+            NodeKind.NUMERIC_LITERAL: self.__compile_literal,
+            NodeKind.BOOLEAN_LITERAL: self.__compile_literal,
+            NodeKind.IDENTIFIER: self.__compile_variable,
+            NodeKind.BINARY_EXPRESSION: self.__compile_binary_expression,
+            NodeKind.NARY_EXPRESSION: self.__compile_nary_expression,
+            NodeKind.FUNC_CALL: self.__compile_func_call_as_expression,
+        }
+
+    def run(self):
+        """Runs the Barnacle interpreter on the provided source."""
+
+        global_scope = Scope()
+
+        if self.ast is None:
+            self.__run_statements(global_scope, self.statements())
+            return
+
+        if self.__program is None:
+            self.__program = [self.__compile_statements([statement]) for statement in self.ast.body]
+            logging.debug("Compiled AST into closures")
+
+        # As in the Interpreter, a `return` statement outside of a function only ends its own top-level statement
+        for statement in self.__program:
+            statement(global_scope)
+
+    def __run_statements(self, scope: Scope, statements: Iterator[nodes.Node]):
+        """Compile and run a stream of top-level statements, a statement at a time."""
+
+        for statement in statements:
+            self.__compile_statements([statement])(scope)
+
+    def __compile_statements(self, statements: list[nodes.Node]) -> Callable[[Scope], Any]:
+        """
+        Compile a list of statements, which are run in the scope they are given. A `return` statement (or a call to
+        a function which returns a truthy value, as in the Interpreter) ends them early, and its result is returned.
+        """
+
+        compiled = [(self.__statement_compilers[statement.kind](statement), statement) for statement in statements]
+        add_error_position = self.add_error_position
+
+        # The statement which raised an error is the one the loop is on, so the error is positioned once here
+        # rather than by a wrapper around every statement
+        def run_statements(scope: Scope) -> Any:
+            ast: nodes.Node | None = None
+
+            try:
+                for statement, ast in compiled:
+                    if result := statement(scope):
+                        return result
+            except RuntimeError as error:
+                add_error_position(error, ast.offset)
+                raise
+
+            return None
+
+        return run_statements
+
+    def __compile_code_block(self, ast: nodes.CodeBlock) -> Callable[[Scope], Any]:
+        """Compile a code block, which runs its statements in a new scope."""
+
+        statements = self.__compile_statements(ast.body)
+
+        def code_block(scope: Scope) -> Any:
+            return statements(Scope(scope))
+
+        return code_block
+
+    def __compile_print(self, ast: nodes.Print) -> Callable[[Scope], None]:
+        expression = self.__compile_expression(ast.body)
+
+        def print_statement(scope: Scope):
+            value = expression(scope)
+
+            if value.__class__ is bool:
+                value = "true" if value else "false"
+
+            print(value)
+
+        return print_statement
+
+    def __compile_var_declaration(self, ast: nodes.VarDeclaration) -> Callable[[Scope], None]:
+        name = ast.identifier.name
+        expression = self.__compile_expression(ast.value)
+
+        def var_declaration(scope: Scope):
+            value = expression(scope)
+            variables = scope.variables
+
+            if name in variables:
+                raise RuntimeError(f"Tried to declare variable '{name}' which already exists")
+
+            variables[name] = value
+
+        return var_declaration
+
+    def __compile_var_assignment(self, ast: nodes.VarAssignment) -> Callable[[Scope], None]:
+        name = ast.identifier.name
+        expression = self.__compile_expression(ast.value)
+
+        def var_assignment(scope: Scope):
+            value = expression(scope)
+
+            while scope is not None:
+                variables = scope.variables
+
+                if name in variables:
+                    variables[name] = value
+                    return
+
+                scope = scope.parent
+
+            raise RuntimeError(f"Tried to update variable '{name}' which has not been declared")
+
+        return var_assignment
+
+    def __compile_conditional(self, ast: nodes.Conditional) -> Callable[[Scope], Any]:
+        # An 'else if' chain is a conditional in the 'on_false' of the one before it, compiled as a list of branches
+        branches = []
+
+        while True:
+            branches.append((self.__compile_expression(ast.expression), self.__compile_code_block(ast.on_true)))
+            ast = ast.on_false
+
+            if ast is None or ast.kind != NodeKind.CONDITIONAL:
+                break
+
+        otherwise = self.__compile_code_block(ast) if ast is not None else None
+
+        def conditional(scope: Scope) -> Any:
+            for expression, code_block in branches:
+                if expression(scope):
+                    return code_block(scope)
+
+            return otherwise(scope) if otherwise is not None else None
+
+        return conditional
+
+    def __compile_while_loop(self, ast: nodes.WhileLoop) -> Callable[[Scope], Any]:
+        expression = self.__compile_expression(ast.expression)
+        statements = self.__compile_statements(ast.body.body)
+
+        def while_loop(scope: Scope) -> Any:
+            while expression(scope):
+                if result := statements(Scope(scope)):
+                    return result
+
+            return None
+
+        return while_loop
+
+    def __compile_do_while_loop(self, ast: nodes.DoWhileLoop) -> Callable[[Scope], Any]:
+        expression = self.__compile_expression(ast.expression)
+        statements = self.__compile_statements(ast.body.body)
+
+        def do_while_loop(scope: Scope) -> Any:
+            while True:
+                if result := statements(Scope(scope)):
+                    return result
+
+                if not expression(scope):
+                    return None
+
+        return do_while_loop
+
+    def __compile_func_declaration(self, ast: nodes.FuncDeclaration) -> Callable[[Scope], None]:
+        name = ast.identifier.name
+        function = CompiledFunction(name, [parameter.name for parameter in ast.parameters], ast.body)
+
+        def func_declaration(scope: Scope):
+            functions = scope.functions
+
+            if name in functions:
+                raise RuntimeError(f"Tried to declare function '{name}' which already exists")
+
+            functions[name] = function
+
+        return func_declaration
+
+    def __compile_func_call(self, ast: nodes.FuncCall) -> Callable[[Scope], Any]:
+        """
+        Compile a function call. The call returns the value of the function's `return` statement, or None if it
+        did not return a value.
+        """
+
+        name = ast.identifier.name
+        arguments = [self.__compile_expression(parameter) for parameter in ast.parameters]
+        compile_function = self.__compile_function
+
+        def func_call(scope: Scope) -> Any:
+            declaring_scope = scope
+
+            while declaring_scope is not None:
+                if (function := declaring_scope.functions.get(name)) is not None:
+                    break
+
+                declaring_scope = declaring_scope.parent
+            else:
+                raise RuntimeError(f"Tried to get function '{name}' which has not been declared")
+
+            body = function.body or compile_function(function)
+            parameters = function.parameters
+
+            if len(arguments) != len(parameters):
+                raise RuntimeError(
+                    f"Tried to call function {name} with incorrect number of parameters"
+                    f"(expected {len(parameters)}, got {len(arguments)})"
+                )
+
+            values = [argument(scope) for argument in arguments]
+
+            if function.duplicate_parameter is not None:
+                raise RuntimeError(f"Tried to declare variable '{function.duplicate_parameter}' which already exists")
+
+            parameter_scope = Scope(declaring_scope)
+            parameter_scope.variables = dict(zip(parameters, values))
+
+            result = body(Scope(parameter_scope))
+
+            return result.value if result.__class__ is Return else None
+
+        return func_call
+
+    def __compile_func_call_as_expression(self, ast: nodes.FuncCall) -> Callable[[Scope], Any]:
+        func_call = self.__compile_func_call(ast)
+        name = ast.identifier.name
+
+        def func_call_as_expression(scope: Scope) -> Any:
+            value = func_call(scope)
+
+            if value is None:
+                raise RuntimeError(f"Function '{name}' used in expression but did not return a value")
+
+            return value
+
+        return func_call_as_expression
+
+    def __compile_function(self, function: CompiledFunction) -> Callable[[Scope], Any]:
+        """
+        Compile the code block of a function, the first time it is called. The code block of a lazily parsed
+        function is parsed first, and compiled once however many times the function is declared.
+        """
+
+        code_block = function.code_block
+
+        if code_block.kind == NodeKind.UNPARSED_CODE_BLOCK:
+            body = self.__compiled_code_blocks.get(code_block.first_token)
+
+            if body is None:
+                parsed = self.parse_code_block(code_block)
+                body = self.__compiled_code_blocks[code_block.first_token] = self.__compile_statements(parsed.body)
+        else:
+            body = self.__compile_statements(code_block.body)
+
+        function.body = body
+
+        return body
+
+    def __compile_return(self, ast: nodes.Return) -> Callable[[Scope], Return]:
+        expression = self.__compile_expression(ast.body)
+
+        def return_statement(scope: Scope) -> Return:
+            return Return(expression(scope))
+
+        return return_statement
+
+    def __compile_expression(self, ast: nodes.Node) -> Callable[[Scope], Any]:
+        return self.__expression_compilers[ast.kind](ast)
+
+    def __compile_literal(self, ast: nodes.StringLiteral | nodes.NumericLiteral | nodes.BooleanLiteral):
+        value = ast.value
+
+        def literal(_: Scope) -> Any:
+            return value
+
+        return literal
+
+    def __compile_variable(self, ast: nodes.Identifier) -> Callable[[Scope], Any]:
+        name = ast.name
+
+        def variable(scope: Scope) -> Any:
+            while scope is not None:
+                variables = scope.variables
+
+                if name in variables:
+                    return variables[name]
+
+                scope = scope.parent
+
+            raise RuntimeError(f"Tried to get variable '{name}' which has not been declared")
+
+        return variable
+
+    def __compile_binary_expression(self, ast: nodes.BinaryExpression) -> Callable[[Scope], Any]:
+        left = self.__compile_expression(ast.left)
+        right = self.__compile_expression(ast.right)
+        operate = compile_binary_operation(ast.operator)
+
+        def binary_expression(scope: Scope) -> Any:
+            return operate(left(scope), right(scope))
+
+        return binary_expression
+
+    def __compile_nary_expression(self, ast: nodes.NaryExpression) -> Callable[[Scope], Any]:
+        first, *rest = [self.__compile_expression(operand) for operand in ast.operands]
+        operate = compile_binary_operation(ast.operator)
+
+        # Left-associative, like the equivalent chain of binary expressions: `a - b - c` is `(a - b) - c`
+        def nary_expression(scope: Scope) -> Any:
+            result = first(scope)
+
+            for operand in rest:
+                result = operate(result, operand(scope))
+
+            return result
+
+        return nary_expression
@@ -0,0 +1,133 @@
+"""
+Implements the Engine class, the base class of the Barnacle engines.
+"""
+
+import abc
+import io
+import logging
+from typing import Iterator, TextIO
+
+from bcl_parser import nodes, parallel
+from bcl_parser import parser as prs
+from bcl_tokenizer.positions import LineIndex
+
+from . import validator
+
+
+class Engine(abc.ABC):
+    """
+    The base class of the engines which run Barnacle programs (e.g. the Interpreter, which walks the AST).
+
+    It gets the AST of the source (or the statements of a streamed source), parses the code blocks of lazily parsed
+    functions, and adds positions to errors. Subclasses implement `run()`.
+    """
+
+    def __init__(
+        self,
+        source: str | TextIO | None,
+        parse_workers: int = 1,
+        lazy_functions: bool = False,
+        ast: nodes.Program | None = None,
+        parser: prs.Parser | None = None,
+        verified: bool = False,
+    ):
+        """
+        If `parse_workers` is more than 1, large sources are parsed in parallel across that many processes.
+
+        If `lazy_functions` is True (and the source is parsed serially), the body of each function is only parsed
+        when the function is first called, so syntax errors in the bodies of functions which are never called are
+        not reported.
+
+        The source may also be a text stream (e.g. `sys.stdin`), in which case nothing is parsed up front.
+        Instead, `run()` parses the stream a top-level statement at a time, and runs each statement as soon as it
+        has been parsed. Once run, a statement is released unless something still refers to it (e.g. a function
+        it declared).
+
+        If the `ast` of the source is given (e.g. from the compile cache), the source is not parsed at all. It must
+        have been parsed with positions, and the source is then only used to report the positions of errors. The source
+        may be None (e.g. for an AST loaded with `--from-ast`), in which case errors are reported without positions.
+        An `ast` parsed with `lazy_functions` must be given with the `parser` which parsed it, which then parses the
+        bodies of its functions as they are called.
+
+        The nodes are not checked as they are run. An AST which the engine parses itself is well-formed, but a given
+        `ast` is validated as a whole before it is run, unless it is `verified` (e.g. it was just parsed).
+        If it is malformed, a RuntimeError is raised.
+        """
+
+        self.source = source
+        self.ast = None
+        self.parser = None
+        self.__line_index = None
+
+        # The code blocks of lazily parsed functions, keyed by the index of their first token
+        self.__parsed_code_blocks: dict[int, nodes.CodeBlock] = {}
+
+        if ast is not None:
+            if not verified:
+                validator.validate(ast)
+                logging.debug("Validated AST")
+
+            self.ast = ast
+            self.parser = parser
+
+            if parser is not None:
+                self.__line_index = parser.tokenizer.line_index
+        elif isinstance(source, io.TextIOBase):
+            self.parser = prs.Parser(source, positions=True)
+            self.__line_index = self.parser.tokenizer.line_index
+        elif parse_workers > 1:
+            self.ast = parallel.parse_parallel(source, parse_workers, positions=True)
+        else:
+            parser = prs.Parser(source, positions=True, lazy_functions=lazy_functions)
+            self.ast = parser.parse()
+
+            # Unparsed function bodies are parsed by the same Parser, so it is only kept if there may be some
+            if lazy_functions:
+                self.parser = parser
+
+        if ast is None and self.ast is not None:
+            logging.debug("Finished parsing source")
+
+    @abc.abstractmethod
+    def run(self):
+        """Runs the Barnacle program."""
+
+    def statements(self) -> Iterator[nodes.Node]:
+        """Parse the streamed source a top-level statement at a time, when there is no AST of the whole source."""
+
+        return self.parser.statements()
+
+    def parse_code_block(self, ast: nodes.UnparsedCodeBlock) -> nodes.CodeBlock:
+        """
+        Parses the code block of a lazily parsed function, the first time a function declared with it is called.
+        """
+
+        code_block = self.__parsed_code_blocks.get(ast.first_token)
+
+        if code_block is None:
+            if self.parser is None:
+                raise RuntimeError("Cannot parse the body of a function without the Parser of the source")
+
+            logging.debug("Parsing 'unparsed_code_block' node")
+            code_block = self.__parsed_code_blocks[ast.first_token] = self.parser.parse_code_block(ast)
+
+        return code_block
+
+    def add_error_position(self, error: RuntimeError, offset: int | None):
+        """
+        Adds the line and column of the source offset of a statement to the error message, unless a nested statement
+        already has.
+
+        Positions are only worked out here, once an error has occurred, so running the program does not pay for them.
+        """
+
+        if offset is None or self.source is None or hasattr(error, "barnacle_position"):
+            return
+
+        if self.__line_index is None:
+            self.__line_index = LineIndex(self.source)
+
+        error.barnacle_position = self.__line_index.position(offset)
+        line, column = error.barnacle_position
+
+        error.args = (f"{error} (line {line}, column {column})",)
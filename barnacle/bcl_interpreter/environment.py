@@ -5,96 +5,111 @@ Implements the Environment class.
 import logging
 
 from bcl_interpreter.function import Function
+from bcl_interpreter.resolver import UNDECLARED, Addresses, FunctionInfo
+from bcl_parser.nodes import CodeBlock, UnparsedCodeBlock
 
 
 class Environment:
     """
     A Barnacle environment which can hold variables and function definitions.
+
+    Variables and functions are stored in a fixed number of slots, which the `Resolver` assigns to their declarations,
+    and are looked up by the addresses it resolves their uses into, rather than by name.
     """
 
-    def __init__(self, outer_environment=None):
-        logging.debug("New environment created")
+    __slots__ = ("parent", "slots")
+
+    def __init__(self, outer_environment=None, size: int = 0):
+        self.parent: Environment = outer_environment
+        self.slots: list = [UNDECLARED] * size
+
+    def grow(self, size: int):
+        """Add slots for the variables and functions declared since the environment was created, up to the size."""
 
-        self.__parent: Environment = outer_environment
-        self.__variables: dict = {}
-        self.__functions: dict[str, Function] = {}
+        self.slots += [UNDECLARED] * (size - len(self.slots))
 
-    def new_variable(self, identifier, value):
+    def clear(self):
+        """Clear every slot, so the environment can be used again as a new one of the same scope."""
+
+        self.slots = [UNDECLARED] * len(self.slots)
+
+    def new_variable(self, identifier, slot: int | None, value):
         """
         Define a new variable in this environment.
 
-        If the variable already exists, a RuntimeError is raised.
+        If the variable already exists (and so has no slot), a RuntimeError is raised.
         """
 
         logging.debug("Adding variable '%s' to environment", identifier)
 
-        if identifier in self.__variables:
+        if slot is None:
             raise RuntimeError(f"Tried to declare variable '{identifier}' which already exists")
 
-        self.__variables[identifier] = value
+        self.slots[slot] = value
 
-    def update_variable(self, identifier, value):
+    def update_variable(self, identifier, addresses: Addresses, value):
         """
-        Update an existing variable in this environment or the outer environment.
+        Update an existing variable in this environment or an outer environment.
 
         If the variable does not exist, a RuntimeError is raised.
         """
 
         logging.debug("Updating variable '%s' in environment", identifier)
 
-        if identifier in self.__variables:
-            self.__variables[identifier] = value
-        elif self.__parent is not None:
-            self.__parent.update_variable(identifier, value)
-        else:
-            raise RuntimeError(f"Tried to update variable '{identifier}' which has not been declared")
-
-    def remove_variable(self, identifier):
-        """
-        Delete an existing variable in this environment.
-
-        If the variable does not exist, a RuntimeError is raised.
-        """
+        for depth, slot in addresses:
+            environment = self
 
-        logging.debug("Removing variable '%s' from environment", identifier)
+            for _ in range(depth):
+                environment = environment.parent
 
-        if identifier not in self.__variables:
-            raise RuntimeError(f"Tried to remove variable '{identifier}' which has not been declared")
+            if environment.slots[slot] is not UNDECLARED:
+                environment.slots[slot] = value
+                return
 
-        self.__variables.pop(identifier)
+        raise RuntimeError(f"Tried to update variable '{identifier}' which has not been declared")
 
-    def get_variable(self, identifier):
+    def get_variable(self, identifier, addresses: Addresses):
         """
-        Fetches the value of an existing variable in this environment or the parent environment.
+        Fetches the value of an existing variable in this environment or an outer environment.
 
         If the variable does not exist, a RuntimeError is raised.
         """
 
         logging.debug("Getting variable '%s' from environment", identifier)
 
-        if identifier in self.__variables:
-            return self.__variables[identifier]
+        for depth, slot in addresses:
+            environment = self
+
+            for _ in range(depth):
+                environment = environment.parent
 
-        if self.__parent is not None:
-            return self.__parent.get_variable(identifier)
+            if (value := environment.slots[slot]) is not UNDECLARED:
+                return value
 
         raise RuntimeError(f"Tried to get variable '{identifier}' which has not been declared")
 
-    def new_function(self, identifier: str, parameters: list[str], code_block: dict):
+    def new_function(
+        self,
+        identifier: str,
+        slot: int | None,
+        parameters: list[str],
+        code_block: CodeBlock | UnparsedCodeBlock,
+        info: FunctionInfo,
+    ):
         """
         Define a new function in this environment.
 
-        If the function name already exists, a RuntimeError is raised.
+        If the function name already exists (and so has no slot), a RuntimeError is raised.
         """
 
         logging.debug("Adding function '%s' to environment", identifier)
 
-        if identifier in self.__functions:
+        if slot is None:
             raise RuntimeError(f"Tried to declare function '{identifier}' which already exists")
 
-        self.__functions[identifier] = Function(name=identifier, parameters=parameters, code_block=code_block)
+        self.slots[slot] = Function(name=identifier, parameters=parameters, code_block=code_block, info=info)
 
-    def get_function(self, identifier: str) -> tuple[Function, "Environment"]:
+    def get_function(self, identifier: str, addresses: Addresses) -> tuple[Function, "Environment"]:
         """
         Return the named function along with the environment that it was declared in.
 
@@ -103,10 +118,13 @@ class Environment:
 
         logging.debug("Getting function '%s' from environment", identifier)
 
-        if identifier in self.__functions:
-            return (self.__functions[identifier], self)
+        for depth, slot in addresses:
+            environment = self
+
+            for _ in range(depth):
+                environment = environment.parent
 
-        if self.__parent is not None:
-            return self.__parent.get_function(identifier)
+            if (function := environment.slots[slot]) is not UNDECLARED:
+                return (function, environment)
 
         raise RuntimeError(f"Tried to get function '{identifier}' which has not been declared")
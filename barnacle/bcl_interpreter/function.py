@@ -4,11 +4,20 @@ Implements the Function dataclass.
 
 from dataclasses import dataclass
 
+from bcl_interpreter.resolver import FunctionInfo
+from bcl_parser.nodes import CodeBlock, UnparsedCodeBlock
+
 
 @dataclass
 class Function:
-    """Represents a function that can be interpreted."""
+    """
+    Represents a function that can be interpreted.
+
+    If function bodies are parsed lazily, the code block is an `UnparsedCodeBlock` until the function is first called.
+    The `info` is that of its declaration, which the `Resolver` resolves the code block with.
+    """
 
     name: str
     parameters: list[str]
-    code_block: dict
+    code_block: CodeBlock | UnparsedCodeBlock
+    info: FunctionInfo
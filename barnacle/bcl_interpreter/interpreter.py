@@ -4,17 +4,28 @@ Implements the Interpreter class.
 
 import logging
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Iterator
 
 from bcl_interpreter.environment import Environment
-from bcl_parser import parser as prs
+from bcl_parser import nodes
+from bcl_parser.nodes import NodeKind
 
+from .engine import Engine
 from .operations import calculate_binary_operation
+from .resolver import Resolver
 
 
-class Interpreter:
+class Interpreter(Engine):
     """
-    The Barnacle Interpreter.
+    The Barnacle Interpreter, which walks the AST (the default engine).
+
+    It takes the arguments described in `Engine`. Before statements are run, they are resolved (see `Resolver`), so
+    variables and functions are looked up by their slots in the environments rather than by name.
+
+    Environments are only created where they are needed: a code block which declares nothing runs in the environment
+    it is in, a function call runs its code block in the environment of its parameters, and a loop creates the
+    environment of its body once, clearing it before each further iteration. `environments_created` counts the
+    environments created so far.
     """
 
     @dataclass
@@ -27,117 +38,135 @@ class Interpreter:
 
         value: Any
 
-    def __init__(self, source: str):
-        self.__ast = prs.Parser(source).parse()
-        logging.debug("Finished parsing source")
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__resolver = Resolver()
+        self.__resolutions = self.__resolver.resolutions
+        self.__resolved = False
+        self.__global_env: Environment | None = None
+        self.environments_created = 0
+
+        # The interpreter dispatches on the kind of each node, so the tables are only built once
+        self.__statement_branches = {
+            NodeKind.PRINT: self.__interpret_print,
+            NodeKind.CONDITIONAL: self.__interpret_conditional,
+            NodeKind.VAR_DECLARATION: self.__interpret_var_declaration,
+            NodeKind.VAR_ASSIGNMENT: self.__interpret_var_assignment,
+            NodeKind.CODE_BLOCK: self.__interpret_code_block,
+            NodeKind.WHILE: self.__interpret_while_loop,
+            NodeKind.DO_WHILE: self.__interpret_do_while_loop,
+            NodeKind.FUNC_DECLARATION: self.__interpret_func_declaration,
+            NodeKind.FUNC_CALL: self.__interpret_func_call,
+            NodeKind.RETURN: self.__interpret_return,
+        }
+
+        self.__expression_branches = {
+            NodeKind.STRING_LITERAL: self.__interpret_string_literal,
+            NodeKind.NUMERIC_LITERAL: self.__interpret_numeric_literal,
+            NodeKind.BOOLEAN_LITERAL: self.__interpret_boolean_literal,
+            NodeKind.IDENTIFIER: self.__interpret_variable,
+            NodeKind.BINARY_EXPRESSION: self.__interpret_binary_expression,
+            NodeKind.NARY_EXPRESSION: self.__interpret_nary_expression,
+            NodeKind.FUNC_CALL: self.__interpret_func_call_as_expression,
+        }
 
     def run(self):
         """Runs the Barnacle interpreter on the provided source."""
 
-        global_env = Environment()
-
-        self.__interpret_program(global_env, self.__ast)
-
-    def __validate_node_has_type(self, ast: dict):
-        """
-        Validates that the AST node has a `type` key.
-        """
-
-        if "type" not in ast.keys():
-            logging.debug("Node has no 'type' key: %s", ast)
-            raise RuntimeError("Node has no 'type' key")
+        global_env = self.__global_env = self.__new_environment(None, 0)
 
-    def __validate_node(self, ast: dict, expected_type: str, expected_keys: set):
-        """
-        Validates that the AST node has the expected type and contains the expected keys.
+        if self.ast is None:
+            self.__interpret_statements(global_env, self.statements())
+            return
 
-        An AST node should always have a `type` key, so this does not need to be provided when calling this function.
-        """
+        if not self.__resolved:
+            self.__resolver.resolve(self.ast.body)
+            self.__resolved = True
+            logging.debug("Resolved AST")
 
-        self.__validate_node_has_type(ast)
+        global_env.grow(self.__resolver.program.size)
+        self.__interpret_program(global_env, self.ast)
 
-        expected_keys.add("type")
+    def __interpret_program(self, env: Environment, ast: nodes.Program):
+        logging.debug("Interpreting 'program' node")
 
-        if ast["type"] != expected_type:
-            actual_type = ast["type"]
-            logging.debug("Node has unexpected type: %s", ast)
-            raise RuntimeError(f"Node has unexpected type (expected '{expected_type}', got '{actual_type}')")
+        for statement in ast.body:
+            self.__interpret_statement(env, statement)
 
-        if set(ast.keys()) != expected_keys:
-            logging.debug("Node does not contain the expected keys: %s", ast)
-            raise RuntimeError(
-                f"Node does not contain the expected keys (expected '{expected_keys}', got '{set(ast.keys())}')"
-            )
+    def __interpret_statements(self, env: Environment, statements: Iterator[nodes.Node]):
+        logging.debug("Interpreting streamed 'program' node")
 
-    def __interpret_program(self, env: Environment, ast: dict):
-        logging.debug("Interpreting 'program' node")
-        self.__validate_node(ast, "program", {"body"})
+        for statement in statements:
+            self.__resolver.resolve([statement])
+            env.grow(self.__resolver.program.size)
 
-        for statement in ast["body"]:
             self.__interpret_statement(env, statement)
+            self.__resolver.release()
 
-    def __interpret_statement(self, env: Environment, ast: dict) -> FlowControlType | None:
+    def __interpret_statement(self, env: Environment, ast: nodes.Node) -> FlowControlType | None:
         logging.debug("Interpreting 'statement' node")
 
-        branches = {
-            "print": self.__interpret_print,
-            "conditional": self.__interpret_conditional,
-            "var_declaration": self.__interpret_var_declaration,
-            "var_assignment": self.__interpret_var_assignment,
-            "code_block": self.__interpret_code_block,
-            "while": self.__interpret_while_loop,
-            "do_while": self.__interpret_do_while_loop,
-            "func_declaration": self.__interpret_func_declaration,
-            "func_call": self.__interpret_func_call,
-            "return": self.__interpret_return,
-        }
+        try:
+            return self.__statement_branches[ast.kind](env, ast)
+        except RuntimeError as error:
+            self.add_error_position(error, ast.offset)
+            raise
 
-        return self.__construct_multibranch_interpret(env, ast, "statement", branches)
-
-    def __interpret_do_while_loop(self, env: Environment, ast: dict) -> FlowControlType | None:
+    def __interpret_do_while_loop(self, env: Environment, ast: nodes.DoWhileLoop) -> FlowControlType | None:
         logging.debug("Interpreting 'do_while' node")
-        self.__validate_node(ast, "do_while", {"expression", "body"})
 
         conditional_value = True
+        body_env = self.__loop_environment(env, ast.body)
 
         while conditional_value:
-            flow_interrupt = self.__interpret_code_block(env, ast["body"])
+            flow_interrupt = self.__interpret_code_block_statements(body_env, ast.body)
 
             if flow_interrupt:
                 return flow_interrupt
 
-            conditional_value = self.__interpret_expression(env, ast["expression"])
+            if body_env is not env:
+                body_env.clear()
+
+            conditional_value = self.__interpret_expression(env, ast.expression)
 
         return None
 
-    def __interpret_return(self, env: Environment, ast: dict) -> ReturnStatement:
+    def __interpret_return(self, env: Environment, ast: nodes.Return) -> ReturnStatement:
         logging.debug("Interpreting 'return' node")
-        self.__validate_node(ast, "return", {"body"})
 
-        return_value = self.__interpret_expression(env, ast["body"])
+        return_value = self.__interpret_expression(env, ast.body)
 
         return Interpreter.ReturnStatement(value=return_value)
 
-    def __interpret_func_call_as_expression(self, env: Environment, ast: dict):
+    def __interpret_func_call_as_expression(self, env: Environment, ast: nodes.FuncCall):
         logging.debug("Interpreting 'func_call' node as part of an 'expression' node")
 
         return_value = self.__interpret_func_call(env, ast)
 
         if return_value is None:
-            func_name = self.__interpret_identifier_node(env, ast["identifier"])
+            func_name = self.__interpret_identifier_node(env, ast.identifier)
             raise RuntimeError(f"Function '{func_name}' used in expression but did not return a value")
 
         return return_value
 
-    def __interpret_func_call(self, env: Environment, ast: dict):
+    def __interpret_func_call(self, env: Environment, ast: nodes.FuncCall):
         logging.debug("Interpreting 'func_call' node")
-        self.__validate_node(ast, "func_call", {"identifier", "parameters"})
 
-        identifier = self.__interpret_identifier_node(env, ast["identifier"])
-        function, declaring_env = env.get_function(identifier)
+        identifier = self.__interpret_identifier_node(env, ast.identifier)
+        function, declaring_env = env.get_function(identifier, self.__resolutions[id(ast)])
+
+        if function.code_block.kind == NodeKind.UNPARSED_CODE_BLOCK:
+            function.code_block = self.parse_code_block(function.code_block)
+
+        if not function.info.resolved:
+            self.__resolver.resolve_function(function.info, function.code_block)
+
+            # The code block may use top-level names which are not declared yet, which are given slots of their own
+            self.__global_env.grow(self.__resolver.program.size)
 
         declared_params = function.parameters
-        provided_params = ast["parameters"]
+        provided_params = ast.parameters
 
         if len(provided_params) != len(declared_params):
             raise RuntimeError(
@@ -147,168 +176,180 @@ class Interpreter:
 
         provided_params = [self.__interpret_expression(env, param) for param in provided_params]
 
-        func_env = Environment(outer_environment=declaring_env)
+        # The code block runs in the same environment as the parameters, whose size includes its declarations
+        func_env = self.__new_environment(declaring_env, function.info.scope.size)
 
-        for param_name, param_value in zip(declared_params, provided_params):
-            func_env.new_variable(param_name, param_value)
+        for param_name, param_slot, param_value in zip(declared_params, function.info.parameter_slots, provided_params):
+            func_env.new_variable(param_name, param_slot, param_value)
 
         possible_return_value = self.__interpret_code_block(func_env, function.code_block)
 
         return possible_return_value.value if isinstance(possible_return_value, Interpreter.ReturnStatement) else None
 
-    def __interpret_func_declaration(self, env: Environment, ast: dict):
+    def __interpret_func_declaration(self, env: Environment, ast: nodes.FuncDeclaration):
         logging.debug("Interpreting 'func_declaration' node")
-        self.__validate_node(ast, "func_declaration", {"identifier", "parameters", "body"})
 
-        identifier = self.__interpret_identifier_node(env, ast["identifier"])
-        parameters = [self.__interpret_identifier_node(env, param_ast) for param_ast in ast["parameters"]]
-        code_block = ast["body"]
+        identifier = self.__interpret_identifier_node(env, ast.identifier)
+        parameters = [self.__interpret_identifier_node(env, param_ast) for param_ast in ast.parameters]
+        code_block = ast.body
+        slot, info = self.__resolutions[id(ast)]
 
-        env.new_function(identifier, parameters, code_block)
+        env.new_function(identifier, slot, parameters, code_block, info)
 
-    def __interpret_print(self, env: Environment, ast: dict):
+    def __interpret_print(self, env: Environment, ast: nodes.Print):
         logging.debug("Interpreting 'print' node")
-        self.__validate_node(ast, "print", {"body"})
 
-        expression = self.__interpret_expression(env, ast["body"])
+        expression = self.__interpret_expression(env, ast.body)
 
         if isinstance(expression, bool):
             expression = "true" if expression else "false"
 
         print(expression)
 
-    def __interpret_string_literal(self, _: Environment, ast: dict):
+    def __interpret_string_literal(self, _: Environment, ast: nodes.StringLiteral):
         logging.debug("Interpreting 'string_literal' node")
-        self.__validate_node(ast, "string_literal", {"value"})
 
-        return ast["value"]
+        return ast.value
 
-    def __interpret_numeric_literal(self, _: Environment, ast: dict):
+    def __interpret_numeric_literal(self, _: Environment, ast: nodes.NumericLiteral):
         logging.debug("Interpreting 'numeric_literal' node")
-        self.__validate_node(ast, "numeric_literal", {"value"})
 
-        return ast["value"]
+        return ast.value
 
-    def __interpret_boolean_literal(self, _: Environment, ast: dict):
+    def __interpret_boolean_literal(self, _: Environment, ast: nodes.BooleanLiteral):
         logging.debug("Interpreting 'boolean_literal' node")
-        self.__validate_node(ast, "boolean_literal", {"value"})
 
-        return ast["value"]
+        return ast.value
 
-    def __interpret_expression(self, env: Environment, ast: dict):
+    def __interpret_expression(self, env: Environment, ast: nodes.Node):
         logging.debug("Interpreting 'expression' node")
 
-        branches = {
-            "string_literal": self.__interpret_string_literal,
-            "numeric_literal": self.__interpret_numeric_literal,
-            "boolean_literal": self.__interpret_boolean_literal,
-            "identifier": self.__interpret_variable,
-            "binary_expression": self.__interpret_binary_expression,
-            "func_call": self.__interpret_func_call_as_expression,
-        }
-
-        return self.__construct_multibranch_interpret(env, ast, "expression", branches)
+        return self.__expression_branches[ast.kind](env, ast)
 
-    def __interpret_binary_expression(self, env: Environment, ast: dict):
+    def __interpret_binary_expression(self, env: Environment, ast: nodes.BinaryExpression):
         logging.debug("Interpreting 'binary_expression' node")
-        self.__validate_node(ast, "binary_expression", {"left", "right", "operator"})
 
-        left_value = self.__interpret_expression(env, ast["left"])
-        right_value = self.__interpret_expression(env, ast["right"])
-        operator = ast["operator"]
+        left_value = self.__interpret_expression(env, ast.left)
+        right_value = self.__interpret_expression(env, ast.right)
+        operator = ast.operator
 
         result = calculate_binary_operation(operator=operator, left=left_value, right=right_value)
         return result
 
-    def __construct_multibranch_interpret(self, env: Environment, ast: dict, interpret_name: str, branches: dict):
-        self.__validate_node_has_type(ast)
+    def __interpret_nary_expression(self, env: Environment, ast: nodes.NaryExpression):
+        logging.debug("Interpreting 'nary_expression' node")
 
-        node_type = ast["type"]
+        operator = ast.operator
+        operands = iter(ast.operands)
 
-        if node_type in branches:
-            return branches[node_type](env, ast)
+        # Left-associative, like the equivalent chain of binary expressions: `a - b - c` is `(a - b) - c`
+        result = self.__interpret_expression(env, next(operands))
 
-        logging.debug("Unexpected node type while interpreting '%s' node: %s", interpret_name, ast)
-        raise RuntimeError(f"Unexpected node type '{node_type}' while interpreting '{interpret_name}'")
+        for operand in operands:
+            right_value = self.__interpret_expression(env, operand)
+            result = calculate_binary_operation(operator=operator, left=result, right=right_value)
 
-    def __interpret_conditional(self, env: Environment, ast: dict) -> FlowControlType | None:
+        return result
+
+    def __interpret_conditional(self, env: Environment, ast: nodes.Conditional) -> FlowControlType | None:
         logging.debug("Interpreting 'conditional' node")
-        self.__validate_node(ast, "conditional", {"expression", "on_true", "on_false"})
 
-        expression = self.__interpret_expression(env, ast["expression"])
+        # An 'else if' chain is a conditional in the 'on_false' of the one before it, walked here without recursion
+        while True:
+            expression = self.__interpret_expression(env, ast.expression)
 
-        if bool(expression):
-            logging.debug("Interpreting conditional 'on_true' node")
-            return self.__interpret_code_block(env, ast["on_true"])
+            if bool(expression):
+                logging.debug("Interpreting conditional 'on_true' node")
+                return self.__interpret_code_block(env, ast.on_true)
 
-        if (on_false_ast := ast["on_false"]) is not None:
-            logging.debug("Interpreting conditional 'on_false' node")
-            self.__validate_node_has_type(on_false_ast)
+            if (on_false_ast := ast.on_false) is None:
+                return None
 
-            if on_false_ast["type"] == "conditional":
-                return self.__interpret_conditional(env, on_false_ast)
+            logging.debug("Interpreting conditional 'on_false' node")
 
-            return self.__interpret_code_block(env, on_false_ast)
+            if on_false_ast.kind != NodeKind.CONDITIONAL:
+                return self.__interpret_code_block(env, on_false_ast)
 
-        return None
+            logging.debug("Interpreting 'conditional' node")
+            ast = on_false_ast
 
-    def __interpret_code_block(self, env: Environment, ast: dict) -> FlowControlType | None:
+    def __interpret_code_block(self, env: Environment, ast: nodes.CodeBlock) -> FlowControlType | None:
         logging.debug("Interpreting 'code_block' node")
-        self.__validate_node(ast, "code_block", {"body"})
 
-        new_env = Environment(env)
+        # A code block which declares nothing (or the code block of a function) has no environment of its own
+        if (size := self.__resolutions[id(ast)]) is not None:
+            env = self.__new_environment(env, size)
 
-        for statement in ast["body"]:
-            flow_interrupt = self.__interpret_statement(new_env, statement)
+        return self.__interpret_code_block_statements(env, ast)
+
+    def __interpret_code_block_statements(self, env: Environment, ast: nodes.CodeBlock) -> FlowControlType | None:
+        for statement in ast.body:
+            flow_interrupt = self.__interpret_statement(env, statement)
 
             if flow_interrupt:
                 return flow_interrupt
 
         return None
 
-    def __interpret_var_declaration(self, env: Environment, ast: dict):
+    def __loop_environment(self, env: Environment, ast: nodes.CodeBlock) -> Environment:
+        """
+        Return the environment the code block of a loop runs in. Each iteration starts from a fresh environment, but
+        its declarations cannot be used once it has ended, so one environment is created and cleared between them.
+        """
+
+        if (size := self.__resolutions[id(ast)]) is None:
+            return env
+
+        return self.__new_environment(env, size)
+
+    def __new_environment(self, env: Environment | None, size: int) -> Environment:
+        self.environments_created += 1
+
+        return Environment(env, size)
+
+    def __interpret_var_declaration(self, env: Environment, ast: nodes.VarDeclaration):
         logging.debug("Interpreting 'var_declaration' node")
-        self.__validate_node(ast, "var_declaration", {"identifier", "value"})
 
-        variable_name = self.__interpret_identifier_node(env, ast["identifier"])
-        variable_value = self.__interpret_expression(env, ast["value"])
+        variable_name = self.__interpret_identifier_node(env, ast.identifier)
+        variable_value = self.__interpret_expression(env, ast.value)
 
-        env.new_variable(variable_name, variable_value)
+        env.new_variable(variable_name, self.__resolutions[id(ast)], variable_value)
 
-    def __interpret_var_assignment(self, env: Environment, ast: dict):
+    def __interpret_var_assignment(self, env: Environment, ast: nodes.VarAssignment):
         logging.debug("Interpreting 'var_assignment' node")
-        self.__validate_node(ast, "var_assignment", {"identifier", "value"})
 
-        variable_name = self.__interpret_identifier_node(env, ast["identifier"])
-        variable_value = self.__interpret_expression(env, ast["value"])
+        variable_name = self.__interpret_identifier_node(env, ast.identifier)
+        variable_value = self.__interpret_expression(env, ast.value)
 
-        env.update_variable(variable_name, variable_value)
+        env.update_variable(variable_name, self.__resolutions[id(ast)], variable_value)
 
-    def __interpret_identifier_node(self, _: Environment, ast: dict):
+    def __interpret_identifier_node(self, _: Environment, ast: nodes.Identifier):
         logging.debug("Interpreting 'identifier' node")
-        self.__validate_node(ast, "identifier", {"name"})
 
-        return ast["name"]
+        return ast.name
 
-    def __interpret_variable(self, env: Environment, ast: dict):
+    def __interpret_variable(self, env: Environment, ast: nodes.Identifier):
         logging.debug("Interpreting 'variable' node")
 
         variable_name = self.__interpret_identifier_node(env, ast)
 
-        return env.get_variable(variable_name)
+        return env.get_variable(variable_name, self.__resolutions[id(ast)])
 
-    def __interpret_while_loop(self, env: Environment, ast: dict) -> FlowControlType | None:
+    def __interpret_while_loop(self, env: Environment, ast: nodes.WhileLoop) -> FlowControlType | None:
         logging.debug("Interpreting 'while' node")
-        self.__validate_node(ast, "while", {"expression", "body"})
 
-        conditional_value = self.__interpret_expression(env, ast["expression"])
+        conditional_value = self.__interpret_expression(env, ast.expression)
+        body_env = self.__loop_environment(env, ast.body)
 
         while conditional_value:
-            flow_interrupt = self.__interpret_code_block(env, ast["body"])
+            flow_interrupt = self.__interpret_code_block_statements(body_env, ast.body)
 
             if flow_interrupt:
                 return flow_interrupt
 
-            conditional_value = self.__interpret_expression(env, ast["expression"])
+            if body_env is not env:
+                body_env.clear()
+
+            conditional_value = self.__interpret_expression(env, ast.expression)
 
         return None
@@ -5,7 +5,29 @@ This includes mathematical operators such as +, -, *, / and boolean operators li
 """
 
 
-from typing import Any
+from operator import add, eq, ge, gt, le, lt, mul, ne, sub, truediv
+from typing import Any, Callable
+
+# The types of Barnacle numbers. A bool is not a number, so types are compared exactly rather than with isinstance().
+NUMBER_TYPES = frozenset({int, float})
+
+# The operators which only take numbers, other than in the cases handled by `calculate_binary_operation`
+NUMERIC_OPERATORS = {
+    "+": add,
+    "-": sub,
+    "*": mul,
+    "/": truediv,
+    "<": lt,
+    "<=": le,
+    ">": gt,
+    ">=": ge,
+}
+
+# The operators which compare operands of the same type directly
+EQUALITY_OPERATORS = {
+    "==": eq,
+    "!=": ne,
+}
 
 
 class OperationNotSupported(RuntimeError):
@@ -69,6 +91,41 @@ def calculate_binary_operation(operator: str, left: Any, right: Any) -> Any:
     )
 
 
+def compile_binary_operation(operator_name: str) -> Callable[[Any, Any], Any]:
+    """
+    Return a function which applies the binary operator to two operands of unknown types. The common cases (numbers,
+    or operands of the same type for equality) are handled directly, and everything else by
+    `calculate_binary_operation`.
+    """
+
+    number_types = NUMBER_TYPES
+
+    if (numeric := NUMERIC_OPERATORS.get(operator_name)) is not None:
+
+        def numeric_operation(left: Any, right: Any) -> Any:
+            if left.__class__ in number_types and right.__class__ in number_types:
+                return numeric(left, right)
+
+            return calculate_binary_operation(operator=operator_name, left=left, right=right)
+
+        return numeric_operation
+
+    if (equality := EQUALITY_OPERATORS.get(operator_name)) is not None:
+
+        def equality_operation(left: Any, right: Any) -> Any:
+            if left.__class__ is right.__class__:
+                return equality(left, right)
+
+            return calculate_binary_operation(operator=operator_name, left=left, right=right)
+
+        return equality_operation
+
+    def other_operation(left: Any, right: Any) -> Any:
+        return calculate_binary_operation(operator=operator_name, left=left, right=right)
+
+    return other_operation
+
+
 def __remove_trailing_substring(left: str, right: str) -> str:
     """Remove a trailing substring from a string."""
 
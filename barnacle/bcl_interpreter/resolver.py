@@ -0,0 +1,335 @@
+"""
+Implements the Resolver class, which works out statically where each variable and function the Interpreter uses is
+declared.
+"""
+
+from typing import Any, Iterator
+
+from bcl_parser import nodes
+from bcl_parser.nodes import NodeKind
+
+# The value of a slot whose variable or function has not been declared yet
+UNDECLARED = type("Undeclared", (), {"__repr__": lambda _: "<undeclared>"})()
+
+# The addresses a use of a name may refer to, innermost first: each is the number of environments to go up from the
+# one it is used in, and the index of the slot in that environment
+Addresses = tuple[tuple[int, int], ...]
+
+DECLARATION_KINDS = (NodeKind.VAR_DECLARATION, NodeKind.FUNC_DECLARATION)
+
+
+def statement_parts(ast: nodes.Node) -> Iterator[nodes.Node]:
+    """
+    Yield the expressions a statement evaluates and the code blocks it runs, in order. The code block of a function
+    is not one of them, as it only runs when the function is called.
+    """
+
+    match ast.kind:
+        case NodeKind.PRINT | NodeKind.RETURN:
+            yield ast.body
+        case NodeKind.VAR_DECLARATION | NodeKind.VAR_ASSIGNMENT:
+            yield ast.value
+        case NodeKind.FUNC_CALL | NodeKind.CODE_BLOCK:
+            yield ast
+        case NodeKind.CONDITIONAL:
+            while ast is not None and ast.kind == NodeKind.CONDITIONAL:
+                yield ast.expression
+                yield ast.on_true
+                ast = ast.on_false
+
+            if ast is not None:
+                yield ast
+        case NodeKind.WHILE | NodeKind.DO_WHILE:
+            yield ast.expression
+            yield ast.body
+
+
+def expression_uses(ast: nodes.Node) -> Iterator[nodes.Node]:
+    """Yield the identifiers and function calls of an expression, each call before its parameters."""
+
+    match ast.kind:
+        case NodeKind.IDENTIFIER:
+            yield ast
+        case NodeKind.BINARY_EXPRESSION:
+            yield from expression_uses(ast.left)
+            yield from expression_uses(ast.right)
+        case NodeKind.NARY_EXPRESSION:
+            for operand in ast.operands:
+                yield from expression_uses(operand)
+        case NodeKind.FUNC_CALL:
+            yield ast
+
+            for parameter in ast.parameters:
+                yield from expression_uses(parameter)
+
+
+def enclosing_scopes(scope: Any, index: int) -> Iterator[tuple[Any, int, bool]]:
+    """
+    Yield each scope a name used in the statement at the index within the scope may be declared in, innermost first,
+    with the index of the statement within it which the use is in, and whether the use is within a function declared
+    in it.
+
+    The scopes may be of any class with the `parent`, `index` and `function` attributes of `Scope`.
+    """
+
+    crossed = False
+
+    while scope is not None:
+        yield scope, index, crossed
+
+        crossed = crossed or scope.function
+        index = scope.index
+        scope = scope.parent
+
+
+def declared_before(declaration_index: int, index: int, crossed: bool) -> bool:
+    """
+    Return whether a declaration has been run when a name is used in the statement at the index within its scope.
+    Within a function declared in the scope, the function's own declaration (or one before it) has always been run.
+    """
+
+    return declaration_index < index or (crossed and declaration_index <= index)
+
+
+class Declaration:
+    """A variable or function declared in a scope, and the slot it is stored in."""
+
+    __slots__ = ("slot", "index")
+
+    def __init__(self, slot: int, index: int | None):
+        self.slot = slot
+
+        # The index of the declaring statement within its scope (-1 for a parameter). A slot of the program scope may
+        # be reserved for a name which is used before it is declared, in which case it is None until it is.
+        self.index = index
+
+
+class Scope:
+    """
+    A code block, a function's parameters, or the whole program, as it is resolved: the variables and functions
+    declared in it, and the slots they are stored in.
+
+    The slots are those of the environment of its `frame`, which is the scope itself unless it shares the environment
+    of an enclosing scope: a code block which declares nothing, or the code block of a function, whose declarations
+    are stored alongside its parameters.
+    """
+
+    __slots__ = ("parent", "index", "function", "frame", "variables", "functions", "size")
+
+    def __init__(
+        self, parent: "Scope | None" = None, index: int = 0, function: bool = False, frame: "Scope | None" = None
+    ):
+        self.parent = parent
+
+        # The index within the parent scope of the statement the scope belongs to
+        self.index = index
+
+        # Whether it is the parameter scope of a function, which may be called at any time after it is declared
+        self.function = function
+        self.frame = frame or self
+
+        self.variables: dict[str, Declaration] = {}
+        self.functions: dict[str, Declaration] = {}
+
+        # The number of slots of the environment, if it is a frame
+        self.size = 0
+
+    def declare(self, table: dict[str, Declaration], name: str, index: int) -> int | None:
+        """
+        Declare a name in one of the tables of the scope, and return its slot. Return None if the name is already
+        declared in the scope, which is an error when the statement is run.
+        """
+
+        declaration = table.get(name)
+
+        if declaration is None:
+            declaration = table[name] = Declaration(self.frame.size, index)
+            self.frame.size += 1
+        elif declaration.index is None:
+            declaration.index = index
+        else:
+            return None
+
+        return declaration.slot
+
+    def reserve(self, table: dict[str, Declaration], name: str) -> Declaration:
+        """Reserve a slot for a name which is not declared yet, but may be by a later statement."""
+
+        declaration = table[name] = Declaration(self.size, None)
+        self.size += 1
+
+        return declaration
+
+
+class FunctionInfo:
+    """The slots of a declared function's parameters, and the scope its code block is resolved in."""
+
+    __slots__ = ("scope", "parameter_slots", "resolved")
+
+    def __init__(self, scope: Scope, parameter_slots: list[int | None]):
+        self.scope = scope
+
+        # A parameter with the same name as an earlier one has no slot, as declaring it fails
+        self.parameter_slots = parameter_slots
+
+        self.resolved = False
+
+
+class Resolver:
+    """
+    Resolves each use of a variable or function into the addresses it may refer to (see `Addresses`), and gives
+    every declaration a slot in the environment it is declared in, so the Interpreter never looks a name up.
+
+    Within a function, statements run in order, so a declaration has either been run when a name is used, or it has
+    not and the name refers to an outer one. A function may be called at any time after it is declared, though, so
+    within its code block, a name may also refer to a declaration which follows it in an enclosing scope. Such a use
+    has several addresses, and refers to the first whose slot has been declared when it is run.
+
+    Errors which are known statically are resolved into declarations without a slot (a name declared twice in a
+    scope) and uses without addresses (a name which is not declared), and raised by the Interpreter when the
+    statement is run, so the statements before it still run.
+
+    The resolutions are keyed by the id of the node they are for:
+    - Variables, assignments and calls: their `Addresses`.
+    - Variable declarations: their slot (or None).
+    - Function declarations: their slot (or None), and the `FunctionInfo` of the function.
+    - Code blocks: the number of slots of their environment, or None if they run in the environment they are in.
+
+    Top-level statements may be resolved all at once or a few at a time (e.g. those of a streamed source), and the
+    code block of a function is resolved when it is first called (e.g. once it has been parsed lazily).
+    """
+
+    def __init__(self):
+        self.program = Scope()
+        self.resolutions: dict[int, Any] = {}
+
+        self.__statement_count = 0
+
+        # The ids of the top-level nodes resolved last, other than those in the code blocks of functions, which are
+        # only collected while top-level statements are being resolved
+        self.__top_level: list[int] = []
+        self.__resolving_top_level = False
+
+    def resolve(self, statements: list[nodes.Node]):
+        """Resolve top-level statements, following those already resolved."""
+
+        first_index = self.__statement_count
+        self.__statement_count += len(statements)
+
+        self.__resolving_top_level = True
+        self.__resolve_statements(self.program, statements, first_index)
+        self.__resolving_top_level = False
+
+    def release(self):
+        """
+        Forget the resolutions of the top-level statements resolved last, once they have been run. Those of the code
+        blocks of functions are kept, as the functions may still be called.
+        """
+
+        for node_id in self.__top_level:
+            del self.resolutions[node_id]
+
+        self.__top_level.clear()
+
+    def resolve_function(self, info: FunctionInfo, code_block: nodes.CodeBlock):
+        """Resolve the code block of a function, unless it already has been."""
+
+        if not info.resolved:
+            self.__resolve_code_block(Scope(info.scope, 0, frame=info.scope), code_block)
+            info.resolved = True
+
+    def __resolve_statements(self, scope: Scope, statements: list[nodes.Node], first_index: int = 0):
+        # Every name declared in the scope is known before any is used, as a function may use one declared after it
+        for index, statement in enumerate(statements, start=first_index):
+            if statement.kind == NodeKind.VAR_DECLARATION:
+                self.__set(statement, scope.declare(scope.variables, statement.identifier.name, index))
+            elif statement.kind == NodeKind.FUNC_DECLARATION:
+                self.__set(statement, self.__declare_function(scope, index, statement))
+
+        for index, statement in enumerate(statements, start=first_index):
+            self.__resolve_statement(scope, index, statement)
+
+    def __declare_function(
+        self, scope: Scope, index: int, ast: nodes.FuncDeclaration
+    ) -> tuple[int | None, FunctionInfo | None]:
+        slot = scope.declare(scope.functions, ast.identifier.name, index)
+
+        if slot is None:
+            return None, None
+
+        parameter_scope = Scope(scope, index, function=True)
+        parameter_slots = [
+            parameter_scope.declare(parameter_scope.variables, parameter.name, -1) for parameter in ast.parameters
+        ]
+
+        return slot, FunctionInfo(parameter_scope, parameter_slots)
+
+    def __resolve_statement(self, scope: Scope, index: int, ast: nodes.Node):
+        for part in statement_parts(ast):
+            if part.kind == NodeKind.CODE_BLOCK:
+                self.__resolve_code_block(self.__block_scope(scope, index, part), part)
+            else:
+                self.__resolve_expression(scope, index, part)
+
+        if ast.kind == NodeKind.VAR_ASSIGNMENT:
+            self.__set(ast, self.__lookup(scope, index, ast.identifier.name, False))
+
+    def __resolve_code_block(self, scope: Scope, ast: nodes.CodeBlock):
+        self.__resolve_statements(scope, ast.body)
+        self.__set(ast, scope.size if scope.frame is scope else None)
+
+    @staticmethod
+    def __block_scope(parent: Scope, index: int, ast: nodes.CodeBlock) -> Scope:
+        """Return the scope of a code block, which only has an environment of its own if it declares something."""
+
+        declares = any(statement.kind in DECLARATION_KINDS for statement in ast.body)
+
+        return Scope(parent, index, frame=None if declares else parent.frame)
+
+    def __resolve_expression(self, scope: Scope, index: int, ast: nodes.Node):
+        for use in expression_uses(ast):
+            if use.kind == NodeKind.IDENTIFIER:
+                self.__set(use, self.__lookup(scope, index, use.name, False))
+            else:
+                self.__set(use, self.__lookup(scope, index, use.identifier.name, True))
+
+    def __lookup(self, scope: Scope, index: int, name: str, function: bool) -> Addresses:
+        """
+        Return the addresses a name used in the statement at the index within the scope may refer to. The last is
+        either a declaration which has been run when the name is used, or one of the program scope which may not
+        have been (which has a slot reserved if it is not declared yet).
+        """
+
+        addresses = []
+        depth = 0
+        frame = scope.frame
+        crossed = False
+
+        for enclosing, enclosing_index, crossed in enclosing_scopes(scope, index):
+            if enclosing.frame is not frame:
+                depth += 1
+                frame = enclosing.frame
+
+            table = enclosing.functions if function else enclosing.variables
+            declaration = table.get(name)
+
+            if declaration is not None and declaration.index is not None:
+                if declared_before(declaration.index, enclosing_index, crossed):
+                    addresses.append((depth, declaration.slot))
+                    return tuple(addresses)
+
+                if crossed:
+                    addresses.append((depth, declaration.slot))
+
+        # Within a function, a top-level name may be declared by a statement which has not been run (or resolved) yet
+        if crossed and not (declaration is not None and declaration.index is not None):
+            declaration = declaration or self.program.reserve(table, name)
+            addresses.append((depth, declaration.slot))
+
+        return tuple(addresses)
+
+    def __set(self, ast: nodes.Node, resolution: Any):
+        self.resolutions[id(ast)] = resolution
+
+        if self.__resolving_top_level:
+            self.__top_level.append(id(ast))
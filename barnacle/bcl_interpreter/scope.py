@@ -0,0 +1,20 @@
+"""
+Implements the Scope class, the dictionary-based environment shared by the engines which compile the AST.
+"""
+
+from typing import Any
+
+
+class Scope:
+    """
+    The variables and functions declared in a code block, a function's parameters, or the whole program.
+
+    It behaves as the Interpreter's `Environment`, with the same errors, but is looked up without recursion or logging.
+    """
+
+    __slots__ = ("variables", "functions", "parent")
+
+    def __init__(self, parent: "Scope | None" = None):
+        self.variables: dict[str, Any] = {}
+        self.functions: dict[str, Any] = {}
+        self.parent = parent
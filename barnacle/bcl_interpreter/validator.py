@@ -0,0 +1,155 @@
+"""
+Implements the validation of an AST before it is interpreted.
+
+The Parser only builds well-formed ASTs, but an AST may also come from elsewhere (e.g. `--from-ast` or the compile
+cache). Such an AST is validated once, as a whole, before it is run, so that the Interpreter does not have to check
+the structure of every node each time it visits it.
+"""
+
+from typing import Any
+
+from bcl_parser import nodes
+from bcl_parser.nodes import NODE_NAMES, NodeKind
+
+# The kinds of node which may be used as a statement, and as an expression
+STATEMENT_KINDS = frozenset(
+    {
+        NodeKind.PRINT,
+        NodeKind.CONDITIONAL,
+        NodeKind.VAR_DECLARATION,
+        NodeKind.VAR_ASSIGNMENT,
+        NodeKind.CODE_BLOCK,
+        NodeKind.WHILE,
+        NodeKind.DO_WHILE,
+        NodeKind.FUNC_DECLARATION,
+        NodeKind.FUNC_CALL,
+        NodeKind.RETURN,
+    }
+)
+
+EXPRESSION_KINDS = frozenset(
+    {
+        NodeKind.STRING_LITERAL,
+        NodeKind.NUMERIC_LITERAL,
+        NodeKind.BOOLEAN_LITERAL,
+        NodeKind.IDENTIFIER,
+        NodeKind.BINARY_EXPRESSION,
+        NodeKind.NARY_EXPRESSION,
+        NodeKind.FUNC_CALL,
+    }
+)
+
+# The type of the value of each kind of literal
+LITERAL_TYPES = {
+    NodeKind.STRING_LITERAL: (str,),
+    NodeKind.NUMERIC_LITERAL: (int, float),
+    NodeKind.BOOLEAN_LITERAL: (bool,),
+}
+
+
+def validate(ast: nodes.Program):
+    """
+    Validate the structure of a whole AST: that every node is one of the node classes, of a kind which may be used
+    where it is (e.g. a statement in a code block, or an expression in a binary expression), and that the values of
+    its other fields have the right types. The code blocks of functions may be left unparsed.
+
+    The AST is walked without recursion. If it is malformed, a RuntimeError is raised.
+    """
+
+    __expect_kind(ast, NodeKind.PROGRAM)
+    pending: list[nodes.Node] = [ast]
+
+    while pending:
+        node = pending.pop()
+
+        match node.kind:
+            case NodeKind.PROGRAM | NodeKind.CODE_BLOCK:
+                pending.extend(__expect_all(node.body, STATEMENT_KINDS, "statement"))
+            case NodeKind.PRINT | NodeKind.RETURN:
+                pending.append(__expect(node.body, EXPRESSION_KINDS, "expression"))
+            case NodeKind.VAR_DECLARATION | NodeKind.VAR_ASSIGNMENT:
+                pending.append(__expect_kind(node.identifier, NodeKind.IDENTIFIER))
+                pending.append(__expect(node.value, EXPRESSION_KINDS, "expression"))
+            case NodeKind.FUNC_DECLARATION:
+                pending.append(__expect_kind(node.identifier, NodeKind.IDENTIFIER))
+                pending.extend(__expect_kind(parameter, NodeKind.IDENTIFIER) for parameter in __list(node.parameters))
+                pending.append(
+                    __expect(node.body, {NodeKind.CODE_BLOCK, NodeKind.UNPARSED_CODE_BLOCK}, "function body")
+                )
+            case NodeKind.FUNC_CALL:
+                pending.append(__expect_kind(node.identifier, NodeKind.IDENTIFIER))
+                pending.extend(__expect_all(node.parameters, EXPRESSION_KINDS, "expression"))
+            case NodeKind.CONDITIONAL:
+                pending.append(__expect(node.expression, EXPRESSION_KINDS, "expression"))
+                pending.append(__expect_kind(node.on_true, NodeKind.CODE_BLOCK))
+
+                if node.on_false is not None:
+                    pending.append(__expect(node.on_false, {NodeKind.CODE_BLOCK, NodeKind.CONDITIONAL}, "else"))
+            case NodeKind.WHILE | NodeKind.DO_WHILE:
+                pending.append(__expect(node.expression, EXPRESSION_KINDS, "expression"))
+                pending.append(__expect_kind(node.body, NodeKind.CODE_BLOCK))
+            case NodeKind.BINARY_EXPRESSION:
+                __expect_value(node, node.operator, (str,))
+                pending.append(__expect(node.left, EXPRESSION_KINDS, "expression"))
+                pending.append(__expect(node.right, EXPRESSION_KINDS, "expression"))
+            case NodeKind.NARY_EXPRESSION:
+                __expect_value(node, node.operator, (str,))
+
+                if len(__list(node.operands)) < 2:
+                    raise RuntimeError("Node 'nary_expression' has fewer than two operands")
+
+                pending.extend(__expect_all(node.operands, EXPRESSION_KINDS, "expression"))
+            case NodeKind.IDENTIFIER:
+                __expect_value(node, node.name, (str,))
+            case NodeKind.STRING_LITERAL | NodeKind.NUMERIC_LITERAL | NodeKind.BOOLEAN_LITERAL:
+                __expect_value(node, node.value, LITERAL_TYPES[node.kind])
+            case NodeKind.UNPARSED_CODE_BLOCK:
+                __expect_value(node, node.first_token, (int,))
+                __expect_value(node, node.last_token, (int,))
+
+
+def __expect(node: Any, kinds: set | frozenset, role: str) -> nodes.Node:
+    """Check that the node is an AST node of one of the kinds which may be used in its role, and return it."""
+
+    if not isinstance(node, nodes.Node):
+        raise RuntimeError(f"Not an AST node: '{type(node).__name__}'")
+
+    if node.kind not in kinds:
+        raise RuntimeError(f"Unexpected node type '{NODE_NAMES[node.kind]}' while interpreting '{role}'")
+
+    return node
+
+
+def __expect_kind(node: Any, kind: NodeKind) -> nodes.Node:
+    """Check that the node is an AST node of the expected kind, and return it."""
+
+    if not isinstance(node, nodes.Node):
+        raise RuntimeError(f"Not an AST node: '{type(node).__name__}'")
+
+    if node.kind != kind:
+        raise RuntimeError(f"Node has unexpected type (expected '{NODE_NAMES[kind]}', got '{NODE_NAMES[node.kind]}')")
+
+    return node
+
+
+def __expect_all(children: Any, kinds: set | frozenset, role: str) -> list[nodes.Node]:
+    """Check that the children are a list of AST nodes of the kinds which may be used in their role, and return it."""
+
+    return [__expect(child, kinds, role) for child in __list(children)]
+
+
+def __expect_value(node: nodes.Node, value: Any, types: tuple[type, ...]):
+    """Check that the value of a field of the node which is not a child node is of one of the expected types."""
+
+    # bool is a subclass of int, but a boolean is not a number in Barnacle
+    if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+        raise RuntimeError(f"Node '{NODE_NAMES[node.kind]}' has a value of unexpected type '{type(value).__name__}'")
+
+
+def __list(children: Any) -> list:
+    """Check that the children of a node are a list, and return it."""
+
+    if not isinstance(children, list):
+        raise RuntimeError(f"Expected a list of AST nodes, got '{type(children).__name__}'")
+
+    return children
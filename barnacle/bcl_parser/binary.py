@@ -0,0 +1,418 @@
+"""
+Implements the compact binary form of the AST.
+
+The binary form starts with the magic number `BCLA` and a format version byte, followed by the constant pool,
+the table of interned names, and then the length of the nodes in bytes and the nodes themselves. Integers are
+written as unsigned LEB128 varints, so small values (such as node kinds and most indices) take a single byte.
+
+-   The constant pool holds each distinct literal value once, as a one-byte tag followed by its data:
+    `t` (true), `f` (false), `i` (an integer, as a zigzag varint), `d` (a float, as 8 bytes) or `s` (a string,
+    as a varint length and its UTF-8 bytes).
+-   The name table holds each distinct identifier name and operator once, as a varint length and its UTF-8 bytes.
+-   The nodes are written children first (in post-order), so they can be loaded with a stack and no recursion.
+    Each node is a varint of its kind shifted left by one, with the low bit set if it records an offset.
+    The kind is followed by whatever the node holds besides its children: the index of its name or constant, the
+    number of children for nodes with a list of them, or the token indices of an `unparsed_code_block`. Then comes
+    the offset, if there is one. A missing `else` block of a conditional is written as `NONE_CODE`.
+"""
+
+import struct
+from typing import Any, BinaryIO, Callable
+
+from . import nodes
+from .nodes import NodeKind
+
+# Binary ASTs start with this magic number, followed by the format version
+MAGIC = b"BCLA"
+VERSION = 1
+
+# Written in place of an optional child node which is missing
+NONE_CODE = 0x7F
+
+FLOAT_STRUCT = struct.Struct("<d")
+
+
+def dump(ast: nodes.Node, stream: BinaryIO):
+    """Write the binary form of the AST to a binary stream."""
+
+    stream.write(dumps(ast))
+
+
+def dumps(ast: nodes.Node) -> bytes:
+    """Return the binary form of the AST."""
+
+    constants: dict[tuple[type, str], int] = {}
+    constant_data = bytearray()
+    names: dict[str, int] = {}
+    name_data = bytearray()
+    body = bytearray()
+
+    def constant(value: Any) -> int:
+        # Keyed by type and repr, so that e.g. `1`, `1.0` and `true` (or `0.0` and `-0.0`) stay distinct
+        key = (type(value), repr(value))
+        index = constants.get(key)
+
+        if index is None:
+            index = constants[key] = len(constants)
+            __write_constant(constant_data, value)
+
+        return index
+
+    def name(value: str) -> int:
+        index = names.get(value)
+
+        if index is None:
+            index = names[value] = len(names)
+            data = value.encode("utf-8")
+            __write_varint(name_data, len(data))
+            name_data.extend(data)
+
+        return index
+
+    # Each node is pushed twice: first to push its children (so that they are written before it), then to write it
+    pending: list[tuple[nodes.Node | None, bool]] = [(ast, False)]
+
+    while pending:
+        node, children_written = pending.pop()
+
+        if node is None:
+            body.append(NONE_CODE)
+            continue
+
+        if not children_written:
+            pending.append((node, True))
+
+            for field_name in reversed(node.__match_args__):
+                value = getattr(node, field_name)
+
+                if isinstance(value, list):
+                    pending.extend((item, False) for item in reversed(value))
+                elif value is None or isinstance(value, nodes.Node):
+                    pending.append((value, False))
+
+            continue
+
+        __write_node(body, node, constant, name)
+
+    header = bytearray(MAGIC)
+    header.append(VERSION)
+    __write_varint(header, len(constants))
+    header += constant_data
+    __write_varint(header, len(names))
+    header += name_data
+    __write_varint(header, len(body))
+
+    return bytes(header + body)
+
+
+def __write_node(body: bytearray, node: nodes.Node, constant: Callable[[Any], int], name: Callable[[str], int]):
+    """
+    Append a node to the data, after its children: its kind, whatever it holds besides its children (with its name or
+    constant interned by `name` or `constant`), and its offset.
+    """
+
+    kind = node.kind
+    __write_varint(body, kind << 1 | (node.offset is not None))
+
+    match kind:
+        case NodeKind.PROGRAM | NodeKind.CODE_BLOCK:
+            __write_varint(body, len(node.body))
+        case NodeKind.IDENTIFIER:
+            __write_varint(body, name(node.name))
+        case NodeKind.STRING_LITERAL | NodeKind.NUMERIC_LITERAL | NodeKind.BOOLEAN_LITERAL:
+            __write_varint(body, constant(node.value))
+        case NodeKind.BINARY_EXPRESSION:
+            __write_varint(body, name(node.operator))
+        case NodeKind.NARY_EXPRESSION:
+            __write_varint(body, name(node.operator))
+            __write_varint(body, len(node.operands))
+        case NodeKind.FUNC_DECLARATION | NodeKind.FUNC_CALL:
+            __write_varint(body, len(node.parameters))
+        case NodeKind.UNPARSED_CODE_BLOCK:
+            __write_varint(body, node.first_token)
+            __write_varint(body, node.last_token)
+
+    if node.offset is not None:
+        __write_varint(body, node.offset)
+
+
+def load(stream: BinaryIO) -> nodes.Node:
+    """
+    Read the binary form of an AST from a binary stream, and return the AST.
+
+    If the stream does not hold a binary AST, a ValueError is raised.
+    """
+
+    return loads(stream.read())
+
+
+def loads(data: bytes) -> nodes.Node:
+    """
+    Return the AST from its binary form.
+
+    The nodes are only checked to be well-formed, not that they make up a valid program: an AST from outside of the
+    Parser should be validated before it is run.
+
+    If the data is not a binary AST, a ValueError is raised.
+    """
+
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a Barnacle binary AST")
+
+    if len(data) == len(MAGIC) or data[len(MAGIC)] != VERSION:
+        raise ValueError(f"Unsupported binary AST version (expected {VERSION})")
+
+    try:
+        return __load_nodes(data)
+    except (IndexError, struct.error, UnicodeDecodeError, ValueError) as error:
+        raise ValueError(f"Binary AST is truncated or corrupted: {error}") from error
+
+
+def __load_nodes(data: bytes) -> nodes.Node:
+    """Read the constant pool, name table and nodes of a binary AST, and return the root node."""
+
+    constants, position = __load_constants(data, len(MAGIC) + 1)
+    names, position = __load_names(data, position)
+
+    # A prefix of the nodes is a valid tree by itself (e.g. the first leaf), so truncation is caught by the length
+    length, position = __read_varint(data, position)
+
+    if position + length != len(data):
+        raise ValueError(f"expected {length} bytes of nodes, got {len(data) - position}")
+
+    return __load_node_tree(data, position, constants, names)
+
+
+def __load_constants(data: bytes, position: int) -> tuple[list, int]:
+    """Read the constant pool at the given position, and return it and the position after it."""
+
+    count, position = __read_varint(data, position)
+    constants = []
+
+    for _ in range(count):
+        value, position = __read_constant(data, position)
+        constants.append(value)
+
+    return constants, position
+
+
+def __load_names(data: bytes, position: int) -> tuple[list[str], int]:
+    """Read the name table at the given position, and return it and the position after it."""
+
+    count, position = __read_varint(data, position)
+    names = []
+
+    for _ in range(count):
+        length, position = __read_varint(data, position)
+
+        if position + length > len(data):
+            raise IndexError("name runs past the end")
+
+        names.append(data[position : position + length].decode("utf-8"))
+        position += length
+
+    return names, position
+
+
+def __load_node_tree(data: bytes, position: int, constants: list, names: list[str]) -> nodes.Node:
+    """Read the nodes from the given position to the end of the data, and return the root node."""
+
+    # The loop runs once for every node, so it is kept in one function, with the kinds compared inline rather than
+    # dispatched to a function per kind, as a call per node would cost more than building the node
+    # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+
+    # Nodes are created without calling their `__init__`, and their fields are set directly, which is much faster.
+    # Everything the loop uses is bound to a local name (and the kinds to plain ints), as they are used for every node.
+    new = object.__new__
+    classes = [nodes.NODE_CLASSES.get(kind) for kind in range(NONE_CODE >> 1)]
+    identifier, binary_expression, nary_expression = (
+        int(NodeKind.IDENTIFIER),
+        int(NodeKind.BINARY_EXPRESSION),
+        int(NodeKind.NARY_EXPRESSION),
+    )
+    literals = {int(NodeKind.STRING_LITERAL), int(NodeKind.NUMERIC_LITERAL), int(NodeKind.BOOLEAN_LITERAL)}
+    blocks = {int(NodeKind.PROGRAM), int(NodeKind.CODE_BLOCK)}
+    assignments = {int(NodeKind.VAR_DECLARATION), int(NodeKind.VAR_ASSIGNMENT)}
+    bodies = {int(NodeKind.PRINT), int(NodeKind.RETURN)}
+    loops = {int(NodeKind.WHILE), int(NodeKind.DO_WHILE)}
+    func_call, func_declaration = int(NodeKind.FUNC_CALL), int(NodeKind.FUNC_DECLARATION)
+    conditional, unparsed_code_block = int(NodeKind.CONDITIONAL), int(NodeKind.UNPARSED_CODE_BLOCK)
+    read_varint, pop_children = __read_varint, __pop_children
+
+    end = len(data)
+    stack: list[nodes.Node | None] = []
+    push, pop = stack.append, stack.pop
+
+    while position < end:
+        code = data[position]
+        position += 1
+
+        if code > 0x7F:
+            code, position = read_varint(data, position - 1)
+        elif code == NONE_CODE:
+            push(None)
+            continue
+
+        kind = code >> 1
+
+        # Most nodes hold a single-byte index, which is read without a call. The most common kinds come first.
+        if kind == identifier or kind in literals:
+            node = new(classes[kind])
+            index = data[position]
+            position += 1
+
+            if index > 0x7F:
+                index, position = read_varint(data, position - 1)
+
+            if kind == identifier:
+                node.name = names[index]
+            else:
+                node.value = constants[index]
+        elif kind == binary_expression:
+            node = new(classes[kind])
+            index, position = read_varint(data, position)
+            node.operator = names[index]
+            node.right = pop()
+            node.left = pop()
+        elif kind in blocks:
+            node = new(classes[kind])
+            count, position = read_varint(data, position)
+            node.body = pop_children(stack, count)
+        elif kind in assignments:
+            node = new(classes[kind])
+            node.value = pop()
+            node.identifier = pop()
+        elif kind in bodies:
+            node = new(classes[kind])
+            node.body = pop()
+        elif kind == func_call:
+            node = new(classes[kind])
+            count, position = read_varint(data, position)
+            node.parameters = pop_children(stack, count)
+            node.identifier = pop()
+        elif kind == conditional:
+            node = new(classes[kind])
+            node.on_false = pop()
+            node.on_true = pop()
+            node.expression = pop()
+        elif kind in loops:
+            node = new(classes[kind])
+            node.body = pop()
+            node.expression = pop()
+        elif kind == func_declaration:
+            node = new(classes[kind])
+            count, position = read_varint(data, position)
+            node.body = pop()
+            node.parameters = pop_children(stack, count)
+            node.identifier = pop()
+        elif kind == nary_expression:
+            node = new(classes[kind])
+            index, position = read_varint(data, position)
+            count, position = read_varint(data, position)
+            node.operator = names[index]
+            node.operands = pop_children(stack, count)
+        elif kind == unparsed_code_block:
+            node = new(classes[kind])
+            node.first_token, position = read_varint(data, position)
+            node.last_token, position = read_varint(data, position)
+        else:
+            raise ValueError(f"unknown node code {code}")
+
+        if code & 1:
+            node.offset, position = read_varint(data, position)
+        else:
+            node.offset = None
+
+        push(node)
+
+    if len(stack) != 1 or stack[0] is None:
+        raise ValueError(f"expected a single root node, got {len(stack)}")
+
+    return stack[0]
+
+
+def __pop_children(stack: list, count: int) -> list:
+    """Remove the last `count` nodes from the stack and return them, in order."""
+
+    if count > len(stack):
+        raise IndexError("not enough child nodes")
+
+    if not count:
+        return []
+
+    children = stack[-count:]
+    del stack[-count:]
+
+    return children
+
+
+def __write_varint(data: bytearray, value: int):
+    """Append an unsigned integer to the data as a LEB128 varint."""
+
+    while value > 0x7F:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+
+    data.append(value)
+
+
+def __read_varint(data: bytes, position: int) -> tuple[int, int]:
+    """Read a LEB128 varint from the data at the given position, and return it and the position after it."""
+
+    value = 0
+    shift = 0
+
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+
+        if byte < 0x80:
+            return value, position
+
+        shift += 7
+
+
+def __write_constant(data: bytearray, value: Any):
+    """Append a constant to the data, as a one-byte tag followed by its data."""
+
+    # bool must be checked before int, as it is a subclass of int
+    if isinstance(value, bool):
+        data += b"t" if value else b"f"
+    elif isinstance(value, int):
+        data += b"i"
+        __write_varint(data, value << 1 if value >= 0 else (-value << 1) - 1)
+    elif isinstance(value, float):
+        data += b"d" + FLOAT_STRUCT.pack(value)
+    else:
+        encoded = value.encode("utf-8")
+        data += b"s"
+        __write_varint(data, len(encoded))
+        data += encoded
+
+
+def __read_constant(data: bytes, position: int) -> tuple[Any, int]:
+    """Read a constant written by `__write_constant`, and return it and the position after it."""
+
+    tag = data[position : position + 1]
+    position += 1
+
+    match tag:
+        case b"t":
+            return True, position
+        case b"f":
+            return False, position
+        case b"i":
+            value, position = __read_varint(data, position)
+            return (value >> 1 if not value & 1 else -((value + 1) >> 1)), position
+        case b"d":
+            return FLOAT_STRUCT.unpack_from(data, position)[0], position + FLOAT_STRUCT.size
+        case b"s":
+            length, position = __read_varint(data, position)
+
+            if position + length > len(data):
+                raise IndexError("string constant runs past the end")
+
+            return data[position : position + length].decode("utf-8"), position + length
+
+    raise ValueError(f"unknown constant tag {tag!r}")
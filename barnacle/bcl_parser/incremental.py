@@ -0,0 +1,203 @@
+"""
+Implements the helpers of incremental re-parsing (see `Parser.reparse()`), which work out the tokens an edit may have
+changed, the code blocks which enclose them, and the positions which move with the edit.
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterator
+
+from bcl_tokenizer import tokenizer as tkn
+from bcl_tokenizer.edits import TextEdit
+from bcl_tokenizer.tokens import TokenType
+
+from . import nodes
+
+
+@dataclass(slots=True)
+class Damage:
+    """
+    The tokens of the source before an edit which the edit may have changed, from `start` to `end` (as in
+    `Tokenizer.edited()`), and how far the edit moves the offsets and token indices after them.
+    """
+
+    previous: tkn.Tokenizer
+    offset: int
+    start: int
+    end: int
+    shift: int
+    token_shift: int
+
+    # Whether the tokens before the damaged ones are unchanged, which an edit closing an earlier unterminated `/*`
+    # breaks, as it changes the tokens before it too
+    unchanged: bool
+
+    @classmethod
+    def of_edit(cls, previous: tkn.Tokenizer, edited: tkn.Tokenizer, edit: TextEdit) -> "Damage":
+        """Return the damage of an edit, given the tokenizers of the source before and after it."""
+
+        start = bisect_right(previous.ends, edit.offset - tkn.LOOKAHEAD)
+        end = bisect_right(previous.starts, edit.offset + edit.deleted_length + tkn.LOOKAHEAD)
+        unchanged = edited.kinds[:start] == previous.kinds[:start] and edited.starts[:start] == previous.starts[:start]
+
+        return cls(
+            previous=previous,
+            offset=edit.offset,
+            start=start,
+            end=min(end, len(previous) - 1),
+            shift=len(edit.inserted(previous.source)) - edit.deleted_length,
+            token_shift=len(edited) - len(previous),
+            unchanged=unchanged,
+        )
+
+
+def enclosing_levels(ast: nodes.Program, damage: Damage) -> list[tuple[list, int]]:
+    """
+    Return the statement lists which enclose the damaged tokens, from the program's inwards, each with the index of
+    the previous token it ends at (the `}` of its code block, or the end of the program).
+
+    None do if the tokens before the damaged ones have changed, as then the whole program must be parsed again.
+    """
+
+    if not damage.unchanged:
+        return []
+
+    previous = damage.previous
+    token_bytes = previous.kinds.tobytes()
+    levels = [(ast.body, len(previous) - 1)]
+
+    while level := __enclosed_level(token_bytes, *levels[-1], damage):
+        levels.append(level)
+
+    return levels
+
+
+def shift_statements(ast: nodes.Program, damage: Damage):
+    """Shift the positions of the statements of the program which follow the edit, by how far the edit moves them."""
+
+    index = max(bisect_left(ast.body, damage.offset, key=statement_offset) - 1, 0)
+
+    for statement in ast.body[index:]:
+        __shift_positions(statement, damage)
+
+
+def statement_offset(statement: nodes.Node) -> int:
+    """Return the source offset of a statement, to search a statement list by offset."""
+
+    return statement.offset
+
+
+def __enclosed_level(token_bytes: bytes, body: list, end: int, damage: Damage) -> tuple[list, int] | None:
+    """
+    If the damaged tokens lie within a code block of one of the statements, strictly between its braces, return the
+    block's statements and the index of its `}` among the previous tokens.
+    """
+
+    previous = damage.previous
+    index = bisect_left(body, previous.starts[damage.start], key=statement_offset) - 1
+
+    if index < 0:
+        return None
+
+    statement = body[index]
+    statement_start = bisect_left(previous.starts, statement.offset)
+    statement_end = bisect_left(previous.starts, body[index + 1].offset) if index + 1 < len(body) else end
+    code_blocks = __code_blocks(statement)
+
+    # Each code block of the statement is a pair of braces at the statement's top level, in order
+    for block_index, (first_token, last_token) in enumerate(__brace_pairs(token_bytes, statement_start, statement_end)):
+        if last_token < damage.start:
+            continue
+
+        if first_token < damage.start and damage.end <= last_token and block_index < len(code_blocks):
+            return code_blocks[block_index].body, last_token
+
+        return None
+
+    return None
+
+
+def __brace_pairs(token_bytes: bytes, start: int, end: int) -> Iterator[tuple[int, int]]:
+    """Yield the indices of each pair of matching braces between the tokens, which is not within another."""
+
+    find = token_bytes.find
+    left_brace, right_brace = bytes([TokenType.LEFT_BRACE]), bytes([TokenType.RIGHT_BRACE])
+
+    index = start
+
+    while (first_token := find(left_brace, index, end)) != -1:
+        depth = 1
+        index = first_token + 1
+        next_left_brace = find(left_brace, index, end)
+
+        while depth:
+            next_right_brace = find(right_brace, index, end)
+
+            if next_right_brace == -1:
+                return
+
+            if next_left_brace != -1 and next_left_brace < next_right_brace:
+                depth += 1
+                index = next_left_brace + 1
+                next_left_brace = find(left_brace, index, end)
+            else:
+                depth -= 1
+                index = next_right_brace + 1
+
+        yield first_token, index - 1
+
+
+def __code_blocks(statement: nodes.Node) -> list[nodes.CodeBlock]:
+    """Return the parsed code blocks of a statement, in source order."""
+
+    if statement.kind == nodes.NodeKind.CODE_BLOCK:
+        return [statement]
+
+    if statement.kind in (nodes.NodeKind.WHILE, nodes.NodeKind.DO_WHILE):
+        return [statement.body]
+
+    if statement.kind == nodes.NodeKind.FUNC_DECLARATION:
+        return [statement.body] if statement.body.kind == nodes.NodeKind.CODE_BLOCK else []
+
+    if statement.kind != nodes.NodeKind.CONDITIONAL:
+        return []
+
+    code_blocks = []
+
+    while statement is not None and statement.kind == nodes.NodeKind.CONDITIONAL:
+        code_blocks.append(statement.on_true)
+        statement = statement.on_false
+
+    if statement is not None:
+        code_blocks.append(statement)
+
+    return code_blocks
+
+
+def __shift_positions(statement: nodes.Node, damage: Damage):
+    """
+    Shift the offsets of a statement and the statements within it from the edit onwards, and the token indices of
+    unparsed code blocks from the damaged tokens onwards.
+
+    Only statements have offsets, so only the code blocks of each statement are walked, not its expressions.
+    """
+
+    pending = [statement]
+
+    while pending:
+        statement = pending.pop()
+
+        if statement.offset >= damage.offset:
+            statement.offset += damage.shift
+
+        if (
+            statement.kind == nodes.NodeKind.FUNC_DECLARATION
+            and statement.body.kind == nodes.NodeKind.UNPARSED_CODE_BLOCK
+        ):
+            if statement.body.first_token >= damage.start:
+                statement.body.first_token += damage.token_shift
+                statement.body.last_token += damage.token_shift
+            continue
+
+        for code_block in __code_blocks(statement):
+            pending.extend(code_block.body)
@@ -0,0 +1,458 @@
+"""
+Implements the AST node classes produced by the Parser.
+
+Every kind of node is a slotted dataclass with an integer `kind` tag, so nodes are small and their fields are
+plain attribute lookups. The AST can be converted to and from its dict form (as output by `--show-ast`),
+where each node is a dict with a `"type"` key naming its kind.
+"""
+
+from dataclasses import dataclass, field, fields
+from enum import IntEnum
+from json.encoder import encode_basestring_ascii
+from typing import Any, ClassVar, Iterator, TextIO
+
+
+class NodeKind(IntEnum):
+    """The kind of an AST node."""
+
+    PROGRAM = 0
+    CODE_BLOCK = 1
+    PRINT = 2
+    VAR_DECLARATION = 3
+    VAR_ASSIGNMENT = 4
+    FUNC_DECLARATION = 5
+    FUNC_CALL = 6
+    CONDITIONAL = 7
+    WHILE = 8
+    DO_WHILE = 9
+    RETURN = 10
+    IDENTIFIER = 11
+    STRING_LITERAL = 12
+    NUMERIC_LITERAL = 13
+    BOOLEAN_LITERAL = 14
+    BINARY_EXPRESSION = 15
+    NARY_EXPRESSION = 16
+    UNPARSED_CODE_BLOCK = 17
+
+
+# The name of each node kind in the dict form of the AST
+NODE_NAMES = {
+    NodeKind.PROGRAM: "program",
+    NodeKind.CODE_BLOCK: "code_block",
+    NodeKind.PRINT: "print",
+    NodeKind.VAR_DECLARATION: "var_declaration",
+    NodeKind.VAR_ASSIGNMENT: "var_assignment",
+    NodeKind.FUNC_DECLARATION: "func_declaration",
+    NodeKind.FUNC_CALL: "func_call",
+    NodeKind.CONDITIONAL: "conditional",
+    NodeKind.WHILE: "while",
+    NodeKind.DO_WHILE: "do_while",
+    NodeKind.RETURN: "return",
+    NodeKind.IDENTIFIER: "identifier",
+    NodeKind.STRING_LITERAL: "string_literal",
+    NodeKind.NUMERIC_LITERAL: "numeric_literal",
+    NodeKind.BOOLEAN_LITERAL: "boolean_literal",
+    NodeKind.BINARY_EXPRESSION: "binary_expression",
+    NodeKind.NARY_EXPRESSION: "nary_expression",
+    NodeKind.UNPARSED_CODE_BLOCK: "unparsed_code_block",
+}
+
+
+@dataclass(slots=True)
+class Node:
+    """
+    The base class of all AST nodes.
+
+    Statement nodes may record the source offset they start at, when the Parser is asked for positions.
+    """
+
+    kind: ClassVar[NodeKind]
+
+    offset: int | None = field(default=None, kw_only=True)
+
+
+@dataclass(slots=True)
+class Program(Node):
+    """A Barnacle program: zero or more statements."""
+
+    kind: ClassVar[NodeKind] = NodeKind.PROGRAM
+
+    body: list[Node]
+
+
+@dataclass(slots=True)
+class CodeBlock(Node):
+    """A block of code: zero or more statements surrounded by braces."""
+
+    kind: ClassVar[NodeKind] = NodeKind.CODE_BLOCK
+
+    body: list[Node]
+
+
+@dataclass(slots=True)
+class UnparsedCodeBlock(Node):
+    """
+    The code block of a function which has not been parsed yet, when the Parser parses function bodies lazily.
+
+    It records the indices of the block's `{` and `}` tokens in the Parser's token stream, so that
+    `Parser.parse_code_block()` can parse it once it is needed.
+    """
+
+    kind: ClassVar[NodeKind] = NodeKind.UNPARSED_CODE_BLOCK
+
+    first_token: int
+    last_token: int
+
+
+@dataclass(slots=True)
+class Print(Node):
+    """A print statement."""
+
+    kind: ClassVar[NodeKind] = NodeKind.PRINT
+
+    body: Node
+
+
+@dataclass(slots=True)
+class Identifier(Node):
+    """An identifier (e.g. a function name or a variable name)."""
+
+    kind: ClassVar[NodeKind] = NodeKind.IDENTIFIER
+
+    name: str
+
+
+@dataclass(slots=True)
+class VarDeclaration(Node):
+    """A variable declaration and assignment."""
+
+    kind: ClassVar[NodeKind] = NodeKind.VAR_DECLARATION
+
+    identifier: Identifier
+    value: Node
+
+
+@dataclass(slots=True)
+class VarAssignment(Node):
+    """A variable assignment."""
+
+    kind: ClassVar[NodeKind] = NodeKind.VAR_ASSIGNMENT
+
+    identifier: Identifier
+    value: Node
+
+
+@dataclass(slots=True)
+class FuncDeclaration(Node):
+    """A function declaration."""
+
+    kind: ClassVar[NodeKind] = NodeKind.FUNC_DECLARATION
+
+    identifier: Identifier
+    parameters: list[Identifier]
+    body: CodeBlock | UnparsedCodeBlock
+
+
+@dataclass(slots=True)
+class FuncCall(Node):
+    """A function call, either as a statement or as part of an expression."""
+
+    kind: ClassVar[NodeKind] = NodeKind.FUNC_CALL
+
+    identifier: Identifier
+    parameters: list[Node]
+
+
+@dataclass(slots=True)
+class Conditional(Node):
+    """An 'if' statement, with an optional 'else' code block or chained 'else if' conditional."""
+
+    kind: ClassVar[NodeKind] = NodeKind.CONDITIONAL
+
+    expression: Node
+    on_true: CodeBlock
+    on_false: "CodeBlock | Conditional | None"
+
+
+@dataclass(slots=True)
+class WhileLoop(Node):
+    """A 'while' loop."""
+
+    kind: ClassVar[NodeKind] = NodeKind.WHILE
+
+    expression: Node
+    body: CodeBlock
+
+
+@dataclass(slots=True)
+class DoWhileLoop(Node):
+    """A 'do-while' loop."""
+
+    kind: ClassVar[NodeKind] = NodeKind.DO_WHILE
+
+    expression: Node
+    body: CodeBlock
+
+
+@dataclass(slots=True)
+class Return(Node):
+    """A 'return' statement within a function code block."""
+
+    kind: ClassVar[NodeKind] = NodeKind.RETURN
+
+    body: Node
+
+
+@dataclass(slots=True)
+class StringLiteral(Node):
+    """A string literal."""
+
+    kind: ClassVar[NodeKind] = NodeKind.STRING_LITERAL
+
+    value: str
+
+
+@dataclass(slots=True)
+class NumericLiteral(Node):
+    """A numeric literal."""
+
+    kind: ClassVar[NodeKind] = NodeKind.NUMERIC_LITERAL
+
+    value: int | float
+
+
+@dataclass(slots=True)
+class BooleanLiteral(Node):
+    """A boolean literal."""
+
+    kind: ClassVar[NodeKind] = NodeKind.BOOLEAN_LITERAL
+
+    value: bool
+
+
+@dataclass(slots=True)
+class BinaryExpression(Node):
+    """An expression with a binary operator (e.g. `+` or `<=`) and two operands."""
+
+    kind: ClassVar[NodeKind] = NodeKind.BINARY_EXPRESSION
+
+    operator: str
+    left: Node
+    right: Node
+
+
+@dataclass(slots=True)
+class NaryExpression(Node):
+    """
+    A chain of three or more operands joined by the same binary operator (e.g. `a + b + c`).
+
+    Like a chain of `binary_expression` nodes, it is left-associative: the operands are combined from left to right.
+    """
+
+    kind: ClassVar[NodeKind] = NodeKind.NARY_EXPRESSION
+
+    operator: str
+    operands: list[Node]
+
+
+NODE_CLASSES: dict[NodeKind, type[Node]] = {
+    node_class.kind: node_class
+    for node_class in (
+        Program,
+        CodeBlock,
+        UnparsedCodeBlock,
+        Print,
+        VarDeclaration,
+        VarAssignment,
+        FuncDeclaration,
+        FuncCall,
+        Conditional,
+        WhileLoop,
+        DoWhileLoop,
+        Return,
+        Identifier,
+        StringLiteral,
+        NumericLiteral,
+        BooleanLiteral,
+        BinaryExpression,
+        NaryExpression,
+    )
+}
+
+NODE_KINDS_BY_NAME = {name: kind for kind, name in NODE_NAMES.items()}
+
+
+def to_dict(node: Node) -> dict:
+    """
+    Return the dict form of the AST node and all of its children.
+
+    The `offset` key is only included for nodes which record an offset.
+    """
+
+    node_dict = {"type": NODE_NAMES[node.kind]}
+
+    for node_field in fields(node):
+        if node_field.name != "offset":
+            node_dict[node_field.name] = __value_to_dict(getattr(node, node_field.name))
+
+    if node.offset is not None:
+        node_dict["offset"] = node.offset
+
+    return node_dict
+
+
+def from_dict(node_dict: dict) -> Node:
+    """
+    Return the AST node for the dict form of a node and all of its children.
+
+    If the dict is not a valid node, a ValueError is raised.
+    """
+
+    if not isinstance(node_dict, dict) or node_dict.get("type") not in NODE_KINDS_BY_NAME:
+        raise ValueError(f"Not a valid AST node: {node_dict!r}")
+
+    node_class = NODE_CLASSES[NODE_KINDS_BY_NAME[node_dict["type"]]]
+    field_names = {node_field.name for node_field in fields(node_class)}
+    actual_names = node_dict.keys() - {"type"}
+
+    if not field_names - {"offset"} <= actual_names <= field_names:
+        raise ValueError(f"AST node '{node_dict['type']}' has unexpected keys {sorted(actual_names)}")
+
+    return node_class(**{name: __value_from_dict(node_dict[name]) for name in actual_names})
+
+
+def write_json(node: Node, stream: TextIO, chunk_size: int = 4096, offsets: bool = True):
+    """
+    Write the dict form of the AST node and all of its children to a text stream, as compact JSON.
+    If `offsets` is False, the offsets of the nodes are left out (as if they had been parsed without positions).
+
+    The output is the same as `json.dumps(to_dict(node), separators=(",", ":"))`, but it is written as it is
+    generated (in chunks of about `chunk_size` pieces), so neither the dict form nor the whole JSON text is ever
+    held in memory. The nodes are walked without recursion, so the depth of nesting is limited only by memory.
+    """
+
+    chunk = []
+
+    for piece in iter_json(node, offsets):
+        chunk.append(piece)
+
+        if len(chunk) >= chunk_size:
+            stream.write("".join(chunk))
+            chunk.clear()
+
+    stream.write("".join(chunk))
+
+
+def iter_json(node: Node, offsets: bool = True) -> Iterator[str]:
+    """Yield the compact JSON text of the dict form of the AST node and all of its children, a piece at a time."""
+
+    # Pending pieces are either JSON text or nodes still to be expanded, in reverse order
+    pending: list[str | Node] = [node]
+
+    while pending:
+        item = pending.pop()
+
+        if isinstance(item, str):
+            yield item
+            continue
+
+        text = f'{{"type":"{NODE_NAMES[item.kind]}"'
+        pieces = []
+
+        for name in item.__match_args__:
+            value = getattr(item, name)
+            text += f',"{name}":'
+
+            if isinstance(value, Node):
+                pieces.append(text)
+                pieces.append(value)
+                text = ""
+            elif isinstance(value, list):
+                if not value:
+                    text += "[]"
+                    continue
+
+                pieces.append(text + "[")
+
+                for index, child in enumerate(value):
+                    if index:
+                        pieces.append(",")
+                    pieces.append(child)
+
+                text = "]"
+            else:
+                text += __json_value(value)
+
+        if offsets and item.offset is not None:
+            text += f',"offset":{item.offset}'
+
+        pieces.append(text + "}")
+        pending.extend(reversed(pieces))
+
+
+def __json_value(value: Any) -> str:
+    """Return the JSON text of a node field's value which is not a node."""
+
+    if value is None:
+        return "null"
+
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+
+    if isinstance(value, bool):
+        return "true" if value else "false"
+
+    return repr(value)
+
+
+def set_offset(node: Node, offset: int):
+    """Record the source offset of the node."""
+
+    node.offset = offset
+
+
+def walk(node: Node) -> Iterator[Node]:
+    """Yield the AST node and all of the nodes beneath it, parents before their children."""
+
+    pending = [node]
+
+    while pending:
+        node = pending.pop()
+
+        yield node
+
+        children = []
+
+        for node_field in fields(node):
+            value = getattr(node, node_field.name)
+
+            if isinstance(value, Node):
+                children.append(value)
+            elif isinstance(value, list):
+                children.extend(value)
+
+        pending.extend(reversed(children))
+
+
+def __value_to_dict(value: Any) -> Any:
+    """Return the dict form of a node field's value."""
+
+    if isinstance(value, Node):
+        return to_dict(value)
+
+    if isinstance(value, list):
+        return [to_dict(item) for item in value]
+
+    return value
+
+
+def __value_from_dict(value: Any) -> Any:
+    """Return a node field's value from its dict form."""
+
+    if isinstance(value, dict):
+        return from_dict(value)
+
+    if isinstance(value, list):
+        return [from_dict(item) for item in value]
+
+    return value
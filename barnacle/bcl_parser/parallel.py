@@ -0,0 +1,109 @@
+"""
+Implements parallel parsing of large sources across a pool of processes.
+"""
+
+import logging
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from . import nodes
+from . import parser as prs
+
+# Each worker process is given several chunks, so that one slow chunk does not hold up the others
+CHUNKS_PER_WORKER = 4
+
+# Sources smaller than this are parsed serially, as starting the worker processes would cost more than it saves
+MIN_PARALLEL_SIZE = 256 * 1024
+
+# The pre-scan only needs to know where strings, comments and braces are, and where the top-level keywords are.
+# Strings and comments must be matched exactly as the token regexes match them, so that keywords and braces
+# inside them are skipped. An unterminated `/*` does not match, and is scanned past as code (like the Tokenizer).
+# Only keywords which always start a new statement are split points: e.g. `if` may follow `else`, and `while`
+# may end a `do` loop.
+SPLIT_REGEX = (
+    r'"[^"]*"|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//.*|(?P<brace>[{}])|(?P<keyword>\b(?:let|print|func|return|do)\b)'
+)
+
+SPLIT_PATTERN = re.compile(SPLIT_REGEX)
+SPLIT_PATTERN_BYTES = re.compile(SPLIT_REGEX.encode("utf-8"))
+
+
+def find_split_points(source: str | bytes | mmap.mmap, chunk_count: int) -> list[int]:
+    """
+    Return up to `chunk_count - 1` offsets at which the source can be split into independently parseable chunks.
+
+    A split point is the start of a top-level statement (outside of any braces), found by a cheap pre-scan of the
+    source rather than by tokenizing it. The split points are spread so that the chunks are roughly the same size.
+    """
+
+    pattern = SPLIT_PATTERN if isinstance(source, str) else SPLIT_PATTERN_BYTES
+    open_brace = "{" if isinstance(source, str) else b"{"
+
+    split_points = []
+    target = len(source) // chunk_count
+    depth = 0
+
+    for match in pattern.finditer(source):
+        if match.lastgroup == "brace":
+            depth += 1 if match.group() == open_brace else -1
+        elif match.lastgroup == "keyword" and depth == 0 and match.start() >= target and match.start() > 0:
+            split_points.append(match.start())
+
+            if len(split_points) == chunk_count - 1:
+                break
+
+            target = len(source) * (len(split_points) + 1) // chunk_count
+
+    return split_points
+
+
+def parse_parallel(
+    source: str | bytes | mmap.mmap, workers: int | None = None, positions: bool = False
+) -> nodes.Program:
+    """
+    Parse the source across a pool of `workers` processes (by default, one per CPU) and return the AST.
+
+    The source is split at top-level statement boundaries, and each chunk is tokenized and parsed by a worker.
+    The statements of the chunks are then joined back together in order, so the AST is identical to the one
+    produced by `Parser(source, positions).parse()`, including the statement offsets when `positions` is True.
+
+    If parsing fails, the source is re-parsed serially so that the SyntaxError raised is the same as the Parser's.
+    """
+
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(source) < MIN_PARALLEL_SIZE:
+        return prs.Parser(source, positions=positions).parse()
+
+    bounds = [0, *find_split_points(source, workers * CHUNKS_PER_WORKER), len(source)]
+    chunks = [source[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    logging.debug("Parsing %d chunks across %d worker processes", len(chunks), workers)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            bodies = list(executor.map(__parse_chunk, chunks, bounds, repeat(positions)))
+    except SyntaxError:
+        logging.debug("Parallel parsing failed, re-parsing serially to report the error")
+        return prs.Parser(source, positions=positions).parse()
+
+    return nodes.Program(
+        body=[statement for body in bodies for statement in body],
+    )
+
+
+def __parse_chunk(chunk: str | bytes, base_offset: int, positions: bool) -> list[nodes.Node]:
+    """Parse one chunk of the source in a worker process, and return its top-level statements."""
+
+    program = prs.Parser(chunk, positions=positions).parse()
+
+    if positions and base_offset:
+        # Shift the offsets of every statement, which are relative to the start of the chunk
+        for node in nodes.walk(program):
+            if node.offset is not None:
+                node.offset += base_offset
+
+    return program.body
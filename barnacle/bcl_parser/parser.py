@@ -2,9 +2,54 @@
 Implements the Parser class.
 """
 
-from typing import Callable, List
+import io
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Iterator
 
+from bcl_tokenizer import stream as tks
 from bcl_tokenizer import tokenizer as tkn
+from bcl_tokenizer.edits import TextEdit
+from bcl_tokenizer.tokens import TOKEN_NAMES, TokenType
+
+from . import incremental, nodes
+
+BINDING_POWERS = {
+    # Key-value pairs represent a binary operator token and how tightly it binds its operands
+    # Operators which bind more tightly are calculated first, e.g. `1 + 2 * 3` is calculated as `1 + (2 * 3)`.
+    # Tokens which are not binary operators have a binding power of 0, which ends an expression.
+    # ==================== Low precedence ====================
+    TokenType.PLUS: 10,
+    TokenType.MINUS: 10,
+    TokenType.EQUAL: 10,
+    TokenType.NOT_EQUAL: 10,
+    # ==================== Medium precedence ====================
+    TokenType.MULTIPLY: 20,
+    TokenType.DIVIDE: 20,
+    TokenType.LESS: 20,
+    TokenType.LESS_EQUAL: 20,
+    TokenType.MORE: 20,
+    TokenType.MORE_EQUAL: 20,
+}
+
+
+@dataclass(slots=True)
+class BlockFrame:
+    """
+    A code block which is being parsed, on the Parser's explicit stack of open code blocks.
+
+    `closing_token` is the token which ends the block, `kind` is the token which started the statement the block
+    belongs to (or `ELSE` for the final block of a conditional), and `offset` is where that statement starts.
+    `header` holds whatever was parsed before the block (e.g. the expression of a `while` loop), which is needed
+    to build the statement's node once the block ends.
+    """
+
+    closing_token: TokenType
+    kind: TokenType | None = None
+    offset: int | None = None
+    header: Any = None
+    statements: list = field(default_factory=list)
 
 
 class Parser:
@@ -12,78 +57,344 @@ class Parser:
     The Barnacle Parser.
 
     Performs syntactic analysis of the tokenized source code to produce an Abstract Syntax Tree (AST).
-    The AST can then be interpreted by the Barnacle Interpreter class.
+    The AST is made of the node classes in `bcl_parser.nodes`, and can then be interpreted by the Barnacle
+    Interpreter class.
     """
 
-    def __init__(self, source):
-        self.source = source
-        self.tokenizer = tkn.Tokenizer(source)
+    def __init__(self, source, positions: bool = False, builder=nodes, lazy_functions: bool = False):
+        """
+        If `positions` is True, every statement node records the source offset it starts at in its `offset` field.
+        The offset can be turned into a line and column with `tokenizer.line_index`.
+
+        The source may also be a Tokenizer which has already tokenized it, whose tokens are then parsed rather than
+        tokenized again. The source may also be a text stream (e.g. `sys.stdin`), which is tokenized as it is parsed
+        rather than read up front. Parsing it with `statements()` then reads no further ahead than the statement
+        being parsed.
+
+        If `lazy_functions` is True, the code blocks of functions are only brace-matched rather than parsed, and are
+        left as `unparsed_code_block` nodes until they are parsed with `parse_code_block()` (e.g. when the function
+        is first called). Syntax errors within them are only found then. This needs all of the tokens of the source,
+        so cannot be used with a text stream.
+
+        The nodes are built by calling the node class names on `builder`, which by default is the `bcl_parser.nodes`
+        module. A `bcl_parser.table.NodeTable` may be given instead, to emit the AST as rows of a flat node table.
+        """
+
+        self.positions = positions
+        self.lazy_functions = lazy_functions
+        self.__nodes = builder
+
+        if isinstance(source, (tkn.Tokenizer, tks.StreamTokenizer)):
+            self.__use_tokenizer(source)
+        elif isinstance(source, io.TextIOBase):
+            self.__use_tokenizer(tks.StreamTokenizer(source))
+        else:
+            self.__use_tokenizer(tkn.Tokenizer(source))
 
-        self.token_lookahead = self.tokenizer.next_token()
+        if lazy_functions and isinstance(self.tokenizer, tks.StreamTokenizer):
+            raise ValueError("Function bodies cannot be parsed lazily from a text stream")
 
-    def parse(self) -> dict:
+        # The branches of multi-branch nodes, keyed by the lookahead token which selects them
+        self.__statement_branches = {
+            TokenType.PRINT: self.__node_print,
+            TokenType.LET: self.__node_var_declaration,
+            TokenType.IDENTIFIER: self.__ambiguous_node_var_assignment_or_func_call,
+            TokenType.RETURN: self.__node_return,
+        }
+
+        self.__value_branches = {
+            TokenType.STRING: self.__node_string_literal,
+            TokenType.NUMBER: self.__node_numeric_literal,
+            TokenType.BOOLEAN: self.__node_boolean_literal,
+        }
+
+        # Statements with a code block are opened by the token they start with,
+        # and closed by the kind of the block frame once their code block ends
+        self.__block_openers = {
+            TokenType.LEFT_BRACE: self.__open_plain_code_block,
+            TokenType.WHILE: self.__open_while_loop,
+            TokenType.DO: self.__open_do_while_loop,
+            TokenType.IF: self.__open_conditional,
+            TokenType.FUNC: self.__open_func_declaration,
+        }
+
+        self.__block_closers = {
+            TokenType.LEFT_BRACE: self.__close_plain_code_block,
+            TokenType.WHILE: self.__close_while_loop,
+            TokenType.DO: self.__close_do_while_loop,
+            TokenType.IF: self.__close_conditional,
+            TokenType.ELSE: self.__close_else,
+            TokenType.FUNC: self.__close_func_declaration,
+        }
+
+    def parse(self) -> nodes.Program:
         """
-        Parse the source and return the AST.
+        Parse the source and return the AST (or the node table, if the Parser was given one as its builder).
 
         If parsing fails at any point, a SyntaxError will be raised.
         """
 
         return self.__node_program()
 
-    def __consume_token(self, expected_token: str) -> dict:
+    def statements(self) -> Iterator[nodes.Node]:
+        """
+        Parse the source a top-level statement at a time, yielding each statement as soon as it has been parsed.
+
+        A statement is complete once the token after it has been read, so a text stream is only read as far as the
+        start of the next statement before the statement is yielded. The Parser keeps nothing of the statements
+        it has already yielded.
+
+        If parsing fails at any point, a SyntaxError will be raised.
+        """
+
+        return self.__node_statements(TokenType.PROGRAM_END)
+
+    def reparse(self, ast: nodes.Program, edit: TextEdit) -> nodes.Program:
+        """
+        Re-parse the source after an edit, given the AST of the source before the edit (as returned by `parse()`
+        or an earlier `reparse()`). The AST is updated in place to match the edited source, and returned.
+
+        Only the statements around the edit, in the innermost code block which encloses it, are parsed again.
+        Every other node is re-used as it is, so the parts of the AST which the edit did not touch keep their
+        identity; the offsets of the statements after the edit are shifted by the change in length. If the
+        re-parsed statements no longer end where they used to (e.g. the edit added a `}`), the statement enclosing
+        them is re-parsed instead, and so on out to the whole program.
+
+        The Parser must have been given a source string, record positions and build the node classes. It is left
+        parsing the edited source. If parsing fails at any point, a SyntaxError will be raised.
+        """
+
+        if not self.positions or self.__nodes is not nodes or not isinstance(self.tokenizer, tkn.Tokenizer):
+            raise ValueError("Only an AST with positions, parsed from a source string, can be re-parsed")
+
+        previous = self.tokenizer
+        self.__use_tokenizer(previous.edited(edit))
+        damage = incremental.Damage.of_edit(previous, self.tokenizer, edit)
+
+        levels = incremental.enclosing_levels(ast, damage)
+
+        # The innermost statement list is re-parsed first, and each enclosing one if that fails
+        for depth in range(len(levels) - 1, -1, -1):
+            body, end = levels[depth]
+            reparsed = self.__reparse_statements(body, end, damage)
+
+            if reparsed is None:
+                continue
+
+            first, last, statements = reparsed
+            logging.debug("Parser re-parsed %d statements at depth %d", len(statements), depth)
+
+            # The nodes after the edit are shifted before the re-parsed statements, whose offsets are right, are put in
+            incremental.shift_statements(ast, damage)
+
+            body[first:last] = statements
+            return ast
+
+        logging.debug("Parser re-parsed the whole program")
+
+        self.token_index = 0
+        self.token_lookahead = self.__token_kinds[0]
+        ast.body = self.parse().body
+
+        return ast
+
+    def parse_code_block(self, code_block: nodes.UnparsedCodeBlock) -> nodes.CodeBlock:
         """
-        Consumes the next token in the stream.
+        Parse the code block of a function, which was skipped because the Parser parses function bodies lazily.
+
+        If parsing fails at any point, a SyntaxError will be raised.
+        """
+
+        self.token_index = code_block.first_token
+        self.token_lookahead = self.__token_kinds[self.token_index]
+
+        self.__consume_token(TokenType.LEFT_BRACE)
+        body = list(self.__node_statements(TokenType.RIGHT_BRACE))
+        self.__consume_token(TokenType.RIGHT_BRACE)
+
+        return self.__nodes.CodeBlock(
+            body=body,
+        )
+
+    def __node_statements(self, closing_token: TokenType, stop_index: int | None = None) -> Iterator[nodes.Node]:
+        """
+        Yields each statement up to the closing token (which is not consumed), as soon as it has been parsed.
+        If a `stop_index` is given, it also stops after the first statement which ends at or past that token.
+
+        Statements which contain a code block (code blocks themselves, loops, conditionals and function declarations)
+        are not parsed by recursion. Instead, each code block being parsed is a `BlockFrame` on an explicit stack,
+        so the depth of nesting is limited only by memory.
+        """
+
+        outermost = BlockFrame(closing_token)
+        frames = [outermost]
+
+        while True:
+            if outermost.statements:
+                yield outermost.statements.pop()
+
+                if stop_index is not None and self.token_index >= stop_index:
+                    return
+
+            frame = frames[-1]
+
+            if self.token_lookahead != frame.closing_token:
+                offset = self.tokenizer.starts[self.token_index]
+
+                if self.token_lookahead in self.__block_openers:
+                    opened = self.__block_openers[self.token_lookahead](offset)
+
+                    # A function whose body is skipped, to be parsed lazily, is complete straight away
+                    if isinstance(opened, BlockFrame):
+                        frames.append(opened)
+                    else:
+                        self.__add_statement(frame, opened, offset)
+                    continue
+
+                self.__add_statement(frame, self.__node_statement(), offset)
+                continue
+
+            if frame is outermost:
+                return
+
+            self.__consume_token(TokenType.RIGHT_BRACE)
+            frames.pop()
+
+            code_block = self.__nodes.CodeBlock(
+                body=frame.statements,
+            )
+
+            # Closing the code block may complete its statement, or open the next code block of a conditional
+            statement = self.__block_closers[frame.kind](frame, code_block)
+
+            if isinstance(statement, BlockFrame):
+                frames.append(statement)
+            else:
+                self.__add_statement(frames[-1], statement, frame.offset)
+
+    def __use_tokenizer(self, tokenizer: "tkn.Tokenizer | tks.StreamTokenizer"):
+        """Starts parsing the tokens of the given tokenizer, from the first one."""
+
+        self.tokenizer = tokenizer
+        self.source = tokenizer.source
+
+        # The parser reads the tokenizer's compact columns directly: the lookahead is a `TokenType`,
+        # and token text is only sliced from the source for the tokens whose value is needed.
+        self.__token_kinds = tokenizer.kinds
+        self.token_index = 0
+        self.token_lookahead = self.__token_kinds[0]
+
+        # The token kinds as bytes, for skipping unparsed code blocks quickly
+        self.__token_bytes = None
+
+    def __reparse_statements(self, body: list, end: int, damage: incremental.Damage) -> tuple[int, int, list] | None:
+        """
+        Re-parses the statements of a statement list which the damaged tokens may have changed, and returns the
+        range of the list they replace with the newly parsed statements. The statement before the damage is always
+        re-parsed, as text added after a statement may extend it.
+
+        If the re-parsed statements do not end exactly where the first untouched statement after them (or the end of
+        the list) now starts, or do not parse, None is returned.
+        """
+
+        previous = damage.previous
+        first = max(bisect_left(body, previous.starts[damage.start], key=incremental.statement_offset) - 1, 0)
+        last = max(bisect_left(body, previous.starts[damage.end], key=incremental.statement_offset), first)
+
+        # An empty statement list has no tokens, so it starts where it ends
+        first_token = bisect_left(previous.starts, body[first].offset) if body else end
+        stop_token = bisect_left(previous.starts, body[last].offset) if last < len(body) else end
+
+        # The token the re-parsed statements must stop at, in the edited source
+        stop_offset = previous.starts[stop_token] + damage.shift
+        stop_index = bisect_left(self.tokenizer.starts, stop_offset)
+
+        if (
+            stop_index == len(self.tokenizer)
+            or self.tokenizer.starts[stop_index] != stop_offset
+            or self.__token_kinds[stop_index] != previous.kinds[stop_token]
+        ):
+            return None
+
+        self.token_index = first_token
+        self.token_lookahead = self.__token_kinds[first_token]
+
+        statements = []
+
+        try:
+            if first_token != stop_index:
+                statements.extend(self.__node_statements(previous.kinds[end], stop_index))
+        except SyntaxError:
+            return None
+
+        if self.token_index != stop_index:
+            return None
+
+        return first, last, statements
+
+    def __consume_token(self, expected_token: TokenType) -> int:
+        """
+        Consumes the next token in the stream and returns its index in the token stream.
         If the token type does not match the provided token_type, an exception is raised.
         """
 
-        if self.token_lookahead["type"] != expected_token:
-            actual_token_type = self.token_lookahead["type"]
-            raise SyntaxError(f"Unexpected token (expected '{expected_token}', got '{actual_token_type}')")
+        if self.token_lookahead != expected_token:
+            expected_token_type = TOKEN_NAMES[expected_token]
+            actual_token_type = TOKEN_NAMES[self.token_lookahead]
+            raise self.__syntax_error(f"Unexpected token (expected '{expected_token_type}', got '{actual_token_type}')")
+
+        token_index = self.token_index
+        self.token_index += 1
+        self.token_lookahead = self.__token_kinds[self.token_index]
+        return token_index
 
-        token = self.token_lookahead
-        self.token_lookahead = self.tokenizer.next_token()
-        return token
+    def __consume_token_text(self, expected_token: TokenType) -> str:
+        """Consumes the next token in the stream like `__consume_token`, and returns its source text."""
 
-    def __node_program(self) -> dict:
+        return self.tokenizer.text(self.__consume_token(expected_token))
+
+    def __syntax_error(self, message: str) -> SyntaxError:
+        """Returns a SyntaxError with the given message, and the position of the lookahead token."""
+
+        line, column = self.tokenizer.position(self.token_index)
+
+        return SyntaxError(f"{message} (line {line}, column {column})")
+
+    def __node_program(self) -> nodes.Program:
         """
         Program node: Represents a Barnacle program.
 
         A program node consists of zero or more `statement` nodes.
         """
 
-        statements = []
+        return self.__nodes.Program(
+            body=list(self.statements()),
+        )
 
-        while self.token_lookahead["type"] != "PROGRAM_END":
-            statements.append(self.__node_statement())
+    def __add_statement(self, frame: "BlockFrame", statement: nodes.Node, offset: int):
+        """Adds a parsed statement to the code block being parsed, recording its offset if positions are wanted."""
 
-        return {
-            "type": "program",
-            "body": statements,
-        }
+        if self.positions:
+            self.__nodes.set_offset(statement, offset)
 
-    def __node_code_block(self) -> dict:
+        frame.statements.append(statement)
+
+    def __open_code_block(self, kind: TokenType, offset: int | None, header=None) -> "BlockFrame":
         """
         Code Block node: Represents a block of code.
 
         A code block node consists of zero or more `statement` nodes,
         surrounded by `{` and `}` tokens.
-        """
-
-        self.__consume_token("{")
-
-        statements = []
 
-        while self.token_lookahead["type"] != "}":
-            statements.append(self.__node_statement())
+        This consumes the `{` token and returns the frame which collects the statements of the code block.
+        The node is built once the matching `}` token is reached, by the closer for the frame's `kind`.
+        """
 
-        self.__consume_token("}")
+        self.__consume_token(TokenType.LEFT_BRACE)
 
-        return {
-            "type": "code_block",
-            "body": statements,
-        }
+        return BlockFrame(TokenType.RIGHT_BRACE, kind, offset, header)
 
-    def __node_statement(self) -> dict:
+    def __node_statement(self) -> nodes.Node:
         """
         Statement node: Represents a single executable statement.
 
@@ -98,41 +409,45 @@ class Parser:
         -   a `do_while` node
         -   a `return` node
         -   a `func_call` node
+
+        Only the statements without a code block are parsed here, the others are opened by `__node_program`.
         """
 
-        branches = {
-            "PRINT": self.__node_print,
-            "LET": self.__node_var_declaration,
-            "FUNC": self.__node_func_declaration,
-            "IF": self.__node_conditional,
-            "IDENTIFIER": self.__ambiguous_node_var_assignment_or_func_call,
-            "{": self.__node_code_block,
-            "WHILE": self.__node_while_loop,
-            "DO": self.__node_do_while_loop,
-            "RETURN": self.__node_return,
-        }
+        return self.__construct_multibranch_node("statement", self.__statement_branches)
+
+    def __open_plain_code_block(self, offset: int) -> "BlockFrame":
+        """Opens a `code_block` statement."""
+
+        return self.__open_code_block(TokenType.LEFT_BRACE, offset)
 
-        return self.__construct_multibranch_node("statement", branches)
+    def __close_plain_code_block(self, _: "BlockFrame", code_block: nodes.CodeBlock) -> nodes.CodeBlock:
+        """Completes a `code_block` statement."""
 
-    def __node_do_while_loop(self) -> dict:
+        return code_block
+
+    def __open_do_while_loop(self, offset: int) -> "BlockFrame":
         """
         Do While loop node: Represents a 'do-while' loop.
 
         A do-while loop consists of the 'DO' token, a code block, a 'WHILE' token and an expression.
         """
 
-        self.__consume_token("DO")
-        body = self.__node_code_block()
-        self.__consume_token("WHILE")
+        self.__consume_token(TokenType.DO)
+
+        return self.__open_code_block(TokenType.DO, offset)
+
+    def __close_do_while_loop(self, _: "BlockFrame", code_block: nodes.CodeBlock) -> nodes.DoWhileLoop:
+        """Completes a `do_while` node once its code block has been parsed."""
+
+        self.__consume_token(TokenType.WHILE)
         expression = self.__node_expression()
 
-        return {
-            "type": "do_while",
-            "expression": expression,
-            "body": body,
-        }
+        return self.__nodes.DoWhileLoop(
+            expression=expression,
+            body=code_block,
+        )
 
-    def __ambiguous_node_var_assignment_or_func_call(self) -> dict:
+    def __ambiguous_node_var_assignment_or_func_call(self) -> nodes.Node:
         """
         An ambiguous node which is either a variable assignment or a function call.
         Both nodes begin with an `IDENTIFIER` token.
@@ -140,12 +455,12 @@ class Parser:
 
         identifier = self.__node_identifier()
 
-        if self.token_lookahead["type"] == "=":
+        if self.token_lookahead == TokenType.ASSIGN:
             return self.__node_var_assignment(identifier)
 
         return self.__node_func_call(identifier)
 
-    def __node_func_call(self, identifier: dict | None = None) -> dict:
+    def __node_func_call(self, identifier: nodes.Identifier | None = None) -> nodes.FuncCall:
         """
         Represents a function call.
 
@@ -157,25 +472,24 @@ class Parser:
         if identifier is None:
             identifier = self.__node_identifier()
 
-        self.__consume_token("(")
+        self.__consume_token(TokenType.LEFT_PARENTHESIS)
 
         parameters = []
-        if self.token_lookahead["type"] != ")":
+        if self.token_lookahead != TokenType.RIGHT_PARENTHESIS:
             parameters.append(self.__node_expression())
 
-            while self.token_lookahead["type"] == ",":
-                self.__consume_token(",")
+            while self.token_lookahead == TokenType.COMMA:
+                self.__consume_token(TokenType.COMMA)
                 parameters.append(self.__node_expression())
 
-        self.__consume_token(")")
+        self.__consume_token(TokenType.RIGHT_PARENTHESIS)
 
-        return {
-            "type": "func_call",
-            "identifier": identifier,
-            "parameters": parameters,
-        }
+        return self.__nodes.FuncCall(
+            identifier=identifier,
+            parameters=parameters,
+        )
 
-    def __node_return(self) -> dict:
+    def __node_return(self) -> nodes.Return:
         """
         Return node: Represents a 'return' statement within a function code block.
 
@@ -183,105 +497,102 @@ class Parser:
         where `RETURN` is a RETURN token, and `expression` is an expression node.
         """
 
-        self.__consume_token("RETURN")
+        self.__consume_token(TokenType.RETURN)
         expression = self.__node_expression()
 
-        return {
-            "type": "return",
-            "body": expression,
-        }
+        return self.__nodes.Return(
+            body=expression,
+        )
 
-    def __node_while_loop(self) -> dict:
+    def __open_while_loop(self, offset: int) -> "BlockFrame":
         """
         While loop node: Represents a 'while' loop.
 
         A while loop consists of the 'WHILE' token, an expression, and a code block.
         """
 
-        self.__consume_token("WHILE")
+        self.__consume_token(TokenType.WHILE)
         expression = self.__node_expression()
-        body = self.__node_code_block()
 
-        return {
-            "type": "while",
-            "expression": expression,
-            "body": body,
-        }
+        return self.__open_code_block(TokenType.WHILE, offset, expression)
 
-    def __node_print(self) -> dict:
+    def __close_while_loop(self, frame: "BlockFrame", code_block: nodes.CodeBlock) -> nodes.WhileLoop:
+        """Completes a `while` node once its code block has been parsed."""
+
+        return self.__nodes.WhileLoop(
+            expression=frame.header,
+            body=code_block,
+        )
+
+    def __node_print(self) -> nodes.Print:
         """
         Print node: Represents a basic print statement.
 
         A print statement consists of the token `PRINT` and an `expression` node.
         """
 
-        self.__consume_token("PRINT")
+        self.__consume_token(TokenType.PRINT)
         body = self.__node_expression()
 
-        return {
-            "type": "print",
-            "body": body,
-        }
+        return self.__nodes.Print(
+            body=body,
+        )
 
-    def __node_string_literal(self) -> dict:
+    def __node_string_literal(self) -> nodes.StringLiteral:
         """
         String literal node: Represents a string literal.
 
         A string literal consists of the token `STRING`.
         """
 
-        string = self.__consume_token("STRING")["value"]
+        string = self.__consume_token_text(TokenType.STRING)
 
-        return {
-            "type": "string_literal",
-            "value": string[1:-1],  # Strip start and end quote characters
-        }
+        return self.__nodes.StringLiteral(
+            value=string[1:-1],  # Strip start and end quote characters
+        )
 
-    def __node_numeric_literal(self) -> dict:
+    def __node_numeric_literal(self) -> nodes.NumericLiteral:
         """
         Numeric literal node: Represents a numeric literal.
 
         A numeric literal consists of the token `NUMBER`.
         """
 
-        number_str = self.__consume_token("NUMBER")["value"]
+        number_str = self.__consume_token_text(TokenType.NUMBER)
         number = float(number_str) if "." in number_str else int(number_str)
 
-        return {
-            "type": "numeric_literal",
-            "value": number,
-        }
+        return self.__nodes.NumericLiteral(
+            value=number,
+        )
 
-    def __node_boolean_literal(self) -> dict:
+    def __node_boolean_literal(self) -> nodes.BooleanLiteral:
         """
         Boolean literal node: Represents a boolean literal.
 
         A boolean literal consists of the token `BOOLEAN`.
         """
 
-        bool_str = self.__consume_token("BOOLEAN")["value"]
+        bool_str = self.__consume_token_text(TokenType.BOOLEAN)
         bool_val = bool_str == "true"
 
-        return {
-            "type": "boolean_literal",
-            "value": bool_val,
-        }
+        return self.__nodes.BooleanLiteral(
+            value=bool_val,
+        )
 
-    def __node_identifier(self) -> dict:
+    def __node_identifier(self) -> nodes.Identifier:
         """
         Identifier node: Represents an identifier (e.g. a function name or a variable name).
 
         An identifier consists of the token stream `IDENTIFIER`.
         """
 
-        identifier = self.__consume_token("IDENTIFIER")["value"]
+        identifier = self.__consume_token_text(TokenType.IDENTIFIER)
 
-        return {
-            "type": "identifier",
-            "name": identifier,
-        }
+        return self.__nodes.Identifier(
+            name=identifier,
+        )
 
-    def __node_var_declaration(self) -> dict:
+    def __node_var_declaration(self) -> nodes.VarDeclaration:
         """
         Variable Declaration node: Represents a variable declaration and assignment.
 
@@ -289,18 +600,17 @@ class Parser:
         where `LET` and `=` are tokens, and `identifier` and `expression` are nodes.
         """
 
-        self.__consume_token("LET")
+        self.__consume_token(TokenType.LET)
         identifier = self.__node_identifier()
-        self.__consume_token("=")
+        self.__consume_token(TokenType.ASSIGN)
         expression = self.__node_expression()
 
-        return {
-            "type": "var_declaration",
-            "identifier": identifier,
-            "value": expression,
-        }
+        return self.__nodes.VarDeclaration(
+            identifier=identifier,
+            value=expression,
+        )
 
-    def __node_var_assignment(self, identifier: dict | None = None) -> dict:
+    def __node_var_assignment(self, identifier: nodes.Identifier | None = None) -> nodes.VarAssignment:
         """
         Variable Assignment node: Represents a variable assignment.
 
@@ -311,104 +621,137 @@ class Parser:
         if identifier is None:
             identifier = self.__node_identifier()
 
-        self.__consume_token("=")
+        self.__consume_token(TokenType.ASSIGN)
         expression = self.__node_expression()
 
-        return {
-            "type": "var_assignment",
-            "identifier": identifier,
-            "value": expression,
-        }
+        return self.__nodes.VarAssignment(
+            identifier=identifier,
+            value=expression,
+        )
 
-    def __node_expression(self) -> dict:
-        """Expression node: Represents an expression whose value can be calculated."""
+    def __node_expression(self) -> nodes.Node:
+        """
+        Expression node: Represents an expression whose value can be calculated.
 
-        return self.__node_low_precedence_operator_expression()
+        Binary expressions are parsed by operator precedence, using the binding powers of the operators: before an
+        operator is pushed onto the operator stack, any operators on the stack which bind at least as tightly are
+        reduced to `binary_expression` nodes. Operators of equal binding power are therefore left-associative,
+        e.g. `1 - 2 + 3` is calculated as `(1 - 2) + 3`.
 
-    def __node_parenthesised_expression(self) -> dict:
-        """Represents an expression within parentheses."""
+        A chain of three or more operands joined by the same operator (e.g. `1 + 2 + 3`) is not nested, but reduced
+        to a single `nary_expression` node, whose operands are calculated from left to right.
 
-        self.__consume_token("(")
-        expression = self.__node_expression()
-        self.__consume_token(")")
+        Parentheses and the parameters of function calls open a new level on the operator stack instead of
+        recursing, so the depth of nesting is limited only by memory.
+        """
 
-        return expression
+        binding_powers = BINDING_POWERS
+        value_branches = self.__value_branches
+        operands = []
 
-    def __node_primary_expression(self) -> dict:
-        """Represents the highest-possible precedence expression, either a value or a parenthesised expression."""
+        # Binary operators are `(binding_power, operator, operand count)`. An open parenthesis is `(0, None, 0)`, and
+        # an open function call is `(0, identifier, index of its first parameter in operands)`.
+        operators = []
 
-        if self.token_lookahead["type"] == "(":
-            return self.__node_parenthesised_expression()
+        while True:
+            # An operand is expected: open any levels before it, then parse it
+            if self.token_lookahead == TokenType.LEFT_PARENTHESIS:
+                self.__consume_token(TokenType.LEFT_PARENTHESIS)
+                operators.append((0, None, 0))
+                continue
 
-        return self.__node_value()
+            if (value_branch := value_branches.get(self.token_lookahead)) is not None:
+                operands.append(value_branch())
+            elif self.token_lookahead != TokenType.IDENTIFIER:
+                operands.append(self.__construct_multibranch_node("value", value_branches))
+            else:
+                identifier = self.__node_identifier()
 
-    def __node_value(self) -> dict:
-        """Represents a single value, either a literal or variable of indeterminate type."""
+                if self.token_lookahead != TokenType.LEFT_PARENTHESIS:
+                    operands.append(identifier)
+                else:
+                    self.__consume_token(TokenType.LEFT_PARENTHESIS)
 
-        branches = {
-            "STRING": self.__node_string_literal,
-            "NUMBER": self.__node_numeric_literal,
-            "BOOLEAN": self.__node_boolean_literal,
-            "IDENTIFIER": self.__ambiguous_node_identifier_or_func_call,
-        }
+                    if self.token_lookahead != TokenType.RIGHT_PARENTHESIS:
+                        operators.append((0, identifier, len(operands)))
+                        continue
 
-        return self.__construct_multibranch_node("value", branches)
+                    self.__consume_token(TokenType.RIGHT_PARENTHESIS)
+                    operands.append(self.__nodes.FuncCall(identifier=identifier, parameters=[]))
 
-    def __ambiguous_node_identifier_or_func_call(self) -> dict:
-        """
-        An ambiguous node which is either an identifier or a function call.
-        Both nodes begin with an `IDENTIFIER` token.
-        """
+            # An operator is expected, or the end of the current level
+            while True:
+                lookahead = self.token_lookahead
+                binding_power = binding_powers.get(lookahead, 0)
 
-        identifier = self.__node_identifier()
+                if binding_power:
+                    operator = TOKEN_NAMES[lookahead]
 
-        if self.token_lookahead["type"] == "(":
-            return self.__node_func_call(identifier)
+                    while operators and operators[-1][0] >= binding_power and operators[-1][1] != operator:
+                        self.__reduce_binary_expression(operands, operators)
 
-        return identifier
+                    # The same operator again extends its chain of operands, rather than nesting it
+                    if operators and operators[-1][1] == operator:
+                        operators[-1] = (binding_power, operator, operators[-1][2] + 1)
+                    else:
+                        operators.append((binding_power, operator, 2))
 
-    def __node_binary_expression(self, operator_tokens: List[str], sub_expression_parser: Callable) -> dict:
-        """
-        Represents a left-associative expression with the given operator tokens and a sub-expression parser.
+                    self.__consume_token(lookahead)
+                    break
 
-        Left-associative means e.g. `1 + 2 + 3` is calculated as `(1 + 2) + 3`.
-        """
+                while operators and operators[-1][0]:
+                    self.__reduce_binary_expression(operands, operators)
+
+                if not operators:
+                    return operands.pop()
 
-        this_expression = sub_expression_parser()
+                _, identifier, first_parameter = operators[-1]
 
-        while self.token_lookahead["type"] in operator_tokens:
-            operator = self.__consume_token(self.token_lookahead["type"])["value"]
+                if identifier is not None and self.token_lookahead == TokenType.COMMA:
+                    self.__consume_token(TokenType.COMMA)
+                    break
 
-            right_operand = sub_expression_parser()
+                self.__consume_token(TokenType.RIGHT_PARENTHESIS)
+                operators.pop()
 
-            this_expression = {
-                "type": "binary_expression",
-                "operator": operator,
-                "left": this_expression,
-                "right": right_operand,
-            }
+                if identifier is not None:
+                    parameters = operands[first_parameter:]
+                    del operands[first_parameter:]
 
-        return this_expression
+                    operands.append(self.__nodes.FuncCall(identifier=identifier, parameters=parameters))
 
-    def __node_low_precedence_operator_expression(self) -> dict:
-        """Represents an expression to be calculated containing low-precedence operators."""
+    def __reduce_binary_expression(self, operands: list, operators: list):
+        """
+        Replaces the top operator and its operands with the `binary_expression` node they make,
+        or the `nary_expression` node if the operator joins a chain of three or more operands.
+        """
 
-        operator_tokens = ["+", "-", "==", "!="]
-        return self.__node_binary_expression(operator_tokens, self.__node_medium_precedence_operator_expression)
+        _, operator, operand_count = operators.pop()
 
-    def __node_medium_precedence_operator_expression(self) -> dict:
-        """Represents an expression to be calculated containing medium-precedence operators."""
+        if operand_count > 2:
+            chain = operands[-operand_count:]
+            del operands[-operand_count:]
 
-        operator_tokens = ["*", "/", "<", "<=", ">", ">="]
-        return self.__node_binary_expression(operator_tokens, self.__node_high_precedence_operator_expression)
+            operands.append(
+                self.__nodes.NaryExpression(
+                    operator=operator,
+                    operands=chain,
+                )
+            )
+            return
 
-    def __node_high_precedence_operator_expression(self) -> dict:
-        """Represents an expression to be calculated containing high-precedence operators."""
+        right_operand = operands.pop()
+        left_operand = operands.pop()
 
-        operator_tokens = []
-        return self.__node_binary_expression(operator_tokens, self.__node_primary_expression)
+        operands.append(
+            self.__nodes.BinaryExpression(
+                operator=operator,
+                left=left_operand,
+                right=right_operand,
+            )
+        )
 
-    def __construct_multibranch_node(self, node_name: str, branches: dict) -> dict:
+    def __construct_multibranch_node(self, node_name: str, branches: dict) -> nodes.Node:
         """
         Constructs a multi-branch node.
 
@@ -422,14 +765,14 @@ class Parser:
         `branches` should be a dictionary where the keys are token types and the value is a node function.
         """
 
-        lookahead_type = self.token_lookahead["type"]
+        lookahead_type = self.token_lookahead
 
         if lookahead_type in branches:
             return branches[lookahead_type]()
 
-        raise SyntaxError(f"Unexpected token '{lookahead_type}' while parsing '{node_name}' node")
+        raise self.__syntax_error(f"Unexpected token '{TOKEN_NAMES[lookahead_type]}' while parsing '{node_name}' node")
 
-    def __node_conditional(self) -> dict:
+    def __open_conditional(self, offset: int) -> "BlockFrame":
         """
         Conditional node: Represents an 'if' statement followed by a code block, 0 or more 'else if' statements
         each followed by a code block, and optionally an 'else' statement followed by a code block.
@@ -437,30 +780,60 @@ class Parser:
         A conditional node consists of at least the `IF` token, an `expression` node, and a `code_block` node.
         It may be immediately followed by an `ELSE` token, which in turn will be immediately followed by either
         another `conditional` node, or a `code_block` node.
-        """
 
-        self.__consume_token("IF")
+        The `if` and `else if` branches of the chain are collected in the frame's header as they are parsed,
+        and the nested `conditional` nodes are only built once the whole chain has been parsed.
+        """
 
+        self.__consume_token(TokenType.IF)
         expression = self.__node_expression()
-        on_true_block = self.__node_code_block()
 
-        on_false_block = None
-        if self.token_lookahead["type"] == "ELSE":
-            self.__consume_token("ELSE")
+        return self.__open_code_block(TokenType.IF, offset, [expression])
 
-            if self.token_lookahead["type"] == "IF":
-                on_false_block = self.__node_conditional()
-            else:
-                on_false_block = self.__node_code_block()
+    def __close_conditional(self, frame: "BlockFrame", code_block: nodes.CodeBlock) -> "nodes.Conditional | BlockFrame":
+        """
+        Completes a branch of a conditional once its code block has been parsed.
 
-        return {
-            "type": "conditional",
-            "expression": expression,
-            "on_true": on_true_block,
-            "on_false": on_false_block,
-        }
+        If an `else if` or `else` follows, the frame for its code block is returned to carry on the chain.
+        """
 
-    def __node_func_declaration(self) -> dict:
+        branches = frame.header
+        branches.append(code_block)
+
+        if self.token_lookahead != TokenType.ELSE:
+            return self.__fold_conditional(branches, None)
+
+        self.__consume_token(TokenType.ELSE)
+
+        if self.token_lookahead != TokenType.IF:
+            return self.__open_code_block(TokenType.ELSE, frame.offset, branches)
+
+        self.__consume_token(TokenType.IF)
+        branches.append(self.__node_expression())
+
+        return self.__open_code_block(TokenType.IF, frame.offset, branches)
+
+    def __close_else(self, frame: "BlockFrame", code_block: nodes.CodeBlock) -> nodes.Conditional:
+        """Completes a conditional once the code block of its final `else` has been parsed."""
+
+        return self.__fold_conditional(frame.header, code_block)
+
+    def __fold_conditional(self, branches: list, on_false: nodes.CodeBlock | None) -> nodes.Conditional:
+        """
+        Builds the `conditional` node for a chain of alternating expressions and code blocks,
+        where each `else if` is a `conditional` node in the `on_false` of the one before it.
+        """
+
+        for index in range(len(branches) - 2, -1, -2):
+            on_false = self.__nodes.Conditional(
+                expression=branches[index],
+                on_true=branches[index + 1],
+                on_false=on_false,
+            )
+
+        return on_false
+
+    def __open_func_declaration(self, offset: int) -> "BlockFrame":
         """
         Function Declaration node: Represents a function declaration.
 
@@ -468,29 +841,90 @@ class Parser:
         where `FUNC`, `(` and `)` are tokens,
         and `identifier` and `code_block` are nodes,
         and `...` consists of 0 or more `identifier` nodes separated by `,` tokens.
+
+        If function bodies are parsed lazily, the code block is skipped and the node is returned straight away,
+        with an `unparsed_code_block` node in place of the code block.
         """
 
-        self.__consume_token("FUNC")
+        self.__consume_token(TokenType.FUNC)
 
         identifier = self.__node_identifier()
 
-        self.__consume_token("(")
+        self.__consume_token(TokenType.LEFT_PARENTHESIS)
 
         parameters = []
-        if self.token_lookahead["type"] == "IDENTIFIER":
+        if self.token_lookahead == TokenType.IDENTIFIER:
             parameters.append(self.__node_identifier())
 
-            while self.token_lookahead["type"] == ",":
-                self.__consume_token(",")
+            while self.token_lookahead == TokenType.COMMA:
+                self.__consume_token(TokenType.COMMA)
                 parameters.append(self.__node_identifier())
 
-        self.__consume_token(")")
+        self.__consume_token(TokenType.RIGHT_PARENTHESIS)
 
-        body = self.__node_code_block()
+        if self.lazy_functions:
+            return self.__nodes.FuncDeclaration(
+                identifier=identifier,
+                parameters=parameters,
+                body=self.__node_unparsed_code_block(),
+            )
 
-        return {
-            "type": "func_declaration",
-            "identifier": identifier,
-            "parameters": parameters,
-            "body": body,
-        }
+        return self.__open_code_block(TokenType.FUNC, offset, (identifier, parameters))
+
+    def __node_unparsed_code_block(self) -> nodes.UnparsedCodeBlock:
+        """
+        Unparsed Code Block node: Represents a code block which is skipped, to be parsed later if it is needed.
+
+        The code block's `{` token is matched with its `}` token by counting braces, without parsing what is between
+        them. The brace tokens are searched for in the bytes of the token kinds, so skipping is much faster than
+        parsing.
+        """
+
+        first_token = self.__consume_token(TokenType.LEFT_BRACE)
+
+        if self.__token_bytes is None:
+            self.__token_bytes = self.__token_kinds.tobytes()
+
+        find = self.__token_bytes.find
+        left_brace, right_brace = bytes([TokenType.LEFT_BRACE]), bytes([TokenType.RIGHT_BRACE])
+
+        depth = 1
+        index = first_token + 1
+        next_left_brace = find(left_brace, index)
+
+        while depth:
+            next_right_brace = find(right_brace, index)
+
+            if next_right_brace == -1:
+                # Unbalanced: report the missing `}` at the end of the program, as parsing the block would
+                self.token_index = len(self.__token_bytes) - 1
+                self.token_lookahead = self.__token_kinds[self.token_index]
+                self.__consume_token(TokenType.RIGHT_BRACE)
+
+            if next_left_brace != -1 and next_left_brace < next_right_brace:
+                depth += 1
+                index = next_left_brace + 1
+                next_left_brace = find(left_brace, index)
+            else:
+                depth -= 1
+                index = next_right_brace + 1
+
+        self.token_index = index - 1
+        self.token_lookahead = TokenType.RIGHT_BRACE
+        last_token = self.__consume_token(TokenType.RIGHT_BRACE)
+
+        return self.__nodes.UnparsedCodeBlock(
+            first_token=first_token,
+            last_token=last_token,
+        )
+
+    def __close_func_declaration(self, frame: "BlockFrame", code_block: nodes.CodeBlock) -> nodes.FuncDeclaration:
+        """Completes a `func_declaration` node once its code block has been parsed."""
+
+        identifier, parameters = frame.header
+
+        return self.__nodes.FuncDeclaration(
+            identifier=identifier,
+            parameters=parameters,
+            body=code_block,
+        )
@@ -0,0 +1,404 @@
+"""
+Implements the NodeTable class, a flat array-backed form of the AST.
+"""
+
+import struct
+import sys
+from array import array
+from typing import Any, BinaryIO
+
+from . import nodes
+from .nodes import NodeKind
+
+# Node table files start with this magic number, followed by the format version
+MAGIC = b"BCLT"
+VERSION = 2
+
+# The offset of a node which does not record one
+NO_OFFSET = -1
+
+
+class NodeTable:
+    """
+    A flat, array-backed form of the AST.
+
+    Every node is a row in the parallel columns `kinds` (its `NodeKind`), `first_child` and `child_count`
+    (a slice of the `children` column, which holds the row indices of its children), `literals` and `offsets`.
+
+    For literal nodes, `literals` holds an index into the constant pool `constants`. For identifier nodes (and the
+    operator of binary and n-ary expressions) it holds an index into the table of interned names `names`, so each
+    distinct name is only stored once. Otherwise it is unused.
+
+    The children of each kind of node are:
+    -   `program`, `code_block`: the statements of the body
+    -   `print`, `return`: the expression
+    -   `var_declaration`, `var_assignment`: the identifier, then the value
+    -   `func_declaration`: the identifier, the parameters, then the code block
+    -   `func_call`: the identifier, then the parameters
+    -   `conditional`: the expression, the code block, then the `else` code block or conditional if there is one
+    -   `while`, `do_while`: the expression, then the code block
+    -   `binary_expression`: the left operand, then the right operand
+    -   `nary_expression`: the operands
+
+    A NodeTable can be passed to the Parser as its `builder`, which then emits rows into the table directly
+    (through the methods named after the node classes) and returns the table, with `root` set to the program row.
+    """
+
+    # The builder methods are named after the node classes they stand in for
+    # pylint: disable=invalid-name
+
+    def __init__(self):
+        self.kinds = array("b")
+        self.first_child = array("i")
+        self.child_count = array("i")
+        self.literals = array("i")
+        self.offsets = array("q")
+        self.children = array("i")
+
+        self.constants: list[Any] = []
+        self.names: list[str] = []
+
+        self.__constant_indices: dict[tuple, int] = {}
+        self.__name_indices: dict[str, int] = {}
+
+        # The row of the program node, once it has been added
+        self.root = -1
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def node_children(self, index: int) -> array:
+        """Return the row indices of the children of the node at the given row."""
+
+        first = self.first_child[index]
+
+        return self.children[first : first + self.child_count[index]]
+
+    def constant(self, value: Any) -> int:
+        """Return the index of the value in the constant pool, adding it if needed."""
+
+        # Keyed by type and repr, so that e.g. `1`, `1.0` and `true` (or `0.0` and `-0.0`) stay distinct
+        key = (type(value), repr(value))
+        index = self.__constant_indices.get(key)
+
+        if index is None:
+            index = self.__constant_indices[key] = len(self.constants)
+            self.constants.append(value)
+
+        return index
+
+    def name(self, name: str) -> int:
+        """Return the index of the name in the interned name table, adding it if needed."""
+
+        index = self.__name_indices.get(name)
+
+        if index is None:
+            index = self.__name_indices[name] = len(self.names)
+            self.names.append(name)
+
+        return index
+
+    def add_node(self, kind: NodeKind, children: list[int] = (), literal: int = 0, offset: int | None = None) -> int:
+        """Add a row for a node and return its index."""
+
+        self.kinds.append(kind)
+        self.first_child.append(len(self.children))
+        self.child_count.append(len(children))
+        self.literals.append(literal)
+        self.offsets.append(NO_OFFSET if offset is None else offset)
+        self.children.extend(children)
+
+        return len(self.kinds) - 1
+
+    def set_offset(self, index: int, offset: int):
+        """Record the source offset of the node at the given row."""
+
+        self.offsets[index] = offset
+
+    def Program(self, body: list[int], offset: int | None = None) -> "NodeTable":
+        """Add the program row, which is the root of the table, and return the table."""
+
+        self.root = self.add_node(NodeKind.PROGRAM, body, offset=offset)
+
+        return self
+
+    def CodeBlock(self, body: list[int], offset: int | None = None) -> int:
+        """Add a `code_block` row."""
+
+        return self.add_node(NodeKind.CODE_BLOCK, body, offset=offset)
+
+    def Print(self, body: int, offset: int | None = None) -> int:
+        """Add a `print` row."""
+
+        return self.add_node(NodeKind.PRINT, [body], offset=offset)
+
+    def Identifier(self, name: str, offset: int | None = None) -> int:
+        """Add an `identifier` row."""
+
+        return self.add_node(NodeKind.IDENTIFIER, literal=self.name(name), offset=offset)
+
+    def VarDeclaration(self, identifier: int, value: int, offset: int | None = None) -> int:
+        """Add a `var_declaration` row."""
+
+        return self.add_node(NodeKind.VAR_DECLARATION, [identifier, value], offset=offset)
+
+    def VarAssignment(self, identifier: int, value: int, offset: int | None = None) -> int:
+        """Add a `var_assignment` row."""
+
+        return self.add_node(NodeKind.VAR_ASSIGNMENT, [identifier, value], offset=offset)
+
+    def FuncDeclaration(self, identifier: int, parameters: list[int], body: int, offset: int | None = None) -> int:
+        """Add a `func_declaration` row."""
+
+        return self.add_node(NodeKind.FUNC_DECLARATION, [identifier, *parameters, body], offset=offset)
+
+    def FuncCall(self, identifier: int, parameters: list[int], offset: int | None = None) -> int:
+        """Add a `func_call` row."""
+
+        return self.add_node(NodeKind.FUNC_CALL, [identifier, *parameters], offset=offset)
+
+    def Conditional(self, expression: int, on_true: int, on_false: int | None, offset: int | None = None) -> int:
+        """Add a `conditional` row."""
+
+        children = [expression, on_true] if on_false is None else [expression, on_true, on_false]
+
+        return self.add_node(NodeKind.CONDITIONAL, children, offset=offset)
+
+    def WhileLoop(self, expression: int, body: int, offset: int | None = None) -> int:
+        """Add a `while` row."""
+
+        return self.add_node(NodeKind.WHILE, [expression, body], offset=offset)
+
+    def DoWhileLoop(self, expression: int, body: int, offset: int | None = None) -> int:
+        """Add a `do_while` row."""
+
+        return self.add_node(NodeKind.DO_WHILE, [expression, body], offset=offset)
+
+    def Return(self, body: int, offset: int | None = None) -> int:
+        """Add a `return` row."""
+
+        return self.add_node(NodeKind.RETURN, [body], offset=offset)
+
+    def StringLiteral(self, value: str, offset: int | None = None) -> int:
+        """Add a `string_literal` row."""
+
+        return self.add_node(NodeKind.STRING_LITERAL, literal=self.constant(value), offset=offset)
+
+    def NumericLiteral(self, value: int | float, offset: int | None = None) -> int:
+        """Add a `numeric_literal` row."""
+
+        return self.add_node(NodeKind.NUMERIC_LITERAL, literal=self.constant(value), offset=offset)
+
+    def BooleanLiteral(self, value: bool, offset: int | None = None) -> int:
+        """Add a `boolean_literal` row."""
+
+        return self.add_node(NodeKind.BOOLEAN_LITERAL, literal=self.constant(value), offset=offset)
+
+    def BinaryExpression(self, operator: str, left: int, right: int, offset: int | None = None) -> int:
+        """Add a `binary_expression` row."""
+
+        return self.add_node(NodeKind.BINARY_EXPRESSION, [left, right], literal=self.name(operator), offset=offset)
+
+    def NaryExpression(self, operator: str, operands: list[int], offset: int | None = None) -> int:
+        """Add a `nary_expression` row."""
+
+        return self.add_node(NodeKind.NARY_EXPRESSION, operands, literal=self.name(operator), offset=offset)
+
+    @classmethod
+    def from_nodes(cls, ast: nodes.Program) -> "NodeTable":
+        """Return the node table of an AST made of node classes."""
+
+        table = cls()
+        table.__add_nodes(ast)
+
+        return table
+
+    def __add_nodes(self, node: nodes.Node) -> int:
+        """Add the rows for the node and all of its children (children first), and return the node's row."""
+
+        arguments = {"offset": node.offset}
+
+        for name in node.__match_args__:
+            value = getattr(node, name)
+
+            if isinstance(value, nodes.Node):
+                value = self.__add_nodes(value)
+            elif isinstance(value, list):
+                value = [self.__add_nodes(item) for item in value]
+
+            arguments[name] = value
+
+        return getattr(self, type(node).__name__)(**arguments)
+
+    def to_nodes(self, index: int | None = None) -> nodes.Node:
+        """Return the node at the given row (by default, the program) and all of its children as node classes."""
+
+        index = self.root if index is None else index
+        kind = self.kinds[index]
+        children = [self.to_nodes(child) for child in self.node_children(index)]
+        offset = None if self.offsets[index] == NO_OFFSET else self.offsets[index]
+
+        match kind:
+            case NodeKind.PROGRAM:
+                return nodes.Program(body=children, offset=offset)
+            case NodeKind.CODE_BLOCK:
+                return nodes.CodeBlock(body=children, offset=offset)
+            case NodeKind.PRINT:
+                return nodes.Print(body=children[0], offset=offset)
+            case NodeKind.RETURN:
+                return nodes.Return(body=children[0], offset=offset)
+            case NodeKind.IDENTIFIER:
+                return nodes.Identifier(name=self.names[self.literals[index]], offset=offset)
+            case NodeKind.VAR_DECLARATION:
+                return nodes.VarDeclaration(identifier=children[0], value=children[1], offset=offset)
+            case NodeKind.VAR_ASSIGNMENT:
+                return nodes.VarAssignment(identifier=children[0], value=children[1], offset=offset)
+            case NodeKind.FUNC_DECLARATION:
+                return nodes.FuncDeclaration(
+                    identifier=children[0], parameters=children[1:-1], body=children[-1], offset=offset
+                )
+            case NodeKind.FUNC_CALL:
+                return nodes.FuncCall(identifier=children[0], parameters=children[1:], offset=offset)
+            case NodeKind.CONDITIONAL:
+                on_false = children[2] if len(children) == 3 else None
+                return nodes.Conditional(expression=children[0], on_true=children[1], on_false=on_false, offset=offset)
+            case NodeKind.WHILE:
+                return nodes.WhileLoop(expression=children[0], body=children[1], offset=offset)
+            case NodeKind.DO_WHILE:
+                return nodes.DoWhileLoop(expression=children[0], body=children[1], offset=offset)
+            case NodeKind.STRING_LITERAL:
+                return nodes.StringLiteral(value=self.constants[self.literals[index]], offset=offset)
+            case NodeKind.NUMERIC_LITERAL:
+                return nodes.NumericLiteral(value=self.constants[self.literals[index]], offset=offset)
+            case NodeKind.BOOLEAN_LITERAL:
+                return nodes.BooleanLiteral(value=self.constants[self.literals[index]], offset=offset)
+            case NodeKind.BINARY_EXPRESSION:
+                operator = self.names[self.literals[index]]
+                return nodes.BinaryExpression(operator=operator, left=children[0], right=children[1], offset=offset)
+            case NodeKind.NARY_EXPRESSION:
+                return nodes.NaryExpression(operator=self.names[self.literals[index]], operands=children, offset=offset)
+
+        raise ValueError(f"Node table row {index} has an unknown kind {kind}")
+
+    def write(self, stream: BinaryIO):
+        """
+        Write the node table to a binary stream.
+
+        The columns are written out as-is (as little-endian 32-bit integers, except for the 64-bit source offsets,
+        or bytes for the kinds), each preceded by its length. The constant pool and name table follow, as tagged values.
+        """
+
+        stream.write(MAGIC + struct.pack("<Bi", VERSION, self.root))
+
+        for column in self.__columns():
+            if sys.byteorder == "big" and column.itemsize > 1:
+                column = array(column.typecode, column)
+                column.byteswap()
+
+            stream.write(struct.pack("<I", len(column)))
+            column.tofile(stream)
+
+        stream.write(struct.pack("<I", len(self.constants)))
+
+        for value in self.constants:
+            NodeTable.__write_value(stream, value)
+
+        stream.write(struct.pack("<I", len(self.names)))
+
+        for name in self.names:
+            NodeTable.__write_value(stream, name)
+
+    @classmethod
+    def read(cls, stream: BinaryIO) -> "NodeTable":
+        """
+        Read a node table written by `write()` from a binary stream.
+
+        If the stream does not hold a node table, a ValueError is raised.
+        """
+
+        header = stream.read(len(MAGIC) + 5)
+
+        if len(header) != len(MAGIC) + 5 or not header.startswith(MAGIC):
+            raise ValueError("Not a Barnacle node table")
+
+        version, root = struct.unpack("<Bi", header[len(MAGIC) :])
+
+        if version != VERSION:
+            raise ValueError(f"Unsupported node table version {version} (expected {VERSION})")
+
+        table = cls()
+        table.root = root
+
+        for column in table.__columns():
+            (length,) = struct.unpack("<I", NodeTable.__read_exactly(stream, 4))
+
+            try:
+                column.fromfile(stream, length)
+            except EOFError as error:
+                raise ValueError("Node table is truncated") from error
+
+            if sys.byteorder == "big" and column.itemsize > 1:
+                column.byteswap()
+
+        (constant_count,) = struct.unpack("<I", NodeTable.__read_exactly(stream, 4))
+        table.constants = [NodeTable.__read_value(stream) for _ in range(constant_count)]
+
+        (name_count,) = struct.unpack("<I", NodeTable.__read_exactly(stream, 4))
+        table.names = [NodeTable.__read_value(stream) for _ in range(name_count)]
+
+        table.__constant_indices = {(type(value), repr(value)): index for index, value in enumerate(table.constants)}
+        table.__name_indices = {name: index for index, name in enumerate(table.names)}
+
+        return table
+
+    def __columns(self) -> list[array]:
+        return [self.kinds, self.first_child, self.child_count, self.literals, self.offsets, self.children]
+
+    @staticmethod
+    def __write_value(stream: BinaryIO, value: Any):
+        """Write a constant or name to a binary stream, as a one-byte tag followed by its data."""
+
+        # bool must be checked before int, as it is a subclass of int
+        if isinstance(value, bool):
+            stream.write(b"t" if value else b"f")
+        elif isinstance(value, int):
+            data = str(value).encode("ascii")
+            stream.write(b"i" + struct.pack("<I", len(data)) + data)
+        elif isinstance(value, float):
+            stream.write(b"d" + struct.pack("<d", value))
+        else:
+            data = value.encode("utf-8")
+            stream.write(b"s" + struct.pack("<I", len(data)) + data)
+
+    @staticmethod
+    def __read_value(stream: BinaryIO) -> Any:
+        """Read a constant or name written by `__write_value` from a binary stream."""
+
+        tag = NodeTable.__read_exactly(stream, 1)
+
+        match tag:
+            case b"t":
+                return True
+            case b"f":
+                return False
+            case b"d":
+                return struct.unpack("<d", NodeTable.__read_exactly(stream, 8))[0]
+            case b"i":
+                (length,) = struct.unpack("<I", NodeTable.__read_exactly(stream, 4))
+                return int(NodeTable.__read_exactly(stream, length).decode("ascii"))
+            case b"s":
+                (length,) = struct.unpack("<I", NodeTable.__read_exactly(stream, 4))
+                return NodeTable.__read_exactly(stream, length).decode("utf-8")
+
+        raise ValueError(f"Node table has an unknown value tag {tag!r}")
+
+    @staticmethod
+    def __read_exactly(stream: BinaryIO, size: int) -> bytes:
+        """Read exactly `size` bytes from a binary stream, raising a ValueError if it ends first."""
+
+        data = stream.read(size)
+
+        if len(data) != size:
+            raise ValueError("Node table is truncated")
+
+        return data
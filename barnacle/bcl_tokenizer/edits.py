@@ -0,0 +1,31 @@
+"""
+Implements the TextEdit dataclass.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TextEdit:
+    """
+    Represents an edit of a source: `deleted_length` characters at `offset` are replaced by `inserted_text`.
+
+    For a bytes source, `offset` and `deleted_length` count bytes, and the inserted text is encoded as UTF-8.
+    """
+
+    offset: int
+    deleted_length: int
+    inserted_text: str
+
+    def inserted(self, source: str | bytes) -> str | bytes:
+        """Return the inserted text in the same form (str or bytes) as the source."""
+
+        return self.inserted_text if isinstance(source, str) else self.inserted_text.encode("utf-8")
+
+    def apply(self, source: str | bytes) -> str | bytes:
+        """Return the source with this edit applied."""
+
+        if not 0 <= self.offset <= self.offset + self.deleted_length <= len(source):
+            raise ValueError(f"Edit {self} is outside of the source (length {len(source)})")
+
+        return source[: self.offset] + self.inserted(source) + source[self.offset + self.deleted_length :]
@@ -0,0 +1,87 @@
+"""
+Implements the LineIndex class.
+"""
+
+import logging
+from array import array
+from bisect import bisect_right
+
+
+class LineIndex:
+    """
+    Converts source offsets to line and column numbers.
+
+    The table of line start offsets is built once, in a single pass over the source,
+    and each conversion is then a binary search of that table.
+    Lines and columns are numbered from 1, and columns count characters even when the source is UTF-8 bytes.
+    """
+
+    def __init__(self, source: str | bytes):
+        self.source = source
+        self.__newline = "\n" if isinstance(source, str) else b"\n"
+        self.line_starts = array("q", [0])
+
+        find_newline = source.find
+        position = find_newline(self.__newline)
+
+        while position != -1:
+            self.line_starts.append(position + 1)
+            position = find_newline(self.__newline, position + 1)
+
+        logging.debug("Line index built with %d lines", len(self.line_starts))
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """Return the `(line, column)` of the given source offset."""
+
+        line = bisect_right(self.line_starts, offset)
+        line_start = self.line_starts[line - 1]
+
+        prefix = self.source[line_start:offset]
+        column = len(prefix if isinstance(prefix, str) else prefix.decode("utf-8", errors="replace")) + 1
+
+        return line, column
+
+    def describe(self, offset: int) -> str:
+        """Return a human-readable description of the given source offset, for use in error messages."""
+
+        line, column = self.position(offset)
+
+        return f"line {line}, column {column}"
+
+
+class StreamLineIndex:
+    """
+    Converts offsets in a text stream to line and column numbers, as the stream is read.
+
+    Unlike LineIndex, the table of line start offsets is built up from each piece of text read from the stream
+    (passed to `add_text()`), so the text itself does not need to be kept. Offsets and columns count characters.
+    """
+
+    def __init__(self):
+        self.line_starts = array("q", [0])
+        self.length = 0
+
+    def add_text(self, text: str):
+        """Record the line starts in the next piece of text read from the stream."""
+
+        position = text.find("\n")
+
+        while position != -1:
+            self.line_starts.append(self.length + position + 1)
+            position = text.find("\n", position + 1)
+
+        self.length += len(text)
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """Return the `(line, column)` of the given offset in the stream, which must already have been read."""
+
+        line = bisect_right(self.line_starts, offset)
+
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def describe(self, offset: int) -> str:
+        """Return a human-readable description of the given stream offset, for use in error messages."""
+
+        line, column = self.position(offset)
+
+        return f"line {line}, column {column}"
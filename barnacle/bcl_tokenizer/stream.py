@@ -0,0 +1,236 @@
+"""
+Implements streaming tokenization of a text stream, for sources too large to read into memory in one go.
+"""
+
+import logging
+from typing import Iterator, TextIO
+
+from . import tokens
+from .positions import StreamLineIndex
+from .tokens import TokenType
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# A StreamTokenizer drops the tokens it no longer needs once it holds this many
+TOKEN_WINDOW_SIZE = 1024
+
+# The token regexes look at most this many characters past the end of a match to decide where it ends
+# (e.g. `1.5` versus `1.x`), so a match ending closer than this to the end of the buffer may still grow.
+LOOKAHEAD = 2
+
+
+def scan_stream(stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple[TokenType, int, str | None]]:
+    """
+    Tokenize a text stream, reading it in chunks of `chunk_size` characters.
+
+    Yields a `(kind, start, text)` tuple per token, where `start` is the offset of the token in the whole stream.
+    The last tuple yielded is always a `PROGRAM_END` token with no text.
+
+    Only the unscanned tail of the current chunk is kept in memory. A token which crosses a chunk boundary
+    (e.g. a long string or block comment) is completed by reading further chunks before it is yielded.
+
+    If no valid token can be found, a SyntaxError is raised.
+    """
+
+    match_token = tokens.TOKEN_PATTERN.match
+    token_groups = tokens.TOKEN_GROUPS
+    keywords = tokens.KEYWORDS
+
+    buffer = ""
+    buffer_offset = 0  # The offset of the start of the buffer in the whole stream
+    position = 0
+    end_of_input = False
+
+    # Newlines are only counted when text is dropped from the buffer, so that errors can report a line and column
+    line = 1
+    line_start = 0
+
+    while True:
+        if position >= len(buffer) and end_of_input:
+            break
+
+        match = None if position >= len(buffer) else match_token(buffer, position)
+
+        if not end_of_input and __needs_more_input(buffer, position, match):
+            # Keep the unscanned tail and read past it; long tokens double the read size so re-scanning stays linear
+            chunk = stream.read(max(chunk_size, len(buffer) - position))
+
+            line, line_start = __advance_line(buffer, buffer_offset, position, line, line_start)
+            buffer_offset += position
+            buffer = buffer[position:] + chunk
+            position = 0
+            end_of_input = not chunk
+            continue
+
+        if not match:
+            line, line_start = __advance_line(buffer, buffer_offset, position, line, line_start)
+            column = buffer_offset + position - line_start + 1
+            near = buffer[position : position + 10]
+            raise SyntaxError(f"Unknown syntax near characters '{near}' (line {line}, column {column})")
+
+        kind = token_groups[match.lastgroup]
+        end = match.end()
+
+        # Whitespace and comments have no kind: the whole run is skipped, carry on with whatever follows it
+        if kind is not None:
+            text = match.group()
+
+            if kind == TokenType.IDENTIFIER:
+                kind = keywords.get(text, kind)
+
+            yield kind, buffer_offset + position, text
+
+        position = end
+
+    logging.debug("Stream tokenizer reached the end of the stream")
+
+    yield TokenType.PROGRAM_END, buffer_offset + position, None
+
+
+def iter_tokens(stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Tokenize a text stream in chunks, yielding each token in the same dict form as `Tokenizer.next_token()`.
+
+    The last token yielded is always the sentinel `PROGRAM_END` token.
+    """
+
+    for kind, _, text in scan_stream(stream, chunk_size):
+        yield {
+            "type": tokens.TOKEN_NAMES[kind],
+            "value": text,
+        }
+
+
+class LineReader:
+    """
+    Reads a text stream a line at a time for `scan_stream()`, so each line is scanned as soon as it has arrived,
+    even when the stream is fed slowly (e.g. a pipe into standard input).
+
+    The start of each line is recorded in `line_index` as it is read, so positions in the stream can be reported
+    without keeping the text which has already been scanned.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.line_index = StreamLineIndex()
+
+        self.__stream = stream
+        self.__chunk_size = chunk_size
+
+    def read(self, size: int) -> str:
+        """Read the next line of the stream, up to `size` characters. At the end of the stream, return `""`."""
+
+        text = self.__stream.readline(size)
+
+        if size > self.__chunk_size:
+            # A token longer than a chunk is being completed, and `scan_stream()` re-scans it after every read:
+            # read at least as much again (in whole lines) so the re-scanning stays linear in its length
+            lines = [text]
+            length = len(text)
+
+            while lines[-1] and length < size:
+                lines.append(self.__stream.readline(size - length))
+                length += len(lines[-1])
+
+            text = "".join(lines)
+
+        self.line_index.add_text(text)
+
+        return text
+
+
+class StreamColumn:
+    """A column of a StreamTokenizer, indexed by the index of a token in the whole stream."""
+
+    def __init__(self, tokenizer: "StreamTokenizer", values: list):
+        self.__tokenizer = tokenizer
+        self.__values = values
+
+    def __getitem__(self, index: int):
+        return self.__values[self.__tokenizer.load(index)]
+
+
+class StreamTokenizer:
+    """
+    Tokenizes a text stream as it is parsed, so the Parser can parse and yield a statement at a time.
+
+    Provides the parts of the Tokenizer's interface which the Parser uses: the `kinds` and `starts` columns are
+    indexed by the index of a token in the whole stream, and `text()`, `position()` and `line_index` work as they
+    do for the Tokenizer. The stream is read a line at a time, and tokens are only scanned once they are indexed.
+
+    The Parser only looks at its lookahead token and the token it has just consumed, so only the most recent tokens
+    are kept: once `TOKEN_WINDOW_SIZE` tokens are held, all but the last two are dropped.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        reader = LineReader(stream, chunk_size)
+
+        self.source = stream
+        self.line_index = reader.line_index
+
+        self.__tokens = scan_stream(reader, chunk_size)
+        self.__first = 0  # The index in the whole stream of the first token held
+        self.__kinds = []
+        self.__starts = []
+        self.__texts = []
+
+        self.kinds = StreamColumn(self, self.__kinds)
+        self.starts = StreamColumn(self, self.__starts)
+
+    def load(self, index: int) -> int:
+        """Scan the stream up to the token at the given index, and return where that token is held in the columns."""
+
+        while index - self.__first >= len(self.__kinds):
+            if len(self.__kinds) >= TOKEN_WINDOW_SIZE:
+                dropped = len(self.__kinds) - 2
+
+                del self.__kinds[:dropped], self.__starts[:dropped], self.__texts[:dropped]
+                self.__first += dropped
+
+            kind, start, text = next(self.__tokens)
+
+            self.__kinds.append(kind)
+            self.__starts.append(start)
+            self.__texts.append(text)
+
+        return index - self.__first
+
+    def text(self, index: int) -> str:
+        """Return the source text of the token at the given index in the token stream."""
+
+        return self.__texts[self.load(index)]
+
+    def position(self, index: int) -> tuple[int, int]:
+        """Return the `(line, column)` at which the token at the given index in the token stream starts."""
+
+        return self.line_index.position(self.starts[index])
+
+
+def __advance_line(buffer: str, buffer_offset: int, position: int, line: int, line_start: int) -> tuple[int, int]:
+    """
+    Returns the line number and line start offset at `position` in the buffer,
+    given the line number and line start offset at the start of the buffer.
+    """
+
+    newlines = buffer.count("\n", 0, position)
+
+    if not newlines:
+        return line, line_start
+
+    return line + newlines, buffer_offset + buffer.rfind("\n", 0, position) + 1
+
+
+def __needs_more_input(buffer: str, position: int, match) -> bool:
+    """
+    Returns whether the token at `position` might scan differently once more of the stream has been read.
+    """
+
+    if match is None:
+        # Nothing matched: either the buffer is exhausted, or a string literal (or two-character operator)
+        # has been cut off by the end of the buffer
+        return position + 1 >= len(buffer) or buffer[position] == '"'
+
+    if match.end() + LOOKAHEAD > len(buffer):
+        return True
+
+    # An unterminated block comment scans as a `/` operator, but a later chunk may still close it
+    return buffer.startswith("/*", position) and match.group() == "/"
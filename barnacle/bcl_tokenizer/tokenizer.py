@@ -3,9 +3,18 @@ Implements the Tokenizer class.
 """
 
 import logging
-import re
+import mmap
+from array import array
+from bisect import bisect_left, bisect_right
 
 from . import tokens
+from .edits import TextEdit
+from .positions import LineIndex
+from .tokens import TokenType
+
+# The token regexes look at most this many characters past the end of a match to decide where it ends
+# (e.g. `1.5` versus `1.x`), so an edit closer than this to the end of a token may change the token.
+LOOKAHEAD = 2
 
 
 class Tokenizer:
@@ -14,60 +23,249 @@ class Tokenizer:
 
     Performs lexical analysis of the source code to produce a stream of tokens.
     The tokens can then be parsed by the Barnacle Parser class.
+
+    The token stream is stored compactly in three parallel columns: `kinds` holds each token's `TokenType`,
+    and `starts` and `ends` hold the offsets of its text in the source (as 64-bit integers, so that sources
+    larger than 2 GiB, such as memory-mapped files, can be tokenized).
+    The text of a token is only sliced from the source when it is asked for.
+    The stream always ends with a `PROGRAM_END` token.
+
+    The source may also be UTF-8 encoded bytes, or any buffer holding them such as a memory-mapped file.
+    These are scanned in place without being decoded, so the offsets in `starts` and `ends` are byte offsets,
+    and only the text of individual tokens is decoded when it is asked for.
+
+    Tokens only record their offsets. Line and column numbers are worked out from a line index,
+    which is built on demand the first time a position is asked for (e.g. to report an error).
+
+    After an edit of the source, `edited()` re-tokenizes only the region damaged by the edit.
     """
 
-    def __init__(self, source: str):
+    def __init__(self, source: str | bytes | mmap.mmap):
+        self.__reset(source)
+        self.__tokenize(0)
+
+        logging.debug("Tokenizer initialised with %d tokens", len(self.kinds))
+
+    def __reset(self, source: str | bytes | mmap.mmap):
         self.source = source
-        logging.debug("Tokenizer initialised")
+        self.__is_text = isinstance(source, str)
+
+        self.kinds = array("b")
+        self.starts = array("q")
+        self.ends = array("q")
+
+        self.__line_index = None
+        self.__next_index = 0
+
+    def edited(self, edit: TextEdit) -> "Tokenizer":
+        """
+        Return a Tokenizer for the source with the edit applied, re-using the tokens of this one where possible.
+
+        Scanning restarts at the last token which the edit cannot have affected, and stops as soon as it produces
+        a token starting at the same place (after the edit) as one of the old tokens. From there on the old tokens
+        are re-used, with their offsets shifted by the change in length.
+
+        If no valid token can be found in the damaged region, a SyntaxError is raised.
+        """
+
+        source = edit.apply(self.source)
+        inserted_length = len(edit.inserted(self.source))
+        shift = inserted_length - edit.deleted_length
+        edit_end = edit.offset + inserted_length
+
+        # Tokens ending before the edit, by more than the scanner's lookahead, are unaffected by it
+        restart = bisect_right(self.ends, edit.offset - LOOKAHEAD)
+
+        if ("*/" if self.__is_text else b"*/") in source[max(edit.offset - 1, 0) : edit_end + 1]:
+            # A new end of comment may close an earlier unterminated `/*`, which had been scanned as operators
+            restart = 0
+
+        return Tokenizer.__retokenized(source, self, restart, edit_end, shift)
+
+    @classmethod
+    def __retokenized(
+        cls, source: str | bytes | mmap.mmap, previous: "Tokenizer", restart: int, edit_end: int, shift: int
+    ) -> "Tokenizer":
+        """Return a Tokenizer for the edited source, which keeps the previous tokens up to `restart`."""
+
+        tokenizer = cls.__new__(cls)
+        tokenizer.__reset(source)
+
+        tokenizer.kinds = previous.kinds[:restart]
+        tokenizer.starts = previous.starts[:restart]
+        tokenizer.ends = previous.ends[:restart]
+
+        rescanned = tokenizer.__tokenize(previous.ends[restart - 1] if restart else 0, previous, edit_end, shift)
+
+        logging.debug("Tokenizer re-used %d tokens and re-scanned %d tokens", len(tokenizer) - rescanned, rescanned)
+
+        return tokenizer
+
+    def dumps(self) -> bytes:
+        """
+        Return the token columns as bytes, which `Tokenizer.loads()` turns back into a Tokenizer of the same source
+        without scanning it again (e.g. to store the tokens of a script in the compile cache).
+        """
+
+        return len(self).to_bytes(8, "little") + self.kinds.tobytes() + self.starts.tobytes() + self.ends.tobytes()
+
+    @classmethod
+    def loads(cls, source: str | bytes | mmap.mmap, data: bytes) -> "Tokenizer":
+        """
+        Return a Tokenizer of the source with the token columns written by `dumps()` on a machine of the same byte
+        order.
+
+        If the data is not the token columns of a source of this length, a ValueError is raised.
+        """
+
+        count = int.from_bytes(data[:8], "little")
+
+        if len(data) != 8 + count * 17:
+            raise ValueError(f"Expected the columns of {count} tokens in {len(data)} bytes")
+
+        tokenizer = cls.__new__(cls)
+        tokenizer.__reset(source)
+
+        tokenizer.kinds.frombytes(data[8 : 8 + count])
+        tokenizer.starts.frombytes(data[8 + count : 8 + 9 * count])
+        tokenizer.ends.frombytes(data[8 + 9 * count :])
 
-        self.current_token = self.__get_next_token_from_stream()
+        if not count or tokenizer.kinds[-1] != TokenType.PROGRAM_END or tokenizer.ends[-1] != len(source):
+            raise ValueError("The tokens do not end with the end of the source")
+
+        logging.debug("Tokenizer loaded with %d tokens", count)
+
+        return tokenizer
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def text(self, index: int) -> str:
+        """Return the source text of the token at the given index in the token stream."""
+
+        text = self.source[self.starts[index] : self.ends[index]]
+
+        return text if self.__is_text else text.decode("utf-8")
+
+    @property
+    def line_index(self) -> LineIndex:
+        """The line index of the source, which is built the first time it is used."""
+
+        if self.__line_index is None:
+            self.__line_index = LineIndex(self.source)
+
+        return self.__line_index
+
+    def position(self, index: int) -> tuple[int, int]:
+        """Return the `(line, column)` at which the token at the given index in the token stream starts."""
+
+        return self.line_index.position(self.starts[index])
+
+    def token(self, index: int) -> dict:
+        """Return the dict form of the token at the given index in the token stream."""
+
+        kind = self.kinds[index]
+
+        return {
+            "type": tokens.TOKEN_NAMES[kind],
+            "value": self.text(index) if kind != TokenType.PROGRAM_END else None,
+        }
 
     def next_token(self) -> dict:
         """
-        Return the next token in the source stream.
+        Return the next token in the source stream, in its dict form.
 
         If `end_of_stream() == True`, a sentinel `PROGRAM_END` token is returned.
+        """
+
+        token_to_return = self.token(self.__next_index)
+
+        if not self.end_of_stream():
+            self.__next_index += 1
+
+        logging.debug("Tokenizer returned token '%s' of type '%s'", token_to_return["value"], token_to_return["type"])
+
+        return token_to_return
+
+    def end_of_stream(self) -> bool:
+        """Returns whether the end of the stream has been reached."""
+
+        return self.kinds[self.__next_index] == TokenType.PROGRAM_END
+
+    def __tokenize(self, position: int, previous: "Tokenizer | None" = None, resync_from: int = 0, shift: int = 0):
+        """
+        Scan the source from `position` onwards into the token columns, returning the number of tokens scanned.
+
+        If a `previous` tokenizer is given (for the source before an edit), scanning stops at the first token which
+        starts at or after `resync_from` in the same place as a previous token, once shifted by `shift`.
+        The rest of the previous tokens are then re-used.
 
         If no valid token can be found, a SyntaxError is raised.
         """
 
-        token_to_return = self.current_token
+        source = self.source
+        match_token = (tokens.TOKEN_PATTERN if self.__is_text else tokens.TOKEN_PATTERN_BYTES).match
+        token_groups = tokens.TOKEN_GROUPS
+        keywords = tokens.KEYWORDS if self.__is_text else tokens.KEYWORDS_BYTES
+        add_kind, add_start, add_end = self.kinds.append, self.starts.append, self.ends.append
 
-        self.current_token = self.__get_next_token_from_stream()
+        length = len(source)
+        scanned = 0
+        resync_lowest = len(self.kinds)
 
-        return token_to_return
+        if previous is None:
+            resync_from = length + 1
 
-    def __get_next_token_from_stream(self) -> dict:
+        while position < length:
+            match = match_token(source, position)
 
-        if self.__source_is_empty():
-            return {
-                "type": "PROGRAM_END",
-                "value": None,
-            }
+            if not match:
+                near = source[position : position + 10]
+                near = near if self.__is_text else near.decode("utf-8", errors="replace")
+                raise SyntaxError(f"Unknown syntax near characters '{near}' ({self.line_index.describe(position)})")
 
-        for regexp, token_type in tokens.TOKEN_REGEXPS.items():
-            match = re.search(regexp, self.source)
+            kind = token_groups[match.lastgroup]
+            end = match.end()
 
-            if match:
-                token_value = match.group()
-                self.source = self.source[len(token_value) :]
+            # Whitespace and comments have no kind: the whole run is skipped, carry on with whatever follows it
+            if kind is not None:
+                if position >= resync_from and self.__resync(previous, resync_lowest, position - shift, shift):
+                    return scanned
 
-                if token_type:
-                    logging.debug("Tokenizer matched token '%s' of type '%s'", token_value, token_type)
+                if kind == TokenType.IDENTIFIER:
+                    kind = keywords.get(source[position:end], kind)
 
-                    return {
-                        "type": token_type,
-                        "value": token_value,
-                    }
+                add_kind(kind)
+                add_start(position)
+                add_end(end)
+                scanned += 1
 
-                return self.__get_next_token_from_stream()
+            position = end
 
-        raise SyntaxError(f"Unknown syntax near characters '{self.source[:10]}'")
+        add_kind(TokenType.PROGRAM_END)
+        add_start(length)
+        add_end(length)
 
-    def end_of_stream(self) -> bool:
-        """Returns whether the end of the stream has been reached."""
+        return scanned
+
+    def __resync(self, previous: "Tokenizer", lowest: int, previous_start: int, shift: int) -> bool:
+        """
+        If a previous token (at index `lowest` or later) starts at `previous_start`, append it and all of the
+        previous tokens after it to the token columns, with their offsets shifted, and return True.
+        """
+
+        index = bisect_left(previous.starts, previous_start, lowest)
+
+        if index == len(previous.starts) or previous.starts[index] != previous_start:
+            return False
+
+        self.kinds.extend(previous.kinds[index:])
 
-        return self.current_token["type"] == "PROGRAM_END"
+        if shift:
+            self.starts.extend(map(shift.__add__, previous.starts[index:]))
+            self.ends.extend(map(shift.__add__, previous.ends[index:]))
+        else:
+            self.starts.extend(previous.starts[index:])
+            self.ends.extend(previous.ends[index:])
 
-    def __source_is_empty(self) -> bool:
-        return not bool(self.source)
+        return True
@@ -1,75 +1,174 @@
 """
-Contains the TOKEN_REGEXPS dictionary.
+Contains the TokenType enum, the TOKEN_REGEXPS and KEYWORDS dictionaries, and the token patterns built from them.
 """
 
+import re
+from enum import IntEnum
+
+
+class TokenType(IntEnum):
+    """The kind of a token, as stored in the Tokenizer's compact token columns."""
+
+    PROGRAM_END = 0
+    NUMBER = 1
+    STRING = 2
+    BOOLEAN = 3
+    LET = 4
+    FUNC = 5
+    RETURN = 6
+    PRINT = 7
+    IF = 8
+    ELSE = 9
+    DO = 10
+    WHILE = 11
+    EQUAL = 12
+    NOT_EQUAL = 13
+    LESS_EQUAL = 14
+    LESS = 15
+    MORE_EQUAL = 16
+    MORE = 17
+    ASSIGN = 18
+    PLUS = 19
+    MINUS = 20
+    MULTIPLY = 21
+    DIVIDE = 22
+    IDENTIFIER = 23
+    LEFT_BRACE = 24
+    RIGHT_BRACE = 25
+    LEFT_PARENTHESIS = 26
+    RIGHT_PARENTHESIS = 27
+    COMMA = 28
+
+
+# The token type names used by the dict form of a token (e.g. for `--show-tokens`) and in error messages
+TOKEN_NAMES = {
+    TokenType.PROGRAM_END: "PROGRAM_END",
+    TokenType.NUMBER: "NUMBER",
+    TokenType.STRING: "STRING",
+    TokenType.BOOLEAN: "BOOLEAN",
+    TokenType.LET: "LET",
+    TokenType.FUNC: "FUNC",
+    TokenType.RETURN: "RETURN",
+    TokenType.PRINT: "PRINT",
+    TokenType.IF: "IF",
+    TokenType.ELSE: "ELSE",
+    TokenType.DO: "DO",
+    TokenType.WHILE: "WHILE",
+    TokenType.EQUAL: "==",
+    TokenType.NOT_EQUAL: "!=",
+    TokenType.LESS_EQUAL: "<=",
+    TokenType.LESS: "<",
+    TokenType.MORE_EQUAL: ">=",
+    TokenType.MORE: ">",
+    TokenType.ASSIGN: "=",
+    TokenType.PLUS: "+",
+    TokenType.MINUS: "-",
+    TokenType.MULTIPLY: "*",
+    TokenType.DIVIDE: "/",
+    TokenType.IDENTIFIER: "IDENTIFIER",
+    TokenType.LEFT_BRACE: "{",
+    TokenType.RIGHT_BRACE: "}",
+    TokenType.LEFT_PARENTHESIS: "(",
+    TokenType.RIGHT_PARENTHESIS: ")",
+    TokenType.COMMA: ",",
+}
+
 TOKEN_REGEXPS = {
     # Key-value pairs represent a token regex and its corresponding token type
     # A token type of None means the pseudo-token should be ignored (e.g. whitespace or comments)
     # Order is important! Even if multiple regexes would match a token, the higher one in this dict takes precedence.
+    # Regexes are matched at the tokenizer's current offset, so they must not be anchored with `^`.
     # ==================== Ignore ====================
+    # Ignored pseudo-tokens consume a whole run at once, so padding and banners are skipped in a single match.
     # Whitespace (ignore)
-    r"^\s": None,
+    r"\s+": None,
     # Block comments (ignore)
-    r"^/\*(.|\n)*?\*/": None,
+    # Unrolled so that it runs in linear time: non-stars, then runs of stars not followed by the closing slash.
+    r"/\*[^*]*\*+(?:[^/*][^*]*\*+)*/": None,
     # Single-line comments (ignore)
-    r"^//.*": None,
+    r"//.*": None,
     # ==================== Literals ====================
     # Number literals
-    r"^-?[0-9]+(\.[0-9]+)?\b": "NUMBER",
+    r"-?[0-9]+(?:\.[0-9]+)?\b": TokenType.NUMBER,
     # String literals
-    r'^"[^"]*"': "STRING",
-    # Boolean literals
-    r"^true\b|^false\b": "BOOLEAN",
-    # ==================== Keywords ====================
-    # Keyword "let"
-    r"^let\b": "LET",
-    # Keyword "func"
-    r"^func\b": "FUNC",
-    # Keyword "return"
-    r"^return\b": "RETURN",
-    # Keyword "print"
-    r"^print\b": "PRINT",
-    # Keyword "if"
-    r"^if\b": "IF",
-    # Keyword "else"
-    r"^else\b": "ELSE",
-    # Keyword "do"
-    r"^do\b": "DO",
-    # Keyword "while"
-    r"^while\b": "WHILE",
+    r'"[^"]*"': TokenType.STRING,
     # ==================== Operators ====================
     # Equality Operator
-    r"^==": "==",
+    r"==": TokenType.EQUAL,
     # Inequality Operator
-    r"^!=": "!=",
+    r"!=": TokenType.NOT_EQUAL,
     # Less Than Or Equal Operator
-    r"^<=": "<=",
+    r"<=": TokenType.LESS_EQUAL,
     # Less Than Operator
-    r"^<": "<",
+    r"<": TokenType.LESS,
     # More Than Or Equal Operator
-    r"^>=": ">=",
+    r">=": TokenType.MORE_EQUAL,
     # More Than Operator
-    r"^>": ">",
+    r">": TokenType.MORE,
     # Assignment Operator
-    r"^=": "=",
+    r"=": TokenType.ASSIGN,
     # Plus Operator
-    r"^\+": "+",
+    r"\+": TokenType.PLUS,
     # Subtract Operator
-    r"^-": "-",
+    r"-": TokenType.MINUS,
     # Multiply Operator
-    r"^\*": "*",
+    r"\*": TokenType.MULTIPLY,
     # Divide Operator
-    r"^/": "/",
+    r"/": TokenType.DIVIDE,
     # ==================== Identifiers ====================
     # Identifiers (function names, variables, classes, etc)
-    r"^[a-z][a-z0-9_]*\b": "IDENTIFIER",
+    # Keywords and boolean literals are also matched here, then looked up in KEYWORDS.
+    r"[a-z][a-z0-9_]*\b": TokenType.IDENTIFIER,
     # ==================== Miscellaneous ====================
     # Braces
-    r"^{": "{",
-    r"^}": "}",
+    r"{": TokenType.LEFT_BRACE,
+    r"}": TokenType.RIGHT_BRACE,
     # Parentheses
-    r"^\(": "(",
-    r"^\)": ")",
+    r"\(": TokenType.LEFT_PARENTHESIS,
+    r"\)": TokenType.RIGHT_PARENTHESIS,
     # Commas
-    r"^,": ",",
+    r",": TokenType.COMMA,
+}
+
+KEYWORDS = {
+    # Key-value pairs represent a reserved word and the token type it produces instead of IDENTIFIER
+    # ==================== Literals ====================
+    # Boolean literals
+    "true": TokenType.BOOLEAN,
+    "false": TokenType.BOOLEAN,
+    # ==================== Keywords ====================
+    "let": TokenType.LET,
+    "func": TokenType.FUNC,
+    "return": TokenType.RETURN,
+    "print": TokenType.PRINT,
+    "if": TokenType.IF,
+    "else": TokenType.ELSE,
+    "do": TokenType.DO,
+    "while": TokenType.WHILE,
+}
+
+BYTES_REGEXPS = {
+    # Key-value pairs represent a regex in TOKEN_REGEXPS and the regex to use instead when scanning UTF-8 bytes
+    # Bytes patterns only know about ASCII whitespace, so the UTF-8 encodings of the other characters that
+    # `\s` matches in a str are spelled out, keeping the two token streams identical.
+    r"\s+": (
+        rb"(?:[\s\x1c-\x1f]|\xc2[\x85\xa0]|\xe1\x9a\x80"
+        rb"|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80)+"
+    ),
 }
+
+# Every regex in TOKEN_REGEXPS becomes one named group of a single alternation, tried in dict order.
+# The name of the group that matched identifies the token type in TOKEN_GROUPS.
+TOKEN_GROUPS = {f"T{index}": token_type for index, token_type in enumerate(TOKEN_REGEXPS.values())}
+
+TOKEN_PATTERN = re.compile("|".join(f"(?P<T{index}>{regexp})" for index, regexp in enumerate(TOKEN_REGEXPS)))
+
+# The same alternation for scanning UTF-8 encoded bytes (e.g. a memory-mapped script) without decoding them
+TOKEN_PATTERN_BYTES = re.compile(
+    b"|".join(
+        b"(?P<T%d>%s)" % (index, BYTES_REGEXPS.get(regexp, regexp.encode("utf-8")))
+        for index, regexp in enumerate(TOKEN_REGEXPS)
+    )
+)
+
+KEYWORDS_BYTES = {keyword.encode("utf-8"): token_type for keyword, token_type in KEYWORDS.items()}
@@ -0,0 +1,134 @@
+"""
+Implements the TranspiledInterpreter class, which runs Barnacle programs transpiled into Python code objects.
+"""
+
+import ast as py
+import logging
+from types import CodeType, TracebackType
+from typing import Any
+
+from bcl_interpreter.engine import Engine
+from bcl_vm import vm
+
+from . import runtime
+from .transpiler import FILENAME, Transpiler
+
+
+class TranspiledInterpreter(Engine):
+    """
+    The Barnacle Interpreter, as a transpiler into Python (selected with `--engine python`).
+
+    The AST is transpiled once into a Python module (see `Transpiler`), which is compiled into a code object and run
+    by CPython itself: loops become Python loops, functions nested `def`s, and variables Python locals, cells and
+    globals, so no Barnacle scope is looked up by name at run time.
+
+    It takes the arguments described in `Engine`, and behaves as the `Interpreter` class, including its errors and
+    their positions. Functions call each other as Python functions, so recursion is limited by Python's recursion
+    limit. A program nested too deeply for Python to compile is run by the `VirtualMachine` instead, but a statement
+    of a streamed source which is nested too deeply raises a RuntimeError, as the statements before it have been run
+    by CPython.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__transpiler: Transpiler | None = None
+        self.__code: CodeType | None = None
+        self.__fallback: vm.VirtualMachine | None = None
+
+    def module(self) -> py.Module:
+        """Return the Python module the program is transpiled into (e.g. to output it with `ast.unparse`)."""
+
+        return Transpiler(self.parse_code_block).transpile(self.ast.body)
+
+    def code(self) -> CodeType | None:
+        """
+        Return the code object of the program, transpiling and compiling it the first time. Return None if the
+        program is nested too deeply to be compiled.
+        """
+
+        if self.__code is None and self.__fallback is None:
+            transpiler = Transpiler(self.parse_code_block)
+
+            try:
+                self.__code = compile(transpiler.transpile(self.ast.body), FILENAME, "exec")
+            except (RecursionError, SyntaxError, MemoryError):
+                # CPython limits the nesting of the code it compiles (e.g. to 20 nested loops)
+                logging.debug("Could not transpile AST into Python, running it with the virtual machine")
+                self.__fallback = vm.VirtualMachine(self.source, ast=self.ast, parser=self.parser, verified=True)
+                return None
+
+            self.__transpiler = transpiler
+            logging.debug("Transpiled AST into Python")
+
+        return self.__code
+
+    def run(self):
+        """Runs the Barnacle interpreter on the provided source."""
+
+        if self.ast is None:
+            self.__run_statements()
+            return
+
+        if self.code() is None:
+            self.__fallback.run()
+            return
+
+        self.__execute(self.__code, self.__transpiler, self.__namespace(self.__transpiler))
+
+    def __run_statements(self):
+        """Transpile and run a streamed source a top-level statement at a time, all in the same namespace."""
+
+        transpiler = Transpiler(self.parse_code_block, stream=True)
+        namespace = self.__namespace(transpiler)
+
+        for statement in self.statements():
+            try:
+                code = compile(transpiler.transpile([statement]), FILENAME, "exec")
+            except (RecursionError, SyntaxError, MemoryError):
+                error = RuntimeError("Statement is nested too deeply to be transpiled")
+                self.add_error_position(error, statement.offset)
+                raise error from None
+
+            self.__execute(code, transpiler, namespace)
+
+    @staticmethod
+    def __namespace(transpiler: Transpiler) -> dict[str, Any]:
+        namespace = runtime.namespace()
+        namespace["bcl_errors"] = transpiler.errors
+
+        return namespace
+
+    def __execute(self, code: CodeType, transpiler: Transpiler, namespace: dict[str, Any]):
+        """Run transpiled code, and position the errors it raises by the innermost statement which raised them."""
+
+        try:
+            exec(code, namespace)  # pylint: disable=exec-used
+        except NameError as error:
+            # A top-level variable or function used before its declaration has been run
+            if error.name not in transpiler.undeclared:
+                raise
+
+            barnacle_error = RuntimeError(transpiler.undeclared[error.name])
+            self.add_error_position(barnacle_error, self.__offset(transpiler, error.__traceback__))
+            raise barnacle_error from None
+        except RuntimeError as error:
+            self.add_error_position(error, self.__offset(transpiler, error.__traceback__))
+            raise
+
+    @staticmethod
+    def __offset(transpiler: Transpiler, traceback: TracebackType | None) -> int | None:
+        """Return the source offset of the innermost transpiled statement in a traceback."""
+
+        line = None
+
+        while traceback is not None:
+            if traceback.tb_frame.f_code.co_filename == FILENAME:
+                line = traceback.tb_lineno
+
+            traceback = traceback.tb_next
+
+        if line is None or line >= len(transpiler.offsets):
+            return None
+
+        return transpiler.offsets[line]
@@ -0,0 +1,182 @@
+"""
+Implements the helpers which Barnacle programs transpiled into Python call where the transpiler cannot prove the types
+of the values involved, or the checks of Barnacle's scoping rules which Python does not make itself.
+
+Every name the transpiled code uses from here starts with `bcl_`, and no name transpiled from a Barnacle identifier
+does: those end with `_<number>` (variables) or `_f<number>` (functions).
+"""
+
+from typing import Any, Callable
+
+from bcl_interpreter.operations import (
+    calculate_binary_operation,
+    compile_binary_operation,
+)
+
+# The value of a variable or function which is declared in its scope, but whose declaration has not been run yet
+UNDECLARED = type("Undeclared", (), {"__repr__": lambda _: "<undeclared>"})()
+
+
+class StatementExit(Exception):
+    """Ends a top-level statement early (a `return` outside of a function, or a call which returned a truthy value)."""
+
+
+def print_value(value: Any):
+    """Print a value as Barnacle does, with booleans printed as `true` and `false`."""
+
+    if value.__class__ is bool:
+        value = "true" if value else "false"
+
+    print(value)
+
+
+def exit_statement(_: Any = None):
+    """End the current top-level statement, after evaluating the value of a top-level `return` (if any)."""
+
+    raise StatementExit()
+
+
+def no_value(name: str):
+    """Raise the error of a call used in an expression to a function which did not return a value."""
+
+    raise RuntimeError(f"Function '{name}' used in expression but did not return a value")
+
+
+def undeclared_variable(name: str):
+    """Raise the error of getting a variable which has not been declared."""
+
+    raise RuntimeError(f"Tried to get variable '{name}' which has not been declared")
+
+
+def undeclared_update(_: Any, name: str):
+    """Raise the error of updating a variable which has not been declared, after evaluating the value."""
+
+    raise RuntimeError(f"Tried to update variable '{name}' which has not been declared")
+
+
+def undeclared_function(name: str):
+    """Raise the error of getting a function which has not been declared."""
+
+    raise RuntimeError(f"Tried to get function '{name}' which has not been declared")
+
+
+def redeclared_variable(_: Any, name: str):
+    """Raise the error of declaring a variable twice in a scope, after evaluating the value."""
+
+    raise RuntimeError(f"Tried to declare variable '{name}' which already exists")
+
+
+def redeclared_function(name: str):
+    """Raise the error of declaring a function twice in a scope."""
+
+    raise RuntimeError(f"Tried to declare function '{name}' which already exists")
+
+
+def arity_error(name: str, expected: int, provided: int):
+    """Raise the error of a call with the wrong number of arguments, before any of them is evaluated."""
+
+    raise RuntimeError(
+        f"Tried to call function {name} with incorrect number of parameters(expected {expected}, got {provided})"
+    )
+
+
+def raise_error(error: Exception):
+    """Raise an error stored when the program was transpiled (e.g. a syntax error in a lazily parsed function)."""
+
+    raise error
+
+
+def broken_function(error: Exception, parameter_count: int) -> Callable[..., Any]:
+    """
+    Return the stand-in for a function whose code block could not be parsed, which raises the error when it is
+    called. Calls which can be resolved when the program is transpiled raise it directly instead.
+    """
+
+    def broken(*_: Any):
+        raise error
+
+    broken.bcl_error = error
+    broken.bcl_parameter_count = parameter_count
+
+    return broken
+
+
+def duplicate_parameter_function(name: str, parameter_count: int) -> Callable[..., Any]:
+    """
+    Return the stand-in for a function with two parameters of the same name, which raises the error of declaring the
+    second one when it is called (once its arguments have been evaluated, as in the Interpreter).
+    """
+
+    def duplicate_parameter(*_: Any):
+        raise RuntimeError(f"Tried to declare variable '{name}' which already exists")
+
+    duplicate_parameter.bcl_parameter_count = parameter_count
+
+    return duplicate_parameter
+
+
+def check_call(function: Callable[..., Any], name: str, provided: int) -> Callable[..., Any]:
+    """
+    Return a function which could not be resolved when the program was transpiled (e.g. a top-level function declared
+    by a later statement of a streamed source), once it is known that it can be called with the arguments provided.
+    """
+
+    if (error := getattr(function, "bcl_error", None)) is not None:
+        raise error
+
+    expected = getattr(function, "bcl_parameter_count", None)
+
+    if expected is None:
+        expected = function.__code__.co_argcount
+
+    if expected != provided:
+        arity_error(name, expected, provided)
+
+    return function
+
+
+# The helpers of the binary operators the transpiled code calls when the types of the operands are not known
+OPERATION_HELPERS = {
+    "+": "bcl_add",
+    "-": "bcl_subtract",
+    "*": "bcl_multiply",
+    "/": "bcl_divide",
+    "<": "bcl_less",
+    "<=": "bcl_less_equal",
+    ">": "bcl_more",
+    ">=": "bcl_more_equal",
+    "==": "bcl_equal",
+    "!=": "bcl_not_equal",
+}
+
+
+def namespace() -> dict[str, Any]:
+    """Return a new namespace to run a transpiled program in, with the helpers its code uses."""
+
+    names = {
+        "__builtins__": {"print": print},
+        "bcl_undeclared": UNDECLARED,
+        "bcl_statement_exit": StatementExit,
+        "bcl_print": print_value,
+        "bcl_operation": calculate_binary_operation,
+        "bcl_exit": exit_statement,
+        "bcl_no_value": no_value,
+        "bcl_undeclared_variable": undeclared_variable,
+        "bcl_undeclared_update": undeclared_update,
+        "bcl_undeclared_function": undeclared_function,
+        "bcl_redeclared_variable": redeclared_variable,
+        "bcl_redeclared_function": redeclared_function,
+        "bcl_arity_error": arity_error,
+        "bcl_raise": raise_error,
+        "bcl_broken_function": broken_function,
+        "bcl_duplicate_parameter": duplicate_parameter_function,
+        "bcl_check_call": check_call,
+    }
+
+    for operator_name, helper in OPERATION_HELPERS.items():
+        names[helper] = compile_binary_operation(operator_name)
+
+    # Checks of whether a top-level variable or function has been declared yet look it up in the namespace itself
+    names["bcl_namespace"] = names
+
+    return names
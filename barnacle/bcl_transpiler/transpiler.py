@@ -0,0 +1,866 @@
+"""
+Implements the Transpiler class, which translates the AST of a Barnacle program into a Python module.
+"""
+
+import ast as py
+from typing import Any, Callable
+
+from bcl_interpreter.resolver import declared_before, enclosing_scopes, expression_uses, statement_parts
+from bcl_parser import nodes
+from bcl_parser.nodes import NodeKind
+
+from .runtime import OPERATION_HELPERS
+
+# The file name of the transpiled code, by which the engine finds its frames in the traceback of an error
+FILENAME = "<barnacle>"
+
+# The types of value the transpiler can prove an expression has. None (no value yet) is below all of them, and ANY
+# (not proven) above.
+NUMBER = "number"
+STRING = "string"
+BOOLEAN = "boolean"
+ANY = "any"
+
+LITERAL_TYPES = {
+    NodeKind.NUMERIC_LITERAL: NUMBER,
+    NodeKind.STRING_LITERAL: STRING,
+    NodeKind.BOOLEAN_LITERAL: BOOLEAN,
+}
+
+# The Python operators of the Barnacle operators which are transpiled as they are, when the types of their operands
+# are proven to be ones which Python and Barnacle treat alike
+PYTHON_OPERATORS = {
+    "+": py.Add,
+    "-": py.Sub,
+    "*": py.Mult,
+    "/": py.Div,
+}
+
+PYTHON_COMPARISONS = {
+    "<": py.Lt,
+    "<=": py.LtE,
+    ">": py.Gt,
+    ">=": py.GtE,
+    "==": py.Eq,
+    "!=": py.NotEq,
+}
+
+# How a declaration is known to have been run when a name which may refer to it is used: it has been (DEFINITE),
+# it may not have been and its Python name holds `UNDECLARED` until it is (CHECKED), or it is a top-level declaration
+# which may not have been, so Python raises a NameError if it is not (GLOBAL)
+DEFINITE = 0
+CHECKED = 1
+GLOBAL = 2
+
+
+class Declaration:
+    """A variable, parameter or function declared in a scope, and the Python name it is transpiled to."""
+
+    __slots__ = ("name", "python_name", "index", "owner", "checked", "type", "function")
+
+    def __init__(self, name: str, python_name: str, index: int, owner: "Scope | None"):
+        self.name = name
+        self.python_name = python_name
+
+        # The index of the declaring statement within its scope (-1 for a parameter)
+        self.index = index
+
+        # The parameter scope of the function whose Python function the declaration is a local of (None for top level)
+        self.owner = owner
+
+        # Whether the declaration may be used before it has been run, so its Python name starts as `UNDECLARED`
+        self.checked = False
+
+        # The join of the types of every value assigned to a variable
+        self.type: str | None = None
+
+        self.function: FunctionInfo | None = None
+
+
+class FunctionInfo:
+    """The parameters and code block of a declared function."""
+
+    __slots__ = ("parameters", "scope", "body", "error_index", "duplicate_parameter")
+
+    def __init__(self, parameters: list[Declaration], scope: "Scope"):
+        self.parameters = parameters
+        self.scope = scope
+        self.body: nodes.CodeBlock | None = None
+
+        # The index in `Transpiler.errors` of the error parsing the code block, if it could not be parsed
+        self.error_index: int | None = None
+
+        # Declaring the parameters fails on the first one which has the same name as an earlier one
+        self.duplicate_parameter: str | None = None
+
+
+class Scope:
+    """A code block, a function's parameters, or the whole program, and the variables and functions declared in it."""
+
+    __slots__ = ("parent", "index", "owner", "function", "variables", "functions")
+
+    def __init__(self, parent: "Scope | None", index: int, owner: "Scope | None", function: bool = False):
+        self.parent = parent
+
+        # The index within the parent scope of the statement the scope belongs to
+        self.index = index
+        self.owner = owner
+
+        # Whether it is the parameter scope of a function, which may be called at any time after it is declared
+        self.function = function
+
+        self.variables: dict[str, Declaration] = {}
+        self.functions: dict[str, Declaration] = {}
+
+
+class Transpiler:
+    """
+    Translates Barnacle statements into a Python module, which runs as the Interpreter would run them.
+
+    Every declaration becomes a Python name of its own: top-level code and its code blocks become module-level code,
+    and each function becomes a nested `def`, so variables are Python globals, locals or cells. The scope each
+    identifier refers to is resolved statically. Where a function may use a name before the declaration it refers to
+    has been run (e.g. a variable declared after the function), its Python name is checked against `UNDECLARED`
+    first, and errors which can be told statically (e.g. a variable declared twice in a scope) are raised where they
+    would be.
+
+    Binary operators whose operands are proven to be numbers (or, for some, both strings or of the same type) are
+    transpiled into Python's own operators, and every other one into a call to a helper which keeps Barnacle's
+    semantics (see `runtime`). The type of a variable is the join of the types of every value assigned to it.
+
+    A Transpiler may be given the statements of a program all at once, or one top-level statement at a time (e.g. of
+    a streamed source). In that case, the types of top-level variables are not proven, as statements which have not
+    been transpiled yet may assign them.
+
+    Each statement's Python code is given a line number of its own, which `offsets` maps to the source offset of the
+    statement, so that an error can be reported at the innermost statement it was raised in.
+    """
+
+    def __init__(
+        self,
+        parse_code_block: Callable[[nodes.UnparsedCodeBlock], nodes.CodeBlock] | None = None,
+        stream: bool = False,
+    ):
+        self.parse_code_block = parse_code_block
+        self.stream = stream
+
+        # The source offset of the statement of each line number (line numbers start at 1)
+        self.offsets: list[int | None] = [None]
+
+        # The errors the transpiled code raises, which could not be raised when it was transpiled (e.g. syntax errors
+        # in the code blocks of functions, only raised when they are called)
+        self.errors: list[Exception] = []
+
+        # The error raised when each top-level Python name is used before it has been declared
+        self.undeclared: dict[str, str] = {}
+
+        self.__program = Scope(None, 0, None)
+        self.__statement_count = 0
+        self.__name_count = 0
+
+        # What is known about each node, keyed by the node's id
+        self.__scopes: dict[int, Scope] = {}
+        self.__declarations: dict[int, Declaration] = {}
+        self.__resolutions: dict[int, list[tuple[Declaration, int]]] = {}
+        self.__writes: list[tuple[Declaration, nodes.Node]] = []
+
+        # The state of the Python code being generated
+        self.__owner: Scope | None = None
+        self.__depth: int | None = 0
+        self.__line = 0
+        self.__exits = False
+        self.__python_scopes: list[tuple[set[str], set[str]]] = []
+
+    def transpile(self, statements: list[nodes.Node]) -> py.Module:
+        """
+        Transpile top-level statements into a Python module, following those already transpiled.
+
+        The AST is walked recursively, so a RecursionError is raised if it is nested too deeply.
+        """
+
+        first_index = self.__statement_count
+        self.__statement_count += len(statements)
+
+        for index, statement in enumerate(statements, start=first_index):
+            self.__declare_statement(self.__program, index, statement)
+
+        for index, statement in enumerate(statements, start=first_index):
+            self.__resolve_statement(self.__program, index, statement)
+
+        self.__infer_types()
+
+        body = []
+
+        for statement in statements:
+            self.__exits = False
+            python_statements = self.__statement(statement)
+
+            # A top-level `return` (or a truthy call statement) within a code block ends its top-level statement
+            if self.__exits:
+                python_statements = [
+                    self.__located(
+                        py.Try(
+                            body=python_statements,
+                            handlers=[
+                                py.ExceptHandler(type=self.__load("bcl_statement_exit"), name=None, body=[py.Pass()])
+                            ],
+                            orelse=[],
+                            finalbody=[],
+                        ),
+                        python_statements[0].lineno,
+                    )
+                ]
+
+            body += python_statements
+
+        # The nodes may be released once transpiled (e.g. those of a streamed source), so their ids may be reused
+        self.__scopes.clear()
+        self.__declarations.clear()
+        self.__resolutions.clear()
+        self.__writes.clear()
+
+        return py.fix_missing_locations(py.Module(body=body, type_ignores=[]))
+
+    # ==================================================================================================================
+    # Declarations
+    # ==================================================================================================================
+
+    def __declare_statement(self, scope: Scope, index: int, ast: nodes.Node):
+        """Declare the variables and functions of a statement in their scopes, and create the scopes of its blocks."""
+
+        match ast.kind:
+            case NodeKind.VAR_DECLARATION:
+                self.__declare(scope, scope.variables, ast, ast.identifier.name, index)
+            case NodeKind.FUNC_DECLARATION:
+                self.__declare_function(scope, index, ast)
+            case NodeKind.CODE_BLOCK:
+                self.__declare_code_block(Scope(scope, index, scope.owner), ast)
+            case NodeKind.CONDITIONAL:
+                while ast is not None and ast.kind == NodeKind.CONDITIONAL:
+                    self.__declare_code_block(Scope(scope, index, scope.owner), ast.on_true)
+                    ast = ast.on_false
+
+                if ast is not None:
+                    self.__declare_code_block(Scope(scope, index, scope.owner), ast)
+            case NodeKind.WHILE | NodeKind.DO_WHILE:
+                self.__declare_code_block(Scope(scope, index, scope.owner), ast.body)
+
+    def __declare_code_block(self, scope: Scope, ast: nodes.CodeBlock):
+        self.__scopes[id(ast)] = scope
+
+        for index, statement in enumerate(ast.body):
+            self.__declare_statement(scope, index, statement)
+
+    def __declare_function(self, scope: Scope, index: int, ast: nodes.FuncDeclaration):
+        declaration = self.__declare(scope, scope.functions, ast, ast.identifier.name, index)
+
+        if declaration is None:
+            return
+
+        parameter_scope = Scope(scope, index, None, function=True)
+        parameter_scope.owner = parameter_scope
+
+        function = declaration.function = FunctionInfo([], parameter_scope)
+
+        for parameter in ast.parameters:
+            if parameter.name in parameter_scope.variables:
+                function.duplicate_parameter = function.duplicate_parameter or parameter.name
+                function.parameters.append(parameter_scope.variables[parameter.name])
+                continue
+
+            parameter_declaration = self.__declare(
+                parameter_scope, parameter_scope.variables, parameter, parameter.name, -1
+            )
+            parameter_declaration.type = ANY
+            function.parameters.append(parameter_declaration)
+
+        code_block = ast.body
+
+        # The code block of a lazily parsed function is parsed now, but an error parsing it is only raised when the
+        # function is called
+        if code_block.kind == NodeKind.UNPARSED_CODE_BLOCK:
+            try:
+                if self.parse_code_block is None:
+                    raise RuntimeError("Cannot parse the body of a function without the Parser of the source")
+
+                code_block = self.parse_code_block(code_block)
+            except (SyntaxError, RuntimeError) as error:
+                function.error_index = len(self.errors)
+                self.errors.append(error)
+                return
+
+        function.body = code_block
+        self.__declare_code_block(Scope(parameter_scope, 0, parameter_scope), code_block)
+
+    def __declare(
+        self, scope: Scope, table: dict[str, Declaration], ast: nodes.Node, name: str, index: int
+    ) -> Declaration | None:
+        """
+        Declare a name in one of the tables of a scope, unless it is already declared there (which is an error when
+        the statement is run). Return the declaration.
+        """
+
+        if name in table:
+            return None
+
+        kind = "f" if table is scope.functions else ""
+
+        if scope is self.__program:
+            python_name = f"{name}_{kind}0"
+        else:
+            self.__name_count += 1
+            python_name = f"{name}_{kind}{self.__name_count}"
+
+        declaration = table[name] = self.__declarations[id(ast)] = Declaration(name, python_name, index, scope.owner)
+
+        if scope is self.__program:
+            self.__declare_top_level(declaration, bool(kind))
+
+            # A later statement of a stream may assign any value to a top-level variable
+            if self.stream:
+                declaration.type = ANY
+
+        return declaration
+
+    def __declare_top_level(self, declaration: Declaration, function: bool):
+        """Record the error of using a top-level name before it is declared, which Python raises as a NameError."""
+
+        kind = "function" if function else "variable"
+        self.undeclared[declaration.python_name] = (
+            f"Tried to get {kind} '{declaration.name}' which has not been declared"
+        )
+
+    # ==================================================================================================================
+    # Resolution
+    # ==================================================================================================================
+
+    def __resolve_statement(self, scope: Scope, index: int, ast: nodes.Node):
+        """Resolve the declarations each name used in a statement may refer to."""
+
+        for part in statement_parts(ast):
+            if part.kind == NodeKind.CODE_BLOCK:
+                self.__resolve_code_block(part)
+            else:
+                self.__resolve_expression(scope, index, part)
+
+        match ast.kind:
+            case NodeKind.VAR_DECLARATION:
+                if (declaration := self.__declarations.get(id(ast))) is not None:
+                    self.__writes.append((declaration, ast.value))
+            case NodeKind.VAR_ASSIGNMENT:
+                resolution = self.__resolutions[id(ast)] = self.__lookup(scope, index, ast.identifier.name, False)
+                self.__writes += [(declaration, ast.value) for declaration, _ in resolution]
+            case NodeKind.FUNC_DECLARATION:
+                declaration = self.__declarations.get(id(ast))
+
+                if declaration is not None and declaration.function.body is not None:
+                    self.__resolve_code_block(declaration.function.body)
+
+    def __resolve_code_block(self, ast: nodes.CodeBlock):
+        scope = self.__scopes[id(ast)]
+
+        for index, statement in enumerate(ast.body):
+            self.__resolve_statement(scope, index, statement)
+
+    def __resolve_expression(self, scope: Scope, index: int, ast: nodes.Node):
+        for use in expression_uses(ast):
+            if use.kind == NodeKind.IDENTIFIER:
+                self.__resolutions[id(use)] = self.__lookup(scope, index, use.name, False)
+            else:
+                self.__resolutions[id(use)] = self.__lookup(scope, index, use.identifier.name, True)
+
+    def __lookup(self, scope: Scope, index: int, name: str, function: bool) -> list[tuple[Declaration, int]]:
+        """
+        Return the declarations a name used in the statement at the index within the scope may refer to, innermost
+        first, and how each is known to have been run. An empty list means the name is not declared when it is used.
+
+        Within a function, statements run in order, so a declaration has either been run when a name is used, or
+        has not and the name refers to an outer one. A function may be called at any time after it is declared,
+        though, so within its code block, a name may refer to a declaration in an enclosing scope which follows it.
+        Only the last declaration a name may refer to is not CHECKED: it is either DEFINITE, or a GLOBAL top-level
+        declaration (which may also be one which has not been transpiled yet, or does not exist at all).
+        """
+
+        candidates = []
+        crossed = False
+
+        for enclosing, enclosing_index, crossed in enclosing_scopes(scope, index):
+            declaration = (enclosing.functions if function else enclosing.variables).get(name)
+
+            if declaration is not None and declared_before(declaration.index, enclosing_index, crossed):
+                candidates.append((declaration, DEFINITE))
+                return candidates
+
+            if declaration is not None and crossed and enclosing is not self.__program:
+                declaration.checked = True
+                candidates.append((declaration, CHECKED))
+
+        # The last scope is the program's, whose declarations are GLOBAL
+        if crossed:
+            if declaration is None:
+                # Not declared yet, so it stands in for a declaration by a later statement (if there is one)
+                declaration = Declaration(name, f"{name}_{'f' if function else ''}0", self.__statement_count, None)
+                declaration.type = ANY
+                self.__declare_top_level(declaration, function)
+
+            candidates.append((declaration, GLOBAL))
+
+        return candidates
+
+    # ==================================================================================================================
+    # Types
+    # ==================================================================================================================
+
+    def __infer_types(self):
+        """Work out the type of every variable, as the join of the types of the values assigned to it."""
+
+        changed = True
+
+        while changed:
+            changed = False
+
+            for declaration, value in self.__writes:
+                value_type = Transpiler.__join(declaration.type, self.__type(value))
+
+                if value_type != declaration.type:
+                    declaration.type = value_type
+                    changed = True
+
+    def __type(self, ast: nodes.Node) -> str | None:
+        """Return the type of the value of an expression, as far as is known so far."""
+
+        match ast.kind:
+            case NodeKind.STRING_LITERAL | NodeKind.NUMERIC_LITERAL | NodeKind.BOOLEAN_LITERAL:
+                return LITERAL_TYPES[ast.kind]
+            case NodeKind.IDENTIFIER:
+                resolution = self.__resolutions[id(ast)]
+                value_type = None
+
+                for declaration, _ in resolution:
+                    value_type = Transpiler.__join(value_type, declaration.type)
+
+                return value_type if resolution else ANY
+            case NodeKind.BINARY_EXPRESSION:
+                return Transpiler.__operation_type(ast.operator, self.__type(ast.left), self.__type(ast.right))
+            case NodeKind.NARY_EXPRESSION:
+                value_type = self.__type(ast.operands[0])
+
+                for operand in ast.operands[1:]:
+                    value_type = Transpiler.__operation_type(ast.operator, value_type, self.__type(operand))
+
+                return value_type
+
+        return ANY
+
+    @staticmethod
+    def __join(first: str | None, second: str | None) -> str | None:
+        if first is None:
+            return second
+
+        if second is None or first == second:
+            return first
+
+        return ANY
+
+    @staticmethod
+    def __operation_type(operator: str, left: str | None, right: str | None) -> str | None:
+        """Return the type of the result of a binary operation, if it does not raise an error."""
+
+        if operator in PYTHON_COMPARISONS:
+            return BOOLEAN
+
+        if operator in ("*", "/"):
+            return NUMBER
+
+        if operator in ("+", "-"):
+            # Numbers and strings cannot be mixed
+            for operand_type in (NUMBER, STRING, None):
+                if operand_type in (left, right):
+                    return operand_type
+
+        return ANY
+
+    # ==================================================================================================================
+    # Python code
+    # ==================================================================================================================
+
+    def __statement(self, ast: nodes.Node) -> list[py.stmt]:
+        """Transpile a statement into Python statements, numbered with a line of their own."""
+
+        # A statement without an offset (e.g. parsed without positions) reports that of the statement it is in
+        line = self.__line
+
+        if ast.offset is not None:
+            self.offsets.append(ast.offset)
+            line = len(self.offsets) - 1
+
+        previous_line, self.__line = self.__line, line
+
+        match ast.kind:
+            case NodeKind.PRINT:
+                statements = [self.__print(ast)]
+            case NodeKind.VAR_DECLARATION:
+                statements = [self.__var_declaration(ast)]
+            case NodeKind.VAR_ASSIGNMENT:
+                statements = self.__var_assignment(ast)
+            case NodeKind.CODE_BLOCK:
+                statements = self.__nested_code_block(ast)
+            case NodeKind.CONDITIONAL:
+                statements = [self.__conditional(ast)]
+            case NodeKind.WHILE:
+                test, _ = self.__expression(ast.expression)
+                statements = [py.While(test=test, body=self.__nested_code_block(ast.body) or [py.Pass()], orelse=[])]
+            case NodeKind.DO_WHILE:
+                body = self.__nested_code_block(ast.body)
+                test, _ = self.__expression(ast.expression)
+                body.append(py.If(test=py.UnaryOp(op=py.Not(), operand=test), body=[py.Break()], orelse=[]))
+                statements = [py.While(test=py.Constant(True), body=body, orelse=[])]
+            case NodeKind.FUNC_DECLARATION:
+                statements = [self.__func_declaration(ast)]
+            case NodeKind.FUNC_CALL:
+                statements = [self.__call_statement(self.__call(ast))]
+            case NodeKind.RETURN:
+                value, _ = self.__expression(ast.body)
+                statements = [self.__return(value)]
+
+        self.__line = previous_line
+
+        return [self.__located(statement, line) for statement in statements]
+
+    def __code_block(self, scope: Scope, statements: list[nodes.Node]) -> list[py.stmt]:
+        """Transpile the statements of a scope, after setting the names which are CHECKED to `UNDECLARED`."""
+
+        body = [
+            py.Assign(targets=[self.__store(declaration)], value=self.__load("bcl_undeclared"))
+            for declaration in [*scope.variables.values(), *scope.functions.values()]
+            if declaration.checked
+        ]
+
+        for statement in statements:
+            body += self.__statement(statement)
+
+        return body
+
+    def __nested_code_block(self, ast: nodes.CodeBlock) -> list[py.stmt]:
+        if self.__depth is not None:
+            self.__depth += 1
+
+        body = self.__code_block(self.__scopes[id(ast)], ast.body)
+
+        if self.__depth is not None:
+            self.__depth -= 1
+
+        return body
+
+    def __print(self, ast: nodes.Print) -> py.stmt:
+        value, value_type = self.__expression(ast.body)
+
+        if value_type == BOOLEAN:
+            value = py.IfExp(test=value, body=py.Constant("true"), orelse=py.Constant("false"))
+        elif value_type not in (NUMBER, STRING):
+            return py.Expr(self.__call_helper("bcl_print", value))
+
+        return py.Expr(self.__call_helper("print", value))
+
+    def __var_declaration(self, ast: nodes.VarDeclaration) -> py.stmt:
+        value, _ = self.__expression(ast.value)
+        declaration = self.__declarations.get(id(ast))
+
+        if declaration is None:
+            return py.Expr(self.__call_helper("bcl_redeclared_variable", value, py.Constant(ast.identifier.name)))
+
+        return py.Assign(targets=[self.__store(declaration)], value=value)
+
+    def __var_assignment(self, ast: nodes.VarAssignment) -> list[py.stmt]:
+        value, _ = self.__expression(ast.value)
+        name = ast.identifier.name
+        resolution = self.__resolutions[id(ast)]
+
+        if not resolution:
+            return [py.Expr(self.__call_helper("bcl_undeclared_update", value, py.Constant(name)))]
+
+        if resolution[0][1] == DEFINITE:
+            return [py.Assign(targets=[self.__store(resolution[0][0])], value=value)]
+
+        # The value is assigned to the innermost declaration which has been run
+        declaration, mode = resolution[-1]
+        statements = [py.Assign(targets=[self.__store(declaration)], value=self.__load("bcl_value"))]
+
+        if mode == GLOBAL:
+            statements = [
+                py.If(
+                    test=py.Compare(
+                        left=py.Constant(declaration.python_name),
+                        ops=[py.In()],
+                        comparators=[self.__load("bcl_namespace")],
+                    ),
+                    body=statements,
+                    orelse=[
+                        py.Expr(
+                            self.__call_helper("bcl_undeclared_update", self.__load("bcl_value"), py.Constant(name))
+                        )
+                    ],
+                )
+            ]
+
+        for declaration, _ in reversed(resolution[:-1]):
+            statements = [
+                py.If(
+                    test=self.__is_declared(declaration),
+                    body=[py.Assign(targets=[self.__store(declaration)], value=self.__load("bcl_value"))],
+                    orelse=statements,
+                )
+            ]
+
+        return [py.Assign(targets=[py.Name(id="bcl_value", ctx=py.Store())], value=value), *statements]
+
+    def __conditional(self, ast: nodes.Conditional) -> py.stmt:
+        # An 'else if' chain is a conditional in the 'on_false' of the one before it, transpiled into nested `if`s
+        branches = []
+
+        while ast is not None and ast.kind == NodeKind.CONDITIONAL:
+            test, _ = self.__expression(ast.expression)
+            branches.append((test, self.__nested_code_block(ast.on_true) or [py.Pass()]))
+            ast = ast.on_false
+
+        statement = self.__nested_code_block(ast) if ast is not None else []
+
+        for test, body in reversed(branches):
+            statement = [py.If(test=test, body=body, orelse=statement)]
+
+        return statement[0]
+
+    def __func_declaration(self, ast: nodes.FuncDeclaration) -> py.stmt:
+        declaration = self.__declarations.get(id(ast))
+
+        if declaration is None:
+            return py.Expr(self.__call_helper("bcl_redeclared_function", py.Constant(ast.identifier.name)))
+
+        function = declaration.function
+        parameter_count = py.Constant(len(function.parameters))
+
+        if function.error_index is not None:
+            error = self.__error(function.error_index)
+            return py.Assign(
+                targets=[self.__store(declaration)],
+                value=self.__call_helper("bcl_broken_function", error, parameter_count),
+            )
+
+        if function.duplicate_parameter is not None:
+            duplicate = py.Constant(function.duplicate_parameter)
+            return py.Assign(
+                targets=[self.__store(declaration)],
+                value=self.__call_helper("bcl_duplicate_parameter", duplicate, parameter_count),
+            )
+
+        # The code block is transpiled as the body of a `def` of its own, in which Python names of enclosing
+        # functions or the top level which are assigned are declared `nonlocal` or `global`
+        state = (self.__owner, self.__depth)
+        self.__owner, self.__depth = function.scope, None
+        self.__python_scopes.append((set(), set()))
+
+        body = self.__code_block(self.__scopes[id(function.body)], function.body.body)
+
+        global_names, nonlocal_names = self.__python_scopes.pop()
+        self.__owner, self.__depth = state
+
+        if nonlocal_names:
+            body.insert(0, py.Nonlocal(names=sorted(nonlocal_names)))
+
+        if global_names:
+            body.insert(0, py.Global(names=sorted(global_names)))
+
+        arguments = py.arguments(
+            posonlyargs=[],
+            args=[py.arg(arg=parameter.python_name) for parameter in function.parameters],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        )
+
+        fields: dict[str, Any] = {"type_params": []} if "type_params" in py.FunctionDef._fields else {}
+
+        return py.FunctionDef(
+            name=declaration.python_name,
+            args=arguments,
+            body=body or [py.Pass()],
+            decorator_list=[],
+            returns=None,
+            **fields,
+        )
+
+    def __call_statement(self, value: py.expr) -> py.stmt:
+        """
+        Transpile a call statement: a truthy result ends the function it is in (which returns no value), or ends the
+        top-level statement it is in, as in the Interpreter.
+        """
+
+        if self.__depth == 0:
+            return py.Expr(value)
+
+        return py.If(test=value, body=[self.__return(None)], orelse=[])
+
+    def __return(self, value: py.expr | None) -> py.stmt:
+        """Transpile a `return`, which outside of a function only ends the top-level statement it is in."""
+
+        if self.__depth is None:
+            return py.Return(value=value)
+
+        if self.__depth == 0:
+            return py.Expr(value) if value is not None else py.Pass()
+
+        self.__exits = True
+
+        return py.Expr(self.__call_helper("bcl_exit", *([value] if value is not None else [])))
+
+    def __expression(self, ast: nodes.Node) -> tuple[py.expr, str]:
+        """Transpile an expression into a Python expression, and return it with the type of its value."""
+
+        match ast.kind:
+            case NodeKind.STRING_LITERAL | NodeKind.NUMERIC_LITERAL | NodeKind.BOOLEAN_LITERAL:
+                return py.Constant(ast.value), LITERAL_TYPES[ast.kind]
+            case NodeKind.IDENTIFIER:
+                return self.__variable(ast), self.__type(ast) or ANY
+            case NodeKind.BINARY_EXPRESSION:
+                return self.__operation(ast.operator, self.__expression(ast.left), self.__expression(ast.right))
+            case NodeKind.NARY_EXPRESSION:
+                result = self.__expression(ast.operands[0])
+
+                for operand in ast.operands[1:]:
+                    result = self.__operation(ast.operator, result, self.__expression(operand))
+
+                return result
+            case NodeKind.FUNC_CALL:
+                # The result is kept in a temporary name, which is safe to reuse as it is used straight away
+                result = py.NamedExpr(target=py.Name(id="bcl_result", ctx=py.Store()), value=self.__call(ast))
+                check = py.Compare(left=result, ops=[py.IsNot()], comparators=[py.Constant(None)])
+                no_value = self.__call_helper("bcl_no_value", py.Constant(ast.identifier.name))
+
+                return py.IfExp(test=check, body=self.__load("bcl_result"), orelse=no_value), ANY
+
+    def __operation(self, operator: str, left: tuple[py.expr, str], right: tuple[py.expr, str]) -> tuple[py.expr, str]:
+        (left_value, left_type), (right_value, right_type) = left, right
+        result_type = Transpiler.__operation_type(operator, left_type, right_type) or ANY
+
+        if left_type == right_type == NUMBER or (
+            left_type == right_type
+            and left_type not in (None, ANY)
+            and (operator in ("==", "!=") or (operator == "+" and left_type == STRING))
+        ):
+            if operator in PYTHON_OPERATORS:
+                return py.BinOp(left=left_value, op=PYTHON_OPERATORS[operator](), right=right_value), result_type
+
+            if operator in PYTHON_COMPARISONS:
+                return (
+                    py.Compare(left=left_value, ops=[PYTHON_COMPARISONS[operator]()], comparators=[right_value]),
+                    result_type,
+                )
+
+        if operator in OPERATION_HELPERS:
+            return self.__call_helper(OPERATION_HELPERS[operator], left_value, right_value), result_type
+
+        return self.__call_helper("bcl_operation", py.Constant(operator), left_value, right_value), result_type
+
+    def __variable(self, ast: nodes.Identifier) -> py.expr:
+        resolution = self.__resolutions[id(ast)]
+
+        if not resolution:
+            return self.__call_helper("bcl_undeclared_variable", py.Constant(ast.name))
+
+        value = self.__load(resolution[-1][0].python_name)
+
+        for declaration, _ in reversed(resolution[:-1]):
+            value = py.IfExp(
+                test=self.__is_declared(declaration), body=self.__load(declaration.python_name), orelse=value
+            )
+
+        return value
+
+    def __call(self, ast: nodes.FuncCall) -> py.expr:
+        """
+        Transpile a function call. The function is looked up (and the number of arguments checked) before the
+        arguments are evaluated, as in the Interpreter.
+        """
+
+        name = ast.identifier.name
+        resolution = self.__resolutions[id(ast)]
+        count = len(ast.parameters)
+
+        if not resolution:
+            function = self.__call_helper("bcl_undeclared_function", py.Constant(name))
+        else:
+            declaration, mode = resolution[-1]
+            function = self.__function(declaration, name, count)
+
+            # A top-level function which may not have been declared yet is only known to be callable once it has
+            if mode == GLOBAL and not isinstance(function, py.Name):
+                function = self.__call_helper(
+                    "bcl_check_call", self.__load(declaration.python_name), py.Constant(name), py.Constant(count)
+                )
+
+            for declaration, _ in reversed(resolution[:-1]):
+                function = py.IfExp(
+                    test=self.__is_declared(declaration),
+                    body=self.__function(declaration, name, count) or self.__load(declaration.python_name),
+                    orelse=function,
+                )
+
+        arguments = [self.__expression(parameter)[0] for parameter in ast.parameters]
+
+        return py.Call(func=function, args=arguments, keywords=[])
+
+    def __function(self, declaration: Declaration, name: str, count: int) -> py.expr | None:
+        """
+        Return the Python expression which gets a declared function to call with a number of arguments, which raises
+        an error instead if the call would. Return None if the function is not known.
+        """
+
+        function = declaration.function
+
+        if function is None:
+            return None
+
+        if function.error_index is not None:
+            return self.__call_helper("bcl_raise", self.__error(function.error_index))
+
+        if len(function.parameters) != count:
+            return self.__call_helper(
+                "bcl_arity_error", py.Constant(name), py.Constant(len(function.parameters)), py.Constant(count)
+            )
+
+        return self.__load(declaration.python_name)
+
+    # ==================================================================================================================
+    # Python nodes
+    # ==================================================================================================================
+
+    def __store(self, declaration: Declaration) -> py.Name:
+        """Return the target of an assignment to a declaration, declaring it `global` or `nonlocal` if need be."""
+
+        if declaration.owner is not self.__owner:
+            global_names, nonlocal_names = self.__python_scopes[-1]
+            (global_names if declaration.owner is None else nonlocal_names).add(declaration.python_name)
+
+        return py.Name(id=declaration.python_name, ctx=py.Store())
+
+    def __is_declared(self, declaration: Declaration) -> py.expr:
+        return py.Compare(
+            left=self.__load(declaration.python_name), ops=[py.IsNot()], comparators=[self.__load("bcl_undeclared")]
+        )
+
+    def __error(self, index: int) -> py.expr:
+        return py.Subscript(value=self.__load("bcl_errors"), slice=py.Constant(index), ctx=py.Load())
+
+    def __call_helper(self, name: str, *arguments: py.expr) -> py.expr:
+        return py.Call(func=self.__load(name), args=list(arguments), keywords=[])
+
+    @staticmethod
+    def __load(name: str) -> py.Name:
+        return py.Name(id=name, ctx=py.Load())
+
+    @staticmethod
+    def __located(statement: py.stmt, line: int) -> py.stmt:
+        statement.lineno = statement.end_lineno = line
+        statement.col_offset = statement.end_col_offset = 0
+
+        return statement
@@ -0,0 +1,289 @@
+"""
+Implements the VirtualMachine class, which runs Barnacle programs compiled into bytecode.
+"""
+
+import logging
+from typing import Any
+
+from bcl_compiler import compiler
+from bcl_compiler.bytecode import OPERATOR_NAMES, CodeObject, Function, Opcode
+from bcl_interpreter.engine import Engine
+from bcl_interpreter.operations import (
+    EQUALITY_OPERATORS,
+    NUMBER_TYPES,
+    NUMERIC_OPERATORS,
+    calculate_binary_operation,
+)
+from bcl_interpreter.scope import Scope
+
+# The opcodes as plain ints, which the dispatch loop compares against more cheaply than the members of `Opcode`
+LOAD_CONST = int(Opcode.LOAD_CONST)
+LOAD_LOCAL = int(Opcode.LOAD_LOCAL)
+STORE_LOCAL = int(Opcode.STORE_LOCAL)
+DECLARE_LOCAL = int(Opcode.DECLARE_LOCAL)
+POP_TOP = int(Opcode.POP_TOP)
+PRINT = int(Opcode.PRINT)
+JUMP = int(Opcode.JUMP)
+JUMP_IF_FALSE = int(Opcode.JUMP_IF_FALSE)
+JUMP_IF_TRUE = int(Opcode.JUMP_IF_TRUE)
+PUSH_SCOPE = int(Opcode.PUSH_SCOPE)
+POP_SCOPE = int(Opcode.POP_SCOPE)
+DECLARE_FUNCTION = int(Opcode.DECLARE_FUNCTION)
+LOAD_FUNCTION = int(Opcode.LOAD_FUNCTION)
+CHECK_ARITY = int(Opcode.CHECK_ARITY)
+CALL = int(Opcode.CALL)
+CHECK_RESULT = int(Opcode.CHECK_RESULT)
+RETURN = int(Opcode.RETURN)
+BINARY_OPERATION = int(Opcode.BINARY_OPERATION)
+COMPARE_EQUAL = int(Opcode.COMPARE_EQUAL)
+
+# The default number of calls which may be in progress at once, so that unbounded recursion in a Barnacle program
+# raises an error rather than using up all memory
+MAX_CALL_DEPTH = 100_000
+
+# The function of each binary opcode, for operands it handles directly (numbers, or operands of the same type for
+# equality), indexed by opcode. Everything else goes through `calculate_binary_operation`.
+BINARY_FUNCTIONS = [
+    (NUMERIC_OPERATORS | EQUALITY_OPERATORS)[OPERATOR_NAMES[opcode]] for opcode in sorted(OPERATOR_NAMES)
+]
+
+
+class VirtualMachine(Engine):
+    """
+    The Barnacle Interpreter, as a bytecode virtual machine (selected with `--engine vm`).
+
+    The AST is compiled once into code objects (see `bcl_compiler`), which a single dispatch loop runs on a value
+    stack. A function call pushes a frame onto a list rather than recursing, so neither deeply nested expressions nor
+    deep recursion in a Barnacle program are limited by Python's recursion limit. Recursion is instead limited to
+    `max_call_depth` calls in progress at once, beyond which a call raises a RuntimeError.
+
+    It takes the arguments described in `Engine`, and behaves as the `Interpreter` class, including its errors and
+    their positions.
+    """
+
+    def __init__(self, *args, max_call_depth: int = MAX_CALL_DEPTH, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.max_call_depth = max_call_depth
+
+        self.__code: CodeObject | None = None
+
+        # The code objects of lazily parsed functions, keyed by the index of the first token of their code block
+        self.__compiled_code_blocks: dict[int, CodeObject] = {}
+
+    def code(self) -> CodeObject:
+        """Return the code object of the program, compiling it the first time."""
+
+        if self.__code is None:
+            self.__code = compiler.compile_program(self.ast)
+            logging.debug("Compiled AST into bytecode")
+
+        return self.__code
+
+    def run(self):
+        """Runs the Barnacle interpreter on the provided source."""
+
+        global_scope = Scope()
+
+        if self.ast is None:
+            for statement in self.statements():
+                self.__execute(compiler.compile_statement(statement), global_scope)
+
+            return
+
+        self.__execute(self.code(), global_scope)
+
+    def __compile_function(self, function: Function) -> CodeObject:
+        """
+        Compile the code block of a lazily parsed function, the first time it is called. The code block is parsed
+        first, and compiled once however many times the function is declared.
+        """
+
+        code_block = function.code_block
+        code = self.__compiled_code_blocks.get(code_block.first_token)
+
+        if code is None:
+            parsed = self.parse_code_block(code_block)
+            code = self.__compiled_code_blocks[code_block.first_token] = compiler.compile_function(function, parsed)
+
+        function.code = code
+
+        return code
+
+    def __execute(self, code: CodeObject, scope: Scope) -> Any:
+        """Run a code object in the scope, and return its result."""
+
+        # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+        number_types = NUMBER_TYPES
+        binary_functions = BINARY_FUNCTIONS
+        max_call_depth = self.max_call_depth
+
+        instructions = code.instructions
+        constants = code.constants
+        names = code.names
+        pc = 0
+
+        stack: list[Any] = []
+        push = stack.append
+        pop = stack.pop
+
+        # The code object, program counter and scope of each caller
+        frames: list[tuple[CodeObject, int, Scope]] = []
+
+        try:
+            while True:
+                opcode = instructions[pc]
+                argument = instructions[pc + 1]
+                pc += 2
+
+                if opcode < BINARY_OPERATION:
+                    right = pop()
+                    left = stack[-1]
+
+                    if (left.__class__ in number_types and right.__class__ in number_types) or (
+                        opcode >= COMPARE_EQUAL and left.__class__ is right.__class__
+                    ):
+                        stack[-1] = binary_functions[opcode](left, right)
+                    else:
+                        stack[-1] = calculate_binary_operation(OPERATOR_NAMES[opcode], left, right)
+                elif opcode == LOAD_LOCAL:
+                    name = names[argument]
+                    current = scope
+
+                    while current is not None:
+                        variables = current.variables
+
+                        if name in variables:
+                            push(variables[name])
+                            break
+
+                        current = current.parent
+                    else:
+                        raise RuntimeError(f"Tried to get variable '{name}' which has not been declared")
+                elif opcode == LOAD_CONST:
+                    push(constants[argument])
+                elif opcode == STORE_LOCAL:
+                    name = names[argument]
+                    current = scope
+
+                    while current is not None:
+                        variables = current.variables
+
+                        if name in variables:
+                            variables[name] = pop()
+                            break
+
+                        current = current.parent
+                    else:
+                        raise RuntimeError(f"Tried to update variable '{name}' which has not been declared")
+                elif opcode == JUMP_IF_FALSE:
+                    if not pop():
+                        pc = argument
+                elif opcode == JUMP:
+                    pc = argument
+                elif opcode == PUSH_SCOPE:
+                    scope = Scope(scope)
+                elif opcode == POP_SCOPE:
+                    for _ in range(argument):
+                        scope = scope.parent
+                elif opcode == DECLARE_LOCAL:
+                    name = names[argument]
+                    variables = scope.variables
+
+                    if name in variables:
+                        raise RuntimeError(f"Tried to declare variable '{name}' which already exists")
+
+                    variables[name] = pop()
+                elif opcode == LOAD_FUNCTION:
+                    name = names[argument]
+                    current = scope
+
+                    while current is not None:
+                        if (function := current.functions.get(name)) is not None:
+                            break
+
+                        current = current.parent
+                    else:
+                        raise RuntimeError(f"Tried to get function '{name}' which has not been declared")
+
+                    if function.code is None:
+                        self.__compile_function(function)
+
+                    push(function)
+                    push(current)
+                elif opcode == CHECK_ARITY:
+                    # The arguments are only evaluated once their number is known to be right
+                    function = stack[-2]
+                    parameters = function.parameters
+
+                    if argument != len(parameters):
+                        raise RuntimeError(
+                            f"Tried to call function {function.name} with incorrect number of parameters"
+                            f"(expected {len(parameters)}, got {argument})"
+                        )
+                elif opcode == CALL:
+                    values = stack[len(stack) - argument :]
+                    del stack[len(stack) - argument :]
+                    declaring_scope = pop()
+                    function = pop()
+                    parameters = function.parameters
+
+                    if function.duplicate_parameter is not None:
+                        raise RuntimeError(
+                            f"Tried to declare variable '{function.duplicate_parameter}' which already exists"
+                        )
+
+                    if len(frames) >= max_call_depth:
+                        raise RuntimeError(f"Exceeded the maximum call depth of {max_call_depth}")
+
+                    frames.append((code, pc, scope))
+
+                    scope = Scope(declaring_scope)
+                    scope.variables = dict(zip(parameters, values))
+                    scope = Scope(scope)
+
+                    code = function.code
+                    instructions = code.instructions
+                    constants = code.constants
+                    names = code.names
+                    pc = 0
+                elif opcode == RETURN:
+                    if not frames:
+                        return pop()
+
+                    code, pc, scope = frames.pop()
+                    instructions = code.instructions
+                    constants = code.constants
+                    names = code.names
+                elif opcode == CHECK_RESULT:
+                    if stack[-1] is None:
+                        raise RuntimeError(
+                            f"Function '{names[argument]}' used in expression but did not return a value"
+                        )
+                elif opcode == JUMP_IF_TRUE:
+                    if pop():
+                        pc = argument
+                elif opcode == PRINT:
+                    value = pop()
+
+                    if value.__class__ is bool:
+                        value = "true" if value else "false"
+
+                    print(value)
+                elif opcode == POP_TOP:
+                    pop()
+                elif opcode == DECLARE_FUNCTION:
+                    function = constants[argument]
+                    functions = scope.functions
+
+                    if function.name in functions:
+                        raise RuntimeError(f"Tried to declare function '{function.name}' which already exists")
+
+                    functions[function.name] = function
+                else:
+                    right = pop()
+                    stack[-1] = calculate_binary_operation(names[argument], stack[-1], right)
+        except RuntimeError as error:
+            # The error is positioned once here, by the statement of the instruction which raised it
+            self.add_error_position(error, code.positions[(pc - 2) // 2])
+            raise
@@ -5,11 +5,35 @@ The entry point for the Barnacle command line interpreter.
 import argparse
 import json
 import logging
+import mmap
 import sys
+from typing import TextIO
 
+from bcl_cache import cache as cch
+from bcl_compiler import bytecode, compiler
+from bcl_interpreter import closures as clo
 from bcl_interpreter import interpreter as itp
+from bcl_parser import binary, nodes, parallel
 from bcl_parser import parser as prs
+from bcl_tokenizer import stream as tks
 from bcl_tokenizer import tokenizer as tkn
+from bcl_tokenizer.positions import LineIndex
+from bcl_transpiler import interpreter as tsp
+from bcl_vm import vm
+
+# The engines which can run a script, selected with `--engine`
+ENGINES = {
+    "tree": itp.Interpreter,
+    "closure": clo.ClosureInterpreter,
+    "vm": vm.VirtualMachine,
+    "python": tsp.TranspiledInterpreter,
+}
+
+# The forms of the AST stored in the compile cache, fully parsed or with the bodies of functions left unparsed, and
+# the form of the tokens which the unparsed bodies are parsed from
+AST_FORM = "ast"
+LAZY_AST_FORM = "lazy-ast"
+TOKENS_FORM = "tokens"
 
 
 def get_source_from_stdin() -> str:
@@ -33,69 +57,505 @@ def get_source_from_file(script: str) -> str:
     return source
 
 
-def output_tokens(source: str):
-    """Output the tokenization of the source."""
+def get_source_from_mmap(script: str) -> mmap.mmap | bytes:
+    """
+    Map the specified file into memory, without reading or decoding it up front.
 
-    logging.info("🐚 Tokenizer Start 🐚")
+    The mapping is read-only, and the OS pages the file in as the tokenizer scans it.
+    """
+
+    logging.info("🐚 Mapping Script '%s' 🐚", script)
+
+    with open(script, "rb") as script_file:
+        if not script_file.seek(0, 2):
+            # Empty files cannot be mapped
+            return b""
+
+        # The mapping stays valid after the file is closed
+        return mmap.mmap(script_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def get_ast_from_file(path: str) -> nodes.Node:
+    """
+    Read an AST from the specified file, either in its binary form (as written by `barnacle compile --output`)
+    or its dict form as JSON (as output by `--show-ast`).
+    """
+
+    logging.info("🐚 Reading AST '%s' 🐚", path)
+
+    with open(path, "rb") as ast_file:
+        data = ast_file.read()
+
+    if data.startswith(binary.MAGIC):
+        return binary.loads(data)
+
+    return nodes.from_dict(json.loads(data))
+
+
+def output_tokens(tokenizer: tkn.Tokenizer, positions: bool = False):
+    """Output the tokens of a tokenized source, optionally with the line and column of each token."""
+
+    # The last token is the PROGRAM_END sentinel, which is not output
+    for index in range(len(tokenizer) - 1):
+        token = tokenizer.token(index)
 
-    tokenizer = tkn.Tokenizer(source)
+        if positions:
+            token["line"], token["column"] = tokenizer.position(index)
 
-    while not tokenizer.end_of_stream():
-        print(tokenizer.next_token())
+        print(token)
+
+
+def output_streamed_tokens(stream: TextIO):
+    """Output the tokenization of a script stream, which is read in chunks rather than all at once."""
+
+    logging.info("🐚 Tokenizer Start 🐚")
+
+    for token in tks.iter_tokens(stream):
+        if token["type"] != "PROGRAM_END":
+            print(token)
 
     logging.info("🐚 Tokenizer End 🐚")
 
 
-def output_ast(source: str):
-    """Output the AST of the source."""
+def stream_tokens(script: str):
+    """Output the tokenization of the script, streaming it from standard input or the specified file."""
 
-    logging.info("🐚 Parser Start 🐚")
+    if script == "-":
+        logging.info("🐚 Streaming Script from STDIN 🐚")
+        output_streamed_tokens(sys.stdin)
+        return
 
-    parser = prs.Parser(source)
-    ast = parser.parse()
-    print(json.dumps(ast, indent=4))
+    logging.info("🐚 Streaming Script '%s' 🐚", script)
 
-    logging.info("🐚 Parser End 🐚")
+    with open(script, "r", encoding="utf-8") as script_file:
+        output_streamed_tokens(script_file)
 
 
-def interpret_file(source: str):
-    """Interpret the source."""
+def print_ast(ast: nodes.Node, positions: bool = True):
+    """Output the AST as compact JSON, writing it out as it is generated, optionally with the offsets of statements."""
 
-    logging.info("🐚 Interpreter Start 🐚")
+    nodes.write_json(ast, sys.stdout, offsets=positions)
+    sys.stdout.write("\n")
+
+
+def print_bytecode(ast: nodes.Program, source: str | bytes | mmap.mmap | None = None):
+    """
+    Output the disassembled bytecode of the AST, as run by the virtual machine, and that of every function it declares.
+    If the source is given, instructions are labelled with their source lines.
+    """
+
+    line_index = LineIndex(source) if source is not None else None
+
+    for line in bytecode.disassemble(compiler.compile_program(ast), line_index):
+        print(line)
+
+
+class Pipeline:
+    """
+    The stages of running a script from the command line: tokenizing, parsing and interpreting it.
+
+    Each stage is run at most once, and only when something needs its result: the tokens output by `--show-tokens`
+    are the ones which are parsed, and the AST output by `--show-ast` is the one which is interpreted. The AST always
+    records positions (they are left out of `--show-ast` unless asked for), so it can be shared by every stage.
+
+    If `lazy_functions` is True, the bodies of functions are only parsed when they are first called. If a compile
+    `cache` is given, the AST is loaded from it rather than parsed, or parsed and stored in it on a miss. A lazily
+    parsed AST is cached apart from a fully parsed one, along with the tokens of the source, so that its function
+    bodies can still be parsed when first called without tokenizing the source. The AST is run by the named `engine`
+    (one of `ENGINES`).
+    """
+
+    def __init__(
+        self,
+        source: str | bytes | mmap.mmap,
+        parse_workers: int = 1,
+        lazy_functions: bool = False,
+        cache: cch.CompileCache | None = None,
+        engine: str = "tree",
+    ):
+        self.source = source
+        self.parse_workers = parse_workers
+        self.lazy_functions = lazy_functions
+        self.cache = cache
+        self.engine = engine
+
+        self.__tokenizer = None
+        self.__parser = None
+        self.__ast = None
+
+        # Whether the AST was parsed here (rather than loaded from the cache), so needs no validation
+        self.__parsed = False
+
+    def tokenizer(self) -> tkn.Tokenizer:
+        """Return the tokens of the source, tokenizing it the first time they are needed."""
+
+        if self.__tokenizer is None:
+            logging.info("🐚 Tokenizer Start 🐚")
+            self.__tokenizer = tkn.Tokenizer(self.source)
+            logging.info("🐚 Tokenizer End 🐚")
+
+        return self.__tokenizer
+
+    def ast(self) -> nodes.Program:
+        """
+        Return the AST of the source, loading it from the compile cache or parsing it the first time it is needed.
+
+        If parsing fails at any point, a SyntaxError will be raised.
+        """
+
+        if self.__ast is None and self.cache is not None:
+            self.__ast = self.__load_cached()
+
+        if self.__ast is None:
+            logging.info("🐚 Parser Start 🐚")
+            self.__ast = self.__parse()
+            self.__parsed = True
+            logging.info("🐚 Parser End 🐚")
+
+        return self.__ast
+
+    def run(self):
+        """Interpret the AST of the source."""
+
+        ast = self.ast()
+
+        logging.info("🐚 Interpreter Start 🐚")
+        ENGINES[self.engine](self.source, ast=ast, parser=self.__parser, verified=self.__parsed).run()
+        logging.info("🐚 Interpreter End 🐚")
+
+    def __load_cached(self) -> nodes.Program | None:
+        """
+        Return the AST of the source from the compile cache, or None if it is not cached.
+
+        The bodies of functions in a lazily parsed AST are parsed from the tokens of the source, so its tokens are
+        loaded from the cache along with it.
+        """
+
+        data = self.cache.load(self.source, self.__cache_form())
+
+        if data is None:
+            return None
+
+        try:
+            ast = binary.loads(data)
+        except ValueError as error:
+            logging.warning("Ignoring corrupted AST in the compile cache: %s", error)
+            return None
+
+        if self.__parses_lazily():
+            tokenizer = self.__load_cached_tokens()
+
+            if tokenizer is None:
+                return None
+
+            self.__tokenizer = tokenizer
+            self.__parser = prs.Parser(tokenizer, positions=True, lazy_functions=True)
+
+        logging.info("🐚 Loaded AST from Compile Cache 🐚")
+
+        return ast
+
+    def __load_cached_tokens(self) -> tkn.Tokenizer | None:
+        """Return the Tokenizer of the source with its tokens from the compile cache, or None if they are not cached."""
+
+        data = self.cache.load(self.source, TOKENS_FORM)
+
+        if data is None:
+            return None
 
-    interpreter = itp.Interpreter(source)
-    interpreter.run()
+        try:
+            return tkn.Tokenizer.loads(self.source, data)
+        except ValueError as error:
+            logging.warning("Ignoring corrupted tokens in the compile cache: %s", error)
+            return None
 
+    def __parse(self) -> nodes.Program:
+        """
+        Parse the source, from its tokens unless it is parsed in parallel (where each worker tokenizes its own part).
+        """
+
+        if self.__parses_lazily():
+            parser = prs.Parser(self.tokenizer(), positions=True, lazy_functions=True)
+            ast = parser.parse()
+
+            # Unparsed function bodies are parsed by the same Parser, so it is only kept if there may be some
+            self.__parser = parser
+        elif self.parse_workers > 1:
+            ast = parallel.parse_parallel(self.source, self.parse_workers, positions=True)
+        else:
+            ast = prs.Parser(self.tokenizer(), positions=True).parse()
+
+        if self.cache is not None:
+            self.cache.store(self.source, self.__cache_form(), binary.dumps(ast))
+
+            if self.__parses_lazily():
+                self.cache.store(self.source, TOKENS_FORM, self.tokenizer().dumps())
+
+        return ast
+
+    def __parses_lazily(self) -> bool:
+        """Return whether function bodies are parsed lazily, which parsing in parallel does not support."""
+
+        return self.lazy_functions and self.parse_workers == 1
+
+    def __cache_form(self) -> str:
+        """Return the form of the AST in the compile cache, as a lazily parsed AST is cached apart from a full one."""
+
+        return LAZY_AST_FORM if self.__parses_lazily() else AST_FORM
+
+
+def stream_interpret(script: str, engine: str = "tree"):
+    """Interpret the script a statement at a time, streaming it from standard input or the specified file."""
+
+    if script == "-":
+        logging.info("🐚 Streaming Script from STDIN 🐚")
+        interpret_stream(sys.stdin, engine)
+        return
+
+    logging.info("🐚 Streaming Script '%s' 🐚", script)
+
+    with open(script, "r", encoding="utf-8") as script_file:
+        interpret_stream(script_file, engine)
+
+
+def interpret_stream(stream: TextIO, engine: str = "tree"):
+    """Interpret a text stream a statement at a time, with the named engine."""
+
+    logging.info("🐚 Interpreter Start 🐚")
+    ENGINES[engine](stream).run()
     logging.info("🐚 Interpreter End 🐚")
 
 
-def main():
-    """Main entry point to the Barnacle interpreter"""
+def compile_scripts(argv: list[str]):
+    """
+    Entry point to `barnacle compile`, which parses scripts ahead of time and stores their ASTs in the compile cache,
+    so that running them does not need to parse them.
+
+    With `--output`, the binary AST of a script is written to a file instead, which can be run with `--from-ast`
+    (e.g. to parse scripts on a build machine, and run them elsewhere).
+    """
+
+    arg_parser = argparse.ArgumentParser(prog="barnacle compile", description="Barnacle Compiler")
+
+    arg_parser.add_argument("scripts", help="Barnacle scripts to compile", nargs="+")
+    arg_parser.add_argument("-l", "--log-level", help="Logging level (default INFO)", default="INFO")
+    arg_parser.add_argument("--log-file", help="Redirect logs to the provided file instead of standard error")
+    arg_parser.add_argument("--cache-dir", help="Compile cache directory (default $BARNACLE_CACHE_DIR or ~/.cache)")
+    arg_parser.add_argument(
+        "-o", "--output", help="Write the binary AST of the script to this file instead of the cache"
+    )
+
+    args = arg_parser.parse_args(argv)
+
+    if args.output is not None and len(args.scripts) != 1:
+        arg_parser.error("--output needs exactly one script")
+
+    logging.basicConfig(format="%(asctime)s|%(message)s", filename=args.log_file, level=args.log_level)
+
+    if args.output is not None:
+        source = get_source_from_file(args.scripts[0])
+
+        logging.info("🐚 Parser Start 🐚")
+        ast = prs.Parser(source, positions=True).parse()
+        logging.info("🐚 Parser End 🐚")
+
+        with open(args.output, "wb") as ast_file:
+            binary.dump(ast, ast_file)
+        return
+
+    cache = cch.CompileCache(args.cache_dir)
+
+    for script in args.scripts:
+        source = get_source_from_file(script)
+
+        if all(cache.load(source, form) is not None for form in (AST_FORM, LAZY_AST_FORM, TOKENS_FORM)):
+            logging.info("🐚 Script '%s' is already compiled 🐚", script)
+            continue
+
+        # Both forms of the AST are cached, as scripts are run with function bodies parsed lazily unless checked
+        logging.info("🐚 Parser Start 🐚")
+        tokenizer = tkn.Tokenizer(source)
+        lazy_parser = prs.Parser(tokenizer, positions=True, lazy_functions=True)
+
+        cache.store(source, AST_FORM, binary.dumps(prs.Parser(tokenizer, positions=True).parse()))
+        cache.store(source, LAZY_AST_FORM, binary.dumps(lazy_parser.parse()))
+        cache.store(source, TOKENS_FORM, tokenizer.dumps())
+        logging.info("🐚 Parser End 🐚")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Build the parser of the arguments of the Barnacle interpreter."""
 
     cmd_desc = "Barnacle Interpreter"
     arg_parser = argparse.ArgumentParser(description=cmd_desc)
 
-    arg_parser.add_argument("script", help="Barnacle script to interpret (if '-', read from stdin)")
+    arg_parser.add_argument("script", help="Barnacle script to interpret (if '-', read from stdin)", nargs="?")
     arg_parser.add_argument("-l", "--log-level", help="Logging level (default INFO)", default="INFO")
     arg_parser.add_argument("--log-file", help="Redirect logs to the provided file instead of standard error")
     arg_parser.add_argument("--show-tokens", help="Output the tokenization of the script", action="store_true")
     arg_parser.add_argument("--show-ast", help="Output the parsed AST of the script", action="store_true")
+    arg_parser.add_argument(
+        "--show-bytecode",
+        help="Output the disassembled bytecode of the script (as run by --engine vm)",
+        action="store_true",
+    )
+    arg_parser.add_argument(
+        "--show-positions",
+        help="Include token lines and columns in --show-tokens, and statement offsets in --show-ast",
+        action="store_true",
+    )
     arg_parser.add_argument("--no-run", help="Do not interpret the script", action="store_true")
+    arg_parser.add_argument(
+        "--check",
+        help="Parse the bodies of all functions up front, rather than when first called, to report any syntax error",
+        action="store_true",
+    )
+    arg_parser.add_argument("--mmap", help="Memory-map the script instead of reading it up front", action="store_true")
+    arg_parser.add_argument(
+        "--stream",
+        help="Read the script as a stream, running each top-level statement as soon as it has been parsed",
+        action="store_true",
+    )
+
+    arg_parser.add_argument(
+        "--from-ast",
+        help="Run an AST written by 'barnacle compile --output' (or output by --show-ast) instead of a script",
+    )
+    arg_parser.add_argument(
+        "--no-cache",
+        help="Always parse the script, rather than loading its AST from (and storing it in) the compile cache",
+        action="store_true",
+    )
+    arg_parser.add_argument("--cache-dir", help="Compile cache directory (default $BARNACLE_CACHE_DIR or ~/.cache)")
+
+    arg_parser.add_argument(
+        "--engine",
+        help=(
+            "Engine which runs the script: 'tree' walks the AST, 'closure' compiles it into closures, "
+            "'vm' compiles it into bytecode for a virtual machine, 'python' transpiles it into Python (default tree)"
+        ),
+        choices=ENGINES,
+        default="tree",
+    )
+
+    arg_parser.add_argument(
+        "--parse-workers",
+        help="Parse large scripts in parallel across this many processes (default 1)",
+        type=int,
+        default=1,
+    )
+
+    return arg_parser
+
+
+def validate_args(arg_parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """Report an error (and exit) if the arguments combine modes which cannot be used together."""
+
+    if (args.script is None) == (args.from_ast is None):
+        arg_parser.error("either a script or --from-ast is required, but not both")
+
+    if args.from_ast is not None and any((args.show_tokens, args.check, args.mmap, args.stream)):
+        arg_parser.error("--from-ast cannot be used with --show-tokens, --check, --mmap or --stream")
+
+    if args.parse_workers < 1:
+        arg_parser.error("--parse-workers must be at least 1")
+
+    if args.mmap and args.script == "-":
+        arg_parser.error("--mmap cannot be used when reading from stdin")
+
+    if args.stream and any((args.mmap, args.show_tokens, args.show_ast, args.show_bytecode, args.parse_workers > 1)):
+        arg_parser.error(
+            "--stream cannot be used with --mmap, --show-tokens, --show-ast, --show-bytecode or --parse-workers"
+        )
+
+
+def only_tokens(args: argparse.Namespace) -> bool:
+    """Return whether the tokens of the script are all that is output, without positions, and it is not run."""
+
+    return (
+        args.show_tokens
+        and args.no_run
+        and not any((args.show_ast, args.show_bytecode, args.mmap, args.show_positions, args.check))
+    )
+
+
+def run_ast(args: argparse.Namespace):
+    """Output and run the AST read from `--from-ast`, rather than a script."""
+
+    ast = get_ast_from_file(args.from_ast)
 
-    args = arg_parser.parse_args()
+    if args.show_ast:
+        print_ast(ast, positions=args.show_positions)
 
-    logging.basicConfig(format="%(asctime)s|%(message)s", filename=args.log_file, level=args.log_level)
+    if args.show_bytecode:
+        print_bytecode(ast)
 
-    source = get_source_from_stdin() if args.script == "-" else get_source_from_file(args.script)
+    if not args.no_run:
+        logging.info("🐚 Interpreter Start 🐚")
+        ENGINES[args.engine](None, ast=ast).run()
+        logging.info("🐚 Interpreter End 🐚")
+
+
+def run_script(args: argparse.Namespace):
+    """Output and run the script, read from standard input or the specified file."""
+
+    if args.mmap:
+        source = get_source_from_mmap(args.script)
+    elif args.script == "-":
+        source = get_source_from_stdin()
+    else:
+        source = get_source_from_file(args.script)
+
+    # Function bodies are parsed when first called, unless the whole script has to be checked or output up front
+    pipeline = Pipeline(
+        source,
+        parse_workers=args.parse_workers,
+        lazy_functions=not (args.check or args.show_ast or args.show_bytecode),
+        cache=None if args.no_cache else cch.CompileCache(args.cache_dir),
+        engine=args.engine,
+    )
 
     if args.show_tokens:
-        output_tokens(source)
+        output_tokens(pipeline.tokenizer(), positions=args.show_positions)
 
     if args.show_ast:
-        output_ast(source)
+        print_ast(pipeline.ast(), positions=args.show_positions)
 
-    if not args.no_run:
-        interpret_file(source)
+    if args.show_bytecode:
+        print_bytecode(pipeline.ast(), source)
+
+    if args.no_run:
+        if args.check and not (args.show_ast or args.show_bytecode):
+            logging.info("🐚 Syntax Check Start 🐚")
+            pipeline.ast()
+            logging.info("🐚 Syntax Check End 🐚")
+    else:
+        pipeline.run()
+
+
+def main():
+    """Main entry point to the Barnacle interpreter"""
+
+    if sys.argv[1:2] == ["compile"]:
+        compile_scripts(sys.argv[2:])
+        return
+
+    arg_parser = build_arg_parser()
+    args = arg_parser.parse_args()
+    validate_args(arg_parser, args)
+
+    logging.basicConfig(format="%(asctime)s|%(message)s", filename=args.log_file, level=args.log_level)
+
+    if args.from_ast is not None:
+        run_ast(args)
+    elif only_tokens(args):
+        # Only the tokens are needed, so the script can be streamed rather than read into memory
+        stream_tokens(args.script)
+    elif args.stream:
+        if not args.no_run:
+            stream_interpret(args.script, args.engine)
+    else:
+        run_script(args)
 
 
 if __name__ == "__main__":
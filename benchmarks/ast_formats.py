@@ -0,0 +1,75 @@
+"""
+Measures the time taken to save and load the AST of a large Barnacle script in each of its serialized forms.
+
+Loading the compact binary form (`bcl_parser.binary`) is compared against tokenizing and parsing the script, and
+against unpickling the AST (which is what the compile cache used to store). Writing the AST out as compact JSON
+with `nodes.write_json()` is compared against `json.dumps()` of its dict form, as `--show-ast` used to output it.
+Every form is checked to load back to the parsed AST before anything is timed.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/ast_formats.py [--size <characters>] [--repeat <count>]`
+"""
+
+import argparse
+import io
+import json
+import pickle
+import time
+
+from bcl_parser import binary, nodes
+from bcl_parser import parser as prs
+from parallel_parse import generate_source
+
+
+def measure(function, repeat: int) -> float:
+    """Return the best time taken by the function, in milliseconds."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best * 1000
+
+
+def main():
+    """Run the AST formats benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle AST formats benchmark")
+    arg_parser.add_argument("--size", help="Size of the generated script in characters", type=int, default=1_000_000)
+    arg_parser.add_argument("--repeat", help="Number of timed runs per approach (best is kept)", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    source = generate_source(args.size)
+    ast = prs.Parser(source, positions=True).parse()
+
+    binary_data = binary.dumps(ast)
+    pickle_data = pickle.dumps(ast, protocol=pickle.HIGHEST_PROTOCOL)
+    json_stream = io.StringIO()
+    nodes.write_json(ast, json_stream)
+
+    if binary.loads(binary_data) != ast or pickle.loads(pickle_data) != ast:
+        raise AssertionError("A loaded AST differs from the parsed AST")
+
+    if nodes.from_dict(json.loads(json_stream.getvalue())) != ast:
+        raise AssertionError("The JSON AST differs from the parsed AST")
+
+    parse_time = measure(lambda: prs.Parser(source, positions=True).parse(), args.repeat)
+    binary_time = measure(lambda: binary.loads(binary_data), args.repeat)
+    pickle_time = measure(lambda: pickle.loads(pickle_data), args.repeat)
+    dumps_time = measure(lambda: json.dumps(nodes.to_dict(ast), indent=4), args.repeat)
+    write_time = measure(lambda: nodes.write_json(ast, io.StringIO()), args.repeat)
+
+    print(f"Script size:                {len(source):>12,} characters")
+    print(f"Binary AST size:            {len(binary_data):>12,} bytes")
+    print(f"Pickled AST size:           {len(pickle_data):>12,} bytes")
+    print(f"Tokenize and parse:         {parse_time:>12.3f} ms")
+    print(f"Unpickle:                   {pickle_time:>12.3f} ms ({parse_time / pickle_time:.1f}x)")
+    print(f"Load binary AST:            {binary_time:>12.3f} ms ({parse_time / binary_time:.1f}x)")
+    print(f"JSON with json.dumps():     {dumps_time:>12.3f} ms")
+    print(f"JSON with write_json():     {write_time:>12.3f} ms ({dumps_time / write_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Measures the memory taken by the AST of a large Barnacle script.
+
+The AST node classes built by the Parser, and the flat node table it can emit instead, are compared against the
+dict form of the same AST (which is what the Parser used to build, and what `--show-ast` outputs). Memory is
+measured with `tracemalloc`, after the source has been tokenized, so only the AST itself is counted.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/ast_memory.py [--size <characters>]`
+"""
+
+import argparse
+import tracemalloc
+
+from bcl_parser import nodes
+from bcl_parser import parser as prs
+from bcl_parser.table import NodeTable
+from parallel_parse import generate_source
+
+
+def measure(function) -> tuple[object, int]:
+    """Return the result of the function, and the memory still allocated by it afterwards in bytes."""
+
+    tracemalloc.start()
+    result = function()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, allocated
+
+
+def main():
+    """Run the AST memory benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle AST memory benchmark")
+    arg_parser.add_argument("--size", help="Size of the generated script in characters", type=int, default=1_000_000)
+    args = arg_parser.parse_args()
+
+    source = generate_source(args.size)
+    parser = prs.Parser(source)
+    table_parser = prs.Parser(source, builder=NodeTable())
+
+    ast, node_bytes = measure(parser.parse)
+    _, dict_bytes = measure(lambda: nodes.to_dict(ast))
+    _, table_bytes = measure(table_parser.parse)
+    node_count = sum(1 for _ in nodes.walk(ast))
+
+    print(f"Script size:                {len(source):>12,} characters ({node_count:,} nodes)")
+    for name, allocated in (("Dict AST", dict_bytes), ("Node AST", node_bytes), ("Node table", table_bytes)):
+        print(f"{name + ':':<28}{allocated / 1_000_000:>12.3f} MB ({allocated / node_count:.0f} bytes per node)")
+
+
+if __name__ == "__main__":
+    main()
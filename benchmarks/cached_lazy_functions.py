@@ -0,0 +1,80 @@
+"""
+Measures the time taken to run a prelude-heavy Barnacle script as the command line does by default, with function
+bodies parsed lazily and the compile cache on.
+
+The script declares many functions but only calls a few of them (as in `lazy_functions.py`). Each run goes through a
+`Pipeline`, from tokenizing the source to interpreting it, with its output discarded. The default run, which loads
+the lazily parsed AST from a warm cache, is compared against running without the cache (`--no-cache`), running with
+a cold cache, and loading the fully parsed AST from a warm cache instead (as `--check` does).
+
+Usage: `PYTHONPATH=barnacle python benchmarks/cached_lazy_functions.py [--functions <count>] [--repeat <count>]`
+"""
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+from bcl_cache import cache as cch
+from lazy_functions import generate_source
+from main import Pipeline
+
+
+def measure(source: str, lazy_functions: bool, cache: cch.CompileCache | None, repeat: int) -> float:
+    """Return the best time taken to run the source with the given compile cache, in milliseconds."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            Pipeline(source, lazy_functions=lazy_functions, cache=cache).run()
+            best = min(best, time.perf_counter() - start)
+
+    return best * 1000
+
+
+def measure_cold(source: str, repeat: int) -> float:
+    """Return the best time taken to run the source by default with an empty compile cache, in milliseconds."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as directory:
+            best = min(best, measure(source, True, cch.CompileCache(directory), 1))
+
+    return best
+
+
+def main():
+    """Run the cached lazy function parsing benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle cached lazy function parsing benchmark")
+    arg_parser.add_argument("--functions", help="Number of functions declared by the script", type=int, default=2000)
+    arg_parser.add_argument("--repeat", help="Number of timed runs per approach (best is kept)", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    source = generate_source(args.functions)
+    no_cache_time = measure(source, True, None, args.repeat)
+    cold_time = measure_cold(source, args.repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = cch.CompileCache(directory)
+
+        # The first run of each fills the cache
+        measure(source, True, cache, 1)
+        measure(source, False, cache, 1)
+
+        default_time = measure(source, True, cache, args.repeat)
+        full_time = measure(source, False, cache, args.repeat)
+
+    print(f"Script size:                {len(source):>12,} characters ({args.functions:,} functions)")
+    print(f"Lazy, no cache:             {no_cache_time:>12.1f} ms")
+    print(f"Lazy, cold cache:           {cold_time:>12.1f} ms")
+    print(f"Lazy, warm cache (default): {default_time:>12.1f} ms ({no_cache_time / default_time:.2f}x)")
+    print(f"Full, warm cache:           {full_time:>12.1f} ms ({no_cache_time / full_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Measures the time taken to get the AST of a large Barnacle script from the compile cache.
+
+Loading the cached AST is compared against tokenizing and parsing the script, which is what running a script costs
+without the cache. The cache lives in a temporary directory, and its AST is checked to be identical to the parsed
+one before anything is timed. As when running a script, the cache holds the binary form of the AST.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/compile_cache.py [--size <characters>] [--repeat <count>]`
+"""
+
+import argparse
+import tempfile
+import time
+
+from bcl_cache import cache as cch
+from bcl_parser import binary, nodes
+from bcl_parser import parser as prs
+from parallel_parse import generate_source
+
+
+def measure(function, repeat: int) -> float:
+    """Return the best time taken by the function, in milliseconds."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best * 1000
+
+
+def main():
+    """Run the compile cache benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle compile cache benchmark")
+    arg_parser.add_argument("--size", help="Size of the generated script in characters", type=int, default=1_000_000)
+    arg_parser.add_argument("--repeat", help="Number of timed runs per approach (best is kept)", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    source = generate_source(args.size)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = cch.CompileCache(directory)
+        ast = prs.Parser(source, positions=True).parse()
+
+        store_time = measure(lambda: cache.store(source, "ast", binary.dumps(ast)), 1)
+
+        if nodes.to_dict(binary.loads(cache.load(source, "ast"))) != nodes.to_dict(ast):
+            raise AssertionError("The cached AST differs from the parsed AST")
+
+        parse_time = measure(lambda: prs.Parser(source, positions=True).parse(), args.repeat)
+        load_time = measure(lambda: binary.loads(cache.load(source, "ast")), args.repeat)
+
+    print(f"Script size:                {len(source):>12,} characters")
+    print(f"Tokenize and parse:         {parse_time:>12.3f} ms")
+    print(f"Store in cache:             {store_time:>12.3f} ms")
+    print(f"Load from cache:            {load_time:>12.3f} ms ({parse_time / load_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
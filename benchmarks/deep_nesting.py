@@ -0,0 +1,56 @@
+"""
+Measures the time taken by the Barnacle Parser on deeply nested scripts.
+
+Each kind of nesting is parsed at increasing depths, well beyond Python's recursion limit, to show that parsing time
+grows linearly with the depth of nesting. The source is tokenized before the timer starts, so only parsing is measured.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/deep_nesting.py [--depth <levels>] [--repeat <count>]`
+"""
+
+import argparse
+import time
+
+from bcl_parser import parser as prs
+
+SOURCES = {
+    "Code blocks": lambda depth: "{" * depth + "print 1" + "}" * depth,
+    "While loops": lambda depth: "while x { " * depth + "print 1" + " }" * depth,
+    "Else if chain": lambda depth: " else ".join(f"if x == {index} {{ print {index} }}" for index in range(depth)),
+    "Parentheses": lambda depth: "print " + "(" * depth + "1" + ")" * depth,
+    "Function calls": lambda depth: "print " + "f(x, " * depth + "1" + ")" * depth,
+}
+
+
+def measure(source: str, repeat: int) -> float:
+    """Return the best time taken to parse the source, in seconds."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        parser = prs.Parser(source)
+
+        start = time.perf_counter()
+        parser.parse()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main():
+    """Run the deep nesting benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle Parser deep nesting benchmark")
+    arg_parser.add_argument("--depth", help="Deepest level of nesting to parse", type=int, default=100_000)
+    arg_parser.add_argument("--repeat", help="Number of timed runs (best is kept)", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    depths = [args.depth // 100, args.depth // 10, args.depth]
+
+    print(f"{'Depth:':<28}" + "".join(f"{depth:>14,}" for depth in depths))
+    for name, generate_source in SOURCES.items():
+        timings = [measure(generate_source(depth), args.repeat) for depth in depths]
+        print(f"{name + ':':<28}" + "".join(f"{timing * 1000:>11.1f} ms" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measures the time taken to re-parse a large Barnacle script after a single-character edit.
+
+Re-parsing only the statements around the edit with `Parser.reparse()` is compared against tokenizing and parsing
+the whole edited script from scratch. The re-parsed AST is checked to be identical to the fully parsed one before
+anything is timed. As `reparse()` updates the AST in place, each timed run re-parses a freshly parsed AST.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/incremental_parser.py [--size <characters>] [--repeat <count>]`
+"""
+
+import argparse
+import time
+
+from bcl_parser import nodes
+from bcl_parser import parser as prs
+from bcl_tokenizer.edits import TextEdit
+from parallel_parse import generate_source
+
+
+def measure_reparse(source: str, edit: TextEdit, repeat: int) -> float:
+    """Return the best time taken to re-parse a freshly parsed AST of the source after the edit, in milliseconds."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        parser = prs.Parser(source, positions=True)
+        ast = parser.parse()
+
+        start = time.perf_counter()
+        parser.reparse(ast, edit)
+        best = min(best, time.perf_counter() - start)
+
+    return best * 1000
+
+
+def measure_parse(source: str, repeat: int) -> float:
+    """Return the best time taken to tokenize and parse the source, in milliseconds."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        prs.Parser(source, positions=True).parse()
+        best = min(best, time.perf_counter() - start)
+
+    return best * 1000
+
+
+def main():
+    """Run the incremental parser benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle incremental Parser benchmark")
+    arg_parser.add_argument("--size", help="Size of the generated script in characters", type=int, default=1_000_000)
+    arg_parser.add_argument("--repeat", help="Number of timed runs per approach (best is kept)", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    source = generate_source(args.size)
+
+    # A single keystroke within a loop in the middle of the script: `value / 2` becomes `value / 25`
+    edits = {
+        "Middle of the script": TextEdit(source.index("/ 2", len(source) // 2) + 3, 0, "5"),
+        "End of the script": TextEdit(source.rindex("/ 2") + 3, 0, "5"),
+    }
+
+    for edit in edits.values():
+        parser = prs.Parser(source, positions=True)
+        reparsed = parser.reparse(parser.parse(), edit)
+
+        if nodes.to_dict(reparsed) != nodes.to_dict(prs.Parser(edit.apply(source), positions=True).parse()):
+            raise AssertionError("AST differs between incremental and full re-parsing")
+
+    full_time = measure_parse(edits["Middle of the script"].apply(source), args.repeat)
+
+    print(f"Script size:                {len(source):>12,} characters ({source.count(chr(10)):,} lines)")
+    print(f"Full re-parse:              {full_time:>12.3f} ms")
+
+    for name, edit in edits.items():
+        incremental_time = measure_reparse(source, edit, args.repeat)
+        print(f"{name + ':':<28}{incremental_time:>12.3f} ms ({full_time / incremental_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
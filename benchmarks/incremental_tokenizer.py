@@ -0,0 +1,61 @@
+"""
+Measures the time taken to re-tokenize a large Barnacle script after a single-character edit.
+
+Re-tokenizing the damaged region with `Tokenizer.edited()` is compared against tokenizing the whole edited script
+from scratch. The token columns of both are checked to be identical before anything is timed.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/incremental_tokenizer.py [--size <characters>] [--repeat <count>]`
+"""
+
+import argparse
+import time
+
+from bcl_tokenizer import tokenizer as tkn
+from bcl_tokenizer.edits import TextEdit
+from tokenizer_throughput import generate_source
+
+
+def measure(function, repeat: int) -> float:
+    """Return the best time taken by the function, in milliseconds."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best * 1000
+
+
+def main():
+    """Run the incremental tokenizer benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle incremental Tokenizer benchmark")
+    arg_parser.add_argument("--size", help="Size of the generated script in characters", type=int, default=2_000_000)
+    arg_parser.add_argument("--repeat", help="Number of timed runs per approach (best is kept)", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    source = generate_source(args.size)
+    tokenizer = tkn.Tokenizer(source)
+
+    # A single keystroke in the middle of the script
+    edit = TextEdit(source.index(" ", len(source) // 2), 0, "x")
+    edited_source = edit.apply(source)
+
+    incremental = tokenizer.edited(edit)
+    full = tkn.Tokenizer(edited_source)
+
+    if (incremental.kinds, incremental.starts, incremental.ends) != (full.kinds, full.starts, full.ends):
+        raise AssertionError("Token columns differ between incremental and full re-tokenization")
+
+    incremental_time = measure(lambda: tokenizer.edited(edit), args.repeat)
+    full_time = measure(lambda: tkn.Tokenizer(edited_source), args.repeat)
+
+    print(f"Script size:                {len(source):>12,} characters ({edited_source.count(chr(10)):,} lines)")
+    print(f"Full re-tokenization:       {full_time:>12.3f} ms")
+    print(f"Incremental:                {incremental_time:>12.3f} ms ({full_time / incremental_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Measures the time taken to interpret loop-heavy and call-heavy Barnacle scripts, with each engine.
+
+Each script is parsed once up front, so only running it is timed (including compiling or transpiling it, for the
+engines which do). Every engine is checked to print the same output. The time taken to validate the AST, as is done
+once for an AST which was not parsed by the Interpreter itself, is shown alongside, as are the environments the
+tree-walking Interpreter creates per iteration of the loop.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/interpreter_loops.py [--iterations <count>] [--repeat <count>]`
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from bcl_interpreter import closures as clo
+from bcl_interpreter import interpreter as itp
+from bcl_interpreter import validator
+from bcl_parser import parser as prs
+from bcl_transpiler import interpreter as tsp
+from bcl_vm import vm
+
+ENGINES = {
+    "Tree-walking Interpreter": itp.Interpreter,
+    "Closure engine": clo.ClosureInterpreter,
+    "Bytecode virtual machine": vm.VirtualMachine,
+    "Transpiled to Python": tsp.TranspiledInterpreter,
+}
+
+
+def loop_source(iterations: int) -> str:
+    """Return a script which sums numbers in a `while` loop, with a conditional in its body."""
+
+    return f"""\
+let total = 0
+let i = 0
+while i < {iterations} {{
+    if i / 2 > 10 {{
+        total = total + i * 2
+    }} else {{
+        total = total - 1
+    }}
+    i = i + 1
+}}
+print total
+"""
+
+
+def call_source(iterations: int) -> str:
+    """Return a script which calls small functions in a `while` loop, and a recursive function."""
+
+    return f"""\
+func square(x) {{
+    return x * x
+}}
+func add(a, b) {{
+    return a + b
+}}
+func fib(n) {{
+    if n < 2 {{
+        return n
+    }}
+    return fib(n - 1) + fib(n - 2)
+}}
+let total = 0
+let i = 0
+while i < {iterations} {{
+    total = add(total, square(i))
+    i = i + 1
+}}
+print total
+print fib(15)
+"""
+
+
+def measure(function, repeat: int) -> float:
+    """Return the best time taken by the function, in milliseconds."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best * 1000
+
+
+def run_engine(engine, source: str, ast) -> str:
+    """Run the parsed source with the engine, and return its output."""
+
+    output = io.StringIO()
+
+    with contextlib.redirect_stdout(output):
+        engine(source, ast=ast, verified=True).run()
+
+    return output.getvalue()
+
+
+def main():
+    """Run the interpreter loops benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle interpreter loops benchmark")
+    arg_parser.add_argument("--iterations", help="Number of iterations of each loop", type=int, default=20_000)
+    arg_parser.add_argument("--repeat", help="Number of timed runs per script (best is kept)", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    scripts = {"Loops": loop_source(args.iterations), "Calls": call_source(args.iterations)}
+
+    for name, source in scripts.items():
+        ast = prs.Parser(source, positions=True).parse()
+        outputs = {run_engine(engine, source, ast) for engine in ENGINES.values()}
+
+        if len(outputs) != 1:
+            raise AssertionError(f"The engines print different output for the {name} script")
+
+        validate_time = measure(lambda: validator.validate(ast), args.repeat)
+        print(f"{name} script (validating the AST once: {validate_time:.3f} ms)")
+
+        baseline = None
+
+        for engine_name, engine in ENGINES.items():
+            engine_time = measure(lambda: run_engine(engine, source, ast), args.repeat)
+            baseline = baseline or engine_time
+            print(f"    {engine_name + ':':<28}{engine_time:>12.3f} ms ({baseline / engine_time:.1f}x)")
+
+        interpreter = itp.Interpreter(source, ast=ast, verified=True)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.run()
+
+        environments = interpreter.environments_created / args.iterations
+        print(f"    Environments created by the tree-walking Interpreter: {environments:.2f} per iteration")
+
+
+if __name__ == "__main__":
+    main()
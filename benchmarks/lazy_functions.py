@@ -0,0 +1,78 @@
+"""
+Measures the time and memory taken to parse a prelude-heavy Barnacle script, with and without lazy function parsing.
+
+The script declares many functions but only calls a few of them. Parsing lazily only brace-matches the body of each
+function, leaving it to be parsed when the function is first called. The source is tokenized before the timer starts,
+so only parsing is measured; AST memory is measured with `tracemalloc` in a separate run.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/lazy_functions.py [--functions <count>] [--repeat <count>]`
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from bcl_parser import parser as prs
+
+FUNCTION_TEMPLATE = """\
+func prelude_{index}(a, b) {{
+    let total = 0
+    while a < b {{
+        if a / 2 == {index} {{ total = total + a * 3 }} else {{ total = total - prelude_{index}(a, a - 1) }}
+        a = a + 1
+    }}
+    return total + {index}
+}}
+"""
+
+
+def generate_source(functions: int) -> str:
+    """Generate a Barnacle script which declares the given number of functions, and calls three of them."""
+
+    declarations = "".join(FUNCTION_TEMPLATE.format(index=index) for index in range(functions))
+
+    return declarations + "print prelude_0(0, 10)\nprint prelude_1(0, 10)\nprint prelude_2(0, 10)\n"
+
+
+def measure(source: str, lazy_functions: bool, repeat: int) -> tuple[float, int]:
+    """Return the best time taken to parse the source in seconds, and the memory taken by its AST in bytes."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        parser = prs.Parser(source, lazy_functions=lazy_functions)
+
+        start = time.perf_counter()
+        parser.parse()
+        best = min(best, time.perf_counter() - start)
+
+    parser = prs.Parser(source, lazy_functions=lazy_functions)
+
+    tracemalloc.start()
+    ast = parser.parse()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del ast
+
+    return best, allocated
+
+
+def main():
+    """Run the lazy function parsing benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle lazy function parsing benchmark")
+    arg_parser.add_argument("--functions", help="Number of functions declared by the script", type=int, default=2000)
+    arg_parser.add_argument("--repeat", help="Number of timed runs (best is kept)", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    source = generate_source(args.functions)
+
+    print(f"Script size:                {len(source):>12,} characters ({args.functions:,} functions)")
+    for name, lazy_functions in (("Eager:", False), ("Lazy:", True)):
+        best, allocated = measure(source, lazy_functions, args.repeat)
+        print(f"{name:<28}{best * 1000:>12.1f} ms to parse, {allocated / 1_000_000:.3f} MB of AST")
+
+
+if __name__ == "__main__":
+    main()
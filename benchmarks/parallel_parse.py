@@ -0,0 +1,96 @@
+"""
+Measures how parallel parsing of a large Barnacle script scales with the number of worker processes.
+
+The script is a long sequence of top-level functions and statements. Each worker count is compared against the
+serial Parser, and every parallel AST is checked to be identical to the serial one before anything is timed.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/parallel_parse.py [--size <characters>] [--workers <count> ...]`
+"""
+
+import argparse
+import os
+import time
+
+from bcl_parser import parallel
+from bcl_parser import parser as prs
+
+SOURCE_TEMPLATE = """\
+func step_{index}(value, limit) {{
+    let count = 0
+    while count < limit {{
+        if value > 100 {{
+            value = value / 2
+        }} else {{
+            value = value * 3 + 1
+        }}
+        count = count + 1
+    }}
+    return value
+}}
+let result_{index} = step_{index}({index}, 10)
+print "step {index}: " + result_{index}
+"""
+
+
+def generate_source(size: int) -> str:
+    """Generate a Barnacle script of at least `size` characters."""
+
+    parts = []
+    length = 0
+    index = 0
+
+    while length < size:
+        part = SOURCE_TEMPLATE.format(index=index)
+        parts.append(part)
+        length += len(part)
+        index += 1
+
+    return "".join(parts)
+
+
+def measure(function, repeat: int) -> float:
+    """Return the best time taken by the function, in seconds."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main():
+    """Run the parallel parsing benchmark."""
+
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted({2**power for power in range(cpu_count.bit_length()) if 2**power > 1} | {cpu_count})
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle parallel Parser benchmark")
+    arg_parser.add_argument("--size", help="Size of the generated script in characters", type=int, default=4_000_000)
+    arg_parser.add_argument("--workers", help="Worker counts to measure", type=int, nargs="+", default=default_workers)
+    arg_parser.add_argument(
+        "--repeat", help="Number of timed runs per worker count (best is kept)", type=int, default=3
+    )
+    args = arg_parser.parse_args()
+
+    source = generate_source(args.size)
+    expected_ast = prs.Parser(source, positions=True).parse()
+
+    serial = measure(lambda: prs.Parser(source, positions=True).parse(), args.repeat)
+
+    print(f"Script size:                {len(source):>12,} characters ({os.cpu_count()} CPUs)")
+    print(f"Serial:                     {serial:>12.3f} s")
+
+    for workers in args.workers:
+        if parallel.parse_parallel(source, workers, positions=True) != expected_ast:
+            raise AssertionError(f"Parallel AST with {workers} workers differs from the serial AST")
+
+        elapsed = measure(lambda: parallel.parse_parallel(source, workers, positions=True), args.repeat)
+
+        print(f"{workers:>3} workers:                {elapsed:>12.3f} s ({serial / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
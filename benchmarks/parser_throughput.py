@@ -0,0 +1,56 @@
+"""
+Measures the throughput (in MB/s) of the Barnacle Parser on an expression-heavy script.
+
+The source is tokenized before the timer starts, so only parsing is measured.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/parser_throughput.py [--size <characters>] [--repeat <count>]`
+"""
+
+import argparse
+import time
+
+from bcl_parser import parser as prs
+
+SOURCE_TEMPLATE = 'let value_{index} = (a + {index}) * b - c / 2 + f(x, y * 3) <= {index} == true != "{index}"\n'
+
+
+def generate_source(size: int) -> str:
+    """Generate a Barnacle script of at least `size` characters."""
+
+    parts = []
+    length = 0
+    index = 0
+
+    while length < size:
+        part = SOURCE_TEMPLATE.format(index=index)
+        parts.append(part)
+        length += len(part)
+        index += 1
+
+    return "".join(parts)
+
+
+def main():
+    """Run the parser throughput benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle Parser throughput benchmark")
+    arg_parser.add_argument("--size", help="Size of the generated script in characters", type=int, default=1_000_000)
+    arg_parser.add_argument("--repeat", help="Number of timed runs (best is kept)", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    source = generate_source(args.size)
+    best = float("inf")
+
+    for _ in range(args.repeat):
+        parser = prs.Parser(source)
+
+        start = time.perf_counter()
+        parser.parse()
+        best = min(best, time.perf_counter() - start)
+
+    print(f"Script size:                {len(source):>12,} characters")
+    print(f"Parser:                     {len(source.encode('utf-8')) / best / 1_000_000:>12.3f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Measures the time to first output and peak memory when interpreting a long Barnacle script as a stream.
+
+The script is read from an in-memory text stream, and interpreted either a top-level statement at a time (as with
+`--stream`), or by reading and parsing the whole script before running it. Output is discarded, but the time of the
+first write is recorded. Peak memory is measured with `tracemalloc` in a separate run, and includes the text read
+from the stream.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/stream_interpret.py [--size <characters>]`
+"""
+
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+from bcl_interpreter import interpreter as itp
+
+SOURCE_TEMPLATE = 'let value_{index} = {index} * 2 + 1\nif value_{index} > 0 {{ print "value " + "{index}" }}\n'
+
+
+class FirstWriteStream(io.TextIOBase):
+    """A text stream which discards what is written to it, recording when it was first written to."""
+
+    def __init__(self):
+        super().__init__()
+        self.first_write = None
+
+    def write(self, text: str) -> int:
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+
+        return len(text)
+
+
+def generate_source(size: int) -> str:
+    """Generate a Barnacle script of at least `size` characters."""
+
+    parts = []
+    length = 0
+    index = 0
+
+    while length < size:
+        part = SOURCE_TEMPLATE.format(index=index)
+        parts.append(part)
+        length += len(part)
+        index += 1
+
+    return "".join(parts)
+
+
+def measure(source: str, stream: bool) -> tuple[float, float, int]:
+    """Interpret the source, and return the time to first output, the total time, and the peak memory in bytes."""
+
+    times = []
+
+    # Timed without tracemalloc (which slows allocation down), then run again to measure peak memory
+    for trace in (False, True):
+        output = FirstWriteStream()
+        script = io.StringIO(source)
+
+        if trace:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+
+        with contextlib.redirect_stdout(output):
+            itp.Interpreter(script if stream else script.read()).run()
+
+        times.append((output.first_write - start, time.perf_counter() - start))
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return *times[0], peak
+
+
+def main():
+    """Run the streaming interpreter benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle streaming interpreter benchmark")
+    arg_parser.add_argument("--size", help="Size of the generated script in characters", type=int, default=1_000_000)
+    args = arg_parser.parse_args()
+
+    source = generate_source(args.size)
+
+    print(f"Script size:                {len(source):>12,} characters")
+    for name, stream in (("Whole script", False), ("Streamed", True)):
+        first_output, total, peak = measure(source, stream)
+        print(
+            f"{name + ':':<28}{first_output * 1000:>12.1f} ms to first output, {total:.3f} s in total, "
+            f"{peak / 1_000_000:.1f} MB peak"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Measures the throughput (in MB/s) of the Barnacle Tokenizer.
+
+The current Tokenizer is compared against the original engine, which tried each token regex in turn with `re.search`
+and re-sliced the remaining source after every token. A copy of that engine is kept here as the reference, and the
+token streams of both engines are checked to be identical before anything is timed.
+
+Usage: `PYTHONPATH=barnacle python benchmarks/tokenizer_throughput.py [--size <characters>] [--repeat <count>]`
+"""
+
+import argparse
+import re
+import time
+
+from bcl_tokenizer import tokenizer as tkn
+
+LEGACY_TOKEN_REGEXPS = {
+    r"^\s": None,
+    r"^/\*(.|\n)*?\*/": None,
+    r"^//.*": None,
+    r"^-?[0-9]+(\.[0-9]+)?\b": "NUMBER",
+    r'^"[^"]*"': "STRING",
+    r"^true\b|^false\b": "BOOLEAN",
+    r"^let\b": "LET",
+    r"^func\b": "FUNC",
+    r"^return\b": "RETURN",
+    r"^print\b": "PRINT",
+    r"^if\b": "IF",
+    r"^else\b": "ELSE",
+    r"^do\b": "DO",
+    r"^while\b": "WHILE",
+    r"^==": "==",
+    r"^!=": "!=",
+    r"^<=": "<=",
+    r"^<": "<",
+    r"^>=": ">=",
+    r"^>": ">",
+    r"^=": "=",
+    r"^\+": "+",
+    r"^-": "-",
+    r"^\*": "*",
+    r"^/": "/",
+    r"^[a-z][a-z0-9_]*\b": "IDENTIFIER",
+    r"^{": "{",
+    r"^}": "}",
+    r"^\(": "(",
+    r"^\)": ")",
+    r"^,": ",",
+}
+
+SOURCE_TEMPLATE = """\
+/* Generated function number {index} */
+func rule_{index}(value, limit) {{
+    let total_{index} = value * 2 + -{index}
+    // Keep going until the limit is reached
+    while total_{index} <= limit {{
+        total_{index} = total_{index} + 1.5
+    }}
+    if total_{index} != limit {{
+        print "rule {index} fired"
+    }} else {{
+        do {{ total_{index} = total_{index} - 1 }} while total_{index} > 0
+    }}
+    return total_{index} == limit
+}}
+print rule_{index}({index}, 100)
+"""
+
+
+def legacy_tokenize(source: str) -> list[dict]:
+    """Tokenize the source with the original try-every-regex engine."""
+
+    token_stream = []
+
+    while source:
+        for regexp, token_type in LEGACY_TOKEN_REGEXPS.items():
+            match = re.search(regexp, source)
+
+            if match:
+                token_value = match.group()
+                source = source[len(token_value) :]
+
+                if token_type:
+                    token_stream.append({"type": token_type, "value": token_value})
+
+                break
+        else:
+            raise SyntaxError(f"Unknown syntax near characters '{source[:10]}'")
+
+    token_stream.append({"type": "PROGRAM_END", "value": None})
+    return token_stream
+
+
+def tokenize_compact(source: str) -> tkn.Tokenizer:
+    """Tokenize the source with the current Tokenizer, keeping only its compact token columns."""
+
+    return tkn.Tokenizer(source)
+
+
+def tokenize(source: str) -> list[dict]:
+    """Tokenize the source with the current Tokenizer, converting every token to its dict form."""
+
+    tokenizer = tkn.Tokenizer(source)
+    token_stream = []
+
+    while not tokenizer.end_of_stream():
+        token_stream.append(tokenizer.next_token())
+
+    token_stream.append(tokenizer.next_token())
+    return token_stream
+
+
+def generate_source(size: int) -> str:
+    """Generate a Barnacle script of at least `size` characters."""
+
+    parts = []
+    length = 0
+    index = 0
+
+    while length < size:
+        part = SOURCE_TEMPLATE.format(index=index)
+        parts.append(part)
+        length += len(part)
+        index += 1
+
+    return "".join(parts)
+
+
+def measure(engine, source: str, repeat: int) -> float:
+    """Return the best throughput of the engine over the source, in MB/s."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine(source)
+        best = min(best, time.perf_counter() - start)
+
+    return len(source.encode("utf-8")) / best / 1_000_000
+
+
+def main():
+    """Run the tokenizer throughput benchmark."""
+
+    arg_parser = argparse.ArgumentParser(description="Barnacle Tokenizer throughput benchmark")
+    arg_parser.add_argument("--size", help="Size of the generated script in characters", type=int, default=100_000)
+    arg_parser.add_argument("--repeat", help="Number of timed runs per engine (best is kept)", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    source = generate_source(args.size)
+
+    if tokenize(source) != legacy_tokenize(source):
+        raise AssertionError("Token streams differ between the current and legacy engines")
+
+    compact = measure(tokenize_compact, source, args.repeat)
+    current = measure(tokenize, source, args.repeat)
+    legacy = measure(legacy_tokenize, source, args.repeat)
+
+    print(f"Script size:                {len(source):>12,} characters")
+    print(f"Legacy engine:              {legacy:>12.3f} MB/s")
+    print(f"Current engine (dicts):     {current:>12.3f} MB/s ({current / legacy:.1f}x)")
+    print(f"Current engine (columns):   {compact:>12.3f} MB/s ({compact / legacy:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
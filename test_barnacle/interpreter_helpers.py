@@ -3,24 +3,47 @@ Implements helper functions for the bcl_interpreter unit tests.
 """
 
 import pytest
+from bcl_interpreter import closures as clo
 from bcl_interpreter import interpreter as itp
+from bcl_transpiler import interpreter as tsp
+from bcl_vm import vm
+
+# Every engine must run every script the same way
+ENGINES = [itp.Interpreter, clo.ClosureInterpreter, vm.VirtualMachine, tsp.TranspiledInterpreter]
+
+# A script whose inner function uses a variable declared after it, so `value` may refer to either declaration of it
+VARIABLE_DECLARED_AFTER_FUNCTION_SOURCE = """\
+func outer() {
+    func inner() {
+        return value
+    }
+    let value = 1
+    print inner()
+}
+let value = "top"
+outer()
+"""
 
 
 def validate_stdout(capsys, *, source: str, expected_stdout: str):
-    """Validates that the provided source produces the expected standard output."""
+    """Validates that the provided source produces the expected standard output, with every engine."""
 
-    interpreter = itp.Interpreter(source)
-    interpreter.run()
+    for engine in ENGINES:
+        interpreter = engine(source)
+        interpreter.run()
 
-    actual_stdout, _ = capsys.readouterr()
+        actual_stdout, _ = capsys.readouterr()
 
-    assert actual_stdout == expected_stdout, f"\nExpected output:\n{expected_stdout}\n\nActual output:\n{actual_stdout}"
+        assert (
+            actual_stdout == expected_stdout
+        ), f"\n{engine.__name__} expected output:\n{expected_stdout}\n\nActual output:\n{actual_stdout}"
 
 
 def expect_error(*, source: str, exception: type[Exception]):
-    """Validates that the provided source causes a specific exception."""
+    """Validates that the provided source causes a specific exception, with every engine."""
 
-    interpreter = itp.Interpreter(source)
+    for engine in ENGINES:
+        interpreter = engine(source)
 
-    with pytest.raises(exception):
-        interpreter.run()
+        with pytest.raises(exception):
+            interpreter.run()
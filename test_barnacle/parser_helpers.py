@@ -4,7 +4,10 @@ Implements helper functions for the bcl_parser unit tests.
 
 import json
 
+import pytest
+from bcl_parser import nodes
 from bcl_parser import parser as prs
+from bcl_parser.table import NodeTable
 
 
 def verify_ast(source: str, expected_ast: dict):
@@ -12,8 +15,62 @@ def verify_ast(source: str, expected_ast: dict):
 
     parser = prs.Parser(source)
 
-    actual_ast = parser.parse()
+    ast = parser.parse()
+    actual_ast = nodes.to_dict(ast)
 
     assert (
         actual_ast == expected_ast
     ), f"\nExpected AST:\n{json.dumps(expected_ast, indent=4)}\n\nActual AST:\n{json.dumps(actual_ast, indent=4)}"
+
+    assert nodes.from_dict(expected_ast) == ast, "The expected AST does not convert back to the parsed AST nodes"
+
+    table = prs.Parser(source, builder=NodeTable()).parse()
+
+    assert table.to_nodes() == ast, "The node table emitted by the Parser does not convert back to the AST nodes"
+
+
+# A lazily parsed function declared on every iteration of a loop, and another which is never called
+REDECLARED_FUNCTION_SOURCE = """\
+let i = 0
+while i < 5 {
+    func twice(x) { return x * 2 }
+    i = twice(i) + 1
+}
+func unused() { print "never" }
+print i
+"""
+
+# A script with comments, nested code blocks and numbers, strings and operators to edit, for re-tokenizing and
+# re-parsing edited sources
+EDITED_SOURCE = """\
+let total = 0
+/* Add up some numbers */
+func add(a, b) {
+    return a + b
+}
+while total < 10 {
+    total = add(total, 1.5) // keep going
+    if total > 5 {
+        print "big"
+    } else {
+        print "small"
+    }
+}
+print "total: " + total
+"""
+
+
+@pytest.fixture(name="parsed_code_blocks")
+def fixture_parsed_code_blocks(monkeypatch) -> list[int]:
+    """Record the first token of each lazily parsed code block whenever it is parsed."""
+
+    parsed = []
+    parse_code_block = prs.Parser.parse_code_block
+
+    def counting_parse_code_block(parser: prs.Parser, code_block: nodes.UnparsedCodeBlock) -> nodes.CodeBlock:
+        parsed.append(code_block.first_token)
+        return parse_code_block(parser, code_block)
+
+    monkeypatch.setattr(prs.Parser, "parse_code_block", counting_parse_code_block)
+
+    return parsed
@@ -0,0 +1,120 @@
+"""
+Unit tests for the bcl_cache submodule.
+"""
+
+import os
+
+import pytest
+from bcl_cache import cache as cch
+from bcl_interpreter import interpreter as itp
+from bcl_interpreter.operations import OperationNotSupported
+from bcl_parser import binary
+from bcl_parser import parser as prs
+
+SOURCE = """\
+func add(a, b) {
+    return a + b
+}
+print add(1, 2)
+"""
+
+
+def __entry_names(directory) -> list[str]:
+    """Return the names of all of the files in the cache directory, including temporary ones."""
+
+    return sorted(os.listdir(directory))
+
+
+def test_miss_then_hit(tmp_path):
+    """Handling a script which is not cached until its AST has been stored."""
+
+    cache = cch.CompileCache(str(tmp_path))
+    data = binary.dumps(prs.Parser(SOURCE, positions=True).parse())
+
+    assert cache.load(SOURCE, "ast") is None
+
+    cache.store(SOURCE, "ast", data)
+
+    assert __entry_names(tmp_path) == [cache.key(SOURCE, "ast")]
+    assert cache.load(SOURCE, "ast") == data
+
+
+def test_keys():
+    """Handling the cache key, which changes with the source, the form and the cache version."""
+
+    cache = cch.CompileCache("unused")
+    key = cache.key(SOURCE, "ast")
+
+    assert key.endswith(".ast")
+    assert cache.key(SOURCE.encode("utf-8"), "ast") == key
+    assert cache.key(SOURCE + " ", "ast") != key
+    assert cache.key(SOURCE, "bytecode") != key
+
+
+def test_cache_version(tmp_path, monkeypatch):
+    """Handling an entry written by a different version of the interpreter, which is not used."""
+
+    cache = cch.CompileCache(str(tmp_path))
+    cache.store(SOURCE, "ast", b"ast")
+
+    monkeypatch.setattr(cch, "CACHE_VERSION", cch.CACHE_VERSION + 1)
+
+    assert cache.load(SOURCE, "ast") is None
+
+
+def test_unreadable_entry(tmp_path, caplog):
+    """Handling an entry which cannot be read, which is ignored."""
+
+    cache = cch.CompileCache(str(tmp_path))
+    (tmp_path / cache.key(SOURCE, "ast")).mkdir()
+
+    assert cache.load(SOURCE, "ast") is None
+    assert "Ignoring unreadable compile cache entry" in caplog.text
+
+
+def test_unwritable_directory(tmp_path, caplog):
+    """Handling a cache directory which cannot be created, which does not stop the script from being run."""
+
+    (tmp_path / "file").write_text("")
+    cache = cch.CompileCache(str(tmp_path / "file" / "cache"))
+
+    cache.store(SOURCE, "ast", b"ast")
+
+    assert cache.load(SOURCE, "ast") is None
+    assert "Could not write compile cache entry" in caplog.text
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Handling a cache which grows past its size cap, where the entries used least recently are removed first."""
+
+    sources = [f"print {index}\n" for index in range(4)]
+    cache = cch.CompileCache(str(tmp_path))
+
+    for index, source in enumerate(sources[:3]):
+        cache.store(source, "ast", source.encode("utf-8"))
+        os.utime(tmp_path / cache.key(source, "ast"), ns=(index, index))
+
+    # Using the oldest entry makes it the most recent
+    assert cache.load(sources[0], "ast") is not None
+
+    cache.max_bytes = sum(os.path.getsize(tmp_path / name) for name in __entry_names(tmp_path))
+    cache.store(sources[3], "ast", sources[3].encode("utf-8"))
+
+    assert cache.load(sources[1], "ast") is None
+    assert all(cache.load(source, "ast") is not None for source in (sources[0], sources[2], sources[3]))
+
+
+def test_interpret_cached_ast(capsys, monkeypatch):
+    """Handling an Interpreter given the AST of its source, which does not parse the source again."""
+
+    ast = prs.Parser(SOURCE + 'print "1" + 1\n', positions=True).parse()
+
+    def no_parsing(*_, **__):
+        raise AssertionError("The source should not be parsed")
+
+    monkeypatch.setattr(prs, "Parser", no_parsing)
+
+    with pytest.raises(OperationNotSupported, match=r"\(line 5, column 1\)"):
+        itp.Interpreter(SOURCE + 'print "1" + 1\n', ast=ast).run()
+
+    assert capsys.readouterr().out == "3\n"
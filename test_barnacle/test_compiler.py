@@ -0,0 +1,133 @@
+"""
+Unit tests for the bcl_compiler submodule, which compiles the AST into bytecode.
+"""
+
+from bcl_compiler import bytecode, compiler
+from bcl_compiler.bytecode import JUMP_OPCODES, Opcode
+from bcl_parser import parser as prs
+from bcl_tokenizer.positions import LineIndex
+
+DEPTH = 5000
+
+
+def compile_source(source: str, lazy_functions: bool = False) -> bytecode.CodeObject:
+    """Parse the source with positions, and compile it."""
+
+    return compiler.compile_program(prs.Parser(source, positions=True, lazy_functions=lazy_functions).parse())
+
+
+def opcodes(code: bytecode.CodeObject) -> list[Opcode]:
+    """Return the opcodes of the instructions of a code object."""
+
+    return [Opcode(opcode) for opcode in code.instructions[::2]]
+
+
+def test_disassemble():
+    """Handling the disassembly of a program and the functions it declares, labelled with source lines."""
+
+    source = """\
+func add(a, b) {
+    return a + b
+}
+let x = add(1, 2)
+print x == 3
+"""
+
+    lines = list(bytecode.disassemble(compile_source(source), LineIndex(source)))
+
+    assert lines == [
+        "Disassembly of <program>():",
+        "     1      0 DECLARE_FUNCTION       0 (function add)",
+        "     4      2 LOAD_FUNCTION          1 (add)",
+        "            4 CHECK_ARITY            2",
+        "            6 LOAD_CONST             1 (1)",
+        "            8 LOAD_CONST             2 (2)",
+        "           10 CALL                   2",
+        "           12 CHECK_RESULT           1 (add)",
+        "           14 DECLARE_LOCAL          0 (x)",
+        "     5     16 LOAD_LOCAL             0 (x)",
+        "           18 LOAD_CONST             3 (3)",
+        "           20 COMPARE_EQUAL",
+        "           22 PRINT",
+        "           24 LOAD_CONST             4 (None)",
+        "           26 RETURN",
+        "",
+        "Disassembly of add(a, b):",
+        "     2      0 LOAD_LOCAL             0 (a)",
+        "            2 LOAD_LOCAL             1 (b)",
+        "            4 BINARY_ADD",
+        "            6 RETURN",
+        "            8 LOAD_CONST             0 (None)",
+        "           10 RETURN",
+        "",
+    ]
+
+
+def test_constant_pool():
+    """Handling repeated constants, which share an entry unless they are of different types."""
+
+    code = compile_source('print 1 + 1 + 1.0\nprint true == 1\nprint "1" + "1"')
+
+    assert code.constants == [1, 1.0, True, "1", None]
+    assert [type(constant) for constant in code.constants] == [int, float, bool, str, type(None)]
+
+
+def test_loops_and_branches():
+    """Handling loops and conditionals, which are compiled into jumps to even instruction indices."""
+
+    code = compile_source("""
+        let i = 0
+        while i < 3 { i = i + 1 }
+        do { i = i - 1 } while i > 0
+        if i == 0 { print "zero" } else if i == 1 { print "one" } else { print "other" }
+        """)
+
+    for pc in range(0, len(code.instructions), 2):
+        if code.instructions[pc] in JUMP_OPCODES:
+            assert 0 <= code.instructions[pc + 1] < len(code.instructions)
+            assert code.instructions[pc + 1] % 2 == 0
+
+    assert opcodes(code).count(Opcode.PUSH_SCOPE) == opcodes(code).count(Opcode.POP_SCOPE) == 5
+    assert Opcode.JUMP_IF_TRUE in opcodes(code)
+
+
+def test_statement_offsets():
+    """Handling the positions of instructions, which are the offsets of their innermost statements."""
+
+    source = "let x = 1\nwhile x < 3 {\n    x = x + 1\n}"
+    code = compile_source(source)
+    store = opcodes(code).index(Opcode.STORE_LOCAL)
+
+    assert code.positions[0] == 0
+    assert code.positions[store] == source.index("x = x + 1")
+    assert code.positions[store + 1] == source.index("while")
+
+
+def test_lazy_functions():
+    """Handling functions whose code blocks have not been parsed, which are left to be compiled when called."""
+
+    code = compile_source("func f() { return 1 }\nfunc g() { return 2 }", lazy_functions=True)
+
+    assert [function.code for function in code.constants[:2]] == [None, None]
+    assert "(function f, compiled when first called)" in "\n".join(bytecode.disassemble(code))
+
+
+def test_deeply_nested_expression():
+    """Handling an expression nested thousands deep, which is compiled without recursion."""
+
+    code = compile_source("print " + "1 - (" * DEPTH + "1" + ")" * DEPTH)
+
+    assert opcodes(code).count(Opcode.BINARY_SUBTRACT) == DEPTH
+
+
+def test_deeply_nested_functions():
+    """Handling functions nested thousands deep, which are compiled one after another."""
+
+    code = compile_source("func f() { " * DEPTH + "return 1" + " }" * DEPTH)
+    depth = 0
+
+    while isinstance(code.constants[0], bytecode.Function):
+        code = code.constants[0].code
+        depth += 1
+
+    assert depth == DEPTH
@@ -0,0 +1,159 @@
+"""
+Unit tests for the behaviour every engine shares, which is checked with each of them.
+"""
+
+import io
+
+import pytest
+from bcl_interpreter.engine import Engine
+
+from .interpreter_helpers import ENGINES, validate_stdout
+from .parser_helpers import (  # pylint: disable=unused-import
+    REDECLARED_FUNCTION_SOURCE,
+    fixture_parsed_code_blocks,
+)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_run_twice(capsys, engine: type[Engine]):
+    """Handling a program which is run twice, which starts from a fresh scope each time."""
+
+    interpreter = engine("let x = 1\nfunc f() { return x }\nprint f()")
+    interpreter.run()
+    interpreter.run()
+
+    assert capsys.readouterr().out == "1\n1\n"
+
+
+def test_flow_control(capsys):
+    """Handling `return` outside of a function, and a called function's value ending its code block."""
+
+    validate_stdout(
+        capsys,
+        source="""
+        func one() {
+            return 1
+        }
+        func none() {
+            print "none"
+        }
+        return 5
+        print "after return"
+        let i = 0
+        while i < 3 {
+            i = i + 1
+            one()
+            print "not reached"
+        }
+        {
+            none()
+            print i
+        }
+        """,
+        expected_stdout="after return\nnone\n1\n",
+    )
+
+
+def test_operators(capsys):
+    """Handling operands which are not both numbers, which are handled as by `calculate_binary_operation`."""
+
+    validate_stdout(
+        capsys,
+        source="""
+        print "abc" - "c"
+        print "a" + "b"
+        print 1 == 1.0
+        print true != false
+        print 2 * 3 * 1.5
+        """,
+        expected_stdout="ab\nab\ntrue\ntrue\n9.0\n",
+    )
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("source", ["print 1 == true", "print true + 1", 'print "a" * 2', "print 1 - true - 1"])
+def test_unsupported_operands(engine: type[Engine], source: str):
+    """Handling operands which an operator does not support, which raise the error of `calculate_binary_operation`."""
+
+    with pytest.raises(RuntimeError, match="does not support the provided operand types"):
+        engine(source).run()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_error_position(engine: type[Engine]):
+    """Handling the position of a runtime error, which is reported for the innermost statement."""
+
+    source = """\
+func add_one(value) {
+    if value > 0 {
+        print value
+    }
+    return value + 1
+}
+let i = 0
+while i < 2 {
+    i = i + 1
+    print add_one(i * "one")
+}
+"""
+
+    with pytest.raises(RuntimeError, match=r"\(line 10, column 5\)$"):
+        engine(source).run()
+
+    with pytest.raises(RuntimeError, match=r"\(line 2, column 5\)$"):
+        engine(source.replace('i * "one"', '"one"')).run()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_arity_checked_before_arguments(capsys, engine: type[Engine]):
+    """Handling a call with the wrong number of arguments, which raises an error before they are evaluated."""
+
+    with pytest.raises(
+        RuntimeError, match=r"incorrect number of parameters\(expected 1, got 2\) \(line 2, column 1\)$"
+    ):
+        engine('func g(a) { return a }\ng("ab", 5 != 2.5 != 6 + "b")').run()
+
+    source = 'func one() { print "one" return 1 }\nfunc f(a) { return a }\nprint "start"\nf(one(), one())'
+
+    with pytest.raises(
+        RuntimeError, match=r"incorrect number of parameters\(expected 1, got 2\) \(line 4, column 1\)$"
+    ):
+        engine(source).run()
+
+    assert capsys.readouterr().out == "start\n"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_streamed_source(capsys, engine: type[Engine]):
+    """Handling a text stream, which is run a statement at a time."""
+
+    interpreter = engine(
+        io.StringIO('let x = 1\nfunc f() { return y }\nlet y = 2\nprint f()\nprint x - "one"\nprint x')
+    )
+
+    with pytest.raises(RuntimeError, match=r"\(line 5, column 1\)$"):
+        interpreter.run()
+
+    assert capsys.readouterr().out == "2\n"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_lazy_functions(capsys, parsed_code_blocks: list[int], engine: type[Engine]):
+    """Handling lazily parsed functions, which are parsed once however often they are declared."""
+
+    engine(REDECLARED_FUNCTION_SOURCE, lazy_functions=True).run()
+
+    assert capsys.readouterr().out == "7\n"
+    assert len(parsed_code_blocks) == len(set(parsed_code_blocks))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_syntax_error_on_call(capsys, engine: type[Engine]):
+    """Handling a syntax error within a lazily parsed function, which is reported when it is first called."""
+
+    interpreter = engine("func broken() { print 1 + }\nprint 2\nbroken()", lazy_functions=True)
+
+    with pytest.raises(SyntaxError, match=r"line 1, column 27"):
+        interpreter.run()
+
+    assert capsys.readouterr().out == "2\n"
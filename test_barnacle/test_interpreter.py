@@ -626,6 +626,32 @@ def test_string_truncation_literal_and_variable(capsys):
     )
 
 
+def test_string_truncation_chain(capsys):
+    """Handling a chain of string truncations, which removes each trailing substring in turn."""
+
+    validate_stdout(
+        capsys,
+        source="""
+        let x = "AlphaBetaGamma"
+        let y = x - "Gamma" - "Beta"
+        print y
+        """,
+        expected_stdout="Alpha\n",
+    )
+
+
+def test_bad_string_truncation_chain():
+    """Handling a chain of string truncations, where a substring is removed out of order."""
+
+    expect_error(
+        source="""
+        let x = "AlphaBetaGamma"
+        let y = x - "Beta" - "Gamma"
+        """,
+        exception=RuntimeError,
+    )
+
+
 def test_bad_string_truncation():
     """Handling bad string truncation."""
 
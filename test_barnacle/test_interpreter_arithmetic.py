@@ -254,3 +254,27 @@ def test_division_does_not_support_booleans():
         """,
         exception=OperationNotSupported,
     )
+
+
+def test_subtraction_chain_is_left_associative(capsys):
+    """Handling a chain of subtractions, which is calculated from left to right."""
+
+    validate_stdout(
+        capsys,
+        source="""
+        let x = 10 - 4 - 3 - 2
+        print x
+        print 10 - (4 - 3 - 2)
+        """,
+        expected_stdout="1\n11\n",
+    )
+
+
+def test_sum_thousands_of_integers(capsys):
+    """Handling addition of a chain of thousands of integers."""
+
+    validate_stdout(
+        capsys,
+        source="print " + " + ".join(str(index) for index in range(10000)),
+        expected_stdout="49995000\n",
+    )
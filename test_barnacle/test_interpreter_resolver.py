@@ -0,0 +1,182 @@
+"""
+Unit tests for the Resolver of the bcl_interpreter submodule, which resolves names into slots of environments.
+"""
+
+import io
+
+import pytest
+from bcl_interpreter import interpreter as itp
+from bcl_interpreter import resolver as rsv
+from bcl_parser import parser as prs
+
+from .interpreter_helpers import (
+    VARIABLE_DECLARED_AFTER_FUNCTION_SOURCE,
+    validate_stdout,
+)
+
+
+def resolve(source: str) -> tuple[rsv.Resolver, list]:
+    """Resolve the statements of a source, and return the Resolver with the statements."""
+
+    statements = prs.Parser(source).parse().body
+    resolver = rsv.Resolver()
+    resolver.resolve(statements)
+
+    return resolver, statements
+
+
+def test_slots_of_declarations():
+    """Handling declarations, which are given a slot each in their scope, with variables and functions apart."""
+
+    resolver, statements = resolve("let a = 1\nfunc a() { return 1 }\nlet b = 2")
+
+    assert resolver.resolutions[id(statements[0])] == 0
+    assert resolver.resolutions[id(statements[1])][0] == 1
+    assert resolver.resolutions[id(statements[2])] == 2
+    assert resolver.program.size == 3
+
+
+def test_addresses_in_nested_blocks():
+    """Handling a variable used in nested code blocks, which is addressed by its depth and slot."""
+
+    resolver, statements = resolve(
+        "let x = 1\nlet i = 0\nwhile i < 1 {\n    let y = x\n    if true {\n        i = y\n    }\n}"
+    )
+    loop = statements[2]
+    assignment = loop.body.body[1].on_true.body[0]
+
+    assert resolver.resolutions[id(loop.body.body[0].value)] == ((1, 0),)
+    assert resolver.resolutions[id(assignment)] == ((1, 1),)
+    assert resolver.resolutions[id(assignment.value)] == ((0, 0),)
+    assert resolver.resolutions[id(loop.body)] == 1
+
+
+def test_code_blocks_without_declarations():
+    """Handling code blocks which declare nothing, which have no environment of their own."""
+
+    resolver, statements = resolve("let i = 0\nwhile i < 1 {\n    if true {\n        i = i + 1\n    }\n}")
+    loop = statements[1]
+    assignment = loop.body.body[0].on_true.body[0]
+
+    assert resolver.resolutions[id(loop.body)] is None
+    assert resolver.resolutions[id(loop.body.body[0].on_true)] is None
+    assert resolver.resolutions[id(assignment)] == ((0, 0),)
+
+
+def test_variable_declared_after_function():
+    """Handling a function using a variable declared after it, which may refer to either declaration."""
+
+    resolver, statements = resolve(VARIABLE_DECLARED_AFTER_FUNCTION_SOURCE)
+    info = resolver.resolutions[id(statements[0])][1]
+    outer_body = statements[0].body
+    resolver.resolve_function(info, outer_body)
+
+    inner = outer_body.body[0]
+    inner_info = resolver.resolutions[id(inner)][1]
+    resolver.resolve_function(inner_info, inner.body)
+
+    # A function's code block shares the environment of its parameters, so `outer` is one up from `inner`
+    assert resolver.resolutions[id(inner.body.body[0].body)] == ((1, 1), (2, 1))
+    assert resolver.resolutions[id(inner.body)] is None
+    assert info.scope.size == 2
+
+
+def test_static_errors():
+    """Handling names declared twice or not at all, which are resolved statically but raised when run."""
+
+    resolver, statements = resolve("let x = 1\nlet x = 2\nprint y\nfunc f(a, a) { return a }")
+
+    assert resolver.resolutions[id(statements[1])] is None
+    assert resolver.resolutions[id(statements[2].body)] == ()
+    assert resolver.resolutions[id(statements[3])][1].parameter_slots == [0, None]
+
+
+def test_static_errors_raised_when_run(capsys):
+    """Handling a statically known error, which is raised once the statements before it have run."""
+
+    with pytest.raises(
+        RuntimeError, match=r"^Tried to declare variable 'x' which already exists \(line 3, column 1\)$"
+    ):
+        itp.Interpreter('let x = 1\nprint "before"\nlet x = 2').run()
+
+    assert capsys.readouterr().out == "before\n"
+
+
+def test_reserved_top_level_slot():
+    """Handling a function using a top-level name before it is declared, which is given a slot up front."""
+
+    resolver, statements = resolve("func f() { return later }")
+    resolver.resolve_function(resolver.resolutions[id(statements[0])][1], statements[0].body)
+
+    assert resolver.program.size == 2
+    assert resolver.resolutions[id(statements[0].body.body[0].body)] == ((1, 1),)
+
+    # A later statement declares it in the reserved slot
+    later = prs.Parser("let later = 1").parse().body
+    resolver.resolve(later)
+
+    assert resolver.resolutions[id(later[0])] == 1
+    assert resolver.program.size == 2
+
+
+def test_streamed_source(capsys):
+    """Handling a text stream, whose statements are resolved a statement at a time, using slots reserved earlier."""
+
+    interpreter = itp.Interpreter(io.StringIO("func f() { return later }\nlet later = 5\nprint f()\nlet x = later + 1"))
+    interpreter.run()
+
+    assert capsys.readouterr().out == "5\n"
+
+
+def test_release():
+    """Handling resolutions of top-level statements which have run, which are released unlike those of functions."""
+
+    resolver, statements = resolve("let x = 1\nfunc f() { return x }")
+    info = resolver.resolutions[id(statements[1])][1]
+    resolver.resolve_function(info, statements[1].body)
+    resolver.release()
+
+    assert id(statements[0]) not in resolver.resolutions
+    assert id(statements[1]) not in resolver.resolutions
+    assert id(statements[1].body.body[0].body) in resolver.resolutions
+
+
+@pytest.mark.parametrize(
+    "source, expected_count",
+    [
+        # The program, and the code block of the loop once
+        ("let i = 0\nwhile i < 10 {\n    let next = i + 1\n    i = next\n}", 2),
+        ("let i = 0\ndo {\n    let next = i + 1\n    i = next\n} while i < 10", 2),
+        # Code blocks which declare nothing have no environment
+        ("let i = 0\nwhile i < 10 {\n    if i > 5 {\n        print i\n    }\n    i = i + 1\n}", 1),
+        # One environment per call, for the parameters and the code block
+        ("func f(a) {\n    let b = a\n    return b\n}\nlet i = 0\nwhile i < 10 {\n    i = f(i) + 1\n}", 11),
+    ],
+)
+def test_environments_created(capsys, source: str, expected_count: int):
+    """Handling the environments created by the Interpreter, which are only created where they are needed."""
+
+    interpreter = itp.Interpreter(source)
+    interpreter.run()
+    capsys.readouterr()
+
+    assert interpreter.environments_created == expected_count
+
+
+def test_loop_environment_cleared(capsys):
+    """Handling the environment of a loop's code block, which starts each iteration without its declarations."""
+
+    source = """\
+let value = "outer"
+let i = 0
+while i < 2 {
+    func get() {
+        return value
+    }
+    print get()
+    let value = i
+    i = i + 1
+}
+"""
+
+    validate_stdout(capsys, source=source, expected_stdout="outer\nouter\n")
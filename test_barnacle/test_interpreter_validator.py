@@ -0,0 +1,127 @@
+"""
+Unit tests for the validation of ASTs given to the bcl_interpreter submodule.
+"""
+
+import pytest
+from bcl_interpreter import interpreter as itp
+from bcl_interpreter import validator
+from bcl_parser import nodes
+from bcl_parser import parser as prs
+
+SOURCE = """\
+func add(a, b) {
+    return a + b
+}
+let x = add(1, 2) - 1 - 1
+if x > 0 {
+    print "positive"
+} else if x < 0 {
+    print "negative"
+} else {
+    print true
+}
+while x < 3 {
+    x = x + 1
+}
+"""
+
+
+def __ast() -> nodes.Program:
+    """Return the AST of the source, as an AST from outside of the Parser would be."""
+
+    return nodes.from_dict(nodes.to_dict(prs.Parser(SOURCE, positions=True).parse()))
+
+
+def test_valid_ast(capsys):
+    """Handling a well-formed AST given to the Interpreter, which is validated and then run."""
+
+    validator.validate(prs.Parser(SOURCE, lazy_functions=True).parse())
+
+    itp.Interpreter(SOURCE, ast=__ast()).run()
+
+    assert capsys.readouterr().out == "positive\n"
+
+
+def __replace_print_body(ast: nodes.Program):
+    ast.body[2].on_true.body[0].body = nodes.Print(nodes.StringLiteral("nested"))
+
+
+def __replace_identifier(ast: nodes.Program):
+    ast.body[1].identifier = nodes.StringLiteral("x")
+
+
+def __replace_statement(ast: nodes.Program):
+    ast.body[3].body.body[0] = nodes.NumericLiteral(1)
+
+
+def __replace_else(ast: nodes.Program):
+    ast.body[2].on_false.on_false = nodes.Print(nodes.BooleanLiteral(True))
+
+
+def __replace_with_dict(ast: nodes.Program):
+    ast.body[0].body.body[0].body.right = {"type": "identifier", "name": "b"}
+
+
+def __replace_literal_value(ast: nodes.Program):
+    ast.body[2].on_false.on_false.body[0].body.value = 1
+
+
+def __replace_numeric_value(ast: nodes.Program):
+    ast.body[1].value.operands[1].value = False
+
+
+def __remove_operands(ast: nodes.Program):
+    del ast.body[1].value.operands[1:]
+
+
+def __replace_parameters(ast: nodes.Program):
+    ast.body[0].parameters = nodes.Identifier("a")
+
+
+@pytest.mark.parametrize(
+    "malform, error",
+    [
+        (__replace_print_body, "Unexpected node type 'print' while interpreting 'expression'"),
+        (__replace_identifier, r"Node has unexpected type \(expected 'identifier', got 'string_literal'\)"),
+        (__replace_statement, "Unexpected node type 'numeric_literal' while interpreting 'statement'"),
+        (__replace_else, "Unexpected node type 'print' while interpreting 'else'"),
+        (__replace_with_dict, "Not an AST node: 'dict'"),
+        (__replace_literal_value, "Node 'boolean_literal' has a value of unexpected type 'int'"),
+        (__replace_numeric_value, "Node 'numeric_literal' has a value of unexpected type 'bool'"),
+        (__remove_operands, "Node 'nary_expression' has fewer than two operands"),
+        (__replace_parameters, "Expected a list of AST nodes, got 'Identifier'"),
+    ],
+)
+def test_malformed_ast(capsys, malform, error: str):
+    """Handling a malformed AST, which is rejected before any of it is run."""
+
+    ast = __ast()
+    malform(ast)
+
+    with pytest.raises(RuntimeError, match=error):
+        itp.Interpreter(SOURCE, ast=ast).run()
+
+    assert capsys.readouterr().out == ""
+
+
+def test_unparsed_function_without_parser():
+    """Handling an AST with a lazily parsed function, given without the Parser which can parse the function."""
+
+    ast = prs.Parser(SOURCE, positions=True, lazy_functions=True).parse()
+
+    with pytest.raises(RuntimeError, match="Cannot parse the body of a function without the Parser"):
+        itp.Interpreter(SOURCE, ast=ast).run()
+
+
+def test_verified_ast_is_not_validated(monkeypatch, capsys):
+    """Handling an AST which is already known to be well-formed, which is not validated again."""
+
+    def no_validation(_):
+        raise AssertionError("The AST should not be validated")
+
+    monkeypatch.setattr(validator, "validate", no_validation)
+
+    itp.Interpreter(SOURCE, ast=__ast(), verified=True).run()
+    itp.Interpreter(SOURCE).run()
+
+    assert capsys.readouterr().out == "positive\npositive\n"
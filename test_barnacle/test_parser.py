@@ -350,24 +350,22 @@ func three_way_adder(num1, num2, num3) {
                                     "name": "answer",
                                 },
                                 "value": {
-                                    "type": "binary_expression",
+                                    "type": "nary_expression",
                                     "operator": "+",
-                                    "left": {
-                                        "type": "binary_expression",
-                                        "operator": "+",
-                                        "left": {
+                                    "operands": [
+                                        {
                                             "type": "identifier",
                                             "name": "num1",
                                         },
-                                        "right": {
+                                        {
                                             "type": "identifier",
                                             "name": "num2",
                                         },
-                                    },
-                                    "right": {
-                                        "type": "identifier",
-                                        "name": "num3",
-                                    },
+                                        {
+                                            "type": "identifier",
+                                            "name": "num3",
+                                        },
+                                    ],
                                 },
                             },
                             {
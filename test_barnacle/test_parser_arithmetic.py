@@ -87,24 +87,22 @@ def test_add_three_integer_literals():
                         "name": "x",
                     },
                     "value": {
-                        "type": "binary_expression",
+                        "type": "nary_expression",
                         "operator": "+",
-                        "left": {
-                            "type": "binary_expression",
-                            "operator": "+",
-                            "left": {
+                        "operands": [
+                            {
                                 "type": "numeric_literal",
                                 "value": 1,
                             },
-                            "right": {
+                            {
                                 "type": "numeric_literal",
                                 "value": 2,
                             },
-                        },
-                        "right": {
-                            "type": "numeric_literal",
-                            "value": 3,
-                        },
+                            {
+                                "type": "numeric_literal",
+                                "value": 3,
+                            },
+                        ],
                     },
                 }
             ],
@@ -918,3 +916,95 @@ def test_multiplication_two_variables():
             ],
         },
     )
+
+
+def test_chain_of_same_operator_with_higher_precedence_operands():
+    """Handling a chain of additions whose operands include a multiplication."""
+
+    verify_ast(
+        source="let x = 1 + 2 * 3 + 4",
+        expected_ast={
+            "type": "program",
+            "body": [
+                {
+                    "type": "var_declaration",
+                    "identifier": {
+                        "type": "identifier",
+                        "name": "x",
+                    },
+                    "value": {
+                        "type": "nary_expression",
+                        "operator": "+",
+                        "operands": [
+                            {
+                                "type": "numeric_literal",
+                                "value": 1,
+                            },
+                            {
+                                "type": "binary_expression",
+                                "operator": "*",
+                                "left": {
+                                    "type": "numeric_literal",
+                                    "value": 2,
+                                },
+                                "right": {
+                                    "type": "numeric_literal",
+                                    "value": 3,
+                                },
+                            },
+                            {
+                                "type": "numeric_literal",
+                                "value": 4,
+                            },
+                        ],
+                    },
+                }
+            ],
+        },
+    )
+
+
+def test_parenthesised_chain_of_subtractions():
+    """Handling a chain of subtractions in parentheses, which is not merged into the enclosing subtraction."""
+
+    verify_ast(
+        source="let x = 1 - (2 - 3 - 4)",
+        expected_ast={
+            "type": "program",
+            "body": [
+                {
+                    "type": "var_declaration",
+                    "identifier": {
+                        "type": "identifier",
+                        "name": "x",
+                    },
+                    "value": {
+                        "type": "binary_expression",
+                        "operator": "-",
+                        "left": {
+                            "type": "numeric_literal",
+                            "value": 1,
+                        },
+                        "right": {
+                            "type": "nary_expression",
+                            "operator": "-",
+                            "operands": [
+                                {
+                                    "type": "numeric_literal",
+                                    "value": 2,
+                                },
+                                {
+                                    "type": "numeric_literal",
+                                    "value": 3,
+                                },
+                                {
+                                    "type": "numeric_literal",
+                                    "value": 4,
+                                },
+                            ],
+                        },
+                    },
+                }
+            ],
+        },
+    )
@@ -0,0 +1,122 @@
+"""
+Unit tests for the binary and JSON forms of the AST produced by the bcl_parser submodule.
+"""
+
+import io
+import json
+
+import pytest
+from bcl_parser import binary, nodes
+from bcl_parser import parser as prs
+
+SOURCE = """\
+func add(a, b) {
+    return a + b
+}
+let x = add(-1, 1.0) + 1 + 2.5
+if x > 1 {
+    print "x ✓ \\n"
+} else if true {
+    print x
+}
+if false {
+    print 0
+}
+do {
+    x = x - 1
+} while x != 0
+"""
+
+
+@pytest.mark.parametrize("positions", [False, True])
+@pytest.mark.parametrize("lazy_functions", [False, True])
+def test_round_trip(positions: bool, lazy_functions: bool):
+    """Handling an AST written in its binary form and loaded back again, with and without positions."""
+
+    ast = prs.Parser(SOURCE, positions=positions, lazy_functions=lazy_functions).parse()
+    loaded = binary.loads(binary.dumps(ast))
+
+    assert loaded == ast
+    assert nodes.to_dict(loaded) == nodes.to_dict(ast)
+
+    stream = io.BytesIO()
+    binary.dump(ast, stream)
+    stream.seek(0)
+
+    assert binary.load(stream) == ast
+
+
+def test_constants_keep_their_types():
+    """Handling literals which are equal in Python but not in Barnacle, which should stay distinct constants."""
+
+    ast = prs.Parser("print 1\nprint 1.0\nprint true\nprint 0\nprint false\nprint -0.0").parse()
+    values = [statement.body for statement in binary.loads(binary.dumps(ast)).body]
+
+    assert [type(value.value) for value in values[:5]] == [int, float, bool, int, bool]
+    assert str(values[-1]) == str(ast.body[-1].body)
+
+
+def test_large_values():
+    """Handling names and constants past the single-byte varints, and large integers."""
+
+    names = [f"variable_{index}" for index in range(300)]
+    source = "".join(f"let {name} = {index * 1000}\n" for index, name in enumerate(names))
+    source += f"print {2 ** 80}\n"
+    ast = prs.Parser(source, positions=True).parse()
+
+    assert binary.loads(binary.dumps(ast)) == ast
+
+
+def test_deep_nesting():
+    """Handling a deeply nested AST, which is written and loaded without recursion."""
+
+    depth = 20_000
+    ast = prs.Parser("{" * depth + "print 1" + "}" * depth).parse()
+    loaded = binary.loads(binary.dumps(ast))
+
+    for _ in range(depth):
+        loaded = loaded.body[0]
+
+    assert loaded == nodes.CodeBlock([nodes.Print(nodes.NumericLiteral(1))])
+
+
+@pytest.mark.parametrize(
+    "data, error",
+    [
+        (b"", "Not a Barnacle binary AST"),
+        (b"BCLT\x01", "Not a Barnacle binary AST"),
+        (binary.MAGIC, "Unsupported binary AST version"),
+        (binary.MAGIC + b"\x09", "Unsupported binary AST version"),
+        (binary.MAGIC + b"\x01\x00\x00", "truncated or corrupted"),
+        (binary.MAGIC + b"\x01\x01z\x00", "truncated or corrupted"),
+        (binary.MAGIC + b"\x01\x00\x00\x01\x7e", "truncated or corrupted"),
+    ],
+)
+def test_invalid_data(data: bytes, error: str):
+    """Handling data which is not a binary AST, or is an unsupported version of one."""
+
+    with pytest.raises(ValueError, match=error):
+        binary.loads(data)
+
+
+def test_truncated_data():
+    """Handling a binary AST which has been cut short anywhere, which should never load."""
+
+    data = binary.dumps(prs.Parser(SOURCE, positions=True).parse())
+
+    for length in range(len(data)):
+        with pytest.raises(ValueError):
+            binary.loads(data[:length])
+
+
+@pytest.mark.parametrize("positions", [False, True])
+def test_write_json(positions: bool):
+    """Handling the AST written out as compact JSON, which should match the JSON of its dict form."""
+
+    ast = prs.Parser(SOURCE, positions=positions, lazy_functions=True).parse()
+    stream = io.StringIO()
+
+    nodes.write_json(ast, stream, chunk_size=16)
+
+    assert stream.getvalue() == json.dumps(nodes.to_dict(ast), separators=(",", ":"))
+    assert nodes.from_dict(json.loads(stream.getvalue())) == ast
@@ -454,3 +454,43 @@ def test_more_than_or_equal_variable_and_integer_literal():
             ],
         },
     )
+
+
+def test_comparison_has_higher_precedence_than_equality():
+    """Handling a comparison operator and an equality operator in the same expression."""
+
+    verify_ast(
+        source="let x = true == y < 2",
+        expected_ast={
+            "type": "program",
+            "body": [
+                {
+                    "type": "var_declaration",
+                    "identifier": {
+                        "type": "identifier",
+                        "name": "x",
+                    },
+                    "value": {
+                        "type": "binary_expression",
+                        "operator": "==",
+                        "left": {
+                            "type": "boolean_literal",
+                            "value": True,
+                        },
+                        "right": {
+                            "type": "binary_expression",
+                            "operator": "<",
+                            "left": {
+                                "type": "identifier",
+                                "name": "y",
+                            },
+                            "right": {
+                                "type": "numeric_literal",
+                                "value": 2,
+                            },
+                        },
+                    },
+                }
+            ],
+        },
+    )
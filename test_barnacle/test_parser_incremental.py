@@ -0,0 +1,132 @@
+"""
+Unit tests for the incremental re-parsing of edited sources by the bcl_parser submodule.
+"""
+
+import pytest
+from bcl_parser import nodes
+from bcl_parser import parser as prs
+from bcl_tokenizer.edits import TextEdit
+
+from .parser_helpers import EDITED_SOURCE as SOURCE
+
+
+def __verify_reparse(source: str, edit: TextEdit, lazy_functions: bool = False) -> tuple[nodes.Program, list]:
+    """
+    Verify that re-parsing the edited source gives the same AST as parsing it from scratch.
+    Returns the AST, and the nodes of the AST from before the edit.
+    """
+
+    parser = prs.Parser(source, positions=True, lazy_functions=lazy_functions)
+    ast = parser.parse()
+    previous_nodes = list(nodes.walk(ast))
+
+    reparsed = parser.reparse(ast, edit)
+    expected = prs.Parser(edit.apply(source), positions=True, lazy_functions=lazy_functions).parse()
+
+    assert reparsed is ast
+    assert nodes.to_dict(reparsed) == nodes.to_dict(expected)
+    assert parser.source == edit.apply(source)
+
+    return reparsed, previous_nodes
+
+
+@pytest.mark.parametrize(
+    "edit",
+    [
+        TextEdit(SOURCE.index("0"), 1, "100"),
+        TextEdit(SOURCE.index("a + b"), 5, "a * b - 1"),
+        TextEdit(SOURCE.index("1.5"), 3, "2"),
+        TextEdit(SOURCE.index('"big"'), 0, "1 + "),
+        TextEdit(SOURCE.index('print "big"'), 0, "let big = true\n        "),
+        TextEdit(SOURCE.index("\n    if total"), 0, " + 1"),
+        TextEdit(SOURCE.index('print "small"'), len('print "small"'), ""),
+        TextEdit(SOURCE.index('"small"') + 1, 0, "not so "),
+        TextEdit(SOURCE.index("} else {"), 0, "} else if total > 1 {\n        print 1\n    "),
+        TextEdit(SOURCE.index("// keep"), 2, "+ 1 //"),
+        TextEdit(SOURCE.index("/* Add"), 0, "/* */ print 2 "),
+        TextEdit(SOURCE.index("while"), len("while total < 10 {"), "{"),
+        TextEdit(SOURCE.index("\n    if total"), 0, "\n}\n{"),
+        TextEdit(len(SOURCE), 0, "print total\n"),
+        TextEdit(0, 0, "print 1\n"),
+        TextEdit(0, len(SOURCE), ""),
+    ],
+)
+def test_edits(edit: TextEdit):
+    """Handling a range of edits, including ones which change the structure of the code blocks around them."""
+
+    __verify_reparse(SOURCE, edit)
+
+
+def test_untouched_nodes_are_reused():
+    """Handling an edit within a nested code block, which only re-parses the statement around the edit."""
+
+    edit = TextEdit(SOURCE.index('"big"'), len('"big"'), '"huge"')
+    ast, previous_nodes = __verify_reparse(SOURCE, edit)
+
+    new_nodes = {id(node) for node in nodes.walk(ast)}
+    replaced = [node for node in previous_nodes if id(node) not in new_nodes]
+
+    assert [nodes.to_dict(node) for node in replaced] == [
+        {"type": "print", "body": {"type": "string_literal", "value": "big"}, "offset": SOURCE.index('print "big"')},
+        {"type": "string_literal", "value": "big"},
+    ]
+
+
+def test_edit_in_block_shifts_later_statements():
+    """Handling an edit which changes the length of the source, moving the statements after it."""
+
+    edit = TextEdit(SOURCE.index('"big"'), 0, "1 + ")
+    ast, _ = __verify_reparse(SOURCE, edit)
+
+    assert ast.body[-1].offset == SOURCE.index('print "total: "') + len("1 + ")
+
+
+def test_edit_in_lazy_function():
+    """Handling an edit before a lazily parsed function, whose code block moves along the token stream."""
+
+    source = "print 1\n" + SOURCE
+    edit = TextEdit(0, len("print 1"), "print 1 + 2 + 3")
+
+    ast, previous_nodes = __verify_reparse(source, edit, lazy_functions=True)
+    function = ast.body[2]
+
+    assert function in previous_nodes
+    assert function.body.kind == nodes.NodeKind.UNPARSED_CODE_BLOCK
+
+
+@pytest.mark.parametrize(
+    "edit, error",
+    [
+        (
+            TextEdit(SOURCE.index('"big"'), 0, "+ "),
+            "Unexpected token '+' while parsing 'value' node (line 9, column 15)",
+        ),
+        (
+            TextEdit(SOURCE.index("} else {"), 1, ""),
+            "Unexpected token 'ELSE' while parsing 'statement' node (line 10, column 6)",
+        ),
+        (
+            TextEdit(SOURCE.index("while"), 0, "{ "),
+            "Unexpected token 'PROGRAM_END' while parsing 'statement' node (line 15, column 1)",
+        ),
+    ],
+)
+def test_syntax_error(edit: TextEdit, error: str):
+    """Handling an edit which makes the source invalid."""
+
+    parser = prs.Parser(SOURCE, positions=True)
+    ast = parser.parse()
+
+    with pytest.raises(SyntaxError) as error_info:
+        parser.reparse(ast, edit)
+
+    assert str(error_info.value) == error
+
+
+def test_reparse_needs_positions():
+    """Handling re-parsing with a Parser which does not record positions."""
+
+    parser = prs.Parser(SOURCE)
+
+    with pytest.raises(ValueError):
+        parser.reparse(parser.parse(), TextEdit(0, 0, " "))
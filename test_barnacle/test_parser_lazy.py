@@ -0,0 +1,114 @@
+"""
+Unit tests for parsing function bodies lazily, in the bcl_parser and bcl_interpreter submodules.
+"""
+
+import io
+
+import pytest
+from bcl_interpreter import interpreter as itp
+from bcl_parser import parser as prs
+from bcl_parser.nodes import NodeKind
+
+from .parser_helpers import (  # pylint: disable=unused-import
+    REDECLARED_FUNCTION_SOURCE,
+    fixture_parsed_code_blocks,
+)
+
+SOURCE = """\
+func add(a, b) {
+    return a + b
+}
+func outer(x) {
+    func inner(y) {
+        if y > 0 { return y } else { return 0 - y }
+    }
+    return inner(x) * 2
+}
+print add(1, 2)
+print outer(-3)
+print outer(4)
+"""
+
+
+def test_function_bodies_are_skipped():
+    """Handling lazily parsed functions, whose code blocks are left unparsed."""
+
+    ast = prs.Parser(SOURCE, lazy_functions=True).parse()
+
+    assert [statement.body.kind for statement in ast.body[:2]] == [NodeKind.UNPARSED_CODE_BLOCK] * 2
+    assert ast.body[2:] == prs.Parser(SOURCE).parse().body[2:]
+
+
+def test_parse_code_block():
+    """Handling the parsing of a skipped code block, which gives the same nodes as parsing it up front."""
+
+    parser = prs.Parser(SOURCE, positions=True, lazy_functions=True)
+    ast = parser.parse()
+    expected_ast = prs.Parser(SOURCE, positions=True).parse()
+
+    assert parser.parse_code_block(ast.body[0].body) == expected_ast.body[0].body
+
+    # Functions declared within a lazily parsed code block are themselves left unparsed
+    outer_body = parser.parse_code_block(ast.body[1].body)
+    inner_declaration = outer_body.body[0]
+
+    assert inner_declaration.body.kind == NodeKind.UNPARSED_CODE_BLOCK
+    assert parser.parse_code_block(inner_declaration.body) == expected_ast.body[1].body.body[0].body
+    assert outer_body.body[1] == expected_ast.body[1].body.body[1]
+
+
+def test_syntax_error_in_unparsed_code_block():
+    """Handling a syntax error within a function body, which is only found once the body is parsed."""
+
+    source = "func broken() { print 1 + }\nprint 2"
+
+    with pytest.raises(SyntaxError):
+        prs.Parser(source).parse()
+
+    parser = prs.Parser(source, lazy_functions=True)
+    ast = parser.parse()
+
+    with pytest.raises(SyntaxError, match=r"line 1, column 27"):
+        parser.parse_code_block(ast.body[0].body)
+
+
+@pytest.mark.parametrize("source", ["func f() { { print 1 }", "func f() { print 1 } }", "func f() print 1"])
+def test_unbalanced_braces(source: str):
+    """Handling function bodies with unbalanced braces, which are reported even when parsing lazily."""
+
+    with pytest.raises(SyntaxError):
+        prs.Parser(source, lazy_functions=True).parse()
+
+
+def test_lazy_functions_from_stream():
+    """Handling lazily parsed functions, which need all of the tokens so cannot be parsed from a stream."""
+
+    with pytest.raises(ValueError):
+        prs.Parser(io.StringIO(SOURCE), lazy_functions=True)
+
+
+def test_interpret_lazy_functions(capsys):
+    """Handling the interpretation of lazily parsed functions, which are parsed when first called."""
+
+    itp.Interpreter(SOURCE, lazy_functions=True).run()
+
+    actual_stdout, _ = capsys.readouterr()
+
+    assert actual_stdout == "3\n6\n8\n"
+
+
+def test_interpret_parses_each_function_once(parsed_code_blocks: list[int]):
+    """Handling repeated calls (and re-declarations) of a lazily parsed function, whose body is parsed once."""
+
+    itp.Interpreter(REDECLARED_FUNCTION_SOURCE, lazy_functions=True).run()
+
+    assert len(parsed_code_blocks) == 1
+
+
+def test_interpret_syntax_error_on_call():
+    """Handling a syntax error within a lazily parsed function, which is reported when it is first called."""
+
+    interpreter = itp.Interpreter("func broken() { print 1 + }\nprint 2\nbroken()", lazy_functions=True)
+
+    with pytest.raises(SyntaxError, match=r"line 1, column 27"):
+        interpreter.run()
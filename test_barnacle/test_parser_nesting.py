@@ -0,0 +1,142 @@
+"""
+Unit tests for parsing deeply nested code by the bcl_parser submodule.
+
+The ASTs here are too deep to compare with `==` (which recurses), so they are checked by counting their nodes.
+"""
+
+from collections import Counter
+
+import pytest
+from bcl_parser import nodes
+from bcl_parser import parser as prs
+from bcl_parser.nodes import NodeKind
+from bcl_parser.table import NodeTable
+
+from .interpreter_helpers import validate_stdout
+
+DEPTH = 5000
+
+
+def count_kinds(source: str) -> Counter:
+    """Parse the source, and count the nodes of each kind in its AST."""
+
+    ast = prs.Parser(source).parse()
+
+    return Counter(node.kind for node in nodes.walk(ast))
+
+
+def test_nested_code_blocks():
+    """Handling code blocks nested thousands deep"""
+
+    kinds = count_kinds("{" * DEPTH + "print 1" + "}" * DEPTH)
+
+    assert kinds[NodeKind.CODE_BLOCK] == DEPTH
+    assert kinds[NodeKind.PRINT] == 1
+
+
+def test_nested_loops_and_functions():
+    """Handling while loops, do-while loops and functions nested thousands deep"""
+
+    opening = "while true { do { func f() { " * (DEPTH // 3)
+    closing = "} } while false }" * (DEPTH // 3)
+
+    kinds = count_kinds(opening + "return 1" + closing)
+
+    assert kinds[NodeKind.WHILE] == DEPTH // 3
+    assert kinds[NodeKind.DO_WHILE] == DEPTH // 3
+    assert kinds[NodeKind.FUNC_DECLARATION] == DEPTH // 3
+    assert kinds[NodeKind.CODE_BLOCK] == DEPTH // 3 * 3
+
+
+def test_else_if_ladder():
+    """Handling an 'else if' chain thousands of branches long"""
+
+    source = " else ".join(f"if x == {index} {{ print {index} }}" for index in range(DEPTH)) + " else { print -1 }"
+
+    ast = prs.Parser(source).parse()
+    conditionals = [node for node in nodes.walk(ast) if node.kind == NodeKind.CONDITIONAL]
+
+    assert len(ast.body) == 1
+    assert len(conditionals) == DEPTH
+    assert conditionals[-1].expression.right.value == DEPTH - 1
+    assert conditionals[-1].on_false.kind == NodeKind.CODE_BLOCK
+
+
+def test_nested_conditionals_with_else():
+    """Handling conditionals with 'else' code blocks nested thousands deep"""
+
+    kinds = count_kinds("if true { print 1 } else {" * DEPTH + "print 2" + "}" * DEPTH)
+
+    assert kinds[NodeKind.CONDITIONAL] == DEPTH
+    assert kinds[NodeKind.CODE_BLOCK] == DEPTH * 2
+
+
+def test_nested_parentheses():
+    """Handling parentheses nested thousands deep"""
+
+    ast = prs.Parser("print " + "(" * DEPTH + "1 + 2" + ")" * DEPTH).parse()
+
+    assert nodes.to_dict(ast) == {
+        "type": "program",
+        "body": [
+            {
+                "type": "print",
+                "body": {
+                    "type": "binary_expression",
+                    "operator": "+",
+                    "left": {"type": "numeric_literal", "value": 1},
+                    "right": {"type": "numeric_literal", "value": 2},
+                },
+            }
+        ],
+    }
+
+
+def test_nested_func_calls():
+    """Handling function calls nested thousands deep as parameters"""
+
+    kinds = count_kinds("print " + "f(1, " * DEPTH + "x" + ")" * DEPTH)
+
+    assert kinds[NodeKind.FUNC_CALL] == DEPTH
+    assert kinds[NodeKind.NUMERIC_LITERAL] == DEPTH
+    assert kinds[NodeKind.IDENTIFIER] == DEPTH + 1
+
+
+def test_long_operator_chain():
+    """Handling a chain of thousands of the same operator, which is parsed into a single n-ary expression"""
+
+    kinds = count_kinds("print " + " + ".join(["1 * 2"] * DEPTH))
+
+    assert kinds[NodeKind.NARY_EXPRESSION] == 1
+    assert kinds[NodeKind.BINARY_EXPRESSION] == DEPTH
+
+
+def test_nested_code_blocks_into_node_table():
+    """Handling code blocks nested thousands deep, built into a node table"""
+
+    table = prs.Parser("{" * DEPTH + "print 1" + "}" * DEPTH, builder=NodeTable()).parse()
+
+    assert sum(1 for kind in table.kinds if kind == NodeKind.CODE_BLOCK) == DEPTH
+
+
+def test_interpret_else_if_ladder(capsys):
+    """Handling interpretation of an 'else if' chain thousands of branches long"""
+
+    source = "let x = 4321 " + " else ".join(f"if x == {index} {{ print {index} }}" for index in range(DEPTH))
+
+    validate_stdout(capsys, source=source, expected_stdout="4321\n")
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "{" * DEPTH + "print 1" + "}" * (DEPTH - 1),
+        "print " + "(" * DEPTH + "1" + ")" * (DEPTH - 1),
+        "print " + "f(" * DEPTH + "1" + ")" * (DEPTH - 1),
+    ],
+)
+def test_unbalanced_nesting(source: str):
+    """Handling thousands of nested blocks or parentheses with one left unclosed"""
+
+    with pytest.raises(SyntaxError):
+        prs.Parser(source).parse()
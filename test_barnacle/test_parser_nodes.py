@@ -0,0 +1,88 @@
+"""
+Unit tests for the AST node classes of the bcl_parser submodule.
+"""
+
+import json
+
+import pytest
+from bcl_parser import nodes
+from bcl_parser import parser as prs
+from bcl_parser.nodes import NodeKind
+
+SOURCE = """\
+func add(a, b) {
+    return a + b
+}
+let x = add(1, 2.5)
+if x > 3 {
+    print "big"
+} else if true {
+    print "small"
+}
+"""
+
+
+def test_nodes():
+    """Handling the node classes built by the Parser, which are slotted and tagged with their kind."""
+
+    ast = prs.Parser(SOURCE).parse()
+
+    assert ast.kind == NodeKind.PROGRAM
+    assert [statement.kind for statement in ast.body] == [
+        NodeKind.FUNC_DECLARATION,
+        NodeKind.VAR_DECLARATION,
+        NodeKind.CONDITIONAL,
+    ]
+    assert ast.body[1] == nodes.VarDeclaration(
+        identifier=nodes.Identifier(name="x"),
+        value=nodes.FuncCall(
+            identifier=nodes.Identifier(name="add"),
+            parameters=[nodes.NumericLiteral(value=1), nodes.NumericLiteral(value=2.5)],
+        ),
+    )
+
+    for node in nodes.walk(ast):
+        assert not hasattr(node, "__dict__")
+
+
+def test_dict_round_trip():
+    """Handling the conversion of nodes to their dict (and JSON) form and back again."""
+
+    ast = prs.Parser(SOURCE, positions=True).parse()
+
+    ast_dict = json.loads(json.dumps(nodes.to_dict(ast)))
+
+    assert ast_dict["body"][0]["type"] == "func_declaration"
+    assert ast_dict["body"][0]["offset"] == 0
+    assert "offset" not in ast_dict["body"][0]["identifier"]
+    assert nodes.from_dict(ast_dict) == ast
+
+
+def test_from_dict_invalid():
+    """Handling dicts which are not valid AST nodes."""
+
+    with pytest.raises(ValueError):
+        nodes.from_dict({"type": "unknown_node"})
+
+    with pytest.raises(ValueError):
+        nodes.from_dict({"type": "print"})
+
+    with pytest.raises(ValueError):
+        nodes.from_dict({"type": "identifier", "name": "x", "value": 1})
+
+
+def test_walk():
+    """Handling a walk of the AST, which visits parents before their children in source order."""
+
+    ast = prs.Parser("print 1 + x\nlet y = 2").parse()
+
+    assert [node.kind for node in nodes.walk(ast)] == [
+        NodeKind.PROGRAM,
+        NodeKind.PRINT,
+        NodeKind.BINARY_EXPRESSION,
+        NodeKind.NUMERIC_LITERAL,
+        NodeKind.IDENTIFIER,
+        NodeKind.VAR_DECLARATION,
+        NodeKind.IDENTIFIER,
+        NodeKind.NUMERIC_LITERAL,
+    ]
@@ -0,0 +1,96 @@
+"""
+Unit tests for parallel parsing by the bcl_parser submodule.
+"""
+
+import pytest
+from bcl_parser import parallel
+from bcl_parser import parser as prs
+
+SOURCE = """\
+/* let print func { */
+func add(a, b) {
+    let total = a + b
+    return total
+}
+let message = "let print { func"
+print add(1, 2) // let print {
+do {
+    let x = 1
+    print x
+} while false
+if x == 1 {
+    print "one"
+} else if x == 2 {
+    print "two"
+}
+func nested() {
+    func inner() {
+        return 1
+    }
+    return inner()
+}
+print nested()
+"""
+
+
+@pytest.fixture(autouse=True)
+def __parse_small_sources_in_parallel(monkeypatch):
+    """Parse the (small) test sources in parallel, rather than falling back to the serial Parser."""
+
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_SIZE", 0)
+
+
+def test_split_points():
+    """Handling the pre-scan, which only splits at keywords starting top-level statements."""
+
+    split_points = parallel.find_split_points(SOURCE, len(SOURCE))
+
+    assert [SOURCE[offset : offset + 6] for offset in split_points] == [
+        "func a",
+        "let me",
+        "print ",
+        "do {\n ",
+        "func n",
+        "print ",
+    ]
+
+
+def test_split_points_spread():
+    """Handling the spread of split points, which should give chunks of roughly the same size."""
+
+    source = "print 1\n" * 1000
+
+    split_points = parallel.find_split_points(source, 4)
+
+    assert split_points == [2000, 4000, 6000]
+
+
+@pytest.mark.parametrize("positions", [False, True])
+def test_parallel_ast(positions: bool):
+    """Handling a source split into many chunks, which should produce the same AST as parsing it serially."""
+
+    expected_ast = prs.Parser(SOURCE, positions=positions).parse()
+
+    assert parallel.parse_parallel(SOURCE, workers=2, positions=positions) == expected_ast
+
+
+def test_parallel_ast_bytes():
+    """Handling a bytes source, whose chunks are parsed without being decoded."""
+
+    source = SOURCE.encode("utf-8")
+
+    assert parallel.parse_parallel(source, workers=2, positions=True) == prs.Parser(source, positions=True).parse()
+
+
+def test_parallel_syntax_error():
+    """Handling a syntax error in a chunk, which should be reported just as the serial Parser reports it."""
+
+    source = SOURCE + "let = 1\n"
+
+    with pytest.raises(SyntaxError) as expected_error:
+        prs.Parser(source).parse()
+
+    with pytest.raises(SyntaxError) as actual_error:
+        parallel.parse_parallel(source, workers=2)
+
+    assert str(actual_error.value) == str(expected_error.value)
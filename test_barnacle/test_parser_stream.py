@@ -0,0 +1,80 @@
+"""
+Unit tests for parsing and interpreting text streams a statement at a time.
+"""
+
+import io
+
+import pytest
+from bcl_interpreter import interpreter as itp
+from bcl_parser import parser as prs
+
+from .test_tokenizer_stream import SOURCE as TOKENIZER_SOURCE
+from .test_tokenizer_stream import CountingStream
+
+SOURCE = """\
+func add(a, b) {
+    return a + b
+}
+let total = 0
+while total < 10 {
+    total = add(total, 3)
+}
+if total == 12 {
+    print "twelve"
+} else if total > 12 {
+    print "more"
+} else {
+    print "less"
+}
+do { print total } while false
+print add("a", "b")
+"""
+
+
+@pytest.mark.parametrize("source", [SOURCE, TOKENIZER_SOURCE.replace("/* unterminated block comment", ""), ""])
+def test_same_ast_as_whole_source(source: str):
+    """Handling a text stream, which parses to the same AST as the whole source."""
+
+    expected_ast = prs.Parser(source, positions=True).parse()
+
+    assert prs.Parser(io.StringIO(source), positions=True).parse() == expected_ast
+
+
+def test_statements():
+    """Handling the top-level statements of the source, parsed one at a time."""
+
+    assert list(prs.Parser(SOURCE).statements()) == prs.Parser(SOURCE).parse().body
+
+
+def test_statements_read_lazily():
+    """Handling a long stream, of which only the first statement (and the token after it) should be read."""
+
+    stream = CountingStream('print "spam"\n' * 10_000)
+
+    statements = prs.Parser(stream).statements()
+    next(statements)
+
+    assert stream.characters_read == len('print "spam"\n') * 2
+
+
+def test_interpret_stream(capsys):
+    """Handling a text stream, which is interpreted with the same output as the whole source."""
+
+    itp.Interpreter(io.StringIO(SOURCE)).run()
+
+    actual_stdout, _ = capsys.readouterr()
+
+    assert actual_stdout == "twelve\n12\nab\n"
+
+
+def test_interpret_stream_before_syntax_error(capsys):
+    """Handling a text stream with a syntax error, where the statements before the error are still run."""
+
+    interpreter = itp.Interpreter(io.StringIO("print 1\nprint 2\nprint (\nprint 3"))
+
+    with pytest.raises(SyntaxError):
+        interpreter.run()
+
+    actual_stdout, _ = capsys.readouterr()
+
+    assert actual_stdout == "1\n2\n"
@@ -79,24 +79,22 @@ def test_add_three_string_literals():
                         "name": "x",
                     },
                     "value": {
-                        "type": "binary_expression",
+                        "type": "nary_expression",
                         "operator": "+",
-                        "left": {
-                            "type": "binary_expression",
-                            "operator": "+",
-                            "left": {
+                        "operands": [
+                            {
                                 "type": "string_literal",
                                 "value": "Hello",
                             },
-                            "right": {
+                            {
                                 "type": "string_literal",
                                 "value": " ",
                             },
-                        },
-                        "right": {
-                            "type": "string_literal",
-                            "value": "World",
-                        },
+                            {
+                                "type": "string_literal",
+                                "value": "World",
+                            },
+                        ],
                     },
                 }
             ],
@@ -0,0 +1,85 @@
+"""
+Unit tests for the flat node table form of the AST produced by the bcl_parser submodule.
+"""
+
+import io
+
+import pytest
+from bcl_parser import parser as prs
+from bcl_parser.nodes import NodeKind
+from bcl_parser.table import NodeTable
+
+SOURCE = """\
+func add(a, b) {
+    return a + b
+}
+let x = add(1, 1.0)
+if x > 1 {
+    print "x"
+} else if true {
+    print x
+}
+do {
+    x = x - 1
+} while x != 0
+"""
+
+
+def test_parser_emits_table():
+    """Handling a Parser given a node table, which should emit the same AST as the node classes."""
+
+    ast = prs.Parser(SOURCE, positions=True).parse()
+    table = prs.Parser(SOURCE, positions=True, builder=NodeTable()).parse()
+
+    assert isinstance(table, NodeTable)
+    assert table.kinds[table.root] == NodeKind.PROGRAM
+    assert table.to_nodes() == ast
+
+    converted = NodeTable.from_nodes(ast)
+
+    assert converted.to_nodes() == ast
+    assert len(converted) == len(table)
+
+
+def test_constants_and_names():
+    """Handling the constant pool and name table, which should each hold a distinct value only once."""
+
+    table = prs.Parser("let x = 1\nlet y = x + 1 + 1.0 + x\nprint true", builder=NodeTable()).parse()
+
+    assert sorted(table.names) == ["+", "x", "y"]
+    assert table.constants == [1, 1.0, True]
+
+    print_row = table.node_children(table.root)[-1]
+    (literal_row,) = table.node_children(print_row)
+
+    assert table.kinds[literal_row] == NodeKind.BOOLEAN_LITERAL
+    assert table.constants[table.literals[literal_row]] is True
+
+
+def test_write_and_read():
+    """Handling a node table written to a binary stream, and read back again."""
+
+    table = prs.Parser(SOURCE, positions=True, builder=NodeTable()).parse()
+
+    stream = io.BytesIO()
+    table.write(stream)
+    stream.seek(0)
+
+    read_table = NodeTable.read(stream)
+
+    assert read_table.to_nodes() == table.to_nodes()
+    assert read_table.constants == table.constants
+    assert read_table.names == table.names
+
+
+def test_read_invalid():
+    """Handling streams which do not hold a complete node table."""
+
+    stream = io.BytesIO()
+    prs.Parser(SOURCE, builder=NodeTable()).parse().write(stream)
+
+    with pytest.raises(ValueError):
+        NodeTable.read(io.BytesIO(b"not a node table"))
+
+    with pytest.raises(ValueError):
+        NodeTable.read(io.BytesIO(stream.getvalue()[:-3]))
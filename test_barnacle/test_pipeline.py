@@ -0,0 +1,136 @@
+"""
+Unit tests for the Pipeline which runs the stages of a script from the command line.
+"""
+
+import pytest
+from bcl_cache import cache as cch
+from bcl_parser import nodes
+from bcl_parser import parser as prs
+from bcl_tokenizer import tokenizer as tkn
+from main import Pipeline
+
+SOURCE = """\
+func add(a, b) {
+    return a + b
+}
+print add(1, 2)
+"""
+
+
+@pytest.fixture(name="tokenizer_count")
+def fixture_tokenizer_count(monkeypatch) -> list:
+    """Count the Tokenizers created, which is the number of times a source is tokenized."""
+
+    created = []
+    tokenizer_class = tkn.Tokenizer
+
+    class CountedTokenizer(tokenizer_class):
+        """A Tokenizer which records each time it is created."""
+
+        def __init__(self, source):
+            created.append(source)
+            super().__init__(source)
+
+    monkeypatch.setattr(tkn, "Tokenizer", CountedTokenizer)
+
+    return created
+
+
+def test_stages_run_once(capsys, tokenizer_count: list):
+    """Handling every stage being used, which should tokenize and parse the source only once."""
+
+    pipeline = Pipeline(SOURCE)
+    tokenizer = pipeline.tokenizer()
+    ast = pipeline.ast()
+
+    pipeline.run()
+
+    assert pipeline.tokenizer() is tokenizer
+    assert pipeline.ast() is ast
+    assert len(tokenizer_count) == 1
+    assert capsys.readouterr().out == "3\n"
+    assert ast == prs.Parser(SOURCE, positions=True).parse()
+
+
+def test_lazy_functions(capsys):
+    """Handling function bodies parsed lazily, by the Parser which parsed the rest of the source."""
+
+    pipeline = Pipeline(SOURCE, lazy_functions=True)
+
+    assert pipeline.ast().body[0].body.kind == nodes.NodeKind.UNPARSED_CODE_BLOCK
+
+    pipeline.run()
+
+    assert capsys.readouterr().out == "3\n"
+
+
+def test_cached_ast_is_not_tokenized(tmp_path, capsys, tokenizer_count: list):
+    """Handling an AST in the compile cache, which should be run without tokenizing the source."""
+
+    cache = cch.CompileCache(str(tmp_path))
+    Pipeline(SOURCE, cache=cache).run()
+    tokenizer_count.clear()
+
+    pipeline = Pipeline(SOURCE, cache=cache)
+    pipeline.run()
+
+    assert not tokenizer_count
+    assert pipeline.ast() == prs.Parser(SOURCE, positions=True).parse()
+    assert capsys.readouterr().out == "3\n3\n"
+
+
+def test_cached_lazy_ast(tmp_path, capsys, tokenizer_count: list):
+    """Handling a lazily parsed AST in the compile cache, whose function bodies are parsed from the cached tokens."""
+
+    cache = cch.CompileCache(str(tmp_path))
+    Pipeline(SOURCE, lazy_functions=True, cache=cache).run()
+
+    assert sorted(entry.suffix for entry in tmp_path.iterdir()) == [".lazy-ast", ".tokens"]
+
+    tokenizer_count.clear()
+    pipeline = Pipeline(SOURCE, lazy_functions=True, cache=cache)
+    pipeline.run()
+
+    assert not tokenizer_count
+    assert pipeline.ast() == prs.Parser(SOURCE, positions=True, lazy_functions=True).parse()
+    assert capsys.readouterr().out == "3\n3\n"
+
+
+def test_cache_with_syntax_error_in_function(tmp_path, capsys):
+    """Handling a syntax error in a function which is never called, which is only reported if it is called."""
+
+    source = "func broken() {\n    let = 1\n}\n" + SOURCE
+    cache = cch.CompileCache(str(tmp_path))
+
+    Pipeline(source, lazy_functions=True, cache=cache).run()
+    Pipeline(source, lazy_functions=True, cache=cache).run()
+
+    assert capsys.readouterr().out == "3\n3\n"
+
+    with pytest.raises(SyntaxError):
+        Pipeline(source, cache=cache).ast()
+
+
+def test_corrupted_cached_ast(tmp_path, capsys, caplog):
+    """Handling an entry in the compile cache which is not a valid AST, which is ignored and the source parsed."""
+
+    cache = cch.CompileCache(str(tmp_path))
+    cache.store(SOURCE, "ast", b"not an AST")
+
+    Pipeline(SOURCE, cache=cache).run()
+
+    assert capsys.readouterr().out == "3\n"
+    assert "Ignoring corrupted AST in the compile cache" in caplog.text
+
+
+def test_corrupted_cached_tokens(tmp_path, capsys, caplog):
+    """Handling corrupted tokens of a cached lazily parsed AST, which are ignored and the source parsed."""
+
+    cache = cch.CompileCache(str(tmp_path))
+    Pipeline(SOURCE, lazy_functions=True, cache=cache).run()
+    cache.store(SOURCE, "tokens", b"not tokens")
+
+    Pipeline(SOURCE, lazy_functions=True, cache=cache).run()
+
+    assert capsys.readouterr().out == "3\n3\n"
+    assert "Ignoring corrupted tokens in the compile cache" in caplog.text
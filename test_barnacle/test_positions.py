@@ -0,0 +1,121 @@
+"""
+Unit tests for source positions (line and column numbers) across the tokenizer, parser and interpreter.
+"""
+
+import io
+
+import pytest
+from bcl_interpreter import interpreter as itp
+from bcl_parser import parser as prs
+from bcl_tokenizer import stream as tks
+from bcl_tokenizer import tokenizer as tkn
+from bcl_tokenizer.positions import LineIndex, StreamLineIndex
+
+
+def test_line_index():
+    """Handling the conversion of offsets to lines and columns."""
+
+    line_index = LineIndex("ab\ncd\n\nef")
+
+    assert line_index.position(0) == (1, 1)
+    assert line_index.position(1) == (1, 2)
+    assert line_index.position(2) == (1, 3)
+    assert line_index.position(3) == (2, 1)
+    assert line_index.position(6) == (3, 1)
+    assert line_index.position(8) == (4, 2)
+    assert line_index.describe(4) == "line 2, column 2"
+
+
+def test_line_index_bytes():
+    """Handling the conversion of byte offsets, where columns still count characters."""
+
+    line_index = LineIndex('x\n"éé" y'.encode("utf-8"))
+
+    assert line_index.position(2) == (2, 1)
+    assert line_index.position(9) == (2, 6)
+
+
+def test_token_positions():
+    """Handling the positions of tokens, which are only worked out when asked for."""
+
+    tokenizer = tkn.Tokenizer("let x = 1\n\n  print x")
+
+    assert tokenizer.position(0) == (1, 1)
+    assert tokenizer.position(3) == (1, 9)
+    assert tokenizer.position(4) == (3, 3)
+    assert tokenizer.position(5) == (3, 9)
+
+
+def test_tokenizer_error_position():
+    """Handling the position of unknown syntax, in both the Tokenizer and the streaming tokenizer."""
+
+    source = 'let x = 1\nprint "a" + ~'
+
+    with pytest.raises(SyntaxError, match=r"line 2, column 13"):
+        tkn.Tokenizer(source)
+
+    with pytest.raises(SyntaxError, match=r"line 2, column 13"):
+        list(tks.iter_tokens(io.StringIO(source), chunk_size=4))
+
+
+def test_parser_error_position():
+    """Handling the position of an unexpected token."""
+
+    with pytest.raises(SyntaxError, match=r"line 3, column 9"):
+        prs.Parser("print 1\n{\n    let = 2\n}").parse()
+
+
+def test_parser_statement_offsets():
+    """Handling the offsets recorded on statement nodes when positions are requested."""
+
+    ast = prs.Parser("print 1\n{ x = 2 }", positions=True).parse()
+
+    assert ast.body[0].offset == 0
+    assert ast.body[1].offset == 8
+    assert ast.body[1].body[0].offset == 10
+
+
+def test_interpreter_error_position():
+    """Handling the position of a runtime error, which is reported for the innermost statement."""
+
+    source = """\
+func add_one(value) {
+    return value + 1
+}
+print add_one("one")
+"""
+
+    interpreter = itp.Interpreter(source)
+
+    with pytest.raises(RuntimeError, match=r"\(line 2, column 5\)$"):
+        interpreter.run()
+
+
+def test_stream_line_index():
+    """Handling the conversion of offsets to lines and columns, as a stream is read."""
+
+    line_index = StreamLineIndex()
+    line_index.add_text("ab\nc")
+    line_index.add_text("d\n\nef")
+
+    assert line_index.position(0) == (1, 1)
+    assert line_index.position(3) == (2, 1)
+    assert line_index.position(4) == (2, 2)
+    assert line_index.position(6) == (3, 1)
+    assert line_index.describe(8) == "line 4, column 2"
+
+
+def test_streamed_parser_error_position():
+    """Handling the position of an unexpected token in a streamed source."""
+
+    with pytest.raises(SyntaxError, match=r"line 3, column 9"):
+        prs.Parser(io.StringIO("print 1\n{\n    let = 2\n}")).parse()
+
+
+def test_streamed_interpreter_error_position():
+    """Handling the position of a runtime error in a streamed source."""
+
+    interpreter = itp.Interpreter(io.StringIO('let x = 1\n\nprint x\nprint x - "one"\nprint x'))
+
+    with pytest.raises(RuntimeError, match=r"\(line 4, column 1\)$"):
+        interpreter.run()
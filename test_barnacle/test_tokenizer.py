@@ -2,7 +2,9 @@
 Unit tests for the bcl_tokenizer submodule.
 """
 
+import pytest
 from bcl_tokenizer import tokenizer as tkn
+from bcl_tokenizer.tokens import TokenType
 
 
 def __verify_first_token(source: str, expected_type: str, expected_value: str):
@@ -94,6 +96,16 @@ def test_comments():
     __verify_token(source, {"type": "PROGRAM_END", "value": None})
 
 
+def test_long_whitespace_and_comment_runs():
+    """Handling source with very long runs of whitespace and comments between tokens."""
+
+    padding = " " * 5000 + "\n" * 5000 + "\r\n\t" * 5000
+    banner = "/*" + "*" * 5000 + " license " * 5000 + "*" * 5000 + "*/"
+    line_comments = "// comment\n" * 5000
+
+    __verify_token(padding + banner + line_comments + "x" + padding, {"type": "IDENTIFIER", "value": "x"})
+
+
 def test_number_literals():
     """Handling number literals."""
 
@@ -407,3 +419,71 @@ def test_keyword_do():
     __verify_not_token_type("doo", "DO")
     __verify_not_token_type("d = o", "DO")
     __verify_not_token_type("DO", "DO")
+
+
+def test_token_stream():
+    """Handling a sequence of tokens, including identifiers which start with a keyword."""
+
+    source = """\
+let letter = -1.5 /* block */ // line
+if iffy != true_value { print "x" }
+"""
+
+    tokenizer = tkn.Tokenizer(source)
+
+    actual_tokens = []
+    while not tokenizer.end_of_stream():
+        actual_tokens.append(tokenizer.next_token())
+
+    assert actual_tokens == [
+        {"type": "LET", "value": "let"},
+        {"type": "IDENTIFIER", "value": "letter"},
+        {"type": "=", "value": "="},
+        {"type": "NUMBER", "value": "-1.5"},
+        {"type": "IF", "value": "if"},
+        {"type": "IDENTIFIER", "value": "iffy"},
+        {"type": "!=", "value": "!="},
+        {"type": "IDENTIFIER", "value": "true_value"},
+        {"type": "{", "value": "{"},
+        {"type": "PRINT", "value": "print"},
+        {"type": "STRING", "value": '"x"'},
+        {"type": "}", "value": "}"},
+    ]
+
+
+def test_compact_token_columns():
+    """Handling the compact token columns, which hold token kinds and source offsets instead of token dicts."""
+
+    tokenizer = tkn.Tokenizer('let  x = "hi" // done')
+
+    assert list(tokenizer.kinds) == [
+        TokenType.LET,
+        TokenType.IDENTIFIER,
+        TokenType.ASSIGN,
+        TokenType.STRING,
+        TokenType.PROGRAM_END,
+    ]
+    assert list(tokenizer.starts) == [0, 5, 7, 9, 21]
+    assert list(tokenizer.ends) == [3, 6, 8, 13, 21]
+
+    assert len(tokenizer) == 5
+    assert tokenizer.text(3) == '"hi"'
+    assert tokenizer.token(1) == {"type": "IDENTIFIER", "value": "x"}
+    assert tokenizer.token(4) == {"type": "PROGRAM_END", "value": None}
+
+
+def test_dumped_token_columns():
+    """Handling token columns written out as bytes, which are loaded for the same source without scanning it."""
+
+    source = 'let  x = "hi" // done'
+    tokenizer = tkn.Tokenizer(source)
+    loaded = tkn.Tokenizer.loads(source, tokenizer.dumps())
+
+    assert (loaded.kinds, loaded.starts, loaded.ends) == (tokenizer.kinds, tokenizer.starts, tokenizer.ends)
+    assert loaded.token(3) == {"type": "STRING", "value": '"hi"'}
+
+    with pytest.raises(ValueError):
+        tkn.Tokenizer.loads(source, tokenizer.dumps()[:-1])
+
+    with pytest.raises(ValueError):
+        tkn.Tokenizer.loads(source + " ", tokenizer.dumps())
@@ -0,0 +1,81 @@
+"""
+Unit tests for the incremental re-tokenization of edited sources by the bcl_tokenizer submodule.
+"""
+
+import logging
+
+import pytest
+from bcl_tokenizer import tokenizer as tkn
+from bcl_tokenizer.edits import TextEdit
+
+from .parser_helpers import EDITED_SOURCE as SOURCE
+
+
+def __verify_edit(source, edit: TextEdit):
+    """Verify that re-tokenizing the edited source produces the same tokens as tokenizing it from scratch."""
+
+    incremental = tkn.Tokenizer(source).edited(edit)
+    expected = tkn.Tokenizer(edit.apply(source))
+
+    assert incremental.source == expected.source
+    assert list(incremental.kinds) == list(expected.kinds)
+    assert list(incremental.starts) == list(expected.starts)
+    assert list(incremental.ends) == list(expected.ends)
+
+
+@pytest.mark.parametrize(
+    "edit",
+    [
+        TextEdit(0, 0, "// "),
+        TextEdit(4, 5, "sum"),
+        TextEdit(12, 1, "10.25"),
+        TextEdit(len("let total = 0\n/*"), 0, "*/ let x = 1 /*"),
+        TextEdit(SOURCE.index("a + b"), 1, "a - "),
+        TextEdit(SOURCE.index("1.5"), 1, "2"),
+        TextEdit(SOURCE.index("1.5") + 1, 2, ""),
+        TextEdit(SOURCE.index("// keep"), 2, '"//"'),
+        TextEdit(SOURCE.index('"total: "') + 1, 0, "the "),
+        TextEdit(len(SOURCE), 0, "print total"),
+        TextEdit(0, len(SOURCE), ""),
+    ],
+)
+def test_edits(edit: TextEdit):
+    """Handling a range of edits, including ones which change where comments and strings end."""
+
+    __verify_edit(SOURCE, edit)
+
+
+def test_edit_closes_unterminated_comment():
+    """Handling an edit which closes a block comment that was previously unterminated (and so scanned as `/ *`)."""
+
+    __verify_edit("x = a /* b c", TextEdit(12, 0, " */ + d"))
+
+
+def test_edit_bytes():
+    """Handling an edit of a bytes source, where offsets count bytes."""
+
+    source = 'print "héllo" + x'.encode("utf-8")
+
+    __verify_edit(source, TextEdit(source.index(b"x"), 1, '"wörld"'))
+
+
+def test_edit_invalid():
+    """Handling an edit which introduces invalid syntax."""
+
+    with pytest.raises(SyntaxError):
+        tkn.Tokenizer(SOURCE).edited(TextEdit(4, 0, "@"))
+
+    with pytest.raises(ValueError):
+        tkn.Tokenizer(SOURCE).edited(TextEdit(len(SOURCE), 1, ""))
+
+
+def test_edit_rescans_only_damaged_region(caplog):
+    """Handling an edit in a long source, which should only re-scan the tokens around the edit."""
+
+    source = "let x = 1\n" * 10_000
+    offset = source.index("1", len(source) // 2)
+
+    with caplog.at_level(logging.DEBUG):
+        tkn.Tokenizer(source).edited(TextEdit(offset, 1, "23"))
+
+    assert "re-scanned 2 tokens" in caplog.text
@@ -0,0 +1,87 @@
+"""
+Unit tests for tokenizing UTF-8 bytes and memory-mapped scripts with the bcl_tokenizer submodule.
+"""
+
+import mmap
+
+from bcl_interpreter import interpreter as itp
+from bcl_tokenizer import tokenizer as tkn
+
+SOURCE = """\
+/* Ünïcödé in a block comment */
+let greeting = "Grüße, 世界!"
+func shout(text) {
+    return text + "!"
+}
+if 1.5 >= -2 { print shout(greeting) } // trailing ç
+"""
+
+
+def __token_stream(source) -> list[dict]:
+    """Return the dict form of every token in the source."""
+
+    tokenizer = tkn.Tokenizer(source)
+    return [tokenizer.token(index) for index in range(len(tokenizer))]
+
+
+def test_bytes_same_tokens_as_str():
+    """Handling a UTF-8 encoded source, which should produce the same tokens as the decoded source."""
+
+    assert __token_stream(SOURCE.encode("utf-8")) == __token_stream(SOURCE)
+
+
+def test_bytes_offsets():
+    """Handling token offsets in a bytes source, which are byte offsets rather than character offsets."""
+
+    source = 'print "é" x'
+
+    tokenizer = tkn.Tokenizer(source.encode("utf-8"))
+
+    assert list(tokenizer.starts) == [0, 6, 11, 12]
+    assert tokenizer.text(1) == '"é"'
+
+
+def test_bytes_unicode_whitespace():
+    """Handling non-ASCII whitespace between tokens in a bytes source."""
+
+    source = "let x =　5 "
+
+    assert __token_stream(source.encode("utf-8")) == __token_stream(source)
+
+
+def test_mmap(tmp_path):
+    """Handling a memory-mapped script."""
+
+    script = tmp_path / "script.bcl"
+    script.write_text(SOURCE, encoding="utf-8")
+
+    with open(script, "rb") as script_file:
+        with mmap.mmap(script_file.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            assert __token_stream(source) == __token_stream(SOURCE)
+
+
+def test_mmap_interpreter(tmp_path, capsys):
+    """Handling a memory-mapped script in the interpreter."""
+
+    script = tmp_path / "script.bcl"
+    script.write_text(SOURCE, encoding="utf-8")
+
+    with open(script, "rb") as script_file:
+        with mmap.mmap(script_file.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            itp.Interpreter(source).run()
+
+    actual_stdout, _ = capsys.readouterr()
+
+    assert actual_stdout == "Grüße, 世界!!\n"
+
+
+def test_offsets_past_2_gib():
+    """Handling offsets past 2 GiB, as found in large memory-mapped scripts, which the offset columns can hold."""
+
+    tokenizer = tkn.Tokenizer(SOURCE.encode("utf-8"))
+    large_offset = 2**31 + 1
+
+    for column in (tokenizer.starts, tokenizer.ends, tokenizer.line_index.line_starts):
+        column.append(large_offset)
+
+        assert column[-1] == large_offset
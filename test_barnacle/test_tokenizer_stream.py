@@ -0,0 +1,140 @@
+"""
+Unit tests for the streaming tokenization of the bcl_tokenizer submodule.
+"""
+
+import io
+
+import pytest
+from bcl_tokenizer import stream as tks
+from bcl_tokenizer import tokenizer as tkn
+
+SOURCE = """\
+/* A block comment which is long enough to cross several chunk boundaries */
+let greeting = "Hello, streaming World!"
+// A single-line comment
+func add(a, b) {
+    return a + b - -1.25 * 100
+}
+if add(1, 2) >= 3 { print greeting } else { print false }
+x = x / 2 /* unterminated block comment
+"""
+
+
+class CountingStream(io.StringIO):
+    """A text stream which records how many characters have been read from it."""
+
+    def __init__(self, source: str):
+        super().__init__(source)
+        self.characters_read = 0
+
+    def read(self, size: int = -1) -> str:
+        chunk = super().read(size)
+        self.characters_read += len(chunk)
+        return chunk
+
+    def readline(self, size: int = -1) -> str:
+        line = super().readline(size)
+        self.characters_read += len(line)
+        return line
+
+
+def __tokenize(source: str) -> list[dict]:
+    """Tokenize the source with the (non-streaming) Tokenizer."""
+
+    tokenizer = tkn.Tokenizer(source)
+    return [tokenizer.token(index) for index in range(len(tokenizer))]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, 64, 4096])
+def test_same_tokens_as_tokenizer(chunk_size: int):
+    """Handling tokens which cross chunk boundaries, for a range of chunk sizes."""
+
+    assert list(tks.iter_tokens(io.StringIO(SOURCE), chunk_size)) == __tokenize(SOURCE)
+
+
+def test_token_offsets():
+    """Handling the offsets of streamed tokens, which are relative to the start of the whole stream."""
+
+    tokenizer = tkn.Tokenizer(SOURCE)
+
+    streamed = list(tks.scan_stream(io.StringIO(SOURCE), chunk_size=7))
+
+    assert [kind for kind, _, _ in streamed] == list(tokenizer.kinds)
+    assert [start for _, start, _ in streamed] == list(tokenizer.starts)
+
+
+def test_empty_stream():
+    """Handling an empty stream."""
+
+    assert list(tks.iter_tokens(io.StringIO(""))) == [{"type": "PROGRAM_END", "value": None}]
+
+
+def test_reads_lazily():
+    """Handling a long stream, of which only the first chunk should be read to produce the first token."""
+
+    stream = CountingStream('print "spam"\n' * 10_000)
+
+    tokens = tks.iter_tokens(stream, chunk_size=100)
+
+    assert next(tokens) == {"type": "PRINT", "value": "print"}
+    assert stream.characters_read == 100
+
+
+def test_unknown_syntax():
+    """Handling invalid syntax, including an unterminated string which reaches the end of the stream."""
+
+    with pytest.raises(SyntaxError):
+        list(tks.iter_tokens(io.StringIO("let x = 5 @"), chunk_size=3))
+
+    with pytest.raises(SyntaxError):
+        list(tks.iter_tokens(io.StringIO('print "Where is the other quote mark?'), chunk_size=3))
+
+
+def test_line_reader_reads_lines():
+    """Handling a stream read a line at a time, so each line can be scanned as soon as it has arrived."""
+
+    stream = CountingStream("let x = 1\nprint x\n" * 100)
+
+    reader = tks.LineReader(stream, chunk_size=100)
+
+    assert reader.read(100) == "let x = 1\n"
+    assert stream.characters_read == 10
+    assert reader.line_index.position(12) == (2, 3)
+
+
+def test_line_reader_long_token():
+    """Handling a token longer than a chunk, which is completed by reading whole lines."""
+
+    comment = "/*" + "comment\n" * 1000 + "*/"
+
+    tokens = list(tks.scan_stream(tks.LineReader(io.StringIO(comment + "print 1"), chunk_size=16), chunk_size=16))
+
+    assert [kind for kind, _, _ in tokens] == list(tkn.Tokenizer(comment + "print 1").kinds)
+
+
+def test_stream_tokenizer():
+    """Handling the token columns of a StreamTokenizer, which are indexed by the position of tokens in the stream."""
+
+    tokenizer = tkn.Tokenizer(SOURCE)
+    stream_tokenizer = tks.StreamTokenizer(io.StringIO(SOURCE), chunk_size=7)
+
+    for index in range(len(tokenizer)):
+        assert stream_tokenizer.kinds[index] == tokenizer.kinds[index]
+        assert stream_tokenizer.starts[index] == tokenizer.starts[index]
+        assert stream_tokenizer.position(index) == tokenizer.position(index)
+
+        if index < len(tokenizer) - 1:
+            assert stream_tokenizer.text(index) == tokenizer.text(index)
+
+
+def test_stream_tokenizer_drops_old_tokens(monkeypatch):
+    """Handling a long stream, of which only the most recent tokens are kept."""
+
+    monkeypatch.setattr(tks, "TOKEN_WINDOW_SIZE", 8)
+
+    stream_tokenizer = tks.StreamTokenizer(io.StringIO("print x\n" * 100))
+
+    for index in range(150):
+        assert stream_tokenizer.text(index) == ("print" if index % 2 == 0 else "x")
+        assert stream_tokenizer.text(index - 1 if index else 0)
+        assert stream_tokenizer.load(index) < 8
@@ -0,0 +1,88 @@
+"""
+Unit tests for the bcl_transpiler submodule, which transpiles the AST into Python.
+"""
+
+import ast as py
+
+import pytest
+from bcl_transpiler import interpreter as tsp
+
+from .interpreter_helpers import VARIABLE_DECLARED_AFTER_FUNCTION_SOURCE
+
+
+def python_source(source: str) -> str:
+    """Return the Python source a script is transpiled into."""
+
+    return py.unparse(tsp.TranspiledInterpreter(source).module())
+
+
+def test_native_operators():
+    """Handling operations whose operands are proven to be numbers or strings, which use Python's operators."""
+
+    source = python_source("""
+        let i = 0
+        let s = "a"
+        while i < 10 {
+            i = i + 1
+            s = s + "b"
+        }
+        print i * 2 == 20
+        """)
+
+    assert "while i_0 < 10:" in source
+    assert "i_0 = i_0 + 1" in source
+    assert "s_0 = s_0 + 'b'" in source
+    assert "print('true' if i_0 * 2 == 20 else 'false')" in source
+    assert "bcl_" not in source
+
+
+def test_operations_of_unknown_types():
+    """Handling operations on values whose types are not proven, which keep Barnacle's semantics."""
+
+    source = python_source('func f(a) { return a + 1 }\nlet x = 1\nx = "one"\nprint x - "e"')
+
+    assert "bcl_add(a_1, 1)" in source
+    # Subtracting a string from anything else raises an error, so the result is a string
+    assert "print(bcl_subtract(x_0, 'e'))" in source
+
+
+def test_variable_declared_after_function(capsys):
+    """Handling a variable which a function uses before it is declared, which is checked when the function is called."""
+
+    source = VARIABLE_DECLARED_AFTER_FUNCTION_SOURCE
+
+    tsp.TranspiledInterpreter(source).run()
+
+    assert capsys.readouterr().out == "1\n"
+    assert "value_2 if value_2 is not bcl_undeclared else value_0" in python_source(source)
+
+
+def test_static_errors():
+    """Handling errors which are known when the script is transpiled, which are still raised when they occur."""
+
+    source = python_source("let x = 1\nlet x = 2\nprint y\nfunc f(a) { return a }\nprint f(1, 2)")
+
+    assert "bcl_redeclared_variable(2, 'x')" in source
+    assert "bcl_undeclared_variable('y')" in source
+    assert "bcl_arity_error('f', 1, 2)(1, 2)" in source
+
+
+def test_undeclared_top_level_function():
+    """Handling a top-level function called by another before it has been declared."""
+
+    source = "func f() {\n    return g()\n}\nprint f()\nfunc g() { return 1 }"
+
+    with pytest.raises(
+        RuntimeError, match=r"^Tried to get function 'g' which has not been declared \(line 2, column 5\)$"
+    ):
+        tsp.TranspiledInterpreter(source).run()
+
+
+def test_deeply_nested_loops(capsys):
+    """Handling loops nested too deeply for CPython to compile, which are run by the virtual machine instead."""
+
+    interpreter = tsp.TranspiledInterpreter("let i = 0\n" + "while i < 1 { " * 30 + 'print "deep"\ni = 1' + " }" * 30)
+    interpreter.run()
+
+    assert interpreter.code() is None
+    assert capsys.readouterr().out == "deep\n"
@@ -0,0 +1,63 @@
+"""
+Unit tests for the bytecode virtual machine of the bcl_vm submodule.
+"""
+
+import sys
+
+import pytest
+from bcl_vm import vm
+
+DEPTH = 5000
+
+
+def test_deeply_nested_expression(capsys):
+    """Handling an expression nested thousands deep, which is run without recursion."""
+
+    vm.VirtualMachine("print " + "1 - (" * DEPTH + "2" + ")" * DEPTH).run()
+
+    # 1 - (1 - 2) is 2, so every pair of subtractions cancels out
+    assert capsys.readouterr().out == "2\n"
+
+
+def test_deeply_nested_calls(capsys):
+    """Handling function calls nested thousands deep as arguments."""
+
+    vm.VirtualMachine("func f(x) { return x + 1 }\nprint " + "f(" * DEPTH + "0" + ")" * DEPTH).run()
+
+    assert capsys.readouterr().out == f"{DEPTH}\n"
+
+
+def test_deep_recursion(capsys):
+    """Handling recursion far deeper than Python's recursion limit, as calls do not recurse in the machine."""
+
+    depth = sys.getrecursionlimit() * 10
+    source = f"""
+    func count(n) {{
+        if n == 0 {{
+            return 0
+        }}
+        return 1 + count(n - 1)
+    }}
+    print count({depth})
+    """
+
+    vm.VirtualMachine(source).run()
+
+    assert capsys.readouterr().out == f"{depth}\n"
+
+
+def test_maximum_call_depth(capsys):
+    """Handling unbounded recursion, which raises an error once the maximum call depth is reached."""
+
+    source = """\
+func count(n) {
+    print n
+    return count(n + 1)
+}
+count(1)
+"""
+
+    with pytest.raises(RuntimeError, match=r"^Exceeded the maximum call depth of 3 \(line 3, column 5\)$"):
+        vm.VirtualMachine(source, max_call_depth=3).run()
+
+    assert capsys.readouterr().out == "1\n2\n3\n"